@@ -3,218 +3,150 @@ Flask API Server for Engagement Scoping Tool
 Bridges Next.js frontend with Python backend
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from pathlib import Path
-import json
-import os
+import csv
+import io
+import math
+import tempfile
 from datetime import datetime
 import traceback
+import atexit
 
 from backend.scoping_engine import ScopingEngine
-from backend.config import OUTPUT_DIR, AVAILABLE_ROLES
+from backend.core.report_service import ReportService, ReportServiceBusy, ReportServiceTimeout
+from backend.core.sow_preview import SOWPreviewRenderer, FORMATS as PREVIEW_FORMATS
+from backend.utils.zip_stream import stream_zip
+from backend.utils import json_serializer
+from backend.core.sensitivity import IncrementalScorer, analyze_sensitivity, MAX_SENSITIVITY_RANGE
+from backend.core.boundary_analysis import BoundaryAnalyzer
+from backend.core.fte_calculator import FTEEffortsCalculator
+from backend.core.result_records import to_plain
+from backend.core.scoping_model import current_model, get_registry
+from backend.core import monte_carlo
+from backend.core.submission_compare import compare_submissions
+from backend.core.scope_optimizer import ScopeOptimizer, DEFAULT_TIME_BUDGET_SECONDS, MAX_TIME_BUDGET_SECONDS
+from backend.utils.formula_compiler import formula_memo_stats
+from backend.config import HOURS_PER_DAY, OUTPUT_DIR, TIERS
+from backend.data.frontend_mapping import FRONTEND_TO_BACKEND_MAP, transform_frontend_to_backend_format
+from backend.storage.analytics import DEFAULT_TOP
+from backend.storage.search_index import DEFAULT_PAGE_SIZE
+from backend.storage.results import (
+    RESULTS_DIR, find_user_submission, get_analytics_store, get_search_index,
+    iter_stored_submissions, load_user_results, load_recomputed_versions, save_user_result
+)
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    jsonify() and request parsing through backend.utils.json_serializer (orjson when installed)
+    
+    Keeps Flask's defaults: sorted keys, indented output in debug mode and
+    Flask's encoding of dates, decimals and UUIDs.
+    """
+    
+    def dumps(self, obj, **kwargs):
+        return json_serializer.dumps(obj, sort_keys=kwargs.get('sort_keys', self.sort_keys),
+                                     indent=bool(kwargs.get('indent')), default=self.default).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return json_serializer.loads(s)
+    
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        # Encoded straight to bytes, no intermediate str
+        body = json_serializer.dumps(obj, sort_keys=self.sort_keys, indent=indent, default=self.default)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
+
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)
 CORS(app)  # Enable CORS for Next.js frontend
 
 # Ensure output directory exists
 OUTPUT_DIR.mkdir(exist_ok=True, parents=True)
 
 # Directory to store results JSON files
-RESULTS_DIR = OUTPUT_DIR / 'results'
 RESULTS_DIR.mkdir(exist_ok=True, parents=True)
 
+DOCX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
 
-# Mapping from frontend IDs to backend names (matching Excel file)
-FRONTEND_TO_BACKEND_MAP = {
-    # Dimensions
-    'account': 'Account',
-    'acc_alt_hier': 'Account Alternate Hierarchies',
-    'rat_coa': 'Rationalization of CoA',
-    'multi_curr': 'Multi-Currency',
-    'rep_curr': 'Reporting Currency',
-    'entity': 'Entity',
-    'ent_redesign': 'Entity Redesign',
-    'ent_alt_hier': 'Entity Alternate Hierarchies',
-    'scenario': 'Scenario',
-    'multi_gaap': 'Multi-GAAP',
-    'cust_dim': 'Custom Dimensions',
-    'alt_hier_cust': 'Alternate Hierarchies in Custom Dimensions',
-    'add_alias': 'Additional Alias Tables',
-    
-    # Application Features
-    'elim': 'Elimination',
-    'cust_elim': 'Custom Elimination Requirement',
-    'consol_journ': 'Consolidation Journals',
-    'journ_temp': 'Journal Templates',
-    'parent_curr': 'Parent Currency Journals',
-    'own_mgmt': 'Ownership Management',
-    'enh_org': 'Enhanced Organization by Period',
-    'equity_pickup': 'Equity Pickup',
-    'partner_elim': 'Partner Elimination',
-    'config_consol': 'Configurable Consolidation Rules',
-    'cash_flow': 'Cash Flow',
-    'supp_data': 'Supplemental Data Collection',
-    'ent_journ': 'Enterprise Journals',
-    'approval': 'Approval Process',
-    'hist_over': 'Historic Overrides',
-    'task_mgr': 'Task Manager',
-    'audit': 'Audit',
-    
-    # Application Customization
-    'data_forms': 'Data Forms',
-    'dashboards': 'Dashboards',
-    
-    # Calculations
-    'bus_rules': 'Business Rules',
-    'mem_formula': 'Member Formula',
-    'mem_form': 'Member Formula',  # Alternative frontend ID
-    'ratios': 'Ratios',
-    'cust_kpis': 'Custom KPIs',
-    'cust_kpi': 'Custom KPIs',  # Alternative frontend ID
-    
-    # Security
-    'sec_dim': 'Secured Dimensions',
-    'num_users': 'Number of Users',
-    
-    # Historical Data
-    'hist_data_val': 'Historical Data Validation',
-    'hist_data': 'Historical Data Validation',  # Alternative frontend ID
-    'data_val_acc': 'Data Validation for Account Alt Hierarchies',
-    'val_acc_alt': 'Data Validation for Account Alt Hierarchies',  # Alternative frontend ID
-    'data_val_ent': 'Data Validation for Entity Alt Hierarchies',
-    'val_ent_alt': 'Data Validation for Entity Alt Hierarchies',  # Alternative frontend ID
-    'hist_journ_conv': 'Historical Journal Conversion',
-    'hist_journ': 'Historical Journal Conversion',  # Alternative frontend ID
-    
-    # Integrations
-    'file_loads': 'Files Based Loads',
-    'file_load': 'Files Based Loads',  # Alternative frontend ID
-    'direct_connect': 'Direct Connect Integrations',
-    'direct_conn': 'Direct Connect Integrations',  # Alternative frontend ID
-    'outbound_int': 'Outbound Integrations',
-    'outbound': 'Outbound Integrations',  # Alternative frontend ID
-    'pipeline': 'Pipeline',
-    'cust_script': 'Custom Scripting',
-    
-    # Reporting
-    'mgmt_reports': 'Management Reports',
-    'mgmt_rep': 'Management Reports',  # Alternative frontend ID
-    'consol_reports': 'Consolidation Reports',
-    'consol_rep': 'Consolidation Reports',  # Alternative frontend ID
-    'consol_journ_reports': 'Consolidation Journal Reports',
-    'consol_journ_rep': 'Consolidation Journal Reports',  # Alternative frontend ID
-    'ic_reports': 'Intercompany Reports',
-    'inter_rep': 'Intercompany Reports',  # Alternative frontend ID
-    'task_mgr_reports': 'Task Manager Reports',
-    'task_rep': 'Task Manager Reports',  # Alternative frontend ID
-    'ent_journ_reports': 'Enterprise Journal Reports',
-    'ent_journ_rep': 'Enterprise Journal Reports',  # Alternative frontend ID
-    'smart_view': 'Smart View Reports',
-    
-    # Automations
-    'auto_loads': 'Automated Data loads',
-    'auto_load': 'Automated Data loads',  # Alternative frontend ID
-    'auto_consol': 'Automated Consolidations',
-    'backup_arch': 'Backup and Archival',
-    'backup': 'Backup and Archival',  # Alternative frontend ID
-    'meta_import': 'Metadata Import',
-    'meta_imp': 'Metadata Import',  # Alternative frontend ID
-    
-    # Testing/Training
-    'unit_test': 'Unit Testing',
-    'uat': 'UAT',
-    'sit': 'SIT',
-    'parallel_test': 'Parallel Testing',
-    'par_test': 'Parallel Testing',  # Alternative frontend ID
-    'user_train': 'User Training',
-    
-    # Transition
-    'go_live': 'Go Live',
-    'hypercare': 'Hypercare',
-    
-    # Documentations
-    'rtm': 'RTM',
-    'design_doc': 'Design Document',
-    'sys_config_doc': 'System Configuration Document',
-    'sys_config': 'System Configuration Document',  # Alternative frontend ID
-    
-    # Change Management
-    'admin_desktop': 'Admin Desktop Procedures',
-    'admin_proc': 'Admin Desktop Procedures',  # Alternative frontend ID
-    'user_desktop': 'End User Desktop Procedures',
-    'end_user_proc': 'End User Desktop Procedures',  # Alternative frontend ID
-    
-    # Project Management
-    'proj_mgmt': 'Project Management'
-}
-
-
-def transform_frontend_to_backend_format(scoping_data, selected_roles):
-    """
-    Transform frontend data format to backend format
-    
-    Frontend format: { 'scope_item_id': { value: 'YES/NO', count: 123 } }
-    Backend format: [{ name: 'Item Name', in_scope: 'YES/NO', details: 123 }]
-    """
-    scope_inputs = []
-    
-    for item_id, data in scoping_data.items():
-        # Use mapping to get exact name from Excel
-        item_name = FRONTEND_TO_BACKEND_MAP.get(item_id)
-        
-        if not item_name:
-            # Fallback: try to clean up the ID
-            item_name = item_id.replace('_', ' ').replace('-', ' ').title()
-            print(f"Warning: No mapping found for '{item_id}', using fallback: '{item_name}'")
-        
-        scope_inputs.append({
-            'name': item_name,
-            'in_scope': data.get('value', 'NO'),
-            'details': data.get('count', 0) if data.get('value') == 'YES' else 0
-        })
-    
-    return scope_inputs
+# Export manifests larger than this are spooled to a temporary file
+EXPORT_MANIFEST_SPOOL_BYTES = 1024 * 1024
 
+# Word reports are rendered in worker processes so request threads don't contend on the GIL
+report_service = ReportService()
+atexit.register(report_service.shutdown, wait=False)
+atexit.register(monte_carlo.shutdown_pool)
 
-def get_user_results_file(user_email):
-    """Get the path to user's results JSON file"""
-    # Sanitize email for filename
-    safe_email = user_email.replace('@', '_at_').replace('.', '_')
-    return RESULTS_DIR / f'user_{safe_email}.json'
+# HTML/Markdown SOW preview for the scoping-history detail page
+preview_renderer = SOWPreviewRenderer()
 
 
-def load_user_results(user_email):
-    """Load user's previous results from JSON file"""
-    results_file = get_user_results_file(user_email)
-    if results_file.exists():
-        try:
-            with open(results_file, 'r') as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading user results: {e}")
-            return []
-    return []
+def parse_submission_id(submission_id):
+    """
+    Extract the user email from a submission ID
+    
+    submission_id format: email_YYYYMMDD_HHMMSS (email with '@' -> '_at_' and '.' -> '_')
+    
+    Returns:
+        (user_email, None) on success, (None, error_message) if the ID is malformed
+    """
+    parts = submission_id.split('_')
+    
+    if len(parts) < 3:
+        return None, 'Invalid submission ID format'
+    
+    # Last 2 parts are date and time, everything before is the email
+    date_part = parts[-2]  # YYYYMMDD
+    time_part = parts[-1]  # HHMMSS
+    
+    if not (date_part.isdigit() and len(date_part) == 8 and time_part.isdigit() and len(time_part) == 6):
+        return None, 'Invalid submission ID format - cannot parse date/time'
+    
+    email_part = '_'.join(parts[:-2])
+    return email_part.replace('_at_', '@').replace('_', '.'), None
 
 
-def save_user_result(user_email, result_data):
-    """Save a new result to user's JSON file"""
-    results_file = get_user_results_file(user_email)
+def find_submission(submission_id):
+    """
+    Load a stored submission by ID
     
-    # Load existing results
-    results = load_user_results(user_email)
+    Returns:
+        (submission, None) if found, otherwise (None, (error_message, http_status))
+    """
+    user_email, error = parse_submission_id(submission_id)
+    if error:
+        return None, (error, 400)
     
-    # Add new result
-    results.append(result_data)
+    submission = find_user_submission(user_email, submission_id)
+    if submission is None:
+        return None, ('Submission not found', 404)
     
-    # Save back to file
-    try:
-        with open(results_file, 'w') as f:
-            json.dump(results, f, indent=2)
-        return True
-    except Exception as e:
-        print(f"Error saving user result: {e}")
-        return False
+    return submission, None
+
+
+def submission_report_inputs(submission):
+    """
+    Rebuild SOW report inputs from a stored submission
+    
+    Returns:
+        (scope_result, effort_categories, effort_summary, fte_by_role, scope_inputs_dict)
+    """
+    calc_result = submission.get('calculation_result', {})
+    effort = calc_result.get('effort_estimation', {})
+    scope_inputs = transform_frontend_to_backend_format(
+        submission.get('scoping_data', {}), submission.get('selected_roles', [])
+    )
+    return (
+        calc_result.get('scope_definition', {}),
+        effort.get('categories', {}),
+        effort.get('summary', {}),
+        calc_result.get('fte_allocation', {}).get('by_role', {}),
+        {item['name']: item for item in scope_inputs}
+    )
 
 
 @app.route('/health', methods=['GET'])
@@ -223,7 +155,9 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'service': 'Engagement Scoping API',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'model_version': current_model().version,
+        'formula_cache': formula_memo_stats()
     })
 
 
@@ -232,7 +166,7 @@ def get_roles():
     """Get available roles for selection"""
     return jsonify({
         'success': True,
-        'roles': AVAILABLE_ROLES
+        'roles': current_model().roles
     })
 
 
@@ -320,20 +254,22 @@ def submit_scoping():
         output_filename = f'scoping_result_{safe_email}_{timestamp}'
         
         # Generate report (JSON + Word)
-        report_result = engine.generate_report(output_filename=output_filename)
+        try:
+            report_result = engine.generate_report(output_filename=output_filename, report_service=report_service)
+        except ReportServiceBusy as busy:
+            return jsonify({
+                'success': False,
+                'error': str(busy)
+            }), 503
+        except ReportServiceTimeout as timeout:
+            return jsonify({
+                'success': False,
+                'error': f'Report generation timed out: {timeout}'
+            }), 504
         
         # Create submission ID from timestamp
         submission_id = f"{safe_email}_{timestamp}"
         
-        # Transform effort categories to simple {category: hours} format for frontend
-        effort_categories_simple = {}
-        if effort_result and 'categories' in effort_result:
-            for category, data in effort_result['categories'].items():
-                if isinstance(data, dict) and 'final_estimate' in data:
-                    effort_categories_simple[category] = data['final_estimate']
-                else:
-                    effort_categories_simple[category] = 0
-        
         # Extract file paths from report_result
         files_data = report_result.get('files', {})
         json_report_path = str(files_data.get('json_report', ''))
@@ -355,19 +291,7 @@ def submit_scoping():
             'status': 'COMPLETED',
             'scoping_data': scoping_data,
             'selected_roles': selected_roles,
-            'calculation_result': {
-                'scope_definition': scope_result,
-                'effort_estimation': {
-                    'summary': effort_result.get('summary', {}),
-                    'categories': effort_categories_simple  # Use simple format
-                },
-                'fte_allocation': fte_result,
-                'tier': scope_result.get('tier_name', 'N/A'),
-                'total_weightage': scope_result.get('total_weightage', 0),
-                'total_hours': fte_result.get('total_hours', 0),
-                'total_days': fte_result.get('total_days', 0),
-                'total_months': fte_result.get('total_months', 0),
-            },
+            'calculation_result': engine.build_calculation_result(),
             'files': {
                 'json_report': json_report_path,
                 'word_report': word_report_path
@@ -395,6 +319,7 @@ def submit_scoping():
                 'total_hours': fte_result.get('total_hours', 0),
                 'total_days': round(fte_result.get('total_days', 0), 2),
                 'total_months': round(correct_total_months, 2),
+                'model_version': engine.model.version,
                 'status': 'COMPLETED',
                 'effort_summary': {
                     'total_time_hours': effort_summary.get('total_time_hours', 0),
@@ -479,60 +404,289 @@ def get_scoping_history():
         }), 500
 
 
+@app.route('/api/scoping/search', methods=['GET'])
+def search_submissions():
+    """
+    Search submissions across users (served from the search index)
+    
+    Query params (all optional):
+    - email: Only this user's submissions
+    - client / project: Case-insensitive prefix of the client / project name
+    - tier: Tier numbers, comma-separated (e.g. 2,3)
+    - from / to: submitted_at range (YYYY-MM-DD or ISO timestamp, inclusive)
+    - min_hours / max_hours: total_hours range
+    - features: Metrics that must all be in scope, comma-separated (names or frontend IDs)
+    - sort: submitted_at (default), client_name, project_name, tier, total_weightage,
+            total_hours or effort_hours
+    - order: desc (default) or asc
+    - page / page_size: 1-based page, rows per page (default 50)
+    """
+    try:
+        def split_list(value, parse):
+            return [parse(item) for item in value.split(',') if item.strip()] if value else None
+        
+        def optional_float(name):
+            value = request.args.get(name)
+            return float(value) if value not in (None, '') else None
+        
+        try:
+            features = split_list(request.args.get('features'), str.strip)
+            filters = {
+                'user_email': request.args.get('email'),
+                'client_name': request.args.get('client'),
+                'project_name': request.args.get('project'),
+                'tiers': split_list(request.args.get('tier'), int),
+                'date_from': _parse_date_filter(request.args.get('from')),
+                'date_to': _parse_date_filter(request.args.get('to'), end_of_day=True),
+                'min_hours': optional_float('min_hours'),
+                'max_hours': optional_float('max_hours'),
+                'features': [FRONTEND_TO_BACKEND_MAP.get(feature, feature) for feature in features or []],
+                'sort': request.args.get('sort', 'submitted_at'),
+                'order': request.args.get('order', 'desc').lower(),
+                'page': int(request.args.get('page', 1)),
+                'page_size': int(request.args.get('page_size', DEFAULT_PAGE_SIZE)),
+            }
+            result = get_search_index().query(**filters)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': f'Invalid search parameters: {e}'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            **result
+        })
+        
+    except Exception as e:
+        print(f"Error searching submissions: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/api/scoping/result/<submission_id>', methods=['GET'])
 def get_scoping_result(submission_id):
     """
     Get detailed result for a specific submission
+    
+    `recomputed` holds results recomputed under other model versions by the
+    backfill job (model_version -> record); the submission keeps its original result.
     """
     try:
-        # submission_id format: email_YYYYMMDD_HHMMSS
-        # We need to extract everything except the last two parts (date and time)
-        parts = submission_id.split('_')
+        submission, error = find_submission(submission_id)
         
-        if len(parts) < 3:
+        if error:
+            message, status = error
             return jsonify({
                 'success': False,
-                'error': 'Invalid submission ID format'
+                'error': message
+            }), status
+        
+        user_email, _ = parse_submission_id(submission_id)
+        
+        return jsonify({
+            'success': True,
+            'submission': submission,
+            'recomputed': load_recomputed_versions(user_email, submission_id)
+        })
+        
+    except Exception as e:
+        print(f"Error fetching result: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/scoping/compare', methods=['GET'])
+def compare_scopings():
+    """
+    Compare two submissions from their stored results (nothing is recomputed)
+    
+    Query params:
+    - a: Baseline submission ID (e.g. the original scoping)
+    - b: Submission ID compared against it (e.g. the revision)
+    
+    Deltas are b - a: per-metric input and weightage changes, tier change,
+    per-category effort hours and per-role FTE hours.
+    """
+    try:
+        submissions = []
+        for param in ('a', 'b'):
+            submission_id = request.args.get(param)
+            if not submission_id:
+                return jsonify({
+                    'success': False,
+                    'error': "Query parameters 'a' and 'b' (submission IDs) are required"
+                }), 400
+            
+            submission, error = find_submission(submission_id)
+            if error:
+                message, status = error
+                return jsonify({
+                    'success': False,
+                    'error': f"{message}: {submission_id}"
+                }), status
+            submissions.append(submission)
+        
+        return jsonify({
+            'success': True,
+            'comparison': compare_submissions(*submissions)
+        })
+        
+    except Exception as e:
+        print(f"Error comparing submissions: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/scoping/preview/<submission_id>', methods=['GET'])
+def preview_report(submission_id):
+    """
+    Render the SOW for a submission as HTML or Markdown (no Word document needed)
+    
+    Query params:
+    - format: 'html' (default) or 'markdown'
+    """
+    try:
+        fmt = request.args.get('format', 'html').lower()
+        if fmt not in PREVIEW_FORMATS:
+            return jsonify({
+                'success': False,
+                'error': f"Unsupported format '{fmt}'. Use one of: {', '.join(PREVIEW_FORMATS)}"
             }), 400
         
-        # Last 2 parts are date and time, everything before is the email
-        date_part = parts[-2]  # YYYYMMDD
-        time_part = parts[-1]  # HHMMSS
+        submission, error = find_submission(submission_id)
         
-        # Check if last two parts look like date and time
-        if not (date_part.isdigit() and len(date_part) == 8 and time_part.isdigit() and len(time_part) == 6):
+        if error:
+            message, status = error
             return jsonify({
                 'success': False,
-                'error': 'Invalid submission ID format - cannot parse date/time'
+                'error': message
+            }), status
+        
+        content = preview_renderer.render(
+            *submission_report_inputs(submission), fmt=fmt,
+            client_name=submission.get('client_name'), project_name=submission.get('project_name')
+        )
+        
+        return jsonify({
+            'success': True,
+            'submission_id': submission_id,
+            'format': fmt,
+            'content': content
+        })
+        
+    except Exception as e:
+        print(f"Error rendering preview: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/scoping/fte-summary/<submission_id>', methods=['GET'])
+def fte_summary(submission_id):
+    """
+    FTE hours/days/months per role for a submission (admin dashboard)
+    
+    Query params:
+    - roles: 'all' (default) for every role, or 'selected' for the submission's selected roles
+    """
+    try:
+        roles = request.args.get('roles', 'all')
+        if roles not in ('all', 'selected'):
+            return jsonify({
+                'success': False,
+                'error': "roles must be 'all' or 'selected'"
             }), 400
         
-        # Email is everything except last 2 parts
-        email_part = '_'.join(parts[:-2])
-        user_email = email_part.replace('_at_', '@').replace('_', '.')
+        submission, error = find_submission(submission_id)
         
-        # Load user results
-        results = load_user_results(user_email)
+        if error:
+            message, status = error
+            return jsonify({
+                'success': False,
+                'error': message
+            }), status
         
-        # Find specific submission
-        submission = None
-        for result in results:
-            if result.get('submission_id') == submission_id:
-                submission = result
-                break
+        categories = submission.get('calculation_result', {}).get('effort_estimation', {}).get('categories', {})
+        selected_roles = submission.get('selected_roles') if roles == 'selected' else None
+        # Stored effort hours, allocated with the current model's role allocation
+        calculator = FTEEffortsCalculator()
+        
+        return jsonify({
+            'success': True,
+            'submission_id': submission_id,
+            'roles': roles,
+            'model_version': calculator.model.version,
+            'fte_summary': to_plain(calculator.generate_fte_summary(categories, selected_roles))
+        })
+        
+    except Exception as e:
+        print(f"Error building FTE summary: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/scoping/sensitivity/<submission_id>', methods=['GET'])
+def sensitivity_analysis(submission_id):
+    """
+    Marginal weightage/tier/hours change per input for a submission (tornado chart data)
+    
+    Query params:
+    - range: Steps either side of each details value (default 1, max MAX_SENSITIVITY_RANGE)
+    - step: Size of one details step (default 1)
+    """
+    try:
+        try:
+            steps = int(request.args.get('range', 1))
+            step_size = float(request.args.get('step', 1))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'range must be an integer and step a number'
+            }), 400
         
-        if not submission:
+        # float() accepts 'nan' and 'inf', which would feed NaN/infinite details into rescoring
+        if not 1 <= steps <= MAX_SENSITIVITY_RANGE or not (math.isfinite(step_size) and step_size > 0):
             return jsonify({
                 'success': False,
-                'error': 'Submission not found'
-            }), 404
+                'error': f'range must be between 1 and {MAX_SENSITIVITY_RANGE} and step a finite positive number'
+            }), 400
+        
+        submission, error = find_submission(submission_id)
+        
+        if error:
+            message, status = error
+            return jsonify({
+                'success': False,
+                'error': message
+            }), status
+        
+        selected_roles = submission.get('selected_roles', [])
+        scope_inputs = transform_frontend_to_backend_format(submission.get('scoping_data', {}), selected_roles)
+        scorer = IncrementalScorer(scope_inputs, selected_roles)
         
         return jsonify({
             'success': True,
-            'submission': submission
+            'submission_id': submission_id,
+            'sensitivity': analyze_sensitivity(scorer, steps, step_size)
         })
         
     except Exception as e:
-        print(f"Error fetching result: {e}")
+        print(f"Error running sensitivity analysis: {e}")
         traceback.print_exc()
         return jsonify({
             'success': False,
@@ -540,111 +694,236 @@ def get_scoping_result(submission_id):
         }), 500
 
 
-@app.route('/api/scoping/download/<submission_id>', methods=['GET'])
-def download_report(submission_id):
+@app.route('/api/scoping/boundaries/<submission_id>', methods=['GET'])
+def tier_boundaries(submission_id):
     """
-    Download Word report for a specific submission
+    Distance of a submission from the next/previous tier and adjustment band,
+    with the smallest single-metric change that crosses each
     """
     try:
-        # submission_id format: email_YYYYMMDD_HHMMSS
-        # We need to extract everything except the last two parts (date and time)
-        parts = submission_id.split('_')
+        submission, error = find_submission(submission_id)
         
-        if len(parts) < 3:
+        if error:
+            message, status = error
             return jsonify({
                 'success': False,
-                'error': 'Invalid submission ID format'
+                'error': message
+            }), status
+        
+        selected_roles = submission.get('selected_roles', [])
+        scope_inputs = transform_frontend_to_backend_format(submission.get('scoping_data', {}), selected_roles)
+        scorer = IncrementalScorer(scope_inputs, selected_roles)
+        
+        return jsonify({
+            'success': True,
+            'submission_id': submission_id,
+            'boundaries': BoundaryAnalyzer(scorer).analyze()
+        })
+        
+    except Exception as e:
+        print(f"Error running boundary analysis: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/scoping/simulate/<submission_id>', methods=['POST'])
+def simulate_scoping(submission_id):
+    """
+    Monte Carlo simulation over uncertain details values of a submission
+    
+    Request body:
+    {
+        "samples": 5000,
+        "seed": 42,
+        "distributions": {
+            "data_forms": {"type": "range", "min": 10, "max": 40},
+            "Multi-Currency": {"type": "triangular", "min": 1, "mode": 3, "max": 8}
+        }
+    }
+    Distribution keys may be frontend scope item IDs or metric names.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        distributions = data.get('distributions') or {}
+        
+        if not isinstance(distributions, dict) or not distributions:
+            return jsonify({
+                'success': False,
+                'error': 'distributions must map scope items to {type, min, max[, mode]}'
+            }), 400
+        
+        try:
+            samples = int(data.get('samples', 5000))
+            seed = None if data.get('seed') is None else int(data['seed'])
+        except (TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'samples and seed must be integers'
             }), 400
         
-        # Last 2 parts are date and time, everything before is the email
-        date_part = parts[-2]  # YYYYMMDD
-        time_part = parts[-1]  # HHMMSS
+        submission, error = find_submission(submission_id)
         
-        # Check if last two parts look like date and time
-        if not (date_part.isdigit() and len(date_part) == 8 and time_part.isdigit() and len(time_part) == 6):
+        if error:
+            message, status = error
             return jsonify({
                 'success': False,
-                'error': 'Invalid submission ID format - cannot parse date/time'
+                'error': message
+            }), status
+        
+        selected_roles = submission.get('selected_roles', [])
+        scope_inputs = transform_frontend_to_backend_format(submission.get('scoping_data', {}), selected_roles)
+        distributions = {
+            FRONTEND_TO_BACKEND_MAP.get(key, key): spec for key, spec in distributions.items()
+        }
+        
+        try:
+            simulation = monte_carlo.run_simulation(scope_inputs, selected_roles, distributions,
+                                                    samples=samples, seed=seed)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
             }), 400
         
-        # Email is everything except last 2 parts
-        email_part = '_'.join(parts[:-2])
-        user_email = email_part.replace('_at_', '@').replace('_', '.')
+        return jsonify({
+            'success': True,
+            'submission_id': submission_id,
+            'simulation': simulation
+        })
         
-        print(f"Download request - Submission ID: {submission_id}")
-        print(f"Extracted email: {user_email}")
+    except Exception as e:
+        print(f"Error running simulation: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/scoping/optimize/<submission_id>', methods=['POST'])
+def optimize_scoping(submission_id):
+    """
+    Richest scope of a submission that fits an hour, month or tier limit
+    
+    Request body:
+    {
+        "max_hours": 1500,
+        "max_months": 6,
+        "max_tier": 3,
+        "priorities": {"data_forms": 3, "Account": 5},
+        "locked": ["Account"],
+        "allow_partial": true,
+        "time_budget_ms": 2000
+    }
+    At least one limit is required. Priority and lock keys may be frontend
+    scope item IDs or metric names.
+    """
+    try:
+        data = request.get_json(silent=True) or {}
         
-        # Load user results
-        results = load_user_results(user_email)
+        try:
+            limits = {
+                key: None if data.get(key) is None else float(data[key])
+                for key in ('max_hours', 'max_months')
+            }
+            max_tier = None if data.get('max_tier') is None else int(data['max_tier'])
+            time_budget = float(data.get('time_budget_ms', DEFAULT_TIME_BUDGET_SECONDS * 1000)) / 1000
+            priorities = {
+                FRONTEND_TO_BACKEND_MAP.get(key, key): float(value)
+                for key, value in (data.get('priorities') or {}).items()
+            }
+            locked = data.get('locked') or []
+            if not isinstance(locked, list):
+                raise TypeError('locked must be a list')
+            locked = [FRONTEND_TO_BACKEND_MAP.get(key, key) for key in locked]
+        except (AttributeError, TypeError, ValueError):
+            return jsonify({
+                'success': False,
+                'error': 'limits, priorities and time_budget_ms must be numbers and locked a list'
+            }), 400
         
-        print(f"Found {len(results)} results for user")
+        if all(v is None for v in limits.values()) and max_tier is None:
+            return jsonify({
+                'success': False,
+                'error': 'At least one of max_hours, max_months or max_tier is required'
+            }), 400
         
-        # Find specific submission
-        submission = None
-        for result in results:
-            if result.get('submission_id') == submission_id:
-                submission = result
-                break
+        if (any(v is not None and v <= 0 for v in limits.values())
+                or (max_tier is not None and max_tier not in TIERS)
+                or any(v < 0 for v in priorities.values())
+                or not 0 < time_budget <= MAX_TIME_BUDGET_SECONDS):
+            return jsonify({
+                'success': False,
+                'error': f'Limits must be positive, max_tier one of {sorted(TIERS)}, priorities '
+                         f'non-negative and time_budget_ms at most {int(MAX_TIME_BUDGET_SECONDS * 1000)}'
+            }), 400
+        
+        submission, error = find_submission(submission_id)
         
-        if not submission:
+        if error:
+            message, status = error
             return jsonify({
                 'success': False,
-                'error': f'Submission not found: {submission_id}'
-            }), 404
+                'error': message
+            }), status
         
-        # Get Word report path
-        word_report_path = submission.get('files', {}).get('word_report')
+        selected_roles = submission.get('selected_roles', [])
+        scope_inputs = transform_frontend_to_backend_format(submission.get('scoping_data', {}), selected_roles)
+        scorer = IncrementalScorer(scope_inputs, selected_roles)
+        optimizer = ScopeOptimizer(scorer, priorities=priorities, locked=locked,
+                                   allow_partial=bool(data.get('allow_partial', True)))
+        
+        return jsonify({
+            'success': True,
+            'submission_id': submission_id,
+            'optimization': optimizer.optimize(max_hours=limits['max_hours'], max_months=limits['max_months'],
+                                               max_tier=max_tier, time_budget=time_budget)
+        })
+        
+    except Exception as e:
+        print(f"Error optimizing scope: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/scoping/download/<submission_id>', methods=['GET'])
+def download_report(submission_id):
+    """
+    Download Word report for a specific submission
+    """
+    try:
+        print(f"Download request - Submission ID: {submission_id}")
+        
+        submission, error = find_submission(submission_id)
+        
+        if error:
+            message, status = error
+            return jsonify({
+                'success': False,
+                'error': f'{message}: {submission_id}' if status == 404 else message
+            }), status
         
+        word_report_path = submission.get('files', {}).get('word_report')
         print(f"Word report path from submission: {word_report_path}")
         
-        # If path is empty or None, try to construct expected filename
-        if not word_report_path or word_report_path == '':
-            # Try multiple possible filenames
-            possible_filenames = [
-                f'scoping_result_{submission_id}.docx',  # Current naming
-                f'scoping_report_{submission_id}.docx',  # Alternative naming
-                # Also try looking for files with similar patterns
-            ]
-            
-            word_report_file = None
-            for filename in possible_filenames:
-                test_path = OUTPUT_DIR / filename
-                print(f"Trying: {test_path}")
-                if test_path.exists():
-                    word_report_file = test_path
-                    print(f"Found file: {word_report_file}")
-                    break
-            
-            # If still not found, list all .docx files and try to match
-            if not word_report_file and OUTPUT_DIR.exists():
-                print(f"File not found in expected locations, checking all .docx files...")
-                all_docx = list(OUTPUT_DIR.glob('*.docx'))
-                print(f"Available .docx files: {[f.name for f in all_docx]}")
-                
-                # Try to find a file that contains the submission ID
-                for docx_file in all_docx:
-                    if submission_id in docx_file.name:
-                        word_report_file = docx_file
-                        print(f"Found matching file: {word_report_file}")
-                        break
-            
-            if not word_report_file:
-                print(f"File not found, checking directory contents...")
-                print(f"Output directory: {OUTPUT_DIR}")
-                if OUTPUT_DIR.exists():
-                    print(f"Files in output dir: {list(OUTPUT_DIR.glob('*.docx'))}")
-                
-                return jsonify({
-                    'success': False,
-                    'error': f'Report file not found. The report may not have been generated. Please try submitting the scoping data again.'
-                }), 404
-        else:
-            word_report_file = Path(word_report_path)
-            
-        if not word_report_file.exists():
+        word_report_file = locate_word_report(submission)
+        
+        if not word_report_file:
+            if word_report_path:
+                error_message = (f'Report file not found at: {word_report_path}. '
+                                 'Please regenerate by resubmitting your scoping data.')
+            else:
+                error_message = ('Report file not found. The report may not have been generated. '
+                                 'Please try submitting the scoping data again.')
             return jsonify({
                 'success': False,
-                'error': f'Report file not found at: {word_report_file}. Please regenerate by resubmitting your scoping data.'
+                'error': error_message
             }), 404
         
         print(f"Sending file: {word_report_file}")
@@ -654,7 +933,7 @@ def download_report(submission_id):
             str(word_report_file),
             as_attachment=True,
             download_name=word_report_file.name,
-            mimetype='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+            mimetype=DOCX_MIMETYPE
         )
         
     except Exception as e:
@@ -666,6 +945,305 @@ def download_report(submission_id):
         }), 500
 
 
+def locate_word_report(submission):
+    """
+    Find the stored Word report for a submission
+    
+    Uses the recorded path, falling back to the known filename patterns in OUTPUT_DIR
+    for older submissions that have no path stored.
+    
+    Returns:
+        Path to the .docx, or None if it no longer exists
+    """
+    word_report_path = submission.get('files', {}).get('word_report')
+    if word_report_path:
+        word_report_file = Path(word_report_path)
+        return word_report_file if word_report_file.exists() else None
+    
+    submission_id = submission.get('submission_id', '')
+    possible_filenames = [
+        f'scoping_result_{submission_id}.docx',  # Current naming
+        f'scoping_report_{submission_id}.docx',  # Alternative naming
+    ]
+    for filename in possible_filenames:
+        test_path = OUTPUT_DIR / filename
+        if test_path.exists():
+            return test_path
+    
+    # Try to find a file that contains the submission ID
+    if submission_id and OUTPUT_DIR.exists():
+        for docx_file in OUTPUT_DIR.glob('*.docx'):
+            if submission_id in docx_file.name:
+                return docx_file
+    
+    return None
+
+
+def regenerate_word_report(submission) -> bytes:
+    """Rebuild a submission's Word report in memory from its stored results"""
+    scope_result, categories, summary, fte_by_role, scope_inputs_dict = submission_report_inputs(submission)
+    
+    # Stored categories are {category: hours}; the document needs hours and days
+    effort_estimation = {
+        category: data if isinstance(data, dict) else {'final_estimate': data, 'in_days': round(data / HOURS_PER_DAY, 2)}
+        for category, data in categories.items()
+    }
+    
+    return report_service.generate(scope_result, effort_estimation, summary, fte_by_role, scope_inputs_dict)
+
+
+def _parse_date_filter(value, end_of_day=False):
+    """Parse a YYYY-MM-DD or ISO timestamp query parameter"""
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00')).replace(tzinfo=None)
+    if end_of_day and len(value) == 10:
+        parsed = parsed.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return parsed
+
+
+def iter_filtered_submissions(user_email=None, client_name=None, date_from=None, date_to=None):
+    """
+    Stream stored submissions matching the export filters, one user file at a time
+    
+    Yields:
+        submission dicts
+    """
+    client_filter = client_name.strip().lower() if client_name else None
+    
+    for _, result in iter_stored_submissions(user_email):
+        if client_filter and (result.get('client_name') or '').strip().lower() != client_filter:
+            continue
+        
+        if date_from or date_to:
+            try:
+                submitted = _parse_date_filter(result.get('submitted_at'))
+            except (TypeError, ValueError):
+                continue
+            if date_from and submitted < date_from:
+                continue
+            if date_to and submitted > date_to:
+                continue
+        
+        yield result
+
+
+def _safe_archive_name(value):
+    """Make a value safe to use as a path component inside the ZIP"""
+    cleaned = ''.join(ch if ch.isalnum() or ch in ' -_.' else '_' for ch in str(value or 'N_A')).strip()
+    return cleaned or 'N_A'
+
+
+@app.route('/api/scoping/export', methods=['GET'])
+def export_reports():
+    """
+    Download every matching SOW report as one ZIP, streamed as it is built
+    
+    Query params (all optional):
+    - email: only this user's submissions
+    - client_name: exact client name (case-insensitive)
+    - from / to: submitted_at date range (YYYY-MM-DD or ISO timestamp, inclusive)
+    
+    Stored Word reports are used when present, otherwise they are regenerated.
+    The archive ends with export_manifest.csv listing every submission and its source.
+    """
+    try:
+        date_from = _parse_date_filter(request.args.get('from'))
+        date_to = _parse_date_filter(request.args.get('to'), end_of_day=True)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Invalid date filter. Use YYYY-MM-DD or an ISO timestamp.'
+        }), 400
+    
+    submissions = iter_filtered_submissions(
+        user_email=request.args.get('email'),
+        client_name=request.args.get('client_name'),
+        date_from=date_from,
+        date_to=date_to
+    )
+    
+    def entries():
+        # Spooled to disk past EXPORT_MANIFEST_SPOOL_BYTES, so memory stays flat however many rows
+        spool = tempfile.SpooledTemporaryFile(max_size=EXPORT_MANIFEST_SPOOL_BYTES)
+        manifest = io.TextIOWrapper(spool, encoding='utf-8', newline='')
+        writer = csv.writer(manifest)
+        writer.writerow(['submission_id', 'client_name', 'project_name', 'submitted_at', 'file', 'source'])
+        
+        try:
+            for submission in submissions:
+                submission_id = submission.get('submission_id', '')
+                arcname = f"{_safe_archive_name(submission.get('client_name'))}/{_safe_archive_name(submission_id)}.docx"
+                
+                word_report_file = locate_word_report(submission)
+                if word_report_file:
+                    source, content = 'stored', word_report_file
+                else:
+                    try:
+                        source, content = 'regenerated', regenerate_word_report(submission)
+                    except Exception as e:
+                        print(f"Could not regenerate report for {submission_id}: {e}")
+                        source, content = f'failed: {e}', None
+                
+                writer.writerow([
+                    submission_id,
+                    submission.get('client_name', ''),
+                    submission.get('project_name', ''),
+                    submission.get('submitted_at', ''),
+                    arcname if content is not None else '',
+                    source
+                ])
+                if content is not None:
+                    yield arcname, content
+            
+            # Streamed from the spool in chunks like the reports (stream_zip closes it)
+            manifest.flush()
+            spool.seek(0)
+            yield 'export_manifest.csv', manifest.detach()
+        finally:
+            spool.close()
+    
+    filename = f"scoping_reports_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    return Response(
+        stream_with_context(stream_zip(entries())),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@app.route('/api/admin/analytics', methods=['GET'])
+def get_analytics():
+    """
+    Cross-user aggregates for the admin dashboard (from the incrementally
+    maintained rollup; no results files are read)
+    
+    Query params:
+    - top: Length of the most-selected roles / most common features lists (default 10)
+    """
+    try:
+        top = request.args.get('top', DEFAULT_TOP)
+        try:
+            top = int(top)
+            if top < 1:
+                raise ValueError
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'top must be a positive integer'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'analytics': get_analytics_store().view(top)
+        })
+        
+    except Exception as e:
+        print(f"Error loading analytics: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/admin/model', methods=['GET'])
+def get_scoping_model():
+    """
+    Current scoping model version and the stored versions
+    
+    Query params:
+    - include=data: Also return the model data (formulas, effort template, role allocation)
+    """
+    try:
+        registry = get_registry()
+        model = registry.current()
+        return jsonify({
+            'success': True,
+            'model': model.to_dict() if request.args.get('include') == 'data' else model.info(),
+            'versions': registry.versions()
+        })
+        
+    except Exception as e:
+        print(f"Error reading scoping model: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/admin/model', methods=['POST'])
+def publish_scoping_model():
+    """
+    Publish edited model data as a new version and activate it
+    
+    Request body (any subset; each part replaces the current one):
+    {
+        "formulas": {"Account": "=IF(...)", ...},
+        "effort_template": {"Category": {"total": 12, "tasks": {"Task": 4}}, ...},
+        "tiers_data": [{"category": "Category", "roles": {"PM USA": 0.5}}, ...],
+        "roles": ["PM USA", ...],
+        "source": "admin@example.com"
+    }
+    Requests already running finish on the previous version; results record
+    the version they were computed with.
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({
+                'success': False,
+                'error': 'Request body must be a JSON object'
+            }), 400
+        
+        try:
+            model = get_registry().publish(data, source=str(data.get('source', '')))
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'model': model.info()
+        })
+        
+    except Exception as e:
+        print(f"Error publishing scoping model: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/api/admin/model/activate/<version>', methods=['POST'])
+def activate_scoping_model(version):
+    """Make a stored model version current (e.g. roll back a bad edit)"""
+    try:
+        try:
+            model = get_registry().activate(version)
+        except KeyError:
+            return jsonify({
+                'success': False,
+                'error': f'Model version not found: {version}'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'model': model.info()
+        })
+        
+    except Exception as e:
+        print(f"Error activating scoping model: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 if __name__ == '__main__':
     print("="*80)
     print("🚀 Starting Engagement Scoping API Server")
@@ -0,0 +1,412 @@
+"""
+Backfill: Recompute Stored Submissions Under a Model Version
+
+After formulas or templates change (a new scoping model version), stored
+history still shows the numbers of the version each submission was computed
+with. The backfill recomputes every stored submission under the target
+version and keeps the result alongside the original (backend.storage.results):
+
+    python -m backend.backfill                          # the current model version
+    python -m backend.backfill --model-version 859a21c81948 --workers 2 --max-rate 20
+    python -m backend.backfill --report-only            # rebuild the diff report
+
+Submissions are streamed one results file at a time and recomputed in chunks
+on a process pool whose workers load the model once. Safe on a live host:
+- the users' results files are only read; new results are appended to
+  RESULTS_DIR/recomputed/<version>/, so concurrent submissions are unaffected
+- --max-rate caps submissions per second, --workers defaults to 1 and workers
+  run at a lower scheduling priority (--nice)
+- progress is the output itself: a rerun skips submissions already
+  recomputed for the version, so an interrupted run resumes where it stopped
+
+Submissions already computed with the target version are skipped. When the run
+ends, diff_report.csv (one row per submission) and diff_summary.json (tier
+transitions, hour change statistics, largest changes) are written next to the
+recomputed results.
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from backend.core.scoping_model import ScopingModel, current_model, get_registry
+from backend.data.frontend_mapping import transform_frontend_to_backend_format
+from backend.scoping_engine import ScopingEngine
+from backend.storage.results import (
+    RECOMPUTED_DIR, append_recomputed, iter_recomputed, iter_stored_submissions
+)
+
+# Submissions per task sent to a worker
+DEFAULT_CHUNK_SIZE = 20
+# Chunks queued per worker; bounds memory and keeps workers busy
+IN_FLIGHT_PER_WORKER = 2
+# Scheduling priority decrease for worker processes (POSIX only)
+DEFAULT_NICENESS = 10
+
+# Failures listed in the run summary (all are counted)
+MAX_REPORTED_FAILURES = 20
+# Rows in the summary's largest_changes
+LARGEST_CHANGES = 10
+
+DIFF_REPORT_FILE = 'diff_report.csv'
+DIFF_SUMMARY_FILE = 'diff_summary.json'
+DIFF_COLUMNS = [
+    'submission_id', 'user_email', 'client_name', 'project_name', 'previous_model_version', 'model_version',
+    'previous_tier', 'tier', 'tier_change', 'previous_weightage', 'weightage',
+    'previous_effort_hours', 'effort_hours', 'effort_hours_change', 'effort_hours_change_pct',
+    'previous_role_hours', 'role_hours', 'role_hours_change',
+]
+
+
+# ----------------------------------------------------------------------
+# Recomputation
+# ----------------------------------------------------------------------
+
+def result_summary(calculation_result: Dict[str, Any]) -> Dict[str, Any]:
+    """The figures compared by the diff report, from a stored calculation result"""
+    scope = calculation_result.get('scope_definition') or {}
+    effort_summary = (calculation_result.get('effort_estimation') or {}).get('summary') or {}
+    return {
+        'model_version': calculation_result.get('model_version'),
+        'tier': scope.get('tier'),
+        'tier_name': calculation_result.get('tier'),
+        'total_weightage': calculation_result.get('total_weightage'),
+        'effort_hours': effort_summary.get('total_time_hours'),
+        'role_hours': calculation_result.get('total_hours'),
+    }
+
+
+class Recomputer:
+    """Recomputes stored submissions with one model version"""
+
+    def __init__(self, model: ScopingModel):
+        self.model = model
+
+    def recompute(self, submission: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Recompute one stored submission
+
+        Returns:
+            Recomputed record (original summary under 'previous'), or
+            {'submission_id': ..., 'error': message}
+        """
+        try:
+            selected_roles = submission.get('selected_roles', [])
+            engine = ScopingEngine(self.model)
+            engine.process_scope({
+                'scope_inputs': transform_frontend_to_backend_format(submission.get('scoping_data', {}),
+                                                                     selected_roles),
+                'selected_roles': selected_roles,
+            })
+            engine.calculate_effort()
+            engine.calculate_fte_allocation()
+            calculation_result = engine.build_calculation_result()
+        except Exception as e:
+            return {'submission_id': submission.get('submission_id'), 'error': f'{type(e).__name__}: {e}'}
+
+        return {
+            'submission_id': submission.get('submission_id'),
+            'user_email': submission.get('user_email'),
+            'client_name': submission.get('client_name'),
+            'project_name': submission.get('project_name'),
+            'submitted_at': submission.get('submitted_at'),
+            'model_version': self.model.version,
+            'recomputed_at': datetime.now().isoformat(timespec='seconds'),
+            'previous': result_summary(submission.get('calculation_result') or {}),
+            'calculation_result': calculation_result,
+        }
+
+    def recompute_chunk(self, submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.recompute(submission) for submission in submissions]
+
+
+_worker_recomputer = None
+
+
+def _init_worker(model: ScopingModel, niceness: int):
+    global _worker_recomputer
+    # The pipeline prints every step; keep worker output quiet
+    sys.stdout = open(os.devnull, 'w')
+    if niceness and hasattr(os, 'nice'):
+        os.nice(niceness)
+    _worker_recomputer = Recomputer(model)
+
+
+def _recompute_chunk_in_worker(submissions: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _worker_recomputer.recompute_chunk(submissions)
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def recomputed_ids(model_version: str) -> Set[str]:
+    """Submissions already recomputed for a version (the resume point)"""
+    return {record.get('submission_id') for record in iter_recomputed(model_version)}
+
+
+def pending_submissions(model_version: str, counts: Dict[str, int], user_email: str = None,
+                        done: Set[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stored submissions still to recompute for a version
+
+    Counts skipped submissions in counts['already_recomputed'] / counts['current'].
+    """
+    for _, submission in iter_stored_submissions(user_email):
+        if submission.get('submission_id') in (done or ()):
+            counts['already_recomputed'] += 1
+        elif (submission.get('calculation_result') or {}).get('model_version') == model_version:
+            counts['current'] += 1
+        else:
+            yield submission
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_backfill(model: ScopingModel = None, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_rate: Optional[float] = None, user_email: str = None, limit: Optional[int] = None,
+                 niceness: int = DEFAULT_NICENESS) -> Dict[str, Any]:
+    """
+    Recompute stored submissions and store the results for the model version
+
+    Args:
+        model: Target model version (default: the current one)
+        workers: Worker processes (1 = recompute in this process)
+        chunk_size: Submissions per worker task
+        max_rate: Submissions per second at most (None = unthrottled)
+        user_email: Only this user's submissions
+        limit: Stop after this many submissions (the rest are left for a later run)
+        niceness: Priority decrease for worker processes
+
+    Returns:
+        {'model_version', 'recomputed', 'errors', 'already_recomputed', 'current',
+         'elapsed_seconds', 'submissions_per_second', 'failures'}
+    """
+    model = model or current_model()
+    started = time.perf_counter()
+    counts = Counter(recomputed=0, errors=0, already_recomputed=0, current=0)
+    failures = []
+
+    def emit(records):
+        by_user = {}
+        for record in records:
+            if 'error' in record:
+                counts['errors'] += 1
+                if len(failures) < MAX_REPORTED_FAILURES:
+                    failures.append(record)
+            else:
+                by_user.setdefault(record['user_email'], []).append(record)
+        for email, user_records in by_user.items():
+            append_recomputed(email, model.version, user_records)
+            counts['recomputed'] += len(user_records)
+
+    def throttle(submitted):
+        if max_rate:
+            wait = started + submitted / max_rate - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+    submissions = pending_submissions(model.version, counts, user_email, recomputed_ids(model.version))
+    if limit is not None:
+        submissions = itertools.islice(submissions, limit)
+    submitted = 0
+
+    if workers <= 1:
+        recomputer = Recomputer(model)
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            for chunk in _chunks(submissions, chunk_size):
+                throttle(submitted)
+                submitted += len(chunk)
+                emit(recomputer.recompute_chunk(chunk))
+    else:
+        max_in_flight = workers * IN_FLIGHT_PER_WORKER
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model, niceness),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            pending = deque()
+            for chunk in _chunks(submissions, chunk_size):
+                throttle(submitted)
+                submitted += len(chunk)
+                pending.append(executor.submit(_recompute_chunk_in_worker, chunk))
+                while len(pending) >= max_in_flight or (pending and pending[0].done()):
+                    emit(pending.popleft().result())
+            while pending:
+                emit(pending.popleft().result())
+
+    elapsed = time.perf_counter() - started
+    return {
+        'model_version': model.version,
+        **counts,
+        'elapsed_seconds': round(elapsed, 3),
+        'submissions_per_second': round(submitted / elapsed, 1) if elapsed > 0 else None,
+        'failures': failures,
+    }
+
+
+# ----------------------------------------------------------------------
+# Diff report
+# ----------------------------------------------------------------------
+
+def _change(new, old):
+    if not isinstance(new, (int, float)) or not isinstance(old, (int, float)):
+        return None
+    return round(new - old, 4)
+
+
+def diff_row(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Old vs recomputed figures for one recomputed record"""
+    previous = record.get('previous') or {}
+    current = result_summary(record['calculation_result'])
+    effort_change = _change(current['effort_hours'], previous.get('effort_hours'))
+    return {
+        'submission_id': record.get('submission_id'),
+        'user_email': record.get('user_email'),
+        'client_name': record.get('client_name'),
+        'project_name': record.get('project_name'),
+        'previous_model_version': previous.get('model_version'),
+        'model_version': record.get('model_version'),
+        'previous_tier': previous.get('tier_name'),
+        'tier': current['tier_name'],
+        'tier_change': _change(current['tier'], previous.get('tier')),
+        'previous_weightage': previous.get('total_weightage'),
+        'weightage': current['total_weightage'],
+        'previous_effort_hours': previous.get('effort_hours'),
+        'effort_hours': current['effort_hours'],
+        'effort_hours_change': effort_change,
+        'effort_hours_change_pct': (round(effort_change / previous['effort_hours'] * 100, 2)
+                                    if effort_change is not None and previous['effort_hours'] else None),
+        'previous_role_hours': previous.get('role_hours'),
+        'role_hours': current['role_hours'],
+        'role_hours_change': _change(current['role_hours'], previous.get('role_hours')),
+    }
+
+
+def build_diff_report(model_version: str) -> Dict[str, Any]:
+    """
+    Tier and hour changes of every submission recomputed for a version
+
+    Returns:
+        {'rows': [diff_row...], 'summary': {...}}
+    """
+    latest = {}
+    for record in iter_recomputed(model_version):
+        latest[record.get('submission_id')] = record
+    rows = [diff_row(record) for record in latest.values()]
+
+    tier_changes = [row['tier_change'] for row in rows if row['tier_change'] is not None]
+    effort_changes = [row['effort_hours_change'] for row in rows if row['effort_hours_change'] is not None]
+    transitions = Counter(f"{row['previous_tier']} -> {row['tier']}" for row in rows if row['tier_change'])
+    largest = sorted((row for row in rows if row['effort_hours_change']),
+                     key=lambda row: abs(row['effort_hours_change']), reverse=True)[:LARGEST_CHANGES]
+
+    summary = {
+        'model_version': model_version,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'submissions': len(rows),
+        'tier_changed': sum(1 for change in tier_changes if change),
+        'tier_up': sum(1 for change in tier_changes if change > 0),
+        'tier_down': sum(1 for change in tier_changes if change < 0),
+        'tier_transitions': dict(transitions.most_common()),
+        'effort_hours_changed': sum(1 for change in effort_changes if change),
+        'effort_hours_change': {
+            'total': round(sum(effort_changes), 4),
+            'mean': round(sum(effort_changes) / len(effort_changes), 4),
+            'min': min(effort_changes),
+            'max': max(effort_changes),
+        } if effort_changes else None,
+        'largest_changes': [
+            {key: row[key] for key in ('submission_id', 'client_name', 'previous_tier', 'tier',
+                                       'previous_effort_hours', 'effort_hours', 'effort_hours_change')}
+            for row in largest
+        ],
+    }
+    return {'rows': rows, 'summary': summary}
+
+
+def write_diff_report(model_version: str, directory: Path = None) -> Dict[str, Any]:
+    """Write diff_report.csv and diff_summary.json; returns the summary"""
+    directory = Path(directory or RECOMPUTED_DIR / model_version)
+    directory.mkdir(parents=True, exist_ok=True)
+    report = build_diff_report(model_version)
+
+    with open(directory / DIFF_REPORT_FILE, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=DIFF_COLUMNS, lineterminator='\n')
+        writer.writeheader()
+        writer.writerows(report['rows'])
+    with open(directory / DIFF_SUMMARY_FILE, 'w', encoding='utf-8') as f:
+        json.dump(report['summary'], f, indent=2)
+        f.write('\n')
+    return report['summary']
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m backend.backfill',
+                                     description='Recompute stored submissions under a model version')
+    parser.add_argument('--model-version', help='Target version (default: the current one)')
+    parser.add_argument('--user', help='Only this user email')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes (default 1 = no pool)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--max-rate', type=float, help='Submissions per second at most')
+    parser.add_argument('--limit', type=int, help='Stop after this many submissions')
+    parser.add_argument('--nice', type=int, default=DEFAULT_NICENESS,
+                        help=f'Worker priority decrease (default {DEFAULT_NICENESS}; POSIX only)')
+    parser.add_argument('--report-only', action='store_true',
+                        help='Only rebuild the diff report from results already recomputed')
+    parser.add_argument('--report-dir', help='Diff report directory (default: next to the recomputed results)')
+    args = parser.parse_args(argv)
+
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error('--workers and --chunk-size must be at least 1')
+    if args.max_rate is not None and args.max_rate <= 0:
+        parser.error('--max-rate must be positive')
+
+    # Model loading prints progress; keep it with the job's log
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.model_version:
+            try:
+                model = get_registry().load(args.model_version)
+            except KeyError:
+                parser.error(f'Unknown model version: {args.model_version}')
+        else:
+            model = current_model()
+
+    if not args.report_only:
+        try:
+            summary = run_backfill(model, workers=args.workers, chunk_size=args.chunk_size,
+                                   max_rate=args.max_rate, user_email=args.user, limit=args.limit,
+                                   niceness=args.nice)
+        except KeyboardInterrupt:
+            print('\nInterrupted - rerun to continue where it stopped', file=sys.stderr)
+            return 130
+        print(f"✓ Recomputed {summary['recomputed']} submissions under model {model.version} "
+              f"({summary['errors']} errors, {summary['already_recomputed']} already done, "
+              f"{summary['current']} current) in {summary['elapsed_seconds']}s", file=sys.stderr)
+        for failure in summary['failures']:
+            print(f"  {failure['submission_id']}: {failure['error']}", file=sys.stderr)
+
+    report = write_diff_report(model.version, args.report_dir)
+    print(f"✓ Diff report: {report['submissions']} submissions, {report['tier_changed']} tier changes, "
+          f"{report['effort_hours_changed']} hour changes -> "
+          f"{Path(args.report_dir or RECOMPUTED_DIR / model.version) / DIFF_REPORT_FILE}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
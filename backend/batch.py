@@ -0,0 +1,389 @@
+"""
+Batch Scoring CLI
+
+Scores a file of scenarios without the API or the interactive UI:
+
+    python -m backend.batch scenarios.ndjson results.ndjson --workers 4
+    python -m backend.batch scenarios.csv results.csv --resume
+
+Input (format from the file extension or --input-format):
+- NDJSON: one object per line
+    {"id": "acme-1", "selected_roles": ["PM USA"],
+     "scope_inputs": [{"name": "Account", "in_scope": "YES", "details": 1500}, ...]}
+- CSV: columns `id`, `selected_roles` (';'-separated) and one column per metric
+  name; a cell is empty/NO (out of scope), YES (in scope, details 0) or the
+  details count (in scope)
+
+Output (NDJSON or CSV) has one record per input row, in input order; rows that
+fail to score carry an `error` instead of results.
+
+Scenarios are read lazily and scored in chunks across a process pool whose
+workers load the scoring model once. At most a few chunks per worker are in
+flight, so memory stays flat however large the input is. With --resume the
+records already in the output file are kept and the matching input rows are
+skipped.
+"""
+
+import argparse
+import contextlib
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from backend.config import AVAILABLE_ROLES
+from backend.core.scope_processor import ScopeDefinitionProcessor
+from backend.core.effort_calculator import EffortCalculator
+from backend.core.fte_calculator import FTEEffortsCalculator
+from backend.core.scoping_model import ScopingModel, current_model
+
+FORMATS = ('ndjson', 'csv')
+FORMAT_EXTENSIONS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.json': 'ndjson', '.csv': 'csv'}
+
+# Scenarios per task sent to a worker
+DEFAULT_CHUNK_SIZE = 200
+# Chunks queued per worker; bounds memory and keeps workers busy
+IN_FLIGHT_PER_WORKER = 2
+
+CSV_RESULT_COLUMNS = ['id', 'total_weightage', 'tier', 'tier_name', 'total_hours',
+                      'total_days', 'total_months', 'model_version', 'error']
+CSV_ROLE_PREFIX = 'hours:'
+
+
+# ----------------------------------------------------------------------
+# Scoring
+# ----------------------------------------------------------------------
+
+class BatchScorer:
+    """Scoring model loaded once and reused for every scenario"""
+
+    def __init__(self, model: ScopingModel = None):
+        """
+        Args:
+            model: Scoping model snapshot (default: the current version); one version
+                   scores the whole run, even if a newer one is activated meanwhile
+        """
+        self.model = model or current_model()
+        self.processor = ScopeDefinitionProcessor(self.model)
+        self.fte_calculator = FTEEffortsCalculator(self.model)
+
+    def score(self, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Score one scenario (same steps and numbers as ScopingEngine)
+
+        Args:
+            scenario: {'id': ..., 'scope_inputs': [...], 'selected_roles': [...]}
+
+        Returns:
+            Result record, or {'id': ..., 'error': message} if the scenario is invalid
+        """
+        try:
+            scope_result = self.processor.process_user_input({
+                'scope_inputs': scenario['scope_inputs'],
+                'selected_roles': scenario.get('selected_roles', [])
+            })
+            calculator = EffortCalculator(scope_result, self.model)
+            categories = calculator.calculate_effort()
+            summary = calculator.generate_summary(categories)
+            role_hours = self.fte_calculator.calculate_role_fte_from_effort(
+                categories, scope_result['selected_roles']
+            )
+        except Exception as e:
+            return {'id': scenario.get('id'), 'error': f'{type(e).__name__}: {e}'}
+
+        return {
+            'id': scenario.get('id'),
+            'total_weightage': scope_result['total_weightage'],
+            'tier': scope_result['tier'],
+            'tier_name': scope_result['tier_name'],
+            'total_hours': summary['total_time_hours'],
+            'total_days': summary['total_days'],
+            'total_months': summary['total_months'],
+            'category_hours': {name: cat['final_estimate'] for name, cat in categories.items()},
+            'role_hours': role_hours,
+            'model_version': self.model.version,
+        }
+
+    def score_chunk(self, scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [self.score(scenario) for scenario in scenarios]
+
+
+_worker_scorer = None
+
+
+def _init_worker(model: ScopingModel):
+    global _worker_scorer
+    # Keep stray prints away from an output streamed to stdout
+    sys.stdout = sys.stderr
+    _worker_scorer = BatchScorer(model)
+
+
+def _score_chunk_in_worker(scenarios: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return _worker_scorer.score_chunk(scenarios)
+
+
+# ----------------------------------------------------------------------
+# Input
+# ----------------------------------------------------------------------
+
+def detect_format(path: str, override: Optional[str] = None) -> str:
+    """File format from an explicit override or the file extension"""
+    if override:
+        return override
+    fmt = FORMAT_EXTENSIONS.get(Path(path).suffix.lower())
+    if fmt is None:
+        raise ValueError(f"Can't tell the format of '{path}'; pass --input-format/--output-format")
+    return fmt
+
+
+def _parse_csv_cell(value: str) -> Tuple[str, float]:
+    value = (value or '').strip()
+    if not value or value.upper() == 'NO':
+        return 'NO', 0
+    if value.upper() == 'YES':
+        return 'YES', 0
+    number = float(value)
+    return 'YES', int(number) if number.is_integer() else number
+
+
+def _read_ndjson(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    for row_number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            scenario = json.loads(line)
+            if not isinstance(scenario.get('scope_inputs'), list):
+                raise ValueError('scope_inputs must be a list')
+        except (ValueError, AttributeError) as e:
+            yield {'id': row_number, 'error': f'Invalid scenario on line {row_number}: {e}'}
+            continue
+        scenario.setdefault('id', row_number)
+        yield scenario
+
+
+def _read_csv(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    reader = csv.DictReader(lines)
+    metric_columns = [c for c in (reader.fieldnames or []) if c not in ('id', 'selected_roles')]
+
+    for row_number, row in enumerate(reader, 1):
+        scenario_id = row.get('id') or row_number
+        try:
+            scope_inputs = []
+            for name in metric_columns:
+                in_scope, details = _parse_csv_cell(row[name])
+                scope_inputs.append({'name': name, 'in_scope': in_scope, 'details': details})
+        except ValueError as e:
+            yield {'id': scenario_id, 'error': f'Invalid scenario on row {row_number}: {e}'}
+            continue
+        roles = [r.strip() for r in (row.get('selected_roles') or '').split(';') if r.strip()]
+        yield {'id': scenario_id, 'scope_inputs': scope_inputs, 'selected_roles': roles}
+
+
+def read_scenarios(lines: Iterable[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily parse scenarios
+
+    Unparseable rows are yielded as {'id', 'error'} records so they keep their
+    place in the output.
+    """
+    return _read_csv(lines) if fmt == 'csv' else _read_ndjson(lines)
+
+
+# ----------------------------------------------------------------------
+# Output
+# ----------------------------------------------------------------------
+
+class ResultWriter:
+    """Streams result records as NDJSON or CSV"""
+
+    def __init__(self, stream, fmt: str, write_header: bool = True):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == 'csv':
+            self.columns = CSV_RESULT_COLUMNS + [CSV_ROLE_PREFIX + role for role in AVAILABLE_ROLES]
+            self.writer = csv.DictWriter(stream, fieldnames=self.columns, extrasaction='ignore',
+                                         lineterminator='\n')
+            if write_header:
+                self.writer.writeheader()
+
+    def write(self, records: List[Dict[str, Any]]):
+        for record in records:
+            if self.fmt == 'csv':
+                row = dict(record)
+                for role, hours in (record.get('role_hours') or {}).items():
+                    row[CSV_ROLE_PREFIX + role] = hours
+                if row.get('error'):
+                    # One record per physical line, so resume can count rows
+                    row['error'] = ' '.join(str(row['error']).split())
+                self.writer.writerow(row)
+            else:
+                self.stream.write(json.dumps(record) + '\n')
+        self.stream.flush()
+
+
+def completed_records(path: Path, fmt: str) -> int:
+    """
+    Records already written to an output file, for resuming
+
+    A trailing partial line (interrupted write) is truncated away.
+    """
+    if not path.exists():
+        return 0
+
+    with open(path, 'rb+') as f:
+        data = f.read()
+        complete = data.rfind(b'\n') + 1
+        if complete < len(data):
+            f.truncate(complete)
+
+    lines = data[:complete].count(b'\n')
+    if fmt == 'csv':
+        lines = max(lines - 1, 0)  # Header
+    return lines
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _merge(chunk: List[Dict[str, Any]], scored: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Put results for a chunk's valid scenarios back between its parse errors"""
+    scored = iter(scored)
+    return [s if 'error' in s else next(scored) for s in chunk]
+
+
+def run_batch(scenarios: Iterable[Dict[str, Any]], writer: ResultWriter, workers: int = 1,
+              chunk_size: int = DEFAULT_CHUNK_SIZE, model: ScopingModel = None) -> Dict[str, Any]:
+    """
+    Score scenarios and write results in input order
+
+    Args:
+        scenarios: Iterable of scenario dicts (read lazily)
+        writer: Destination for result records
+        workers: Worker processes (1 = score in this process)
+        chunk_size: Scenarios per worker task
+        model: Scoping model snapshot (default: the current version)
+
+    Returns:
+        {'scenarios', 'errors', 'elapsed_seconds', 'scenarios_per_second', 'workers', 'model_version'}
+    """
+    started = time.perf_counter()
+    model = model or current_model()
+    counts = {'scenarios': 0, 'errors': 0}
+
+    def emit(records):
+        writer.write(records)
+        counts['scenarios'] += len(records)
+        counts['errors'] += sum(1 for r in records if 'error' in r)
+
+    chunks = _chunks(scenarios, chunk_size)
+
+    if workers <= 1:
+        with contextlib.redirect_stdout(sys.stderr):
+            scorer = BatchScorer(model)
+        for chunk in chunks:
+            emit(_merge(chunk, scorer.score_chunk([s for s in chunk if 'error' not in s])))
+    else:
+        max_in_flight = workers * IN_FLIGHT_PER_WORKER
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(model,),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            pending = deque()
+            for chunk in chunks:
+                valid = [s for s in chunk if 'error' not in s]
+                pending.append((chunk, executor.submit(_score_chunk_in_worker, valid) if valid else None))
+                # Write finished chunks from the head only, preserving input order
+                while len(pending) >= max_in_flight or (pending and _done(pending[0][1])):
+                    emit(_collect(*pending.popleft()))
+            while pending:
+                emit(_collect(*pending.popleft()))
+
+    elapsed = time.perf_counter() - started
+    return {
+        **counts,
+        'elapsed_seconds': round(elapsed, 3),
+        'scenarios_per_second': round(counts['scenarios'] / elapsed, 1) if elapsed > 0 else None,
+        'workers': workers,
+        'model_version': model.version,
+    }
+
+
+def _done(future) -> bool:
+    return future is None or future.done()
+
+
+def _collect(chunk, future) -> List[Dict[str, Any]]:
+    return _merge(chunk, future.result() if future is not None else [])
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m backend.batch', description='Score a file of scenarios')
+    parser.add_argument('input', help="Scenario file (NDJSON or CSV), '-' for stdin")
+    parser.add_argument('output', help="Result file (NDJSON or CSV), '-' for stdout")
+    parser.add_argument('--input-format', choices=FORMATS)
+    parser.add_argument('--output-format', choices=FORMATS)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Worker processes (default: CPU count; 1 = no pool)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--resume', action='store_true',
+                        help='Keep results already in the output file and skip those input rows')
+    args = parser.parse_args(argv)
+
+    try:
+        input_format = detect_format(args.input, args.input_format or ('ndjson' if args.input == '-' else None))
+        output_format = detect_format(args.output, args.output_format or ('ndjson' if args.output == '-' else None))
+    except ValueError as e:
+        parser.error(str(e))
+    if args.resume and args.output == '-':
+        parser.error('--resume needs an output file')
+    if args.workers < 1 or args.chunk_size < 1:
+        parser.error('--workers and --chunk-size must be at least 1')
+
+    output_path = Path(args.output)
+    skip = completed_records(output_path, output_format) if args.resume else 0
+
+    input_stream = sys.stdin if args.input == '-' else open(args.input, newline='', encoding='utf-8')
+    if args.output == '-':
+        output_stream = sys.stdout
+    else:
+        output_stream = open(output_path, 'a' if args.resume else 'w', newline='', encoding='utf-8')
+    write_header = not (args.resume and output_path.stat().st_size > 0) if args.output != '-' else True
+
+    try:
+        scenarios = itertools.islice(read_scenarios(input_stream, input_format), skip, None)
+        writer = ResultWriter(output_stream, output_format, write_header=write_header)
+        summary = run_batch(scenarios, writer, workers=args.workers, chunk_size=args.chunk_size)
+    except KeyboardInterrupt:
+        print('\nInterrupted - rerun with --resume to continue', file=sys.stderr)
+        return 130
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    if skip:
+        print(f'Resumed after {skip} completed scenarios', file=sys.stderr)
+    print(f"✓ Scored {summary['scenarios']} scenarios ({summary['errors']} errors) "
+          f"in {summary['elapsed_seconds']}s - {summary['scenarios_per_second']} scenarios/s "
+          f"with {summary['workers']} worker(s), model {summary['model_version']}", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,6 +3,7 @@ Configuration and Constants
 Centralized configuration for the scoping tool
 """
 
+import os
 from pathlib import Path
 
 # Project paths
@@ -79,10 +80,36 @@ AVAILABLE_ROLES = [
 HOURS_PER_DAY = 8
 DAYS_PER_MONTH = 30
 
+# Report generation worker pool (Word documents are built in separate processes)
+REPORT_POOL_SIZE = int(os.environ.get('REPORT_POOL_SIZE', os.cpu_count() or 2))
+REPORT_TIMEOUT_SECONDS = float(os.environ.get('REPORT_TIMEOUT_SECONDS', 60))
+REPORT_QUEUE_LIMIT = int(os.environ.get('REPORT_QUEUE_LIMIT', REPORT_POOL_SIZE * 4))
+
+# Memoized weightage results kept per compiled formula (keyed on its referenced inputs)
+FORMULA_MEMO_SIZE = int(os.environ.get('FORMULA_MEMO_SIZE', 4096))
+# Compiled formulas kept process-wide, least recently used evicted first (a model
+# version has ~60 formulas; each published version with edited formulas adds its own)
+FORMULA_CACHE_SIZE = int(os.environ.get('FORMULA_CACHE_SIZE', 512))
+
+# Published scoping model versions (formulas, effort template, role allocations)
+MODEL_DIR = Path(os.environ.get('MODEL_DIR', OUTPUT_DIR / 'models'))
+# How often a process checks MODEL_DIR for a newly activated version
+MODEL_POLL_SECONDS = float(os.environ.get('MODEL_POLL_SECONDS', 2))
+
+# Parsed user results files kept in memory (reparsed when the file changes)
+RESULTS_CACHE_FILES = int(os.environ.get('RESULTS_CACHE_FILES', 64))
+
+# Compression of stored results and JSON reports: 'gzip', 'zstd' (needs the zstandard package) or 'none'
+STORAGE_COMPRESSION = os.environ.get('STORAGE_COMPRESSION', 'gzip').lower()
+
+# JSON encoder for API responses and stored files: 'auto' (orjson when installed), 'orjson' or 'stdlib'
+JSON_BACKEND = os.environ.get('JSON_BACKEND', 'auto').lower()
+
 # Excel sheet names
 SHEET_SCOPE_DEFINITION = 'Scope Definition'
 SHEET_EFFORT_ESTIMATION = 'Effort Estimation'
 SHEET_SCOPE_OF_SERVICE = 'Scope of Service'
+SHEET_DEFINITIONS = 'Definitions'
 
 # Named ranges (from Excel)
 NAMED_RANGES = {
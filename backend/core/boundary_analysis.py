@@ -0,0 +1,162 @@
+"""
+Tier-Boundary Analysis
+
+How close is a scenario to the next (or previous) implementation tier, and to
+the next weightage band of the category adjustments (w <= 100 / 120 / 160)?
+
+Every weightage formula is a step function of each Details input (compiled
+formulas expose the breakpoints), so total weightage only changes when a
+details value crosses one of those breakpoints. For each metric the analyzer
+evaluates just the integer details values adjacent to the breakpoints, nearest
+first, instead of searching the whole range.
+"""
+
+import math
+from typing import Any, Dict, List, Optional
+
+from backend.config import TIERS
+from backend.core.effort_calculator import ADJUSTMENT_BANDS, get_adjustment_band
+from backend.core.scope_processor import determine_tier
+from backend.core.sensitivity import IncrementalScorer
+
+# Details values scanned when a formula isn't piecewise-constant in an input
+MAX_LINEAR_SCAN = 500
+
+TARGETS = ('next_tier', 'previous_tier', 'next_band', 'previous_band')
+
+
+def band_range(band: int) -> Dict[str, Optional[float]]:
+    """Weightage range of an adjustment band: above (exclusive) / up_to (inclusive)"""
+    return {
+        'above': ADJUSTMENT_BANDS[band - 1] if band > 0 else None,
+        'up_to': ADJUSTMENT_BANDS[band] if band < len(ADJUSTMENT_BANDS) else None,
+    }
+
+
+def weightage_boundaries(weightage: float) -> Dict[str, Any]:
+    """Weightage distance from the current tier's and band's edges"""
+    tier = determine_tier(weightage)
+    min_val, max_val = TIERS[tier]['range']
+    band = get_adjustment_band(weightage)
+    band_edges = band_range(band)
+
+    return {
+        'tier': tier,
+        'tier_name': TIERS[tier]['name'],
+        'tier_range': TIERS[tier]['range'],
+        'band': band,
+        'band_range': band_edges,
+        # Weightage must exceed 'above' / fall below 'below' to leave the tier
+        'next_tier': None if tier == max(TIERS) else {'above': max_val, 'distance': max_val - weightage},
+        'previous_tier': None if tier == min(TIERS) else {'below': min_val, 'distance': weightage - min_val},
+        # Bands are (above, up_to]
+        'next_band': None if band_edges['up_to'] is None else
+            {'above': band_edges['up_to'], 'distance': band_edges['up_to'] - weightage},
+        'previous_band': None if band_edges['above'] is None else
+            {'at_most': band_edges['above'], 'distance': weightage - band_edges['above']},
+    }
+
+
+class BoundaryAnalyzer:
+    """Minimal single-metric changes that move a scenario across a tier or band"""
+
+    def __init__(self, scorer: IncrementalScorer):
+        self.scorer = scorer
+
+    def details_breakpoints(self, metric_name: str) -> Optional[List[float]]:
+        """Union of the breakpoints of every formula reading metric_name[Details] (None = not piecewise)"""
+        ref = (metric_name, 'Details')
+        found = set()
+        for name in self.scorer.formula_dependents.get(metric_name, ()):
+            _, compiled = self.scorer.formulas[name]
+            points = compiled.breakpoints(ref)
+            if points is None:
+                return None
+            found.update(points)
+        if self.scorer._always_dependent:
+            return None
+        return sorted(found)
+
+    @staticmethod
+    def candidate_values(current: float, breakpoints: Optional[List[float]]) -> List[float]:
+        """
+        Integer details values where the total weightage may differ from its value
+        at `current`, nearest first (increases before decreases at equal distance)
+        """
+        if breakpoints is None:
+            low = max(0, math.floor(current) - MAX_LINEAR_SCAN)
+            candidates = set(range(low, math.floor(current) + MAX_LINEAR_SCAN + 1))
+        else:
+            candidates = set()
+            for b in breakpoints:
+                # The nearest integer inside each region around b
+                candidates.update((math.floor(b) + 1, math.ceil(b) - 1))
+                if float(b).is_integer():
+                    candidates.add(int(b))
+        return sorted((c for c in candidates if c >= 0 and c != current),
+                      key=lambda c: (abs(c - current), c < current))
+
+    def analyze_metric(self, metric_name: str) -> Dict[str, Any]:
+        scorer = self.scorer
+        metric = scorer.metrics[metric_name]
+        current = metric.details or 0
+        in_scope = metric.in_scope or 'NO'
+        tier = scorer.tier
+        band = get_adjustment_band(scorer.total_weightage)
+
+        breakpoints = self.details_breakpoints(metric_name)
+        found = dict.fromkeys(TARGETS)
+
+        for value in self.candidate_values(current, breakpoints):
+            weightage = scorer.rescore_weightage(metric_name, details=value)
+            new_tier, new_band = determine_tier(weightage), get_adjustment_band(weightage)
+            hit = {'details': value, 'change': value - current, 'total_weightage': weightage,
+                   'tier': new_tier, 'band': new_band}
+            for key, crossed in (('next_tier', new_tier > tier), ('previous_tier', new_tier < tier),
+                                 ('next_band', new_band > band), ('previous_band', new_band < band)):
+                if crossed and found[key] is None:
+                    found[key] = hit
+            if all(found.values()):
+                break
+
+        toggled = 'NO' if in_scope == 'YES' else 'YES'
+        toggle_weightage = scorer.rescore_weightage(metric_name, in_scope=toggled)
+        return {
+            'metric': metric_name,
+            'in_scope': in_scope,
+            'details': current,
+            'piecewise': breakpoints is not None,
+            **found,
+            'toggle_in_scope': {
+                'in_scope': toggled,
+                'total_weightage': toggle_weightage,
+                'tier': determine_tier(toggle_weightage),
+                'band': get_adjustment_band(toggle_weightage),
+            },
+        }
+
+    def analyze(self) -> Dict[str, Any]:
+        """
+        Boundary analysis for the whole scenario
+
+        Returns:
+            Weightage-level distances plus, per metric, the smallest details change
+            reaching the next/previous tier and band (None if no value does) and
+            the effect of toggling in_scope
+        """
+        metrics = [self.analyze_metric(name) for name in self.scorer.metric_order]
+
+        def nearest(key):
+            hits = [(abs(m[key]['change']), m['metric'], m[key]) for m in metrics if m[key]]
+            if not hits:
+                return None
+            _, name, hit = min(hits, key=lambda h: h[0])
+            return {'metric': name, **hit}
+
+        return {
+            'model_version': self.scorer.model.version,
+            'total_weightage': self.scorer.total_weightage,
+            **weightage_boundaries(self.scorer.total_weightage),
+            'nearest': {key: nearest(key) for key in TARGETS},
+            'metrics': metrics,
+        }
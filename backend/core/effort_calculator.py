@@ -16,7 +16,8 @@ import math
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from backend.config import HOURS_PER_DAY, DAYS_PER_MONTH
-from backend.data.effort_template import EFFORT_ESTIMATION_TEMPLATE
+from backend.core.result_records import CategoryRecord, TaskRecord
+from backend.core.scoping_model import ScopingModel, current_model
 
 
 def excel_round(value, decimals=0):
@@ -29,20 +30,74 @@ def excel_round(value, decimals=0):
     return math.floor(value * multiplier + 0.5) / multiplier
 
 
+# Tier-based category adjustments: hours added per band of engagement weightage
+# (w <= 100, w <= 120, w <= 160, above)
+ADJUSTMENT_BANDS = (100, 120, 160)
+
+CATEGORY_TIER_ADJUSTMENTS = {
+    "Project Initiation and Planning": (0, 4, 6, 8),
+    "Requirement Gathering, Read back and Client Sign-off": (0, 8, 12, 16),
+    "Design": (0, 8, 16, 24),
+    "Build and Configure FCC": (0, 8, 16, 24),
+    "Setup Application Features": (0, 8, 16, 24),
+    "Application Customization": (0, 8, 12, 16),
+    "Calculations": (0, 8, 12, 16),
+    "Security": (0, 8, 12, 16),
+    "Historical Data": (0, 8, 12, 16),
+    "Integrations": (0, 8, 12, 16),
+    "Reporting": (0, 8, 12, 16),
+    "Automations": (0, 8, 12, 16),
+    "Testing/Training": (0, 8, 12, 16),
+    "Transition": (0, 8, 16, 24),
+    "Documentations": (0, 8, 12, 16),
+    "Change Management": (0, 8, 12, 16),
+    "Creating and Managing EPM Cloud Infrastructure": (0, 0, 0, 0),
+}
+
+# Tasks whose estimate reads another metric's scope inputs (besides their own)
+TASK_INPUT_DEPENDENCIES = {
+    "Data Validation for Account Alt Hierarchies": ("Historical Data Validation",),
+    "Historical Journal Conversion": ("Historical Data Validation",),
+    "Data Validation for Entity Alt Hierarchies": ("Entity Alternate Hierarchies",),
+}
+
+
+def get_adjustment_band(weightage: float) -> int:
+    """Index of the adjustment band the weightage falls in (0-3)"""
+    for band, upper in enumerate(ADJUSTMENT_BANDS):
+        if weightage <= upper:
+            return band
+    return len(ADJUSTMENT_BANDS)
+
+
+def get_category_adjustment(category_name: str, weightage: float) -> float:
+    """Tier-based adjustment hours for a category at the given engagement weightage"""
+    adj = CATEGORY_TIER_ADJUSTMENTS.get(category_name)
+    if adj is None:
+        return 0
+    return adj[get_adjustment_band(weightage)]
+
+
 class EffortCalculator:
     """
     Calculates effort estimation with tier-based adjustments
     Matches Excel Effort Estimation sheet logic exactly
     """
     
-    def __init__(self, scope_result: dict):
+    def __init__(self, scope_result: dict, model: ScopingModel = None):
         """
         Initialize with scope processing result
         
         Args:
             scope_result: Output from ScopeDefinitionProcessor
+            model: Scoping model snapshot (default: the current version; pass the
+                   processor's model so both steps use the same version)
+        
+        scope_metrics (metric name -> MetricRecord) may be swapped for a lookup with
+        changed records (MetricRecord.replace) to re-estimate single tasks.
         """
-        self.scope_metrics = {m['name']: m for m in scope_result['metrics']}
+        self.effort_template = (model or current_model()).effort_template
+        self.scope_metrics = {m.name: m for m in scope_result['metrics']}
         self.engagement_weightage = scope_result['total_weightage']
         self.tier = scope_result['tier']
         self.tier_name = scope_result['tier_name']
@@ -50,20 +105,20 @@ class EffortCalculator:
     def lookup_inscope(self, task_name: str) -> str:
         """Check if task is in scope"""
         metric = self.scope_metrics.get(task_name)
-        return "YES" if metric and metric['in_scope_flag'] == 1 else "NO"
+        return "YES" if metric is not None and metric.in_scope_flag == 1 else "NO"
     
     def lookup_details(self, task_name: str) -> float:
         """Get details value from scope definition (Returns 0 if NOT in scope)"""
         metric = self.scope_metrics.get(task_name)
-        if metric and metric['in_scope'] == "YES":
-            return metric.get('details', 0) if metric.get('details') is not None else 0
+        if metric is not None and metric.in_scope == "YES":
+            return metric.details if metric.details is not None else 0
         return 0
     
     def get_raw_details(self, task_name: str) -> float:
         """Get details value regardless of in_scope status"""
         metric = self.scope_metrics.get(task_name)
-        if metric:
-            return metric.get('details', 0) if metric.get('details') is not None else 0
+        if metric is not None:
+            return metric.details if metric.details is not None else 0
         return 0
     
     def calculate_task_final_estimate(self, task_name: str) -> float:
@@ -212,38 +267,7 @@ class EffortCalculator:
         """
         w = self.engagement_weightage
         
-        # Tier-based adjustments map
-        tier_adjustments = {
-            "Project Initiation and Planning": (0, 4, 6, 8),
-            "Requirement Gathering, Read back and Client Sign-off": (0, 8, 12, 16),
-            "Design": (0, 8, 16, 24),
-            "Build and Configure FCC": (0, 8, 16, 24),
-            "Setup Application Features": (0, 8, 16, 24),
-            "Application Customization": (0, 8, 12, 16),
-            "Calculations": (0, 8, 12, 16),
-            "Security": (0, 8, 12, 16),
-            "Historical Data": (0, 8, 12, 16),
-            "Integrations": (0, 8, 12, 16),
-            "Reporting": (0, 8, 12, 16),
-            "Automations": (0, 8, 12, 16),
-            "Testing/Training": (0, 8, 12, 16),
-            "Transition": (0, 8, 16, 24),
-            "Documentations": (0, 8, 12, 16),
-            "Change Management": (0, 8, 12, 16),
-            "Creating and Managing EPM Cloud Infrastructure": (0, 0, 0, 0),
-        }
-        
-        category_adjustment = 0
-        if category_name in tier_adjustments:
-            adj = tier_adjustments[category_name]
-            if w <= 100:
-                category_adjustment = adj[0]
-            elif w <= 120:
-                category_adjustment = adj[1]
-            elif w <= 160:
-                category_adjustment = adj[2]
-            else:
-                category_adjustment = adj[3]
+        category_adjustment = get_category_adjustment(category_name, w)
         
         category_base = base_hours + category_adjustment
         
@@ -257,27 +281,20 @@ class EffortCalculator:
         """
         effort_estimation = {}
         
-        for category, data in EFFORT_ESTIMATION_TEMPLATE.items():
-            category_info = {
-                'base_hours': data['total'],
-                'final_estimate': 0,
-                'in_days': 0,
-                'tasks': []
-            }
+        for category, data in self.effort_template.items():
+            category_info = CategoryRecord(data['total'])
             
             task_estimates = {}
             for task_name, task_base_hours in data['tasks'].items():
                 task_final_estimate = self.calculate_task_final_estimate(task_name)
                 
-                task_info = {
-                    'name': task_name,
-                    'base_hours': task_base_hours,
-                    'in_scope': self.lookup_inscope(task_name),
-                    'details': self.lookup_details(task_name),
-                    'final_estimate': task_final_estimate
-                }
-                
-                category_info['tasks'].append(task_info)
+                category_info.tasks.append(TaskRecord(
+                    task_name,
+                    task_base_hours,
+                    self.lookup_inscope(task_name),
+                    self.lookup_details(task_name),
+                    task_final_estimate
+                ))
                 if task_final_estimate > 0:
                     task_estimates[task_name] = task_final_estimate
             
@@ -287,8 +304,8 @@ class EffortCalculator:
                 task_estimates
             )
             
-            category_info['final_estimate'] = category_final_estimate
-            category_info['in_days'] = round(category_final_estimate / HOURS_PER_DAY, 2)
+            category_info.final_estimate = category_final_estimate
+            category_info.in_days = round(category_final_estimate / HOURS_PER_DAY, 2)
             
             effort_estimation[category] = category_info
         
@@ -298,7 +315,7 @@ class EffortCalculator:
         """
         Generate summary statistics based on Excel formula logic
         """
-        total_hours = sum(cat['final_estimate'] for cat in effort_estimation.values())
+        total_hours = sum(cat.final_estimate for cat in effort_estimation.values())
         
         total_days = total_hours / 8
         total_months = total_days / 30
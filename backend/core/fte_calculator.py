@@ -11,21 +11,35 @@ Where:
 - $I$6:$I$22 = Hours from Effort Estimation for each tier
 - J6:J22 = Role allocation percentage (0-1) for each tier
 - Result = Total FTE hours for that role across all tiers
+
+The allocation table is held as a dense categories x roles matrix (built once
+per model version, see ScopingModel), so FTE hours for every role are one
+vector-matrix product and a batch of scenarios is one matrix-matrix product.
 """
 
 from pathlib import Path
 import sys
 
+import numpy as np
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from backend.data.excel_templates import APP_TIERS_ROLES, APP_TIERS_DATA
+from backend.config import HOURS_PER_DAY, DAYS_PER_MONTH
+from backend.core.result_records import RoleFTESummary
+from backend.core.scoping_model import ScopingModel, current_model
 
 
 class FTEEffortsCalculator:
     """Calculate role-based FTE effort allocation"""
     
-    def __init__(self):
-        """Load tier definitions and role allocation data from template"""
+    def __init__(self, model: ScopingModel = None):
+        """
+        Load tier definitions and role allocation data
+        
+        Args:
+            model: Scoping model snapshot (default: the current version)
+        """
+        self.model = model or current_model()
         self.tiers_data = {}  # Dict with row_index -> {hours, roles: {role -> allocation}}
         self.roles = []
         self.tier_hours = {}
@@ -34,21 +48,50 @@ class FTEEffortsCalculator:
         self._load_app_tiers_data()
     
     def _load_app_tiers_data(self):
-        """Load tier and role allocation data from template (previously from Excel App Tiers Definition sheet)"""
-        # Use hardcoded roles from template
-        self.roles = APP_TIERS_ROLES.copy()
+        """Load tier and role allocation data from the model (previously from Excel App Tiers Definition sheet)"""
+        self.roles = list(self.model.roles)
         
-        # Load tier/category data from template
-        # Note: Hours are NOT stored in template - they come dynamically from effort_estimation
-        for tier_info in APP_TIERS_DATA:
+        # Load tier/category data from the model
+        # Note: Hours are NOT stored in the model - they come dynamically from effort_estimation
+        for tier_info in self.model.tiers_data:
             row_idx = tier_info['row_index']
             self.tiers_data[row_idx] = {
                 'category': tier_info['category'],
                 'roles': tier_info['roles'].copy()
             }
         
+        # Dense form of the same table (shared with the model, read-only)
+        self.categories = self.model.categories
+        self.role_index = self.model.role_index
+        self.allocation_matrix = self.model.allocation_matrix
+        
         print(f"Loaded {len(self.roles)} roles: {self.roles}")
-        print(f"Loaded {len(self.tiers_data)} tier/category rows (6-22)")
+        print(f"Loaded {len(self.tiers_data)} tier/category rows (model {self.model.version})")
+    
+    def calculate_all_roles_fte(self, effort_estimation: dict) -> np.ndarray:
+        """
+        FTE hours for every role (self.roles order) in one product
+        
+        Args:
+            effort_estimation: dict from EffortCalculator.calculate_effort()
+                               or {category: hours}
+        
+        Returns:
+            Array of hours per role
+        """
+        return self.model.category_hours_vector(effort_estimation) @ self.allocation_matrix
+    
+    def calculate_role_fte_batch(self, category_hours: np.ndarray) -> np.ndarray:
+        """
+        FTE hours for a batch of scenarios
+        
+        Args:
+            category_hours: scenarios x categories array (self.categories order)
+        
+        Returns:
+            scenarios x roles array (self.roles order)
+        """
+        return np.asarray(category_hours, dtype=float) @ self.allocation_matrix
     
     def calculate_role_fte_from_effort(self, effort_estimation: dict, selected_roles: list = None) -> dict:
         """
@@ -71,43 +114,13 @@ class FTEEffortsCalculator:
         Returns:
             dict with role_name -> fte_hours mapping
         """
-        role_fte = {}
+        role_hours = self.calculate_all_roles_fte(effort_estimation)
         roles_to_calculate = selected_roles if selected_roles else self.roles
         
-        # For each role, calculate SUMPRODUCT across all 17 rows (rows 6-22)
-        for role in roles_to_calculate:
-            if role not in self.roles:
-                continue
-            
-            total_fte = 0.0
-            
-            # Iterate through each row 0-16 (representing rows 6-22 in Excel)
-            for row_idx in range(17):  # 17 rows total (rows 6-22)
-                if row_idx not in self.tiers_data:
-                    continue
-                
-                tier_data = self.tiers_data[row_idx]
-                category_name = tier_data['category']
-                
-                # Get hours for this category from effort_estimation
-                # effort_estimation structure: {'Project Initiation and Planning': {'final_estimate': 18, ...}, ...}
-                hours_value = 0.0
-                if category_name in effort_estimation:
-                    effort_entry = effort_estimation[category_name]
-                    if isinstance(effort_entry, dict) and 'final_estimate' in effort_entry:
-                        hours_value = effort_entry['final_estimate']
-                    elif isinstance(effort_entry, (int, float)):
-                        hours_value = effort_entry
-                
-                # Get role allocation percentage for this row
-                role_allocation = tier_data['roles'].get(role, 0.0)
-                
-                # SUMPRODUCT: hours × allocation, then sum across all rows
-                total_fte += hours_value * role_allocation
-            
-            role_fte[role] = total_fte
-        
-        return role_fte
+        return {
+            role: float(role_hours[self.role_index[role]])
+            for role in roles_to_calculate if role in self.role_index
+        }
     
     def get_role_allocation_matrix(self) -> dict:
         """
@@ -129,42 +142,34 @@ class FTEEffortsCalculator:
         Generate complete FTE summary for all selected roles
         
         Args:
-            effort_estimation: Output from EffortCalculator.calculate_effort()
-            selected_roles: List of selected role names
+            effort_estimation: Output from EffortCalculator.calculate_effort() or {category: hours}
+            selected_roles: List of selected role names (None = all roles)
         
         Returns:
             dict with:
             - role_fte_hours: dict of role -> fte_hours
             - role_fte_days: dict of role -> fte_days (hours/8)
-            - role_fte_summary: list of dicts with role details
+            - role_fte_summary: list of RoleFTESummary records
+            - total_hours: sum over the summarized roles
         """
-        # Map effort estimation by tier
-        tier_efforts = {}
-        for category, cat_data in effort_estimation.items():
-            # Get tier name from effort_estimation summary
-            # For now, assume we need to get this from scope_result
-            pass
-        
-        # Calculate role FTE
-        role_fte_hours = self.calculate_role_fte(tier_efforts, selected_roles)
+        role_fte_hours = self.calculate_role_fte_from_effort(effort_estimation, selected_roles)
         
         # Convert to days
-        role_fte_days = {role: hours / 8 for role, hours in role_fte_hours.items()}
+        role_fte_days = {role: hours / HOURS_PER_DAY for role, hours in role_fte_hours.items()}
         
         # Create summary
         summary = []
-        for role in (selected_roles if selected_roles else self.roles):
-            if role in role_fte_hours:
-                summary.append({
-                    'role': role,
-                    'fte_hours': role_fte_hours[role],
-                    'fte_days': role_fte_days[role],
-                    'fte_months': role_fte_days[role] / 30
-                })
+        for role in role_fte_hours:
+            summary.append(RoleFTESummary(
+                role,
+                role_fte_hours[role],
+                role_fte_days[role],
+                role_fte_days[role] / DAYS_PER_MONTH
+            ))
         
         return {
             'role_fte_hours': role_fte_hours,
             'role_fte_days': role_fte_days,
-            'role_fte_summary': summary
+            'role_fte_summary': summary,
+            'total_hours': sum(role_fte_hours.values())
         }
-
@@ -0,0 +1,339 @@
+"""
+Monte Carlo Uncertainty Estimation
+
+Clients rarely know exact counts at scoping time, so `details` values can be
+given as distributions and the scoping model sampled thousands of times.
+
+Scoring is vectorized over samples:
+- Weightage: compiled formulas evaluated in batch (breakpoint tables -> np.searchsorted)
+- Effort tasks: evaluated once per distinct sampled input value, then scattered back
+- Category adjustments: weightage band lookup per sample
+- FTE: category-hours matrix x role-allocation matrix
+
+Samples are drawn in fixed-size chunks, each with its own child of one
+SeedSequence, so results for a seed are identical whether chunks run in this
+process or across the worker pool.
+"""
+
+import multiprocessing
+import os
+import secrets
+import threading
+from collections import ChainMap
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+import numpy as np
+
+from backend.config import HOURS_PER_DAY, DAYS_PER_MONTH, TIERS
+from backend.core.effort_calculator import (
+    ADJUSTMENT_BANDS, CATEGORY_TIER_ADJUSTMENTS, TASK_INPUT_DEPENDENCIES
+)
+from backend.core.result_records import MetricRecord
+from backend.core.scoping_model import ScopingModel
+from backend.core.sensitivity import IncrementalScorer
+from backend.utils.formula_compiler import FormulaValueError, bind_value
+from backend.utils.formula_evaluator import FormulaEvaluator
+
+DISTRIBUTION_TYPES = ('range', 'triangular')
+
+# Samples per chunk; fixed so a seed always yields the same samples
+CHUNK_SIZE = 10000
+
+MAX_SAMPLES = int(os.environ.get('MONTE_CARLO_MAX_SAMPLES', 200000))
+# Sample counts at or above this are spread over a process pool
+PARALLEL_THRESHOLD = int(os.environ.get('MONTE_CARLO_PARALLEL_THRESHOLD', 40000))
+MAX_WORKERS = int(os.environ.get('MONTE_CARLO_WORKERS', os.cpu_count() or 2))
+
+PERCENTILES = (10, 50, 90)
+
+
+def validate_distributions(distributions: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Check and normalize details distributions
+
+    Args:
+        distributions: metric name -> {'type': 'range', 'min': a, 'max': b} or
+                       {'type': 'triangular', 'min': a, 'mode': c, 'max': b}
+
+    Returns:
+        Normalized copy (floats, 'mode' filled in for ranges)
+
+    Raises:
+        ValueError: Unknown type or inconsistent bounds
+    """
+    normalized = {}
+    for name, spec in distributions.items():
+        kind = spec.get('type', 'range')
+        if kind not in DISTRIBUTION_TYPES:
+            raise ValueError(f"{name}: unknown distribution type '{kind}' (use {', '.join(DISTRIBUTION_TYPES)})")
+        try:
+            low, high = float(spec['min']), float(spec['max'])
+            mode = float(spec.get('mode', (low + high) / 2))
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"{name}: 'min' and 'max' (and 'mode' for triangular) must be numbers")
+        if not 0 <= low <= mode <= high:
+            raise ValueError(f"{name}: need 0 <= min <= mode <= max")
+        normalized[name] = {'type': kind, 'min': low, 'mode': mode, 'max': high}
+    return normalized
+
+
+def _draw(rng: np.random.Generator, spec: Dict[str, Any], size: int) -> np.ndarray:
+    """Whole-number details values from a distribution"""
+    low, high = spec['min'], spec['max']
+    if low == high:
+        return np.full(size, float(round(low)))
+    if spec['type'] == 'range':
+        return rng.integers(int(np.ceil(low)), int(np.floor(high)) + 1, size=size).astype(float)
+    return np.rint(rng.triangular(low, spec['mode'], high, size=size))
+
+
+class VectorizedScorer:
+    """Scores many variations of a baseline's details values at once"""
+
+    def __init__(self, scorer: IncrementalScorer):
+        self.scorer = scorer
+        self.categories = list(scorer.effort_template)
+        self.roles = scorer.selected_roles
+
+        # category x selected-role columns of the shared allocation matrix
+        self.allocation = scorer.model.allocation_submatrix(self.categories, self.roles)
+
+        self.adjustments = np.array([
+            CATEGORY_TIER_ADJUSTMENTS.get(category, (0,) * (len(ADJUSTMENT_BANDS) + 1))
+            for category in self.categories
+        ], dtype=float)
+        self.base_hours = np.array([scorer.effort_template[c]['total'] for c in self.categories], dtype=float)
+
+    def _weightage(self, details: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        scorer = self.scorer
+        affected = set(scorer._always_dependent)
+        for name in details:
+            affected |= scorer.formula_dependents.get(name, set())
+
+        total = np.zeros(size)
+        for name in scorer.metric_order:
+            if name not in affected:
+                total += scorer.weightages[name]
+                continue
+
+            formula, compiled = scorer.formulas[name]
+            if compiled is None:
+                total += self._weightage_rows(formula, details, size)
+                continue
+
+            columns = {}
+            try:
+                for ref in compiled.refs:
+                    if ref[1] == 'Details' and ref[0] in details:
+                        columns[ref] = details[ref[0]]
+                    else:
+                        value = bind_value(scorer.metrics.get(ref[0]), ref[1])
+                        columns[ref] = np.full(size, value, dtype=object if ref[1] == 'InScope' else float)
+            except FormulaValueError:
+                continue  # Same as the scalar path: the formula evaluates to 0
+            total += compiled.evaluate_batch(columns, size)
+        return total
+
+    def _weightage_rows(self, formula: str, details: Dict[str, np.ndarray], size: int) -> np.ndarray:
+        """Row-by-row fallback for formulas the compiler doesn't handle"""
+        result = np.zeros(size)
+        for row in range(size):
+            changed = {name: self.scorer.metrics[name].replace(details=values[row])
+                       for name, values in details.items() if name in self.scorer.metrics}
+            result[row] = FormulaEvaluator(list(ChainMap(changed, self.scorer.metrics).values())).evaluate(formula)
+        return result
+
+    def _task_estimates(self, details: Dict[str, np.ndarray], size: int) -> Dict[tuple, np.ndarray]:
+        """Estimates for tasks reading sampled inputs, computed once per distinct input combination"""
+        scorer = self.scorer
+        calculator = scorer.effort_calculator
+        results = {}
+
+        for key in {key for name in details for key in scorer.task_dependents.get(name, [])}:
+            task_name = key[1]
+            inputs = [n for n in (task_name,) + TASK_INPUT_DEPENDENCIES.get(task_name, ()) if n in details]
+            stacked = np.column_stack([details[n] for n in inputs])
+            unique_rows, inverse = np.unique(stacked, axis=0, return_inverse=True)
+
+            values = np.empty(len(unique_rows))
+            try:
+                for i, row in enumerate(unique_rows):
+                    changed = {
+                        name: (scorer.metrics[name] if name in scorer.metrics
+                               else MetricRecord.unscoped(name)).replace(details=float(value))
+                        for name, value in zip(inputs, row)
+                    }
+                    calculator.scope_metrics = ChainMap(changed, scorer.metrics)
+                    values[i] = calculator.calculate_task_final_estimate(task_name)
+            finally:
+                calculator.scope_metrics = scorer.metrics
+            results[key] = values[inverse.reshape(-1)]
+        return results
+
+    def score(self, details: Dict[str, np.ndarray], size: int) -> Dict[str, np.ndarray]:
+        """
+        Score `size` scenarios that differ from the baseline in the given details columns
+
+        Returns:
+            Dict of arrays: weightage, tier, total_hours, category_hours (size x categories),
+            role_hours (size x roles)
+        """
+        scorer = self.scorer
+        weightage = self._weightage(details, size)
+
+        tier = np.full(size, max(TIERS))
+        unassigned = np.ones(size, dtype=bool)
+        for tier_id, info in TIERS.items():
+            min_val, max_val = info['range']
+            match = unassigned & (weightage >= min_val) & (weightage <= max_val)
+            tier[match] = tier_id
+            unassigned &= ~match
+
+        changed_tasks = self._task_estimates(details, size)
+        task_sums = np.empty((size, len(self.categories)))
+        for c, category in enumerate(self.categories):
+            if not any(key[0] == category for key in changed_tasks):
+                task_sums[:, c] = scorer.category_task_sums[category]
+                continue
+            column = np.zeros(size)
+            for task_name in scorer.effort_template[category]['tasks']:
+                key = (category, task_name)
+                values = changed_tasks.get(key)
+                if values is None:
+                    baseline = scorer.task_estimates[key]
+                    column += baseline if baseline > 0 else 0
+                else:
+                    column += np.where(values > 0, values, 0)
+            task_sums[:, c] = column
+
+        band = np.searchsorted(np.asarray(ADJUSTMENT_BANDS, dtype=float), weightage, side='left')
+        category_hours = self.base_hours + self.adjustments[:, band].T + task_sums
+        return {
+            'weightage': weightage,
+            'tier': tier,
+            'total_hours': category_hours.sum(axis=1),
+            'category_hours': category_hours,
+            'role_hours': category_hours @ self.allocation,
+        }
+
+
+def _simulate_chunk(scorer: IncrementalScorer, distributions: Dict[str, Dict[str, Any]],
+                    seed: np.random.SeedSequence, size: int) -> Dict[str, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    details = {name: _draw(rng, distributions[name], size) for name in sorted(distributions)}
+    result = VectorizedScorer(scorer).score(details, size)
+    del result['category_hours']
+    return result
+
+
+def _simulate_chunk_in_worker(scope_inputs, selected_roles, model, distributions, seed, size):
+    """Pool entry point: rebuild the baseline in the worker process, on the caller's model version"""
+    return _simulate_chunk(IncrementalScorer(scope_inputs, selected_roles, model=model), distributions, seed, size)
+
+
+_executor = None
+_executor_workers = 0
+_executor_lock = threading.Lock()
+
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """Shared worker pool, kept warm between simulations (spawn: safe with threads)"""
+    global _executor, _executor_workers
+    with _executor_lock:
+        if _executor is None or _executor_workers != workers:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _executor_workers = workers
+        return _executor
+
+
+def shutdown_pool():
+    """Stop the simulation worker pool"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+def _percentiles(values: np.ndarray) -> Dict[str, float]:
+    points = np.percentile(values, PERCENTILES)
+    summary = {f'p{p}': float(v) for p, v in zip(PERCENTILES, points)}
+    summary['mean'] = float(values.mean())
+    return summary
+
+
+def run_simulation(scope_inputs: List[Dict[str, Any]], selected_roles: List[str],
+                   distributions: Dict[str, Dict[str, Any]], samples: int = 5000,
+                   seed: int = None, max_workers: int = None, model: ScopingModel = None) -> Dict[str, Any]:
+    """
+    Sample details values from distributions and summarize the outcomes
+
+    Args:
+        scope_inputs: Baseline [{'name', 'in_scope', 'details'}, ...]
+        selected_roles: Roles to report FTE hours for
+        distributions: metric name -> distribution (see validate_distributions)
+        samples: Number of scenarios to sample
+        seed: Seed for reproducible results (None = a random 63-bit seed, returned
+              so the run can be repeated)
+        max_workers: Pool size for large sample counts (default MONTE_CARLO_WORKERS)
+        model: Scoping model snapshot (default: the current version)
+
+    Returns:
+        P10/P50/P90 (+ mean) for weightage, total hours, months and per-role FTE
+        hours, plus the probability of each tier
+    """
+    if not 1 <= samples <= MAX_SAMPLES:
+        raise ValueError(f'samples must be between 1 and {MAX_SAMPLES}')
+    distributions = validate_distributions(distributions)
+
+    if seed is None:
+        # Within 2**53, so clients parsing JSON numbers as doubles (JavaScript) read
+        # the returned seed exactly and can send it back to replay the run
+        seed = secrets.randbits(53)
+    seed_sequence = np.random.SeedSequence(seed)
+    sizes = [min(CHUNK_SIZE, samples - start) for start in range(0, samples, CHUNK_SIZE)]
+    chunk_seeds = seed_sequence.spawn(len(sizes))
+    workers = min(max_workers or MAX_WORKERS, len(sizes))
+
+    scorer = IncrementalScorer(scope_inputs, selected_roles, model=model)
+    unknown = sorted(set(distributions) - set(scorer.metrics))
+    if unknown:
+        raise ValueError(f"Unknown metrics: {', '.join(unknown)}")
+
+    if samples >= PARALLEL_THRESHOLD and workers > 1:
+        chunks = list(_get_executor(workers).map(
+            _simulate_chunk_in_worker,
+            [scope_inputs] * len(sizes), [selected_roles] * len(sizes), [scorer.model] * len(sizes),
+            [distributions] * len(sizes), chunk_seeds, sizes
+        ))
+    else:
+        chunks = [_simulate_chunk(scorer, distributions, s, n) for s, n in zip(chunk_seeds, sizes)]
+
+    merged = {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    total_hours = merged['total_hours']
+    tiers, counts = np.unique(merged['tier'], return_counts=True)
+
+    return {
+        'model_version': scorer.model.version,
+        'samples': samples,
+        'seed': seed,
+        'distributions': distributions,
+        'baseline': {
+            'total_weightage': scorer.total_weightage,
+            'tier': scorer.tier,
+            'total_hours': scorer.total_hours,
+        },
+        'weightage': _percentiles(merged['weightage']),
+        'total_hours': _percentiles(total_hours),
+        'total_months': _percentiles(total_hours / HOURS_PER_DAY / DAYS_PER_MONTH),
+        'tier_probabilities': {
+            int(tier): {'name': TIERS[int(tier)]['name'], 'probability': float(count) / samples}
+            for tier, count in zip(tiers, counts)
+        },
+        'role_hours': {
+            role: _percentiles(merged['role_hours'][:, i]) for i, role in enumerate(scorer.selected_roles)
+        },
+    }
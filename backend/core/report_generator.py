@@ -10,13 +10,17 @@ from docx import Document
 from docx.shared import Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from backend.data.excel_templates import KDD_DEFINITIONS, KDD_CONDITIONAL_MAPPINGS
+from backend.config import EXCEL_FILE, SHEET_SCOPE_DEFINITION, SHEET_DEFINITIONS
+from backend.utils.workbook_snapshot import get_workbook_snapshot
 
 
 class SOWReportGenerator:
     """Generate Statement of Work report with Scope, Timings, and KDD Items"""
     
-    def __init__(self):
+    def __init__(self, excel_file=EXCEL_FILE):
         """Initialize report generator"""
+        self.excel_file = excel_file
+        
         # Tier definitions
         self.tier_ranges = {
             'Tier 1 - Jumpstart': {'min': 0, 'max': 60},
@@ -26,6 +30,11 @@ class SOWReportGenerator:
             'Tier 5 - Full Spectrum': {'min': 201, 'max': 999},
         }
     
+    @property
+    def snapshot(self):
+        """Cached Scope Definition / Definitions cell values (reloaded when the file changes)"""
+        return get_workbook_snapshot(self.excel_file)
+    
     def get_tier_name(self, weightage):
         """Determine tier name based on engagement weightage"""
         for tier_name, range_dict in self.tier_ranges.items():
@@ -53,20 +62,19 @@ class SOWReportGenerator:
             'Member Formulas': 45,
         }
         
+        snapshot = self.snapshot
         for metric_name, row in key_metrics.items():
-            details[metric_name] = self.ws_scope.cell(row, 4).value or 0  # Column D
+            details[metric_name] = snapshot.cell(SHEET_SCOPE_DEFINITION, row, 4) or 0  # Column D
         
         return details
     
     def get_metric_in_scope(self, metric_name):
         """Check if a metric is in scope (Column C = YES/NO)"""
-        # Find the row with this metric
-        for row in range(6, 100):
-            metric = self.ws_scope.cell(row, 2).value
-            if metric and metric.strip() == metric_name.strip():
-                in_scope = self.ws_scope.cell(row, 3).value
-                return in_scope == 'YES'
-        return False
+        snapshot = self.snapshot
+        row = snapshot.metric_row(metric_name)
+        if row is None:
+            return False
+        return snapshot.cell(SHEET_SCOPE_DEFINITION, row, 3) == 'YES'
     
     def generate_scope_section(self, scope_data, tier_name):
         """Generate Scope of Service section"""
@@ -269,7 +277,7 @@ TIMELINE ASSUMPTIONS
     def _load_kdd_definitions(self):
         """Load KDD definitions from Definitions sheet"""
         try:
-            ws_def = self.wb['Definitions']
+            snapshot = self.snapshot
             kdd_list = {}
             
             # Rows B138-B149 contain the KDD definitions
@@ -277,7 +285,7 @@ TIMELINE ASSUMPTIONS
             kdd_rows = list(range(138, 150))  # Rows 138-149
             
             for idx, row in enumerate(kdd_rows, 1):
-                kdd_text = ws_def.cell(row, 2).value  # Column B
+                kdd_text = snapshot.cell(SHEET_DEFINITIONS, row, 2)  # Column B
                 if kdd_text:
                     kdd_list[f'KDD{idx:02d}'] = str(kdd_text).strip()
             
@@ -361,11 +369,8 @@ TIMELINE ASSUMPTIONS
             scope_inputs_dict: List of scope input dicts (optional)
         """
         
-        # Load Definitions sheet for KDD text
-        try:
-            ws_defs = self.wb['Definitions']
-        except:
-            ws_defs = load_workbook(EXCEL_FILE, data_only=True)['Definitions']
+        # Scope Definition and Definitions values come from the shared workbook snapshot
+        snapshot = self.snapshot
         
         # Conditional KDD mapping: (Scope Definition cell, Definitions sheet row, KDD number, KDD title)
         conditional_kdd_mappings = [
@@ -420,12 +425,12 @@ successful implementation:
         for scope_cell, defs_row, kdd_num, kdd_title in conditional_kdd_mappings:
             try:
                 # Get value from Scope Definition sheet
-                scope_value = self.ws_scope[scope_cell].value
+                scope_value = snapshot.cell_ref(SHEET_SCOPE_DEFINITION, scope_cell)
                 
                 # Check if value > 0
                 if scope_value is not None and scope_value > 0:
                     # Get KDD text from Definitions sheet
-                    kdd_text_from_defs = ws_defs.cell(defs_row, 2).value  # Column B
+                    kdd_text_from_defs = snapshot.cell(SHEET_DEFINITIONS, defs_row, 2)  # Column B
                     
                     if kdd_text_from_defs:
                         conditional_kdds.append((kdd_num, kdd_title, str(kdd_text_from_defs).strip()))
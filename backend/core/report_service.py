@@ -0,0 +1,270 @@
+"""
+Report Service - Offloads Word document generation to worker processes
+
+python-docx/lxml document building is CPU-bound and holds the GIL, so running it
+on the request threads serializes every SOW generation. This service sends the
+work to a pool of worker processes instead.
+
+Key Responsibilities:
+1. Reduce engine results to a compact, picklable payload (numbers and names only)
+2. Render the SOW document in a worker process (returns a file path or raw bytes)
+3. Apply backpressure: reject new work when too many reports are pending
+4. Enforce per-report timeouts
+5. Recover from crashed or hung workers by rebuilding the pool; reports that
+   were pending on a pool recycled for another report's timeout are re-submitted
+"""
+
+import multiprocessing
+import threading
+import time
+import weakref
+from concurrent.futures import CancelledError, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from backend.config import REPORT_POOL_SIZE, REPORT_TIMEOUT_SECONDS, REPORT_QUEUE_LIMIT
+
+
+class ReportServiceBusy(RuntimeError):
+    """Raised when the report queue is full"""
+
+
+class ReportServiceTimeout(TimeoutError):
+    """Raised when a report is not generated within the timeout"""
+
+
+def build_report_payload(scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict) -> dict:
+    """
+    Reduce engine results to the fields the SOW document actually uses
+
+    Args:
+        scope_result: Output from ScopeDefinitionProcessor
+        effort_estimation: Output from EffortCalculator (category -> {...})
+        summary: Effort summary dict with total hours/days/months
+        fte_allocation: Dict of role -> {'hours': value, ...}
+        scope_inputs_dict: Dict mapping metric names to user inputs
+
+    Returns:
+        Compact dict that is cheap to pickle across process boundaries
+    """
+    return {
+        'scope_result': {
+            'total_weightage': scope_result['total_weightage'],
+            'tier_name': scope_result['tier_name'],
+            'tier_range': tuple(scope_result['tier_range']),
+            'metrics': [
+                {'name': m['name'], 'in_scope_flag': m['in_scope_flag']}
+                for m in scope_result.get('metrics', [])
+            ],
+        },
+        'effort_estimation': {
+            category: {'final_estimate': data['final_estimate'], 'in_days': data['in_days']}
+            for category, data in effort_estimation.items()
+        },
+        'summary': {
+            'total_time_hours': summary['total_time_hours'],
+            'total_days': summary['total_days'],
+            'total_months': summary['total_months'],
+        },
+        'fte_allocation': {
+            role: {'hours': data['hours']} for role, data in (fte_allocation or {}).items()
+        },
+        'scope_inputs_dict': {
+            name: {'details': item.get('details', 0)} for name, item in (scope_inputs_dict or {}).items()
+        },
+    }
+
+
+def _warm_worker():
+    """Import python-docx once per worker so the first report doesn't pay for it"""
+    import backend.core.sow_report_generator  # noqa: F401
+
+
+def _render_report(payload: dict, output_path: str = None):
+    """
+    Worker entry point: build the SOW document from a compact payload
+
+    Returns:
+        Path of the saved document if output_path is given, otherwise the .docx bytes
+    """
+    from backend.core.sow_report_generator import SOWReportGenerator
+
+    generator = SOWReportGenerator()
+    args = (
+        payload['scope_result'],
+        payload['effort_estimation'],
+        payload['summary'],
+        payload['fte_allocation'],
+        payload['scope_inputs_dict'],
+    )
+
+    if output_path:
+        return generator.generate_word_document(*args, output_path)
+    return generator.generate_word_bytes(*args)
+
+
+class ReportService:
+    """
+    Executor-backed SOW report generation
+
+    Usage:
+        service = ReportService()
+        path = service.generate(scope_result, categories, summary, fte, scope_inputs, 'out.docx')
+        data = service.generate(scope_result, categories, summary, fte, scope_inputs)  # bytes
+    """
+
+    def __init__(self, max_workers: int = None, timeout: float = None, max_pending: int = None,
+                 render=None):
+        """
+        Args:
+            max_workers: Worker process count (defaults to REPORT_POOL_SIZE)
+            timeout: Seconds to wait for a single report (defaults to REPORT_TIMEOUT_SECONDS)
+            max_pending: Reports allowed in flight before rejecting (defaults to REPORT_QUEUE_LIMIT)
+            render: Module-level function (payload, output_path) run in the workers
+                    (defaults to building the SOW document)
+        """
+        self.max_workers = max_workers or REPORT_POOL_SIZE
+        self.timeout = timeout if timeout is not None else REPORT_TIMEOUT_SECONDS
+        self.max_pending = max_pending or REPORT_QUEUE_LIMIT
+        self.render = render or _render_report
+
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._executor = None
+        # Pools torn down because some report timed out (the others pending on them are re-submitted)
+        self._recycled = weakref.WeakSet()
+        self.restarts = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: never fork a process that is running request threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_warm_worker
+                )
+            return self._executor
+
+    def _reset_executor(self, broken: ProcessPoolExecutor, timed_out: bool = False):
+        """
+        Replace a broken or hung pool; concurrent callers only reset it once
+
+        Args:
+            broken: The pool to replace
+            timed_out: Recycled because a report hung (not because a worker crashed)
+        """
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+            self.restarts += 1
+            if timed_out:
+                self._recycled.add(broken)
+
+        # Terminate workers explicitly - a hung worker never finishes on its own
+        for process in list((getattr(broken, '_processes', None) or {}).values()):
+            if process.is_alive():
+                process.terminate()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, payload: dict, output_path=None):
+        """
+        Queue a report for generation
+
+        Args:
+            payload: Output from build_report_payload()
+            output_path: Where to save the .docx (None = return bytes)
+
+        Returns:
+            (executor, Future) - the executor is kept so a failure can reset the right pool
+
+        Raises:
+            ReportServiceBusy: if max_pending reports are already in flight
+        """
+        if not self._slots.acquire(blocking=False):
+            raise ReportServiceBusy(
+                f"Report queue is full ({self.max_pending} pending). Please retry shortly."
+            )
+
+        try:
+            executor = self._get_executor()
+            try:
+                future = executor.submit(self.render, payload, str(output_path) if output_path else None)
+            except BrokenProcessPool:
+                # A worker died since the last report - start a fresh pool
+                self._reset_executor(executor)
+                executor = self._get_executor()
+                future = executor.submit(self.render, payload, str(output_path) if output_path else None)
+        except BaseException:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return executor, future
+
+    def generate(self, scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict,
+                 output_path=None, timeout: float = None):
+        """
+        Generate an SOW report in a worker process and wait for it
+
+        Returns:
+            Path string if output_path is given, otherwise the .docx bytes
+
+        Raises:
+            ReportServiceBusy: queue is full
+            ReportServiceTimeout: the worker did not finish in time (the pool is recycled)
+        """
+        payload = build_report_payload(scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict)
+        return self.run(payload, output_path, timeout)
+
+    def run(self, payload: dict, output_path=None, timeout: float = None):
+        """
+        Render a payload in a worker process and wait for it
+
+        A report is retried once if its worker crashed, and re-submitted (within
+        its timeout) if its pool was recycled because another report hung.
+
+        Args:
+            payload: Output from build_report_payload()
+            output_path: Where to save the .docx (None = return bytes)
+            timeout: Seconds to wait (defaults to the service timeout)
+
+        Raises:
+            ReportServiceBusy: queue is full
+            ReportServiceTimeout: the worker did not finish in time (the pool is recycled)
+            BrokenProcessPool: the worker crashed twice
+        """
+        timeout = self.timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        crashed = False
+
+        while True:
+            executor, future = self.submit(payload, output_path)
+            try:
+                return future.result(timeout=max(deadline - time.monotonic(), 0))
+            except CancelledError:
+                if executor in self._recycled:
+                    # Dropped from the queue of a pool recycled for another report's timeout
+                    continue
+                raise
+            except BrokenProcessPool:
+                if executor in self._recycled:
+                    # Collateral of another report's timeout, not this report's fault
+                    continue
+                self._reset_executor(executor)
+                if crashed:
+                    raise
+                # One retry if a worker crashed (e.g. killed by the OS) while holding our job
+                crashed = True
+            except FutureTimeoutError:
+                if not future.cancel():
+                    # Already running: the only way to stop it is to recycle the pool
+                    self._reset_executor(executor, timed_out=True)
+                raise ReportServiceTimeout(f"Report generation exceeded {timeout:.0f}s")
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker pool"""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
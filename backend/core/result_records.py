@@ -0,0 +1,176 @@
+"""
+Result Records
+
+Slotted records for the rows the engine produces per request - one per
+metric, effort task, effort category and role - instead of one dict each.
+A record holds its fields in fixed slots (no per-instance dict), so a scored
+scenario allocates a fraction of the memory, which adds up in batch runs that
+keep many results.
+
+Engine code reads and sets fields as attributes (metric.details); a changed
+copy is record.replace(details=...). Records also read like the dicts they
+replace - record['name'], record.get('details'), dict(record) and == against
+a dict - so code shared with stored (JSON-loaded) results handles both.
+Results become plain dicts where they leave the engine (to_plain(): API
+responses, stored submissions, JSON reports).
+"""
+
+from collections.abc import Mapping
+from operator import attrgetter
+from typing import Any, Dict
+
+
+class Record(Mapping):
+    """Read-only mapping view over a slotted record's fields (in slot order)"""
+    __slots__ = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # All field values in one C-level call (to_dict, replace)
+        cls._values = attrgetter(*cls.__slots__)
+
+    def __getitem__(self, key):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        if key in self.__slots__:
+            return getattr(self, key)
+        return default
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def __iter__(self):
+        return iter(self.__slots__)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def keys(self):
+        return self.__slots__
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the fields (record classes on hot paths spell theirs out)"""
+        result = {}
+        for name, value in zip(self.__slots__, self._values(self)):
+            result[name] = value
+        return result
+
+    def replace(self, **changes) -> 'Record':
+        """Copy with some fields changed"""
+        copy = object.__new__(type(self))
+        for name, value in zip(self.__slots__, self._values(self)):
+            setattr(copy, name, value)
+        for name, value in changes.items():
+            setattr(copy, name, value)
+        return copy
+
+    def __repr__(self):
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{type(self).__name__}({fields})'
+
+
+class MetricRecord(Record):
+    """One scope definition metric: the user's inputs and its weightage"""
+    __slots__ = ('row', 'name', 'in_scope', 'details', 'weightage', 'feature_clean',
+                 'in_scope_flag', 'is_details_required', 'is_sub_question', 'formula')
+
+    def __init__(self, row: int, name: str, is_details_required: bool, is_sub_question: bool):
+        self.row = row
+        self.name = name
+        self.in_scope = None
+        self.details = None
+        self.weightage = 0
+        self.feature_clean = name
+        self.in_scope_flag = 0
+        self.is_details_required = is_details_required
+        self.is_sub_question = is_sub_question
+        self.formula = ''
+
+    @classmethod
+    def unscoped(cls, name: str) -> 'MetricRecord':
+        """A metric that isn't in the scope definition (out of scope, no details)"""
+        metric = cls(None, name, False, False)
+        metric.in_scope = 'NO'
+        metric.details = 0
+        return metric
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'row': self.row, 'name': self.name, 'in_scope': self.in_scope, 'details': self.details,
+                'weightage': self.weightage, 'feature_clean': self.feature_clean,
+                'in_scope_flag': self.in_scope_flag, 'is_details_required': self.is_details_required,
+                'is_sub_question': self.is_sub_question, 'formula': self.formula}
+
+
+class TaskRecord(Record):
+    """One effort estimation task"""
+    __slots__ = ('name', 'base_hours', 'in_scope', 'details', 'final_estimate')
+
+    def __init__(self, name: str, base_hours: float, in_scope: str, details: float, final_estimate: float):
+        self.name = name
+        self.base_hours = base_hours
+        self.in_scope = in_scope
+        self.details = details
+        self.final_estimate = final_estimate
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'name': self.name, 'base_hours': self.base_hours, 'in_scope': self.in_scope,
+                'details': self.details, 'final_estimate': self.final_estimate}
+
+
+class CategoryRecord(Record):
+    """One effort estimation category and its tasks"""
+    __slots__ = ('base_hours', 'final_estimate', 'in_days', 'tasks')
+
+    def __init__(self, base_hours: float, final_estimate: float = 0, in_days: float = 0, tasks: list = None):
+        self.base_hours = base_hours
+        self.final_estimate = final_estimate
+        self.in_days = in_days
+        self.tasks = tasks if tasks is not None else []
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'base_hours': self.base_hours, 'final_estimate': self.final_estimate,
+                'in_days': self.in_days, 'tasks': [task.to_dict() for task in self.tasks]}
+
+
+class RoleFTE(Record):
+    """FTE allocation of one selected role (ScopingEngine.fte_result['by_role'])"""
+    __slots__ = ('hours', 'days', 'months')
+
+    def __init__(self, hours: float, days: float, months: float):
+        self.hours = hours
+        self.days = days
+        self.months = months
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'hours': self.hours, 'days': self.days, 'months': self.months}
+
+
+class RoleFTESummary(Record):
+    """One row of FTEEffortsCalculator.generate_fte_summary()['role_fte_summary']"""
+    __slots__ = ('role', 'fte_hours', 'fte_days', 'fte_months')
+
+    def __init__(self, role: str, fte_hours: float, fte_days: float, fte_months: float):
+        self.role = role
+        self.fte_hours = fte_hours
+        self.fte_days = fte_days
+        self.fte_months = fte_months
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'role': self.role, 'fte_hours': self.fte_hours, 'fte_days': self.fte_days,
+                'fte_months': self.fte_months}
+
+
+def to_plain(value: Any) -> Any:
+    """Copy of a result with every record (at any depth) converted to a plain dict"""
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        if value and all(isinstance(item, Record) for item in value):
+            return [item.to_dict() for item in value]
+        return [to_plain(item) for item in value]
+    return value
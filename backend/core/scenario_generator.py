@@ -0,0 +1,280 @@
+"""
+Synthetic Scope Scenario Generator
+
+Produces plausible scoping inputs for benchmarks, load tests and batch runs,
+driven by METRICS_TEMPLATE:
+- Sub-questions (is_sub_question) can only be in scope when their parent
+  question (the closest preceding top-level row) is, as in the scoping form
+- Only metrics with is_details_required get a details count
+- Details defaults come from the weightage ladders of the formulas (up to just
+  past the top breakpoint), or DEFAULT_DETAILS for metrics without one
+
+Each scenario carries both shapes: backend `scope_inputs` and the frontend
+`scoping_data` keyed by FRONTEND_TO_BACKEND_MAP IDs. Scenario i is drawn from
+its own RNG seeded by (seed, i), so any slice of a run can be regenerated
+without the scenarios before it.
+
+    python -m backend.core.scenario_generator --count 100000 --seed 7 -o scenarios.ndjson
+    python -m backend.core.scenario_generator --count 1000 | python -m backend.batch - results.ndjson
+"""
+
+import argparse
+import csv
+import json
+import math
+import random
+import sys
+from typing import Any, Dict, Iterator, List, Optional
+
+from backend.config import AVAILABLE_ROLES
+from backend.core.monte_carlo import validate_distributions
+from backend.data.excel_templates import METRICS_TEMPLATE
+from backend.data.frontend_mapping import BACKEND_TO_FRONTEND_MAP, FRONTEND_TO_BACKEND_MAP
+from backend.utils.formula_compiler import compile_formula
+
+DEFAULT_IN_SCOPE_PROBABILITY = 0.6
+# Chance a sub-question is in scope given its parent is
+DEFAULT_SUB_QUESTION_PROBABILITY = 0.5
+
+# Typical client sizes for counts no weightage ladder bounds
+DEFAULT_DETAILS = {
+    'Account': {'type': 'triangular', 'min': 200, 'mode': 1500, 'max': 10000},
+    'Entity': {'type': 'triangular', 'min': 2, 'mode': 25, 'max': 500},
+}
+FALLBACK_DETAILS = {'type': 'triangular', 'min': 1, 'mode': 3, 'max': 20}
+
+OUTPUT_FORMATS = ('ndjson', 'csv')
+
+
+def details_ceilings(formulas: Dict[str, str]) -> Dict[str, int]:
+    """
+    Per metric, the first integer above the highest breakpoint of any formula
+    reading its details (larger counts no longer change the weightage)
+    """
+    top = {}
+    for formula in formulas.values():
+        compiled = compile_formula(formula)
+        if compiled is None:
+            continue
+        for ref in compiled.refs:
+            points = compiled.breakpoints(ref) if ref[1] == 'Details' else None
+            if points:
+                top[ref[0]] = max(top.get(ref[0], 0), int(max(points)) + 1)
+    return top
+
+
+def parent_questions() -> Dict[str, Optional[str]]:
+    """Metric name -> parent question name (None for top-level questions)"""
+    parents, current = {}, None
+    for metric in METRICS_TEMPLATE:
+        if metric['is_sub_question']:
+            parents[metric['name']] = current
+        else:
+            parents[metric['name']] = None
+            current = metric['name']
+    return parents
+
+
+class ScenarioGenerator:
+    """Seeded, dependency-consistent random scoping scenarios"""
+
+    def __init__(self, seed: int = 0, metrics: Dict[str, Dict[str, Any]] = None,
+                 in_scope_probability: float = DEFAULT_IN_SCOPE_PROBABILITY,
+                 sub_question_probability: float = DEFAULT_SUB_QUESTION_PROBABILITY,
+                 roles: List[str] = None, formulas: Dict[str, str] = None):
+        """
+        Args:
+            seed: Base seed
+            metrics: Per-metric overrides, keyed by metric name or frontend ID:
+                     {'in_scope_probability': p, 'type': 'range'|'triangular', 'min', 'max'[, 'mode']}
+                     (details keys optional; same distribution format as the simulate endpoint)
+            in_scope_probability: Default chance a top-level question is in scope
+            sub_question_probability: Default chance a sub-question is in scope when its parent is
+            roles: Fixed selected roles (default: a random non-empty subset per scenario)
+            formulas: Weightage formulas for details defaults (default: the model's)
+
+        Raises:
+            ValueError: Unknown metric or role, bad probability or distribution
+        """
+        if formulas is None:
+            from backend.core.scope_processor import ScopeDefinitionProcessor
+            formulas = ScopeDefinitionProcessor().formulas
+
+        self.seed = seed
+        self.roles = list(roles) if roles else None
+        unknown_roles = [r for r in self.roles or [] if r not in AVAILABLE_ROLES]
+        if unknown_roles:
+            raise ValueError(f"Unknown roles: {', '.join(unknown_roles)}")
+
+        self.parents = parent_questions()
+        ceilings = details_ceilings(formulas)
+        overrides = self._normalize_overrides(metrics or {})
+
+        self.plan = []  # [(name, parent, probability, details spec or None)]
+        for metric in METRICS_TEMPLATE:
+            name = metric['name']
+            override = overrides.get(name, {})
+            probability = override.get('in_scope_probability',
+                                       sub_question_probability if metric['is_sub_question'] else in_scope_probability)
+            if not 0 <= probability <= 1:
+                raise ValueError(f'{name}: in_scope_probability must be between 0 and 1')
+
+            spec = None
+            if metric['is_details_required']:
+                spec = override.get('details') or DEFAULT_DETAILS.get(name)
+                if spec is None and name in ceilings:
+                    top = ceilings[name]
+                    spec = {'type': 'triangular', 'min': 1, 'mode': max(1, top // 4), 'max': top}
+                spec = validate_distributions({name: spec or FALLBACK_DETAILS})[name]
+            self.plan.append((name, self.parents[name], probability, spec))
+
+    @staticmethod
+    def _normalize_overrides(metrics: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        names = {m['name'] for m in METRICS_TEMPLATE}
+        normalized = {}
+        for key, spec in metrics.items():
+            name = FRONTEND_TO_BACKEND_MAP.get(key, key)
+            if name not in names:
+                raise ValueError(f"Unknown metric '{key}'")
+            entry = {}
+            if 'in_scope_probability' in spec:
+                entry['in_scope_probability'] = float(spec['in_scope_probability'])
+            if 'min' in spec or 'max' in spec:
+                entry['details'] = {k: v for k, v in spec.items() if k != 'in_scope_probability'}
+            normalized[name] = entry
+        return normalized
+
+    @staticmethod
+    def _draw(rng: random.Random, spec: Dict[str, Any]) -> int:
+        low, high = spec['min'], spec['max']
+        if spec['type'] == 'range':
+            return rng.randint(math.ceil(low), math.floor(high))
+        return round(rng.triangular(low, high, spec['mode']))
+
+    def scenario(self, index: int) -> Dict[str, Any]:
+        """
+        Scenario number `index` (the same for a given seed and configuration)
+
+        Returns:
+            {'id', 'scope_inputs', 'selected_roles', 'scoping_data'}
+        """
+        rng = random.Random(f'{self.seed}:{index}')
+        in_scope = {}
+        scope_inputs = []
+
+        for name, parent, probability, spec in self.plan:
+            selected = (parent is None or in_scope[parent]) and rng.random() < probability
+            in_scope[name] = selected
+            details = self._draw(rng, spec) if selected and spec else 0
+            scope_inputs.append({'name': name, 'in_scope': 'YES' if selected else 'NO', 'details': details})
+
+        if self.roles:
+            roles = list(self.roles)
+        else:
+            chosen = set(rng.sample(AVAILABLE_ROLES, rng.randint(1, len(AVAILABLE_ROLES))))
+            roles = [r for r in AVAILABLE_ROLES if r in chosen]
+
+        return {
+            'id': f'gen-{self.seed}-{index}',
+            'scope_inputs': scope_inputs,
+            'selected_roles': roles,
+            'scoping_data': to_scoping_data(scope_inputs),
+        }
+
+    def generate(self, count: int, start: int = 0) -> Iterator[Dict[str, Any]]:
+        """Lazily yield scenarios start .. start + count - 1"""
+        for index in range(start, start + count):
+            yield self.scenario(index)
+
+
+def to_scoping_data(scope_inputs: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Backend scope_inputs -> frontend scopingData ({item_id: {'value', 'count'}})"""
+    return {
+        BACKEND_TO_FRONTEND_MAP[item['name']]: {'value': item['in_scope'], 'count': item['details']}
+        for item in scope_inputs
+    }
+
+
+def submit_payload(scenario: Dict[str, Any], user_email: str = 'loadtest@example.invalid',
+                   client_name: str = 'Synthetic Client') -> Dict[str, Any]:
+    """POST /api/scoping/submit body for a generated scenario"""
+    return {
+        'userEmail': user_email,
+        'userName': 'Synthetic User',
+        'clientName': client_name,
+        'projectName': scenario['id'],
+        'scopingData': scenario['scoping_data'],
+        'selectedRoles': scenario['selected_roles'],
+    }
+
+
+def write_scenarios(scenarios: Iterator[Dict[str, Any]], stream, fmt: str = 'ndjson'):
+    """
+    Write scenarios in a format `python -m backend.batch` reads
+
+    NDJSON lines keep both shapes; CSV has one column per metric with NO,
+    YES or the details count.
+    """
+    if fmt == 'ndjson':
+        for scenario in scenarios:
+            stream.write(json.dumps(scenario) + '\n')
+        return
+
+    names = [m['name'] for m in METRICS_TEMPLATE]
+    details_required = {m['name'] for m in METRICS_TEMPLATE if m['is_details_required']}
+    writer = csv.writer(stream, lineterminator='\n')
+    writer.writerow(['id', 'selected_roles'] + names)
+    for scenario in scenarios:
+        cells = []
+        for item in scenario['scope_inputs']:
+            if item['in_scope'] != 'YES':
+                cells.append('NO')
+            else:
+                cells.append(item['details'] if item['name'] in details_required else 'YES')
+        writer.writerow([scenario['id'], ';'.join(scenario['selected_roles'])] + cells)
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m backend.core.scenario_generator',
+                                     description='Generate synthetic scoping scenarios')
+    parser.add_argument('--count', type=int, default=1000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--start', type=int, default=0, help='Index of the first scenario')
+    parser.add_argument('--config', help='JSON file: {"metrics": {...}, "in_scope_probability": p, '
+                                         '"sub_question_probability": p, "roles": [...]}')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='ndjson')
+    parser.add_argument('-o', '--output', default='-', help="Output file ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    config = {}
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+
+    # Model loading prints progress; keep stdout clean for piping
+    stdout = sys.stdout
+    sys.stdout = sys.stderr
+    try:
+        generator = ScenarioGenerator(
+            seed=args.seed,
+            metrics=config.get('metrics'),
+            in_scope_probability=config.get('in_scope_probability', DEFAULT_IN_SCOPE_PROBABILITY),
+            sub_question_probability=config.get('sub_question_probability', DEFAULT_SUB_QUESTION_PROBABILITY),
+            roles=config.get('roles'),
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    finally:
+        sys.stdout = stdout
+
+    stream = sys.stdout if args.output == '-' else open(args.output, 'w', newline='', encoding='utf-8')
+    try:
+        write_scenarios(generator.generate(args.count, args.start), stream, args.format)
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,410 @@
+"""
+Scope Optimizer
+
+Finds the richest scope that fits an hour, month or tier limit, e.g.
+"what can we deliver within 1,500 hours" or "stay in Tier 2".
+
+Decisions are made for the metrics the client asked for (in scope in the
+submission): drop it, keep it, or (for count-based metrics) deliver a reduced
+count. Metrics that share a weightage formula or an effort task are grouped,
+so every group contributes an exact, precomputed (weightage, task hours,
+value) per option and groups add up independently. The only coupling left is
+the category adjustment, a step function of total weightage.
+
+Branch-and-bound over the groups then prunes on:
+- value: current + an upper bound for the remaining groups <= incumbent, where the
+  bound is the LP relaxation of the remaining multiple-choice knapsack (greedy over
+  each group's convex hull) for the hour budget and for the tier's weightage budget
+- hours: current + minimum remaining task hours > the band's task-hour budget
+- weightage: outside the band being searched or above the highest allowed tier
+The search runs once per adjustment band (lowest first) so the adjustment
+hours are a known constant inside each run. It stops at the time budget and
+returns the best solution found.
+"""
+
+import math
+import time
+from collections import ChainMap
+from itertools import product
+from typing import Any, Dict, List, Optional
+
+from backend.config import HOURS_PER_DAY, DAYS_PER_MONTH, TIERS
+from backend.core.effort_calculator import (
+    ADJUSTMENT_BANDS, CATEGORY_TIER_ADJUSTMENTS, TASK_INPUT_DEPENDENCIES, get_adjustment_band
+)
+from backend.core.scope_processor import determine_tier
+from backend.core.sensitivity import IncrementalScorer
+
+DEFAULT_TIME_BUDGET_SECONDS = 2.0
+MAX_TIME_BUDGET_SECONDS = 10.0
+
+# Reduced-count options offered per metric (besides dropping it and the full count)
+MAX_PARTIAL_LEVELS = 5
+
+# Largest option table built for one group of linked metrics
+MAX_GROUP_OPTIONS = 4096
+
+
+def _hull(options: List[tuple], cost_index: int):
+    """
+    LP-relaxation data for one group and one resource
+
+    Returns:
+        (value at the cheapest option, [(slope, cost step, value step), ...]) where the
+        steps walk the upper convex hull of (cost, value) from the cheapest option
+    """
+    min_cost = min(o[cost_index] for o in options)
+    base_value = max(o[3] for o in options if o[cost_index] == min_cost)
+    points = {}
+    for option in options:
+        cost = option[cost_index] - min_cost
+        if option[3] > base_value and option[3] > points.get(cost, -math.inf):
+            points[cost] = option[3]
+
+    steps = []
+    cost, value = 0.0, base_value
+    remaining = sorted(points.items())
+    while remaining:
+        # Next hull vertex: steepest value gain per unit of cost
+        best = max(remaining, key=lambda p: (p[1] - value) / (p[0] - cost) if p[0] > cost else math.inf)
+        dc, dv = best[0] - cost, best[1] - value
+        steps.append((dv / dc if dc > 0 else math.inf, dc, dv))
+        cost, value = best
+        remaining = [p for p in remaining if p[0] > cost and p[1] > value]
+    return base_value, steps
+
+
+def _relaxation_bound(base_value: float, steps: List[tuple], capacity: float) -> float:
+    """Greedy LP bound: best value reachable with `capacity` extra cost"""
+    bound = base_value
+    for _, dc, dv in steps:
+        if dc <= capacity:
+            bound += dv
+            capacity -= dc
+        else:
+            return bound + dv * capacity / dc
+    return bound
+
+
+class _Group:
+    """Linked metrics decided together, with every option's exact contributions"""
+
+    def __init__(self, members: List[str]):
+        self.members = members
+        self.options = []  # [(assignment, weightage, task_hours, value)]
+
+    def finalize(self):
+        # Best value first so the search reaches good incumbents early
+        self.options.sort(key=lambda o: (-o[3], o[2]))
+        self.min_weightage = min(o[1] for o in self.options)
+        self.min_hours = min(o[2] for o in self.options)
+        self.max_value = self.options[0][3]
+        self.weightage_hull = _hull(self.options, 1)
+        self.hours_hull = _hull(self.options, 2)
+
+
+class ScopeOptimizer:
+    """Branch-and-bound search over drop/keep/reduce decisions for requested metrics"""
+
+    def __init__(self, scorer: IncrementalScorer, priorities: Dict[str, float] = None,
+                 locked: List[str] = None, allow_partial: bool = True):
+        """
+        Precompute per-group contributions
+
+        Args:
+            scorer: IncrementalScorer for the requested scope (its in-scope metrics are the decisions)
+            priorities: metric name -> weight of delivering it in full (default 1)
+            locked: Metrics that must be delivered exactly as requested
+            allow_partial: Offer reduced counts for count-based metrics
+        """
+        self.scorer = scorer
+        self.priorities = priorities or {}
+        self.locked = set(locked or [])
+        self.allow_partial = allow_partial
+
+        self.decisions = [name for name in scorer.metric_order if scorer.metrics[name].in_scope == 'YES']
+        self.base_hours = sum(data['total'] for data in scorer.effort_template.values())
+        self.band_adjustments = [
+            sum(CATEGORY_TIER_ADJUSTMENTS.get(category, (0,) * (len(ADJUSTMENT_BANDS) + 1))[band]
+                for category in scorer.effort_template)
+            for band in range(len(ADJUSTMENT_BANDS) + 1)
+        ]
+        self._build_groups()
+
+    # ------------------------------------------------------------------
+    # Precomputation
+    # ------------------------------------------------------------------
+
+    def metric_options(self, name: str) -> List[tuple]:
+        """(in_scope, details, value) choices for one requested metric"""
+        metric = self.scorer.metrics[name]
+        requested = metric.details or 0
+        priority = float(self.priorities.get(name, 1))
+        full = ('YES', requested, priority)
+        if name in self.locked:
+            return [full]
+
+        options = [full, ('NO', 0, 0.0)]
+        if self.allow_partial and metric.is_details_required and requested > 1:
+            levels = set()
+            for b in self._breakpoints(name):
+                # Largest count in each weightage region below the requested count
+                levels.update((math.ceil(b) - 1, b) if float(b).is_integer() else (math.floor(b),))
+            levels.update(math.ceil(requested * q / 4) for q in (1, 2, 3))
+            levels = sorted(int(v) for v in levels if 0 < v < requested)
+            if len(levels) > MAX_PARTIAL_LEVELS:
+                step = (len(levels) - 1) / (MAX_PARTIAL_LEVELS - 1)
+                levels = sorted({levels[round(i * step)] for i in range(MAX_PARTIAL_LEVELS)})
+            options += [('YES', v, priority * v / requested) for v in levels]
+        return options
+
+    def _breakpoints(self, name: str) -> List[float]:
+        ref = (name, 'Details')
+        found = set()
+        for owner in self.scorer.formula_dependents.get(name, ()):
+            compiled = self.scorer.formulas[owner][1]
+            found.update(compiled.breakpoints(ref) or [])
+        return sorted(found)
+
+    def _build_groups(self):
+        scorer = self.scorer
+        decision_set = set(self.decisions)
+
+        # Union metrics that meet in a formula or an effort task
+        parent = {name: name for name in self.decisions}
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        def link(names):
+            names = [n for n in names if n in decision_set]
+            for other in names[1:]:
+                parent[find(other)] = find(names[0])
+
+        formula_inputs = {}
+        for owner, (_, compiled) in scorer.formulas.items():
+            inputs = {ref[0] for ref in compiled.refs} if compiled is not None else set(decision_set)
+            formula_inputs[owner] = inputs
+            link(sorted(inputs))
+
+        task_inputs = {}
+        for category, data in scorer.effort_template.items():
+            for task_name in data['tasks']:
+                inputs = {task_name, *TASK_INPUT_DEPENDENCIES.get(task_name, ())}
+                task_inputs[(category, task_name)] = inputs
+                link(sorted(inputs))
+
+        members = {}
+        for name in self.decisions:
+            members.setdefault(find(name), []).append(name)
+
+        # Contributions that no decision touches are constant
+        self.constant_weightage = sum(
+            scorer.weightages[owner] for owner, inputs in formula_inputs.items() if not inputs & decision_set
+        ) + sum(scorer.weightages[name] for name in scorer.metric_order if name not in scorer.formulas)
+        self.constant_hours = sum(
+            max(scorer.task_estimates[key], 0) for key, inputs in task_inputs.items() if not inputs & decision_set
+        )
+
+        self.groups = []
+        for names in members.values():
+            group = _Group(names)
+            formulas = [o for o, inputs in formula_inputs.items() if inputs & set(names)]
+            tasks = [k for k, inputs in task_inputs.items() if inputs & set(names)]
+            per_metric = [self.metric_options(n) for n in names]
+            if math.prod(len(o) for o in per_metric) > MAX_GROUP_OPTIONS:
+                per_metric = [o[:2] for o in per_metric]  # Keep/drop only for very large groups
+
+            for combo in product(*per_metric):
+                assignment = {n: (in_scope, details) for n, (in_scope, details, _) in zip(names, combo)}
+                lookup = self._lookup(assignment)
+                weightage = sum(scorer._evaluate_weightage(o, lookup) for o in formulas)
+                hours = self._task_hours(tasks, lookup)
+                group.options.append((assignment, weightage, hours, sum(c[2] for c in combo)))
+            group.finalize()
+            self.groups.append(group)
+
+        # Biggest decisions first
+        self.groups.sort(key=lambda g: -g.max_value)
+
+    def _lookup(self, assignment: Dict[str, tuple]):
+        changed = {}
+        for name, (in_scope, details) in assignment.items():
+            changed[name] = self.scorer.metrics[name].replace(in_scope=in_scope, details=details,
+                                                              in_scope_flag=1 if in_scope == 'YES' else 0)
+        return ChainMap(changed, self.scorer.metrics)
+
+    def _task_hours(self, tasks: List[tuple], lookup) -> float:
+        calculator = self.scorer.effort_calculator
+        calculator.scope_metrics = lookup
+        try:
+            return sum(max(calculator.calculate_task_final_estimate(task_name), 0) for _, task_name in tasks)
+        finally:
+            calculator.scope_metrics = self.scorer.metrics
+
+    def total_hours(self, weightage: float, task_hours: float) -> float:
+        """Total hours for a total weightage and summed task estimates"""
+        return self.base_hours + self.band_adjustments[get_adjustment_band(weightage)] + task_hours
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def optimize(self, max_hours: Optional[float] = None, max_months: Optional[float] = None,
+                 max_tier: Optional[int] = None,
+                 time_budget: float = DEFAULT_TIME_BUDGET_SECONDS) -> Dict[str, Any]:
+        """
+        Maximize priority-weighted scope under the given limits
+
+        Args:
+            max_hours: Total hours limit
+            max_months: Duration limit (converted with HOURS_PER_DAY x DAYS_PER_MONTH)
+            max_tier: Highest acceptable implementation tier
+            time_budget: Seconds to search before returning the best solution so far
+
+        Returns:
+            Best solution found: chosen inputs per metric, totals, objective and whether
+            the search finished (optimal) within the budget
+        """
+        hour_limit = math.inf if max_hours is None else float(max_hours)
+        if max_months is not None:
+            hour_limit = min(hour_limit, float(max_months) * DAYS_PER_MONTH * HOURS_PER_DAY)
+        tier_limit = max(TIERS) if max_tier is None else int(max_tier)
+        weightage_limit = TIERS[tier_limit]['range'][1] if tier_limit < max(TIERS) else math.inf
+
+        groups = self.groups
+        n = len(groups)
+        # Suffix sums: best value / least weightage / least hours over groups i..n-1
+        rest_value = [0.0] * (n + 1)
+        rest_weightage = [0.0] * (n + 1)
+        rest_hours = [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            rest_value[i] = rest_value[i + 1] + groups[i].max_value
+            rest_weightage[i] = rest_weightage[i + 1] + groups[i].min_weightage
+            rest_hours[i] = rest_hours[i + 1] + groups[i].min_hours
+
+        # Merged hull steps of groups i..n-1 per resource, steepest first
+        def suffix_hulls(attr):
+            hulls = [(0.0, [])] * (n + 1)
+            for i in range(n - 1, -1, -1):
+                base_value, steps = getattr(groups[i], attr)
+                hulls[i] = (hulls[i + 1][0] + base_value,
+                            sorted(hulls[i + 1][1] + steps, key=lambda step: -step[0]))
+            return hulls
+
+        hours_hulls = suffix_hulls('hours_hull') if hour_limit < math.inf else None
+
+        rest_max_weightage = [0.0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            rest_max_weightage[i] = rest_max_weightage[i + 1] + max(o[1] for o in groups[i].options)
+
+        deadline = time.perf_counter() + time_budget
+        state = {'best': None, 'best_key': None, 'nodes': 0, 'timed_out': False}
+        chosen = [None] * n
+
+        def search(i, weightage, hours, value, band_floor, band_ceiling, task_budget):
+            state['nodes'] += 1
+            if state['nodes'] % 512 == 0 and time.perf_counter() > deadline:
+                state['timed_out'] = True
+            if state['timed_out']:
+                return
+
+            low_weightage = weightage + rest_weightage[i]
+            if low_weightage > band_ceiling or weightage + rest_max_weightage[i] <= band_floor:
+                return
+            low_hours = hours + rest_hours[i]
+            if low_hours > task_budget:
+                return
+
+            best_key = state['best_key']
+            if best_key is not None and i < n:
+                bound = rest_value[i]
+                if hours_hulls is not None:
+                    bound = min(bound, _relaxation_bound(*hours_hulls[i], task_budget - low_hours))
+                if band_ceiling < math.inf:
+                    bound = min(bound, _relaxation_bound(*weightage_hulls[i], band_ceiling - low_weightage))
+                # Ties can't beat the incumbent by more than a few hours; skip them
+                if value + bound <= best_key[0] + 1e-9:
+                    return
+
+            if i == n:
+                if determine_tier(weightage) > tier_limit:
+                    return
+                total = self.total_hours(weightage, hours)
+                key = (value, -total)
+                if best_key is None or key > best_key:
+                    state['best_key'] = key
+                    state['best'] = (list(chosen), weightage, total)
+                return
+
+            for option in groups[i].options:
+                chosen[i] = option
+                search(i + 1, weightage + option[1], hours + option[2], value + option[3],
+                       band_floor, band_ceiling, task_budget)
+                if state['timed_out']:
+                    return
+
+        # One search per adjustment band: inside a band the adjustment hours are fixed,
+        # so the hour budget for tasks and the weightage ceiling are exact
+        weightage_hulls = suffix_hulls('weightage_hull')
+        start = time.perf_counter()
+        for band in range(len(ADJUSTMENT_BANDS) + 1):
+            band_floor = ADJUSTMENT_BANDS[band - 1] if band > 0 else -math.inf
+            band_ceiling = min(ADJUSTMENT_BANDS[band] if band < len(ADJUSTMENT_BANDS) else math.inf,
+                               weightage_limit)
+            if band_ceiling <= band_floor:
+                continue
+            task_budget = hour_limit - self.base_hours - self.band_adjustments[band]
+            search(0, self.constant_weightage, self.constant_hours, 0.0, band_floor, band_ceiling, task_budget)
+            if state['timed_out']:
+                break
+        elapsed = time.perf_counter() - start
+
+        result = {
+            'model_version': self.scorer.model.version,
+            'constraints': {
+                'max_hours': None if hour_limit == math.inf else hour_limit,
+                'max_tier': tier_limit,
+            },
+            'optimal': not state['timed_out'],
+            'nodes_explored': state['nodes'],
+            'elapsed_ms': round(elapsed * 1000, 2),
+            'max_objective': rest_value[0],
+        }
+        if state['best'] is None:
+            return {**result, 'feasible': False, 'solution': None}
+
+        options, weightage, total = state['best']
+        assignment = {}
+        for option in options:
+            assignment.update(option[0])
+        return {**result, 'feasible': True, 'solution': self._describe(assignment, weightage, total,
+                                                                        state['best_key'][0])}
+
+    def _describe(self, assignment: Dict[str, tuple], weightage: float, total_hours: float,
+                  objective: float) -> Dict[str, Any]:
+        metrics = []
+        for name in self.decisions:
+            requested = self.scorer.metrics[name].details or 0
+            in_scope, details = assignment[name]
+            status = 'dropped' if in_scope != 'YES' else ('reduced' if details != requested else 'kept')
+            metrics.append({'metric': name, 'status': status, 'in_scope': in_scope,
+                            'details': details, 'requested_details': requested})
+
+        tier = determine_tier(weightage)
+        return {
+            'objective': objective,
+            'total_weightage': weightage,
+            'tier': tier,
+            'tier_name': TIERS[tier]['name'],
+            'total_hours': total_hours,
+            'total_months': total_hours / HOURS_PER_DAY / DAYS_PER_MONTH,
+            'metrics': metrics,
+            'scope_inputs': [
+                {'name': name, 'in_scope': in_scope, 'details': details}
+                for name, (in_scope, details) in assignment.items()
+            ],
+        }
@@ -0,0 +1,536 @@
+"""
+Versioned Scoping Model
+
+The data the scoring pipeline runs on - weightage formulas, the effort
+estimation template and the App Tiers role allocation - as one immutable
+snapshot (ScopingModel). The built-in snapshot comes from the formula CSVs and
+the Python templates; admins can publish edited data as a new version without
+a redeploy.
+
+Versions are content hashes, so every process that loads the same data agrees
+on the version recorded in results. ModelRegistry holds the current snapshot
+for a process and swaps it RCU-style: a new version is built and validated off
+the request path, then a single reference assignment makes it current. Callers
+take a snapshot once (ScopingEngine, IncrementalScorer, BatchScorer...) and
+keep it, so in-flight work finishes on the version it started with.
+
+Published versions live in MODEL_DIR as <version>.json, with a CURRENT file
+naming the active one. Every process polls CURRENT (at most every
+MODEL_POLL_SECONDS) and reloads in a background thread when it changes, so all
+workers of a deployment converge on a newly activated version.
+"""
+
+import csv
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections.abc import Mapping
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from backend.config import DATA_DIR, MODEL_DIR, MODEL_POLL_SECONDS
+from backend.data.effort_template import EFFORT_ESTIMATION_TEMPLATE
+from backend.data.excel_templates import APP_TIERS_DATA, APP_TIERS_ROLES, METRICS_TEMPLATE
+from backend.utils.formula_compiler import compile_formula
+from backend.utils.formula_evaluator import FormulaEvaluator
+
+# Main formulas first; the array supplement overrides metrics it also defines
+FORMULA_FILES = ('formulas_expanded.csv', 'formulas_array_supplement.csv')
+
+# Parts of a model that can be replaced when publishing
+MODEL_PARTS = ('formulas', 'effort_template', 'tiers_data', 'roles')
+
+POINTER_FILE = 'CURRENT'
+VERSION_PATTERN = re.compile(r'[0-9a-f]{12}')
+
+
+def read_formula_files(data_dir: Path = DATA_DIR) -> Dict[str, str]:
+    """
+    Metric name -> weightage formula from the formula CSVs
+
+    Rows that are not metrics (the sheet's Row103 weightage total) are skipped;
+    the processor sums the metric weightages itself.
+    """
+    # (stdlib csv rather than pandas keeps scoring-only processes light)
+    metric_names = {m['name'] for m in METRICS_TEMPLATE}
+    formulas = {}
+    for filename in FORMULA_FILES:
+        path = Path(data_dir) / filename
+        if path.exists():
+            with open(path, newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    if row['Metric'] in metric_names:
+                        formulas[row['Metric']] = row['Formula']
+    return formulas
+
+
+def _validation_metrics(in_scope: str, details: float) -> List[Dict[str, Any]]:
+    return [{'name': m['name'], 'in_scope': in_scope, 'details': details,
+             'in_scope_flag': 1 if in_scope == 'YES' else 0} for m in METRICS_TEMPLATE]
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_model_data(formulas: Dict[str, str], effort_template: Dict[str, Dict[str, Any]],
+                        tiers_data: List[Dict[str, Any]], roles: List[str]):
+    """
+    Check model data before it can become a version
+
+    Formulas are evaluated with every metric out of scope and with every
+    metric in scope, so syntax errors surface here rather than as silent
+    zero weightages in results.
+
+    Raises:
+        ValueError: Describing every problem found
+    """
+    errors = []
+
+    if not isinstance(roles, list) or not roles or not all(isinstance(r, str) and r for r in roles):
+        errors.append('roles must be a non-empty list of role names')
+    elif len(set(roles)) != len(roles):
+        errors.append('roles must be unique')
+
+    if not isinstance(formulas, dict):
+        errors.append('formulas must map metric names to formulas')
+    else:
+        metric_names = {m['name'] for m in METRICS_TEMPLATE}
+        evaluators = [FormulaEvaluator(_validation_metrics('NO', 0)), FormulaEvaluator(_validation_metrics('YES', 1))]
+        for name, formula in formulas.items():
+            if name not in metric_names:
+                errors.append(f"formulas: unknown metric '{name}'")
+                continue
+            if not isinstance(formula, str):
+                errors.append(f"formulas: '{name}' must be a string")
+                continue
+            if not formula:
+                continue
+            try:
+                compiled = compile_formula(formula)
+                for evaluator in evaluators:
+                    value = (compiled.evaluate(evaluator.metrics_lookup, strict=True) if compiled is not None
+                             else evaluator.evaluate_interpreted(formula, strict=True))
+                    float(value)
+            except Exception as e:
+                errors.append(f"formulas: '{name}' does not evaluate ({type(e).__name__}: {e})")
+
+    if not isinstance(effort_template, dict) or not effort_template:
+        errors.append('effort_template must map category names to {total, tasks}')
+        effort_template = {}
+    for category, data in effort_template.items():
+        if not isinstance(data, dict) or not _is_number(data.get('total')) or data['total'] < 0:
+            errors.append(f"effort_template: '{category}' needs a non-negative 'total'")
+            continue
+        tasks = data.get('tasks')
+        if not isinstance(tasks, dict) or not all(_is_number(h) and h >= 0 for h in tasks.values()):
+            errors.append(f"effort_template: '{category}' tasks must map task names to non-negative hours")
+
+    if not isinstance(tiers_data, list) or not tiers_data:
+        errors.append('tiers_data must be a non-empty list of {category, roles} rows')
+        tiers_data = []
+    known_roles = set(roles) if isinstance(roles, list) else set()
+    for i, row in enumerate(tiers_data):
+        if not isinstance(row, dict) or not isinstance(row.get('roles'), dict):
+            errors.append(f'tiers_data[{i}] must be {{category, roles}}')
+            continue
+        if row.get('category') not in effort_template:
+            errors.append(f"tiers_data[{i}]: category '{row.get('category')}' is not in the effort template")
+        for role, allocation in row['roles'].items():
+            if role not in known_roles:
+                errors.append(f"tiers_data[{i}]: unknown role '{role}'")
+            elif not _is_number(allocation) or not 0 <= allocation <= 1:
+                errors.append(f"tiers_data[{i}]: allocation for '{role}' must be between 0 and 1")
+
+    if errors:
+        raise ValueError('Invalid scoping model: ' + '; '.join(errors))
+
+
+_default_model = None
+_default_model_lock = threading.Lock()
+
+
+class ScopingModel:
+    """
+    Immutable snapshot of the scoring data
+
+    Attributes are shared by every component scoring with this version; treat
+    them as read-only.
+    """
+
+    def __init__(self, formulas: Dict[str, str], effort_template: Dict[str, Dict[str, Any]],
+                 tiers_data: List[Dict[str, Any]], roles: List[str],
+                 published_at: str = None, source: str = ''):
+        """
+        Validate the data and build the derived lookups
+
+        Args:
+            formulas: Metric name -> weightage formula
+            effort_template: Category -> {'total': hours, 'tasks': {task: hours}}
+            tiers_data: App Tiers rows [{'category', 'roles': {role: allocation}}, ...]
+                        ('row_index' is assigned from the list position when missing)
+            roles: Role names (allocation matrix column order)
+            published_at: ISO timestamp of publication (None for the built-in model)
+            source: Who/what published it
+
+        Raises:
+            ValueError: Invalid model data
+        """
+        validate_model_data(formulas, effort_template, tiers_data, roles)
+
+        # Own copies, so later edits to the caller's data can't leak in
+        data = json.loads(json.dumps({
+            'formulas': formulas,
+            'effort_template': effort_template,
+            'tiers_data': [
+                {'row_index': row.get('row_index', i), 'category': row['category'], 'roles': row['roles']}
+                for i, row in enumerate(tiers_data)
+            ],
+            'roles': roles,
+        }))
+        self.formulas = data['formulas']
+        self.effort_template = data['effort_template']
+        self.tiers_data = sorted(data['tiers_data'], key=lambda row: row['row_index'])
+        self.roles = data['roles']
+        self.published_at = published_at
+        self.source = source
+
+        canonical = json.dumps(dict(data, formulas=dict(sorted(self.formulas.items()))),
+                               sort_keys=False, separators=(',', ':'))
+        self.version = hashlib.sha256(canonical.encode('utf-8')).hexdigest()[:12]
+
+        self._build_allocation_matrix()
+
+    def _build_allocation_matrix(self):
+        """Categories x roles allocation (rows for the same category add up, as in SUMPRODUCT)"""
+        self.categories = list(dict.fromkeys(row['category'] for row in self.tiers_data))
+        self.category_index = {category: i for i, category in enumerate(self.categories)}
+        self.role_index = {role: j for j, role in enumerate(self.roles)}
+
+        matrix = np.zeros((len(self.categories), len(self.roles)))
+        for row in self.tiers_data:
+            for role, allocation in row['roles'].items():
+                matrix[self.category_index[row['category']], self.role_index[role]] += allocation
+        matrix.setflags(write=False)
+        self.allocation_matrix = matrix
+
+    @classmethod
+    def default(cls) -> 'ScopingModel':
+        """The built-in model: formula CSVs and the Python templates (built once per process)"""
+        global _default_model
+        with _default_model_lock:
+            if _default_model is None:
+                _default_model = cls(read_formula_files(), EFFORT_ESTIMATION_TEMPLATE, APP_TIERS_DATA,
+                                     APP_TIERS_ROLES, source='built-in')
+            return _default_model
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScopingModel':
+        """Rebuild a model from to_dict() output (the stored version must match the data)"""
+        model = cls(*(data[part] for part in MODEL_PARTS),
+                    published_at=data.get('published_at'), source=data.get('source', ''))
+        if data.get('version') not in (None, model.version):
+            raise ValueError(f"Model data does not match version {data['version']}")
+        return model
+
+    def __reduce__(self):
+        # Pickled for worker processes as plain data; derived lookups are rebuilt there
+        return (ScopingModel.from_dict, (self.to_dict(),))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Complete model data (the stored file format)"""
+        return dict(self.info(), formulas=self.formulas, effort_template=self.effort_template,
+                    tiers_data=self.tiers_data, roles=self.roles)
+
+    def info(self) -> Dict[str, Any]:
+        """Version metadata without the data"""
+        return {
+            'version': self.version,
+            'published_at': self.published_at,
+            'source': self.source,
+            'formula_count': len(self.formulas),
+            'category_count': len(self.effort_template),
+            'role_count': len(self.roles),
+        }
+
+    def allocation_submatrix(self, categories: Sequence[str] = None, roles: Sequence[str] = None) -> np.ndarray:
+        """
+        Allocation matrix with rows/columns in the given order
+
+        Args:
+            categories: Row order (default self.categories); unknown categories get zero rows
+            roles: Column order (default self.roles); unknown roles get zero columns
+
+        Returns:
+            len(categories) x len(roles) array (a copy)
+        """
+        matrix = self.allocation_matrix
+        if categories is not None:
+            rows = [self.category_index.get(c, -1) for c in categories]
+            matrix = np.vstack([matrix, np.zeros(matrix.shape[1])])[rows]
+        if roles is not None:
+            columns = [self.role_index.get(r, -1) for r in roles]
+            matrix = np.hstack([matrix, np.zeros((matrix.shape[0], 1))])[:, columns]
+        return np.array(matrix)
+
+    def category_hours_vector(self, effort_estimation: Dict[str, Any]) -> np.ndarray:
+        """
+        Hours per allocation category from effort estimation output
+
+        Accepts both {'category': {'final_estimate': hours, ...}} (EffortCalculator)
+        and {'category': hours} (stored submissions); missing categories count as 0.
+        """
+        hours = np.zeros(len(self.categories))
+        for category, entry in effort_estimation.items():
+            i = self.category_index.get(category)
+            if i is None:
+                continue
+            if isinstance(entry, Mapping):
+                hours[i] = entry.get('final_estimate', 0.0)
+            elif isinstance(entry, (int, float)):
+                hours[i] = entry
+        return hours
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_name(f'.{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    tmp.write_text(text, encoding='utf-8')
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """The current ScopingModel of a process, swapped atomically when a new version is activated"""
+
+    def __init__(self, model_dir: Path = MODEL_DIR, poll_seconds: float = MODEL_POLL_SECONDS):
+        """
+        Args:
+            model_dir: Directory of published versions and the CURRENT pointer
+            poll_seconds: Minimum interval between checks of CURRENT (0 = never poll;
+                          call refresh() instead)
+        """
+        self.model_dir = Path(model_dir)
+        self.poll_seconds = poll_seconds
+        self._model: Optional[ScopingModel] = None
+        self._lock = threading.Lock()        # Serializes swaps and publications
+        self._poll_lock = threading.Lock()
+        self._pointer_stamp = None
+        self._next_poll = 0.0
+        self._reloading = False
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def current(self) -> ScopingModel:
+        """
+        The current snapshot (never blocks on a reload in progress)
+
+        Callers should keep the returned model for the whole unit of work.
+        """
+        model = self._model
+        if model is None:
+            with self._lock:
+                if self._model is None:
+                    stamp = self._stamp()
+                    version = self._read_pointer()
+                    self._model = ScopingModel.default()
+                    if version:
+                        try:
+                            self._model = self.load(version)
+                        except Exception as e:
+                            print(f"Error loading scoping model {version}, using the built-in model: {e}")
+                    self._pointer_stamp = stamp
+                    self._next_poll = time.monotonic() + self.poll_seconds
+                return self._model
+
+        if self.poll_seconds > 0 and time.monotonic() >= self._next_poll:
+            self._poll()
+        return model
+
+    def _poll(self):
+        with self._poll_lock:
+            self._next_poll = time.monotonic() + self.poll_seconds
+            if self._reloading or self._stamp() == self._pointer_stamp:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload_in_background, name='scoping-model-reload', daemon=True).start()
+
+    def _reload_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            # Keep serving the current version; a later activation retries
+            print(f"Error reloading scoping model: {e}")
+            self._pointer_stamp = self._stamp()
+        finally:
+            self._reloading = False
+
+    def refresh(self) -> ScopingModel:
+        """Load the activated version now, if it is not already current"""
+        stamp = self._stamp()
+        version = self._read_pointer()
+        current = self.current()
+        if version is None or version == current.version:
+            self._pointer_stamp = stamp
+            return current
+
+        # Built outside the lock: requests keep using the old version meanwhile
+        model = self.load(version)
+        with self._lock:
+            self._model = model
+            self._pointer_stamp = stamp
+        print(f"Scoping model {version} activated")
+        return model
+
+    def load(self, version: str) -> ScopingModel:
+        """
+        A stored version
+
+        Raises:
+            KeyError: No such version
+        """
+        path = self._version_path(version)
+        if not path.exists():
+            if version == ScopingModel.default().version:
+                return ScopingModel.default()
+            raise KeyError(version)
+        with open(path, encoding='utf-8') as f:
+            return ScopingModel.from_dict(json.load(f))
+
+    def ensure_stored(self, version: str) -> Path:
+        """
+        Make sure a version is stored in MODEL_DIR, writing the built-in model's
+        file if needed (the built-in model changes with the formula CSVs and
+        templates, so only a stored copy stays loadable after a redeploy)
+
+        Returns:
+            Path of the stored version
+
+        Raises:
+            KeyError: Neither a stored nor the built-in version
+            OSError: MODEL_DIR is not writable
+        """
+        path = self._version_path(version)
+        if not path.exists():
+            default = ScopingModel.default()
+            if version != default.version:
+                raise KeyError(version)
+            self.model_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(path, json.dumps(default.to_dict(), indent=2))
+        return path
+
+    def versions(self) -> List[Dict[str, Any]]:
+        """Metadata of every stored version, oldest first, flagging the active one"""
+        current = self.current().version
+        versions = {}
+        for path in self.model_dir.glob('*.json'):
+            if VERSION_PATTERN.fullmatch(path.stem):
+                with open(path, encoding='utf-8') as f:
+                    data = json.load(f)
+                versions[path.stem] = {key: data.get(key) for key in ('version', 'published_at', 'source')}
+        if current not in versions:
+            versions[current] = {key: value for key, value in self.current().info().items()
+                                 if key in ('version', 'published_at', 'source')}
+        for info in versions.values():
+            info['active'] = info['version'] == current
+        return sorted(versions.values(), key=lambda info: info['published_at'] or '')
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def publish(self, changes: Dict[str, Any], source: str = '') -> ScopingModel:
+        """
+        Build a new version from the current one plus replaced parts, store it and activate it
+
+        Args:
+            changes: Any of 'formulas', 'effort_template', 'tiers_data', 'roles'
+                     (each replaces that part entirely)
+            source: Who/what published it (recorded with the version)
+
+        Returns:
+            The new current model
+
+        Raises:
+            ValueError: No known parts given, or the resulting model is invalid
+        """
+        parts = {key: changes[key] for key in MODEL_PARTS if key in changes}
+        if not parts:
+            raise ValueError(f"Nothing to publish; expected any of: {', '.join(MODEL_PARTS)}")
+
+        base = self.current()
+        data = {part: getattr(base, part) for part in MODEL_PARTS}
+        data.update(parts)
+        model = ScopingModel(**data, published_at=datetime.now().isoformat(timespec='seconds'), source=source)
+
+        self.model_dir.mkdir(parents=True, exist_ok=True)
+        # Keep the version being replaced, so it can be re-activated
+        for version_model in (base, model):
+            path = self._version_path(version_model.version)
+            if not path.exists():
+                _write_atomic(path, json.dumps(version_model.to_dict(), indent=2))
+        return self._activate(model)
+
+    def activate(self, version: str) -> ScopingModel:
+        """
+        Make a stored version current (e.g. roll back)
+
+        Raises:
+            KeyError: No such version
+        """
+        return self._activate(self.load(version))
+
+    def _activate(self, model: ScopingModel) -> ScopingModel:
+        with self._lock:
+            self.model_dir.mkdir(parents=True, exist_ok=True)
+            _write_atomic(self.model_dir / POINTER_FILE, model.version + '\n')
+            self._model = model
+            self._pointer_stamp = self._stamp()
+        print(f"Scoping model {model.version} activated")
+        return model
+
+    # ------------------------------------------------------------------
+    # Files
+    # ------------------------------------------------------------------
+
+    def _version_path(self, version: str) -> Path:
+        if not isinstance(version, str) or not VERSION_PATTERN.fullmatch(version):
+            raise KeyError(version)
+        return self.model_dir / f'{version}.json'
+
+    def _read_pointer(self) -> Optional[str]:
+        try:
+            return (self.model_dir / POINTER_FILE).read_text(encoding='utf-8').strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _stamp(self):
+        try:
+            stat = (self.model_dir / POINTER_FILE).stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ModelRegistry:
+    """The process-wide registry (created on first use)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry()
+        return _registry
+
+
+def current_model() -> ScopingModel:
+    """Snapshot of the current scoping model for this process"""
+    return get_registry().current()
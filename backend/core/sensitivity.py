@@ -0,0 +1,291 @@
+"""
+Sensitivity Analysis
+
+Answers "what happens to hours if this input changes?" for a scoped submission
+without re-running the full ScopingEngine pipeline for every variation.
+
+IncrementalScorer scores a baseline once and keeps reverse dependency indexes:
+- input metric -> metrics whose weightage formula references it
+- input metric -> effort tasks that read it (own name + TASK_INPUT_DEPENDENCIES)
+A single-input change then re-evaluates only the dependent formulas and tasks,
+re-applies the weightage-banded category adjustments, and propagates category
+hour deltas to roles through the App Tiers allocation rows.
+"""
+
+import math
+from collections import ChainMap, defaultdict
+from typing import Any, Dict, List, Optional
+
+from backend.core.scope_processor import ScopeDefinitionProcessor, determine_tier
+from backend.core.effort_calculator import (
+    EffortCalculator, TASK_INPUT_DEPENDENCIES, get_category_adjustment
+)
+from backend.core.fte_calculator import FTEEffortsCalculator
+from backend.core.result_records import MetricRecord
+from backend.core.scoping_model import ScopingModel, current_model
+from backend.utils.formula_compiler import compile_formula
+from backend.utils.formula_evaluator import FormulaEvaluator
+
+# Largest ± range accepted by analyze_sensitivity
+MAX_SENSITIVITY_RANGE = 25
+
+
+class IncrementalScorer:
+    """Baseline scoring result plus cheap re-scoring of single-metric changes"""
+
+    def __init__(self, scope_inputs: List[Dict[str, Any]], selected_roles: List[str],
+                 processor: ScopeDefinitionProcessor = None, fte_calculator: FTEEffortsCalculator = None,
+                 model: ScopingModel = None):
+        """
+        Score the baseline and build the dependency indexes
+
+        Args:
+            scope_inputs: [{'name': str, 'in_scope': 'YES'/'NO', 'details': number}, ...]
+            selected_roles: Roles to report FTE hours for
+            processor: Optional ScopeDefinitionProcessor to reuse (its metrics are overwritten)
+            fte_calculator: Optional FTEEffortsCalculator to reuse (same model as the processor)
+            model: Scoping model snapshot (default: the processor's, else the current version)
+        """
+        self.model = model or (processor.model if processor else current_model())
+        self.effort_template = self.model.effort_template
+        processor = processor or ScopeDefinitionProcessor(self.model)
+        self.fte_calculator = fte_calculator or FTEEffortsCalculator(self.model)
+        self.selected_roles = [r for r in selected_roles if r in self.fte_calculator.roles]
+
+        self.scope_result = processor.process_user_input({
+            'scope_inputs': scope_inputs,
+            'selected_roles': selected_roles
+        })
+        # Copies, so reusing the processor later can't change the baseline
+        self.metrics = {m.name: m.replace() for m in self.scope_result['metrics']}
+        self.metric_order = list(self.metrics)
+        self.weightages = {name: m.weightage for name, m in self.metrics.items()}
+        self.total_weightage = self.scope_result['total_weightage']
+        self.tier = self.scope_result['tier']
+
+        self._build_formula_index(processor.formulas)
+        self._build_effort_baseline()
+
+    # ------------------------------------------------------------------
+    # Baseline
+    # ------------------------------------------------------------------
+
+    def _build_formula_index(self, formulas: Dict[str, str]):
+        self.formulas = {}
+        self.formula_dependents = defaultdict(set)
+        always = set()
+
+        for name in self.metric_order:
+            formula = formulas.get(name, '')
+            if not formula:
+                continue
+            compiled = compile_formula(formula)
+            self.formulas[name] = (formula, compiled)
+            if compiled is None:
+                always.add(name)  # Can't see its references; re-evaluate on every change
+                continue
+            for ref_name, _ in compiled.refs:
+                self.formula_dependents[ref_name].add(name)
+
+        self._always_dependent = always
+
+    def _build_effort_baseline(self):
+        self.effort_calculator = EffortCalculator(self.scope_result, self.model)
+        self.task_estimates = {}
+        self.task_dependents = defaultdict(list)
+        self.category_task_sums = {}
+        self.category_hours = {}
+
+        for category, data in self.effort_template.items():
+            for task_name in data['tasks']:
+                self.task_estimates[(category, task_name)] = \
+                    self.effort_calculator.calculate_task_final_estimate(task_name)
+                for input_name in (task_name,) + TASK_INPUT_DEPENDENCIES.get(task_name, ()):
+                    self.task_dependents[input_name].append((category, task_name))
+
+            self.category_task_sums[category] = self._task_sum(category, self.task_estimates)
+            self.category_hours[category] = self._category_hours(category, self.total_weightage,
+                                                                 self.category_task_sums[category])
+
+        self.total_hours = sum(self.category_hours.values())
+        self.role_hours = self.fte_calculator.calculate_role_fte_from_effort(
+            self.category_hours, self.selected_roles
+        )
+
+        # category -> [(role, allocation)] for propagating hour deltas
+        self.category_allocations = defaultdict(list)
+        for row_idx in sorted(self.fte_calculator.tiers_data):
+            row = self.fte_calculator.tiers_data[row_idx]
+            for role in self.selected_roles:
+                allocation = row['roles'].get(role, 0.0)
+                if allocation:
+                    self.category_allocations[row['category']].append((role, allocation))
+
+    def _task_sum(self, category: str, estimates) -> float:
+        # Same order and positive-only rule as EffortCalculator.calculate_effort
+        values = [estimates[(category, task)] for task in self.effort_template[category]['tasks']]
+        return sum(v for v in values if v > 0)
+
+    def _category_hours(self, category: str, weightage: float, task_sum: float) -> float:
+        base_hours = self.effort_template[category]['total']
+        return base_hours + get_category_adjustment(category, weightage) + task_sum
+
+    def baseline(self) -> Dict[str, Any]:
+        """Baseline totals"""
+        return {
+            'model_version': self.model.version,
+            'total_weightage': self.total_weightage,
+            'tier': self.tier,
+            'total_hours': self.total_hours,
+            'category_hours': dict(self.category_hours),
+            'role_hours': dict(self.role_hours),
+        }
+
+    # ------------------------------------------------------------------
+    # Incremental re-scoring
+    # ------------------------------------------------------------------
+
+    def _evaluate_weightage(self, name: str, lookup) -> float:
+        formula, compiled = self.formulas[name]
+        if compiled is not None:
+            return compiled.evaluate(lookup)
+        return FormulaEvaluator(list(lookup.values())).evaluate(formula)
+
+    def _changed_lookup(self, metric_name: str, in_scope: Optional[str], details: Optional[float]):
+        """Metric lookup with one metric's inputs replaced"""
+        metric = self.metrics.get(metric_name)
+        changed = (metric if metric is not None else MetricRecord.unscoped(metric_name)).replace()
+        if in_scope is not None:
+            changed.in_scope = in_scope
+            changed.in_scope_flag = 1 if in_scope == 'YES' else 0
+        if details is not None:
+            changed.details = details
+        return ChainMap({metric_name: changed}, self.metrics)
+
+    def _total_weightage(self, metric_name: str, lookup) -> float:
+        # Only formulas that reference the changed metric are re-evaluated
+        new_weightages = {
+            name: self._evaluate_weightage(name, lookup)
+            for name in self.formula_dependents.get(metric_name, set()) | self._always_dependent
+        }
+        return sum(new_weightages.get(name, self.weightages[name]) for name in self.metric_order)
+
+    def rescore_weightage(self, metric_name: str, in_scope: Optional[str] = None,
+                          details: Optional[float] = None) -> float:
+        """Total engagement weightage with one metric's inputs changed (no effort/FTE)"""
+        return self._total_weightage(metric_name, self._changed_lookup(metric_name, in_scope, details))
+
+    def rescore(self, metric_name: str, in_scope: Optional[str] = None,
+                details: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Score the baseline with one metric's inputs changed
+
+        Args:
+            metric_name: Metric to change
+            in_scope: New in-scope value (None = unchanged)
+            details: New details value (None = unchanged)
+
+        Returns:
+            Dict with total_weightage, tier, total_hours and the non-zero
+            weightage/category/role deltas against the baseline
+        """
+        lookup = self._changed_lookup(metric_name, in_scope, details)
+        total_weightage = self._total_weightage(metric_name, lookup)
+
+        # Effort: only tasks that read the changed metric, plus banded adjustments
+        calculator = self.effort_calculator
+        calculator.scope_metrics = lookup
+        try:
+            changed_tasks = {key: calculator.calculate_task_final_estimate(key[1])
+                             for key in self.task_dependents.get(metric_name, [])}
+        finally:
+            calculator.scope_metrics = self.metrics
+
+        estimates = ChainMap(changed_tasks, self.task_estimates)
+        touched_categories = {category for category, _ in changed_tasks}
+        category_delta = {}
+        for category, old_hours in self.category_hours.items():
+            task_sum = (self._task_sum(category, estimates) if category in touched_categories
+                        else self.category_task_sums[category])
+            delta = self._category_hours(category, total_weightage, task_sum) - old_hours
+            if delta:
+                category_delta[category] = delta
+
+        role_delta = defaultdict(float)
+        for category, delta in category_delta.items():
+            for role, allocation in self.category_allocations.get(category, []):
+                role_delta[role] += delta * allocation
+
+        tier = determine_tier(total_weightage)
+        return {
+            'total_weightage': total_weightage,
+            'weightage_delta': total_weightage - self.total_weightage,
+            'tier': tier,
+            'tier_changed': tier != self.tier,
+            'total_hours': self.total_hours + sum(category_delta.values()),
+            'hours_delta': sum(category_delta.values()),
+            'category_hours_delta': category_delta,
+            'role_hours_delta': {role: delta for role, delta in role_delta.items() if delta},
+        }
+
+
+def analyze_sensitivity(scorer: IncrementalScorer, steps: int = 1, step_size: float = 1) -> Dict[str, Any]:
+    """
+    Marginal effect of every metric's inputs on weightage, tier and hours
+
+    For each metric, details is moved by ±1..steps × step_size (never below 0)
+    and in_scope is toggled YES <-> NO.
+
+    Args:
+        scorer: IncrementalScorer for the submission
+        steps: How many steps either side of the current details value
+        step_size: Size of one details step (finite and positive)
+
+    Returns:
+        {'baseline': {...}, 'metrics': [...]} with metrics ordered by hours swing
+        (largest first), ready for a tornado chart
+
+    Raises:
+        ValueError: step_size is not a finite positive number
+    """
+    if not (math.isfinite(step_size) and step_size > 0):
+        raise ValueError(f'step_size must be a finite positive number, got {step_size!r}')
+    steps = max(1, min(int(steps), MAX_SENSITIVITY_RANGE))
+    results = []
+
+    for name in scorer.metric_order:
+        metric = scorer.metrics[name]
+        current_details = metric.details or 0
+        current_in_scope = metric.in_scope or 'NO'
+        changes = []
+
+        for k in list(range(-steps, 0)) + list(range(1, steps + 1)):
+            new_details = current_details + k * step_size
+            if new_details < 0:
+                continue
+            change = scorer.rescore(name, details=new_details)
+            changes.append({'change': 'details', 'step': k, 'value': new_details, **change})
+
+        toggled = 'NO' if current_in_scope == 'YES' else 'YES'
+        change = scorer.rescore(name, in_scope=toggled)
+        changes.append({'change': 'in_scope', 'step': None, 'value': toggled, **change})
+
+        hours_deltas = [c['hours_delta'] for c in changes] + [0]
+        results.append({
+            'metric': name,
+            'in_scope': current_in_scope,
+            'details': current_details,
+            'weightage': scorer.weightages[name],
+            'min_hours_delta': min(hours_deltas),
+            'max_hours_delta': max(hours_deltas),
+            'swing': max(hours_deltas) - min(hours_deltas),
+            'changes': changes,
+        })
+
+    results.sort(key=lambda r: r['swing'], reverse=True)
+    return {
+        'baseline': scorer.baseline(),
+        'steps': steps,
+        'step_size': step_size,
+        'metrics': results,
+    }
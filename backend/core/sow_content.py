@@ -0,0 +1,71 @@
+"""
+SOW Content - Data shared by every SOW output format
+
+Pure functions (no python-docx) that pick the values shown in the Statement
+of Work: the scope detail counts and the applicable Key Design Decisions.
+Used by the Word report (SOWReportGenerator) and the HTML/Markdown preview.
+"""
+
+from backend.data.excel_templates import KDD_DEFINITIONS, KDD_CONDITIONAL_MAPPINGS
+
+# SOW label -> scope metric providing the count
+SCOPE_DETAIL_METRICS = {
+    'Account': 'Account',
+    'Account Hierarchies': 'Account Alternate Hierarchies',
+    'Entity': 'Entity',
+    'Entity Hierarchies': 'Entity Alternate Hierarchies',
+    'Currencies': 'Multi-Currency',
+    'Reporting Currencies': 'Reporting Currency',
+    'Custom Dimensions': 'Custom Dimensions',
+    'Custom Dimension Hierarchies': 'Alternate Hierarchies in Custom Dimensions',
+    'Data Forms': 'Data Forms',
+    'Business Rules': 'Business Rules',
+    'Member Formulas': 'Member Formula',
+}
+
+# First 4 KDD items - Always included
+DEFAULT_KDDS = [
+    ('KDD01', 'General Application Configuration'),
+    ('KDD02', 'Metadata Configuration'),
+    ('KDD03', 'FCC Consolidations and Other Calculations'),
+    ('KDD04', 'Reports and Data Form Configuration'),
+]
+
+
+def get_scope_details(scope_inputs_dict: dict) -> dict:
+    """
+    Extract scope details from user input
+
+    Args:
+        scope_inputs_dict: Dict mapping metric names to {'in_scope': str, 'details': number}
+
+    Returns:
+        Dict of SOW label -> user detail value (0 when not provided)
+    """
+    return {
+        label: scope_inputs_dict.get(metric_name, {}).get('details', 0)
+        for label, metric_name in SCOPE_DETAIL_METRICS.items()
+    }
+
+
+def get_applicable_kdds(scope_metrics: list) -> list:
+    """
+    Get KDD items based on scope definition values
+
+    Returns list of (kdd_id, kdd_text) tuples
+    First 4 are always included, rest are conditional based on scope metrics
+    """
+    kdd_items = list(DEFAULT_KDDS)
+
+    # Create a lookup dict of metric name -> in_scope flag from scope_metrics
+    scope_dict = {m['name']: m['in_scope_flag'] for m in scope_metrics}
+
+    # Check conditional KDD mappings from template
+    for scope_metric_name, kdd_key, _ in KDD_CONDITIONAL_MAPPINGS:
+        # Check if this metric is in scope (in_scope_flag = 1)
+        if scope_dict.get(scope_metric_name, 0) > 0:
+            kdd_text = KDD_DEFINITIONS.get(kdd_key, '')
+            if kdd_text:
+                kdd_items.append((kdd_key, kdd_text))
+
+    return kdd_items
@@ -0,0 +1,274 @@
+"""
+SOW Preview Renderer - Lightweight HTML/Markdown rendering of the SOW
+
+Produces the same content as the Word document from SOWReportGenerator
+(scope of service, timings, effort by category, resource allocation, KDDs)
+without python-docx, so the UI can show a submission's SOW instantly.
+
+Templates are compiled once at import and the boilerplate sections that do not
+depend on the submission are rendered once per format and cached.
+"""
+
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from functools import lru_cache
+from html import escape
+from string import Template
+
+from backend.config import HOURS_PER_DAY, DAYS_PER_MONTH
+from backend.core.sow_content import get_scope_details, get_applicable_kdds
+
+FORMATS = ('html', 'markdown')
+
+ENGAGEMENT_TEXT = (
+    "Under this SOW, Donyati will work with Client to provide Services noted below. "
+    "Actual activities, work items, schedule and deliverables would be jointly managed "
+    "by Donyati and Client based on the Client's business priorities."
+)
+MODULES_TEXT = (
+    "The scope of this engagement is focused on the implementation of the following "
+    "application modules: Oracle EPM Enterprise – Financial Consolidation and Close"
+)
+GO_LIVE_TEXT = (
+    "Go-live support will be provided and additional capabilities will be added per a "
+    "subsequent Statement of Work expected to be started immediately following the "
+    "completion of this Statement of Work."
+)
+TIMELINE_TEXT = (
+    "Completion of Services and Deliverables agreed upon is subject to, among other things, "
+    "appropriate cooperation, obtaining the necessary information, and timely response to inquiries. "
+    "The chart below shows the estimated hours per month for each resource role. At the conclusion of "
+    "Requirements and Design, Donyati will revise the implementation timeline to incorporate agreed upon "
+    "requirements and design elements. Donyati and Client will review and approve the revised implementation "
+    "timeline before moving into the Development Phase."
+)
+STANDARD_DIMENSIONS_TEXT = (
+    "Standard Dimensions: Year, Period, View, Consolidation, Intercompany, and Data Source "
+    "dimensions will be configured to support consolidation and reporting."
+)
+APPLICATION_FEATURES = [
+    "Standard elimination capabilities will be provided",
+    "Consolidation journals will be enabled",
+    "Consolidation journal templates will be created as needed",
+    "Approval process will be utilized in the application",
+    "Task manager may be used to support Financial Consolidation and Close",
+]
+
+# Scope bullets filled from the user's detail counts
+DIMENSION_BULLETS = [
+    Template("Account Dimension: Approximately $Account accounts will be configured based on the current Chart of Accounts."),
+    Template("Account Alternate Hierarchies: Up to $AccountHierarchies alternate hierarchies will be developed."),
+    Template("Entity Dimension: Approximately $Entity entities will be configured based on the current structure."),
+    Template("Entity Alternate Hierarchies: Up to $EntityHierarchies alternate hierarchies will be developed."),
+    Template("Currency Configuration: $Currencies currencies will be configured with $ReportingCurrencies reporting currency/currencies."),
+    Template("Custom Dimensions: $CustomDimensions custom dimensions will be leveraged to support additional reporting "
+             "requirements. Up to $CustomDimensionHierarchies alternate hierarchies will be developed."),
+]
+CUSTOMIZATION_BULLETS = [
+    Template("Custom Data Forms: If required, up to $DataForms custom data forms will be developed to support "
+             "Financial Consolidation and Close."),
+]
+CALCULATION_BULLETS = [
+    Template("Custom Business Rules: If required, up to $BusinessRules custom business rules will be developed to "
+             "support Financial Consolidation and Close."),
+    Template("Member Formulas: If required, up to $MemberFormulas member formulas will be developed to support "
+             "Financial Consolidation and Close."),
+]
+
+# Per-format document skeletons
+DOCUMENT_TEMPLATES = {
+    'markdown': Template(
+        "# STATEMENT OF WORK (SOW)\n"
+        "## FCC IMPLEMENTATION ENGAGEMENT\n\n"
+        "Generated: $generated\n\n"
+        "$engagement_items"
+        "- Engagement Weightage: $weightage\n"
+        "- Implementation Tier: $tier_name ($tier_min-$tier_max)\n\n"
+        "$scope_section\n"
+        "$timings_section\n"
+        "$kdd_section"
+    ),
+    'html': Template(
+        "<article class=\"sow-preview\">\n"
+        "<h1>STATEMENT OF WORK (SOW)</h1>\n"
+        "<h2>FCC IMPLEMENTATION ENGAGEMENT</h2>\n"
+        "<p>Generated: $generated</p>\n"
+        "<ul>\n$engagement_items<li>Engagement Weightage: $weightage</li>\n"
+        "<li>Implementation Tier: $tier_name ($tier_min-$tier_max)</li>\n</ul>\n"
+        "$scope_section\n"
+        "$timings_section\n"
+        "$kdd_section"
+        "</article>\n"
+    ),
+}
+
+
+def _heading(fmt: str, text: str, level: int) -> str:
+    if fmt == 'html':
+        return f"<h{level + 1}>{escape(text)}</h{level + 1}>\n"
+    return f"{'#' * (level + 1)} {text}\n\n"
+
+
+def _paragraph(fmt: str, text: str) -> str:
+    if fmt == 'html':
+        return f"<p>{escape(text)}</p>\n"
+    return f"{text}\n\n"
+
+
+def _bullets(fmt: str, items: list, ordered: bool = False) -> str:
+    if fmt == 'html':
+        tag = 'ol' if ordered else 'ul'
+        rows = ''.join(f"<li>{escape(str(item))}</li>\n" for item in items)
+        return f"<{tag}>\n{rows}</{tag}>\n"
+    marker = '1.' if ordered else '-'
+    return ''.join(f"{marker} {item}\n" for item in items) + "\n"
+
+
+def _table(fmt: str, header: list, rows: list) -> str:
+    if fmt == 'html':
+        head = ''.join(f"<th>{escape(str(cell))}</th>" for cell in header)
+        body = ''.join(
+            "<tr>" + ''.join(f"<td>{escape(str(cell))}</td>" for cell in row) + "</tr>\n"
+            for row in rows
+        )
+        return f"<table>\n<thead><tr>{head}</tr></thead>\n<tbody>\n{body}</tbody>\n</table>\n"
+    lines = [
+        '| ' + ' | '.join(str(cell) for cell in header) + ' |',
+        '|' + '---|' * len(header),
+    ]
+    lines.extend('| ' + ' | '.join(str(cell) for cell in row) + ' |' for row in rows)
+    return '\n'.join(lines) + "\n\n"
+
+
+@lru_cache(maxsize=None)
+def _static_section(fmt: str, name: str) -> str:
+    """Boilerplate that is identical for every submission (rendered once per format)"""
+    if name == 'scope_intro':
+        return _paragraph(fmt, ENGAGEMENT_TEXT) + _paragraph(fmt, MODULES_TEXT)
+    if name == 'application_features':
+        return _heading(fmt, 'APPLICATION FEATURES', 2) + _bullets(fmt, APPLICATION_FEATURES)
+    if name == 'timeline_text':
+        return _paragraph(fmt, GO_LIVE_TEXT)
+    if name == 'allocation_text':
+        return _paragraph(fmt, TIMELINE_TEXT)
+    if name == 'kdd_intro':
+        return (_heading(fmt, '3. KEY DESIGN DECISIONS (KDD)', 1) +
+                _paragraph(fmt, "The following Key Design Decisions have been identified as critical for the "
+                                "successful implementation:"))
+    raise KeyError(name)
+
+
+def _category_hours(category_data) -> tuple:
+    """(hours, days) from a full effort category dict or a stored {category: hours} value"""
+    if isinstance(category_data, Mapping):
+        hours = category_data.get('final_estimate', 0)
+        return hours, category_data.get('in_days', round(hours / HOURS_PER_DAY, 2))
+    hours = category_data or 0
+    return hours, round(hours / HOURS_PER_DAY, 2)
+
+
+class SOWPreviewRenderer:
+    """Render the SOW as HTML or Markdown from scope, effort, FTE and KDD data"""
+
+    def render(self, scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict,
+               fmt: str = 'html', generated_at: datetime = None,
+               client_name: str = None, project_name: str = None) -> str:
+        """
+        Render the SOW preview
+
+        Args:
+            scope_result: Output from ScopeDefinitionProcessor (or stored scope_definition)
+            effort_estimation: category -> {'final_estimate', 'in_days'} or category -> hours
+            summary: Effort summary dict with total hours/days/months
+            fte_allocation: Dict of role -> {'hours': value, ...}
+            scope_inputs_dict: Dict mapping metric names to user inputs
+            fmt: 'html' or 'markdown'
+            generated_at: Start date of the engagement (defaults to now)
+            client_name: Client the SOW is for (listed when given)
+            project_name: Project name (listed when given)
+
+        Returns:
+            Rendered document text
+        """
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported preview format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+
+        start_date = generated_at or datetime.now()
+        tier_range = scope_result.get('tier_range') or (0, 0)
+
+        engagement_items = ''.join(
+            f"<li>{label}: {escape(str(value))}</li>\n" if fmt == 'html' else f"- {label}: {value}\n"
+            for label, value in (('Client', client_name), ('Project', project_name)) if value
+        )
+
+        return DOCUMENT_TEMPLATES[fmt].substitute(
+            generated=start_date.strftime('%d-%b-%Y'),
+            engagement_items=engagement_items,
+            weightage=f"{scope_result.get('total_weightage', 0):.1f}",
+            tier_name=escape(str(scope_result.get('tier_name', ''))) if fmt == 'html' else scope_result.get('tier_name', ''),
+            tier_min=tier_range[0],
+            tier_max=tier_range[1],
+            scope_section=self._scope_section(fmt, scope_result, scope_inputs_dict or {}),
+            timings_section=self._timings_section(fmt, start_date, effort_estimation, summary, fte_allocation or {}),
+            kdd_section=self._kdd_section(fmt, scope_result.get('metrics', [])),
+        )
+
+    def _scope_section(self, fmt, scope_result, scope_inputs_dict) -> str:
+        # Template placeholders can't contain spaces: 'Account Hierarchies' -> $AccountHierarchies
+        values = {label.replace(' ', ''): value for label, value in get_scope_details(scope_inputs_dict).items()}
+
+        return ''.join([
+            _heading(fmt, '1. SCOPE OF SERVICE', 1),
+            _paragraph(fmt, f"Engagement Tier: {scope_result.get('tier_name', '')}"),
+            _static_section(fmt, 'scope_intro'),
+            _heading(fmt, 'DIMENSIONS', 2),
+            _bullets(fmt, [t.substitute(values) for t in DIMENSION_BULLETS] + [STANDARD_DIMENSIONS_TEXT]),
+            _static_section(fmt, 'application_features'),
+            _heading(fmt, 'APPLICATION CUSTOMIZATION', 2),
+            _bullets(fmt, [t.substitute(values) for t in CUSTOMIZATION_BULLETS]),
+            _heading(fmt, 'CALCULATIONS', 2),
+            _bullets(fmt, [t.substitute(values) for t in CALCULATION_BULLETS]),
+        ])
+
+    def _timings_section(self, fmt, start_date, effort_estimation, summary, fte_allocation) -> str:
+        num_months = round(summary.get('total_months', 0))
+        end_date = start_date + timedelta(days=num_months * DAYS_PER_MONTH)
+
+        # Resource role / monthly hours (same even split as the Word document)
+        months = max(num_months, 1)
+        roles = sorted(fte_allocation.keys())
+        allocation_rows = []
+        for role in roles:
+            monthly_hours = round(fte_allocation[role]['hours'] / months)
+            allocation_rows.append([role] + [monthly_hours] * months)
+
+        category_rows = []
+        for category_name in sorted(effort_estimation.keys()):
+            hours, days = _category_hours(effort_estimation[category_name])
+            category_rows.append([category_name, f"{hours:.1f}", f"{days:.2f}"])
+        category_rows.append(['TOTAL', f"{summary.get('total_time_hours', 0):.1f}", f"{summary.get('total_days', 0):.2f}"])
+
+        return ''.join([
+            _heading(fmt, '2. TIMINGS (EFFORT ESTIMATION)', 1),
+            _paragraph(fmt, f"The engagement start date is {start_date.strftime('%d-%b-%Y')}"),
+            _paragraph(fmt, f"The engagement end date is {end_date.strftime('%d-%b-%Y')}"),
+            _static_section(fmt, 'timeline_text'),
+            _paragraph(fmt, f"This SOW assumes {num_months} months to complete Financial Consolidation and Close."),
+            _static_section(fmt, 'allocation_text'),
+            _heading(fmt, 'Resource Role/Monthly Hours', 2),
+            _table(fmt, ['Resource Role'] + [str(m) for m in range(1, months + 1)], allocation_rows),
+            _heading(fmt, 'TOTAL IMPLEMENTATION EFFORT', 2),
+            _bullets(fmt, [
+                f"Total Hours: {summary.get('total_time_hours', 0):.1f} hours",
+                f"Total Days: {summary.get('total_days', 0):.1f} days (@ {HOURS_PER_DAY} hours/day)",
+                f"Total Months: {summary.get('total_months', 0):.2f} months (@ {DAYS_PER_MONTH} days/month)",
+            ]),
+            _heading(fmt, 'EFFORT BY CATEGORY', 2),
+            _table(fmt, ['Category', 'Hours', 'Days'], category_rows),
+        ])
+
+    def _kdd_section(self, fmt, scope_metrics) -> str:
+        kdd_items = get_applicable_kdds(scope_metrics)
+        return _static_section(fmt, 'kdd_intro') + _bullets(
+            fmt, [f"{kdd_id}: {kdd_text}" for kdd_id, kdd_text in kdd_items], ordered=True
+        )
@@ -8,6 +8,7 @@ Generates Statement of Work (SOW) reports with:
 """
 
 from datetime import datetime, timedelta
+from io import BytesIO
 from pathlib import Path
 
 try:
@@ -18,7 +19,7 @@ except ImportError:
     raise ImportError("python-docx is required. Install with: pip install python-docx")
 
 from backend.config import OUTPUT_DIR
-from backend.data.excel_templates import KDD_DEFINITIONS, KDD_CONDITIONAL_MAPPINGS
+from backend.core.sow_content import get_scope_details, get_applicable_kdds
 
 
 class SOWReportGenerator:
@@ -37,20 +38,7 @@ class SOWReportGenerator:
         Returns:
             Dict with actual user input values
         """
-        details = {
-            'Account': scope_inputs_dict.get('Account', {}).get('details', 0),
-            'Account Hierarchies': scope_inputs_dict.get('Account Alternate Hierarchies', {}).get('details', 0),
-            'Entity': scope_inputs_dict.get('Entity', {}).get('details', 0),
-            'Entity Hierarchies': scope_inputs_dict.get('Entity Alternate Hierarchies', {}).get('details', 0),
-            'Currencies': scope_inputs_dict.get('Multi-Currency', {}).get('details', 0),
-            'Reporting Currencies': scope_inputs_dict.get('Reporting Currency', {}).get('details', 0),
-            'Custom Dimensions': scope_inputs_dict.get('Custom Dimensions', {}).get('details', 0),
-            'Custom Dimension Hierarchies': scope_inputs_dict.get('Alternate Hierarchies in Custom Dimensions', {}).get('details', 0),
-            'Data Forms': scope_inputs_dict.get('Data Forms', {}).get('details', 0),
-            'Business Rules': scope_inputs_dict.get('Business Rules', {}).get('details', 0),
-            'Member Formulas': scope_inputs_dict.get('Member Formula', {}).get('details', 0),
-        }
-        return details
+        return get_scope_details(scope_inputs_dict)
     
     def get_applicable_kdds(self, scope_metrics: list):
         """
@@ -59,28 +47,7 @@ class SOWReportGenerator:
         Returns list of (kdd_id, kdd_text) tuples
         First 4 are always included, rest are conditional based on scope metrics
         """
-        # First 4 KDD items - Always included
-        default_kdds = [
-            ('KDD01', 'General Application Configuration'),
-            ('KDD02', 'Metadata Configuration'),
-            ('KDD03', 'FCC Consolidations and Other Calculations'),
-            ('KDD04', 'Reports and Data Form Configuration'),
-        ]
-        
-        kdd_items = list(default_kdds)
-        
-        # Create a lookup dict of metric name -> in_scope flag from scope_metrics
-        scope_dict = {m['name']: m['in_scope_flag'] for m in scope_metrics}
-        
-        # Check conditional KDD mappings from template
-        for scope_metric_name, kdd_key, _ in KDD_CONDITIONAL_MAPPINGS:
-            # Check if this metric is in scope (in_scope_flag = 1)
-            if scope_dict.get(scope_metric_name, 0) > 0:
-                kdd_text = KDD_DEFINITIONS.get(kdd_key, '')
-                if kdd_text:
-                    kdd_items.append((kdd_key, kdd_text))
-        
-        return kdd_items
+        return get_applicable_kdds(scope_metrics)
     
     def generate_word_document(self, scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict, output_path=None):
         """
@@ -97,6 +64,40 @@ class SOWReportGenerator:
         Returns:
             Path to generated document
         """
+        doc = self.build_document(scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict)
+        
+        # Save document
+        if not output_path:
+            OUTPUT_DIR.mkdir(exist_ok=True)
+            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            output_path = OUTPUT_DIR / f'SOW_Report_{timestamp}.docx'
+        
+        output_path = Path(output_path)
+        doc.save(str(output_path))
+        
+        return str(output_path)
+    
+    def generate_word_bytes(self, scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict) -> bytes:
+        """
+        Generate the SOW Word document in memory
+        
+        Same arguments as generate_word_document, without an output path.
+        
+        Returns:
+            The .docx file contents
+        """
+        doc = self.build_document(scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict)
+        buffer = BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
+    
+    def build_document(self, scope_result, effort_estimation, summary, fte_allocation, scope_inputs_dict):
+        """
+        Build the SOW Word document without saving it
+        
+        Returns:
+            python-docx Document
+        """
         # Create Document
         doc = Document()
         
@@ -337,13 +338,4 @@ class SOWReportGenerator:
         else:
             doc.add_paragraph("No key design decisions identified for this scope.", style='Normal')
         
-        # Save document
-        if not output_path:
-            OUTPUT_DIR.mkdir(exist_ok=True)
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            output_path = OUTPUT_DIR / f'SOW_Report_{timestamp}.docx'
-        
-        output_path = Path(output_path)
-        doc.save(str(output_path))
-        
-        return str(output_path)
+        return doc
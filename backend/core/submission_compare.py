@@ -0,0 +1,140 @@
+"""
+Submission Comparison
+
+Compares two stored submissions (typically a revised scoping against the
+original) from their stored calculation results - nothing is recomputed.
+
+When the two were computed under different model versions, the deltas mix
+input changes with formula/template changes; `same_model_version` says so.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional
+
+# Decimal places kept on deltas (hides float noise from summing)
+DELTA_PRECISION = 6
+
+
+def _delta(a, b) -> Optional[float]:
+    if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
+        return None
+    return round(b - a, DELTA_PRECISION)
+
+
+def _pct(a, b) -> Optional[float]:
+    delta = _delta(a, b)
+    if delta is None or not a:
+        return None
+    return round(delta / a * 100, 2)
+
+
+def _values(a, b) -> Dict[str, Any]:
+    return {'a': a, 'b': b, 'delta': _delta(a, b), 'delta_pct': _pct(a, b)}
+
+
+def _union(first: Iterable[str], second: Iterable[str]) -> List[str]:
+    """Keys of both, in first-seen order"""
+    return list(dict.fromkeys([*first, *second]))
+
+
+def submission_header(submission: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'submission_id': submission.get('submission_id'),
+        'client_name': submission.get('client_name'),
+        'project_name': submission.get('project_name'),
+        'submitted_at': submission.get('submitted_at'),
+        'model_version': submission.get('calculation_result', {}).get('model_version'),
+    }
+
+
+def compare_inputs(metrics_a: List[Dict[str, Any]], metrics_b: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Metrics whose scope input or weightage differs
+
+    Returns:
+        [{'name', 'a': {...}, 'b': {...}, 'in_scope_changed', 'details_changed', 'weightage_delta'}, ...]
+        in Scope Definition order; a metric missing on one side is None there
+    """
+    by_name_a = {m['name']: m for m in metrics_a}
+    by_name_b = {m['name']: m for m in metrics_b}
+    changes = []
+
+    for name in _union(by_name_a, by_name_b):
+        a = by_name_a.get(name)
+        b = by_name_b.get(name)
+        side_a = {key: a.get(key) for key in ('in_scope', 'details', 'weightage')} if a else None
+        side_b = {key: b.get(key) for key in ('in_scope', 'details', 'weightage')} if b else None
+        if side_a == side_b:
+            continue
+        changes.append({
+            'name': name,
+            'a': side_a,
+            'b': side_b,
+            'in_scope_changed': (side_a or {}).get('in_scope') != (side_b or {}).get('in_scope'),
+            'details_changed': (side_a or {}).get('details') != (side_b or {}).get('details'),
+            'weightage_delta': _delta((side_a or {}).get('weightage', 0), (side_b or {}).get('weightage', 0)),
+        })
+    return changes
+
+
+def compare_submissions(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Compare two stored submissions (b relative to a)
+
+    Args:
+        a: Stored submission (the baseline, e.g. the original scoping)
+        b: Stored submission (e.g. the revision)
+
+    Returns:
+        {'a', 'b', 'same_model_version', 'tier', 'total_weightage', 'inputs',
+         'effort_hours', 'categories', 'role_hours', 'roles', 'summary'}
+    """
+    result_a = a.get('calculation_result', {})
+    result_b = b.get('calculation_result', {})
+    scope_a = result_a.get('scope_definition', {})
+    scope_b = result_b.get('scope_definition', {})
+
+    categories_a = result_a.get('effort_estimation', {}).get('categories', {})
+    categories_b = result_b.get('effort_estimation', {}).get('categories', {})
+    categories = {
+        category: _values(categories_a.get(category, 0), categories_b.get(category, 0))
+        for category in _union(categories_a, categories_b)
+    }
+
+    roles_a = result_a.get('fte_allocation', {}).get('by_role', {})
+    roles_b = result_b.get('fte_allocation', {}).get('by_role', {})
+    roles = {
+        role: dict(_values(roles_a.get(role, {}).get('hours', 0), roles_b.get(role, {}).get('hours', 0)),
+                   in_a=role in roles_a, in_b=role in roles_b)
+        for role in _union(roles_a, roles_b)
+    }
+
+    header_a = submission_header(a)
+    header_b = submission_header(b)
+    inputs = compare_inputs(scope_a.get('metrics', []), scope_b.get('metrics', []))
+    tier_delta = _delta(scope_a.get('tier'), scope_b.get('tier'))
+
+    return {
+        'a': header_a,
+        'b': header_b,
+        'same_model_version': header_a['model_version'] == header_b['model_version'],
+        'tier': {
+            'a': result_a.get('tier'),
+            'b': result_b.get('tier'),
+            'changed': result_a.get('tier') != result_b.get('tier'),
+            'delta': tier_delta,
+        },
+        'total_weightage': _values(result_a.get('total_weightage'), result_b.get('total_weightage')),
+        'inputs': inputs,
+        'effort_hours': _values(result_a.get('effort_estimation', {}).get('summary', {}).get('total_time_hours'),
+                                result_b.get('effort_estimation', {}).get('summary', {}).get('total_time_hours')),
+        'categories': categories,
+        'role_hours': _values(result_a.get('total_hours'), result_b.get('total_hours')),
+        'roles': roles,
+        'summary': {
+            'inputs_changed': len(inputs),
+            'categories_changed': sum(1 for values in categories.values() if values['delta']),
+            'roles_changed': sum(1 for values in roles.values() if values['delta']),
+            'roles_added': [role for role, values in roles.items() if not values['in_a']],
+            'roles_removed': [role for role, values in roles.items() if not values['in_b']],
+        },
+    }
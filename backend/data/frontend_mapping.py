@@ -0,0 +1,162 @@
+"""
+Frontend Scope Item Mapping
+
+Maps the scope item IDs sent by the Next.js scoping form (scopingData keys)
+to the exact metric names of the Scope Definition template.
+"""
+
+FRONTEND_TO_BACKEND_MAP = {
+    # Dimensions
+    'account': 'Account',
+    'acc_alt_hier': 'Account Alternate Hierarchies',
+    'rat_coa': 'Rationalization of CoA',
+    'multi_curr': 'Multi-Currency',
+    'rep_curr': 'Reporting Currency',
+    'entity': 'Entity',
+    'ent_redesign': 'Entity Redesign',
+    'ent_alt_hier': 'Entity Alternate Hierarchies',
+    'scenario': 'Scenario',
+    'multi_gaap': 'Multi-GAAP',
+    'cust_dim': 'Custom Dimensions',
+    'alt_hier_cust': 'Alternate Hierarchies in Custom Dimensions',
+    'add_alias': 'Additional Alias Tables',
+    
+    # Application Features
+    'elim': 'Elimination',
+    'cust_elim': 'Custom Elimination Requirement',
+    'consol_journ': 'Consolidation Journals',
+    'journ_temp': 'Journal Templates',
+    'parent_curr': 'Parent Currency Journals',
+    'own_mgmt': 'Ownership Management',
+    'enh_org': 'Enhanced Organization by Period',
+    'equity_pickup': 'Equity Pickup',
+    'partner_elim': 'Partner Elimination',
+    'config_consol': 'Configurable Consolidation Rules',
+    'cash_flow': 'Cash Flow',
+    'supp_data': 'Supplemental Data Collection',
+    'ent_journ': 'Enterprise Journals',
+    'approval': 'Approval Process',
+    'hist_over': 'Historic Overrides',
+    'task_mgr': 'Task Manager',
+    'audit': 'Audit',
+    
+    # Application Customization
+    'data_forms': 'Data Forms',
+    'dashboards': 'Dashboards',
+    
+    # Calculations
+    'bus_rules': 'Business Rules',
+    'mem_formula': 'Member Formula',
+    'mem_form': 'Member Formula',  # Alternative frontend ID
+    'ratios': 'Ratios',
+    'cust_kpis': 'Custom KPIs',
+    'cust_kpi': 'Custom KPIs',  # Alternative frontend ID
+    
+    # Security
+    'sec_dim': 'Secured Dimensions',
+    'num_users': 'Number of Users',
+    
+    # Historical Data
+    'hist_data_val': 'Historical Data Validation',
+    'hist_data': 'Historical Data Validation',  # Alternative frontend ID
+    'data_val_acc': 'Data Validation for Account Alt Hierarchies',
+    'val_acc_alt': 'Data Validation for Account Alt Hierarchies',  # Alternative frontend ID
+    'data_val_ent': 'Data Validation for Entity Alt Hierarchies',
+    'val_ent_alt': 'Data Validation for Entity Alt Hierarchies',  # Alternative frontend ID
+    'hist_journ_conv': 'Historical Journal Conversion',
+    'hist_journ': 'Historical Journal Conversion',  # Alternative frontend ID
+    
+    # Integrations
+    'file_loads': 'Files Based Loads',
+    'file_load': 'Files Based Loads',  # Alternative frontend ID
+    'direct_connect': 'Direct Connect Integrations',
+    'direct_conn': 'Direct Connect Integrations',  # Alternative frontend ID
+    'outbound_int': 'Outbound Integrations',
+    'outbound': 'Outbound Integrations',  # Alternative frontend ID
+    'pipeline': 'Pipeline',
+    'cust_script': 'Custom Scripting',
+    
+    # Reporting
+    'mgmt_reports': 'Management Reports',
+    'mgmt_rep': 'Management Reports',  # Alternative frontend ID
+    'consol_reports': 'Consolidation Reports',
+    'consol_rep': 'Consolidation Reports',  # Alternative frontend ID
+    'consol_journ_reports': 'Consolidation Journal Reports',
+    'consol_journ_rep': 'Consolidation Journal Reports',  # Alternative frontend ID
+    'ic_reports': 'Intercompany Reports',
+    'inter_rep': 'Intercompany Reports',  # Alternative frontend ID
+    'task_mgr_reports': 'Task Manager Reports',
+    'task_rep': 'Task Manager Reports',  # Alternative frontend ID
+    'ent_journ_reports': 'Enterprise Journal Reports',
+    'ent_journ_rep': 'Enterprise Journal Reports',  # Alternative frontend ID
+    'smart_view': 'Smart View Reports',
+    
+    # Automations
+    'auto_loads': 'Automated Data loads',
+    'auto_load': 'Automated Data loads',  # Alternative frontend ID
+    'auto_consol': 'Automated Consolidations',
+    'backup_arch': 'Backup and Archival',
+    'backup': 'Backup and Archival',  # Alternative frontend ID
+    'meta_import': 'Metadata Import',
+    'meta_imp': 'Metadata Import',  # Alternative frontend ID
+    
+    # Testing/Training
+    'unit_test': 'Unit Testing',
+    'uat': 'UAT',
+    'sit': 'SIT',
+    'parallel_test': 'Parallel Testing',
+    'par_test': 'Parallel Testing',  # Alternative frontend ID
+    'user_train': 'User Training',
+    
+    # Transition
+    'go_live': 'Go Live',
+    'hypercare': 'Hypercare',
+    
+    # Documentations
+    'rtm': 'RTM',
+    'design_doc': 'Design Document',
+    'sys_config_doc': 'System Configuration Document',
+    'sys_config': 'System Configuration Document',  # Alternative frontend ID
+    
+    # Change Management
+    'admin_desktop': 'Admin Desktop Procedures',
+    'admin_proc': 'Admin Desktop Procedures',  # Alternative frontend ID
+    'user_desktop': 'End User Desktop Procedures',
+    'end_user_proc': 'End User Desktop Procedures',  # Alternative frontend ID
+    
+    # Project Management
+    'proj_mgmt': 'Project Management'
+}
+
+
+# First frontend ID for each metric (the ID used when building payloads)
+BACKEND_TO_FRONTEND_MAP = {
+    name: item_id for item_id, name in reversed(list(FRONTEND_TO_BACKEND_MAP.items()))
+}
+
+
+def transform_frontend_to_backend_format(scoping_data, selected_roles):
+    """
+    Transform frontend data format to backend format
+    
+    Frontend format: { 'scope_item_id': { value: 'YES/NO', count: 123 } }
+    Backend format: [{ name: 'Item Name', in_scope: 'YES/NO', details: 123 }]
+    """
+    scope_inputs = []
+    
+    for item_id, data in scoping_data.items():
+        # Use mapping to get exact name from Excel
+        item_name = FRONTEND_TO_BACKEND_MAP.get(item_id)
+        
+        if not item_name:
+            # Fallback: try to clean up the ID
+            item_name = item_id.replace('_', ' ').replace('-', ' ').title()
+            print(f"Warning: No mapping found for '{item_id}', using fallback: '{item_name}'")
+        
+        scope_inputs.append({
+            'name': item_name,
+            'in_scope': data.get('value', 'NO'),
+            'details': data.get('count', 0) if data.get('value') == 'YES' else 0
+        })
+    
+    return scope_inputs
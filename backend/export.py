@@ -0,0 +1,311 @@
+"""
+Columnar Export of Stored Submissions
+
+Flattens every stored submission into one row for offline analysis
+(notebooks, BI tools):
+
+    python -m backend.export exports/                    # Parquet if pyarrow is installed, else CSV.gz
+    python -m backend.export exports/ --format csv.gz
+    python -m backend.export exports/ --full             # ignore the watermark, export everything again
+
+Columns: submission fields (id, user, client, submitted_at, model version,
+tier, weightage, effort and role hour totals), then per metric
+`in_scope:<metric>` (1/0), `details:<metric>` and `weightage:<metric>`, the
+effort hours of each category (`category_hours:<category>`) and the FTE hours
+of each role (`role_hours:<role>`; empty when the role was not selected).
+Metric, category and role columns follow the current scoping model.
+
+Each run writes one new part file (submissions_<timestamp>.parquet or
+.csv.gz) holding only the submissions stored since the previous run, so the
+export directory is read as a dataset (e.g. pandas.read_parquet(directory)).
+The watermark in _export_state.json records how many submissions of each user's
+results file (append-only) have been exported; it advances only once a part
+is completely written, so an interrupted run is simply repeated.
+
+Rows are written in chunks while the results files are read one at a time,
+so memory stays flat however many submissions are stored. Parquet needs the
+optional pyarrow package (pip install pyarrow).
+"""
+
+import argparse
+import contextlib
+import csv
+import gzip
+import itertools
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+from backend.core.scoping_model import ScopingModel, current_model
+from backend.data.excel_templates import METRICS_TEMPLATE
+from backend.storage.results import iter_stored_submissions
+
+FORMATS = ('parquet', 'csv.gz')
+STATE_FILE = '_export_state.json'  # '_' prefix: skipped by dataset readers
+PART_PREFIX = 'submissions_'
+
+# Rows buffered per write
+DEFAULT_CHUNK_SIZE = 1000
+
+BASE_COLUMNS = [
+    ('submission_id', 'string'), ('user_email', 'string'), ('client_name', 'string'),
+    ('project_name', 'string'), ('submitted_at', 'string'), ('status', 'string'),
+    ('model_version', 'string'), ('tier', 'int'), ('tier_name', 'string'),
+    ('total_weightage', 'float'), ('effort_hours', 'float'), ('role_hours', 'float'),
+    ('role_days', 'float'), ('role_months', 'float'), ('selected_roles', 'string'),
+]
+
+
+def export_columns(model: ScopingModel = None) -> List[Tuple[str, str]]:
+    """
+    Export columns as (name, kind), kind being 'string', 'int' or 'float'
+    """
+    model = model or current_model()
+    columns = list(BASE_COLUMNS)
+    for metric in METRICS_TEMPLATE:
+        name = metric['name']
+        columns += [(f'in_scope:{name}', 'int'), (f'details:{name}', 'float'), (f'weightage:{name}', 'float')]
+    columns += [(f'category_hours:{category}', 'float') for category in model.effort_template]
+    columns += [(f'role_hours:{role}', 'float') for role in model.roles]
+    return columns
+
+
+def flatten_submission(submission: Dict[str, Any]) -> Dict[str, Any]:
+    """One export row from a stored submission (columns it doesn't have are left out)"""
+    result = submission.get('calculation_result') or {}
+    scope = result.get('scope_definition') or {}
+    effort = result.get('effort_estimation') or {}
+    fte = result.get('fte_allocation') or {}
+
+    row = {
+        'submission_id': submission.get('submission_id'),
+        'user_email': submission.get('user_email'),
+        'client_name': submission.get('client_name'),
+        'project_name': submission.get('project_name'),
+        'submitted_at': submission.get('submitted_at'),
+        'status': submission.get('status'),
+        'model_version': result.get('model_version'),
+        'tier': scope.get('tier'),
+        'tier_name': result.get('tier'),
+        'total_weightage': result.get('total_weightage'),
+        'effort_hours': (effort.get('summary') or {}).get('total_time_hours'),
+        'role_hours': result.get('total_hours'),
+        'role_days': result.get('total_days'),
+        'role_months': result.get('total_months'),
+        'selected_roles': ';'.join(submission.get('selected_roles') or []),
+    }
+    for metric in scope.get('metrics') or []:
+        name = metric.get('name')
+        row[f'in_scope:{name}'] = 1 if metric.get('in_scope') == 'YES' else 0
+        row[f'details:{name}'] = metric.get('details')
+        row[f'weightage:{name}'] = metric.get('weightage')
+    for category, hours in (effort.get('categories') or {}).items():
+        row[f'category_hours:{category}'] = hours
+    for role, values in (fte.get('by_role') or {}).items():
+        row[f'role_hours:{role}'] = (values or {}).get('hours')
+    return row
+
+
+# ----------------------------------------------------------------------
+# Watermark
+# ----------------------------------------------------------------------
+
+def load_state(directory: Path) -> Dict[str, Any]:
+    path = Path(directory) / STATE_FILE
+    if not path.exists():
+        return {'files': {}, 'parts': []}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_state(directory: Path, state: Dict[str, Any]):
+    path = Path(directory) / STATE_FILE
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def new_submissions(watermark: Dict[str, Dict[str, Any]], progress: Dict[str, Dict[str, Any]],
+                    user_email: str = None) -> Iterator[Dict[str, Any]]:
+    """
+    Stored submissions after the watermark
+
+    Args:
+        watermark: results file name -> {'count', 'last_id'} of the previous export
+        progress: Filled with the new watermark of every file read
+        user_email: Only this user's submissions
+
+    A results file whose submission at the watermark isn't the recorded one
+    was replaced (deleted and started again) and is exported from the start.
+    """
+    for results_file, group in itertools.groupby(iter_stored_submissions(user_email), key=lambda item: item[0]):
+        submissions = [submission for _, submission in group]
+        mark = watermark.get(results_file.name) or {}
+        start = mark.get('count', 0)
+        if start and (start > len(submissions) or submissions[start - 1].get('submission_id') != mark.get('last_id')):
+            start = 0
+        yield from submissions[start:]
+        progress[results_file.name] = {
+            'count': len(submissions),
+            'last_id': submissions[-1].get('submission_id') if submissions else None,
+        }
+
+
+# ----------------------------------------------------------------------
+# Writers
+# ----------------------------------------------------------------------
+
+class CsvGzipWriter:
+    """Gzip-compressed CSV; in_scope/details/hours as plain numbers"""
+
+    extension = '.csv.gz'
+
+    def __init__(self, path: Path, columns: List[Tuple[str, str]]):
+        self._file = gzip.open(path, 'wt', newline='', encoding='utf-8')
+        self._writer = csv.DictWriter(self._file, fieldnames=[name for name, _ in columns],
+                                      extrasaction='ignore', lineterminator='\n')
+        self._writer.writeheader()
+
+    def write(self, rows: List[Dict[str, Any]]):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetWriter:
+    """Parquet (one row group per chunk, zstd-compressed)"""
+
+    extension = '.parquet'
+
+    def __init__(self, path: Path, columns: List[Tuple[str, str]]):
+        if not PARQUET_AVAILABLE:
+            raise ValueError("Parquet export needs pyarrow (pip install pyarrow); use --format csv.gz")
+        types = {'string': pa.string(), 'int': pa.int64(), 'float': pa.float64()}
+        self._columns = columns
+        self._schema = pa.schema([(name, types[kind]) for name, kind in columns])
+        self._writer = pq.ParquetWriter(path, self._schema, compression='zstd')
+
+    def write(self, rows: List[Dict[str, Any]]):
+        arrays = {name: [row.get(name) for row in rows] for name, _ in self._columns}
+        self._writer.write_table(pa.Table.from_pydict(arrays, schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+WRITERS = {'parquet': ParquetWriter, 'csv.gz': CsvGzipWriter}
+
+
+def resolve_format(fmt: str = 'auto') -> str:
+    """'auto' -> parquet when pyarrow is installed, otherwise csv.gz"""
+    if fmt == 'auto':
+        return 'parquet' if PARQUET_AVAILABLE else 'csv.gz'
+    if fmt not in WRITERS:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: auto, {', '.join(FORMATS)}")
+    return fmt
+
+
+# ----------------------------------------------------------------------
+# Runner
+# ----------------------------------------------------------------------
+
+def run_export(directory: Path, fmt: str = 'auto', full: bool = False, user_email: str = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE, model: ScopingModel = None) -> Dict[str, Any]:
+    """
+    Export the submissions stored since the last export into a new part file
+
+    Args:
+        directory: Export directory (parts and the watermark)
+        fmt: 'auto', 'parquet' or 'csv.gz'
+        full: Ignore the watermark and export every stored submission
+        user_email: Only this user's submissions
+        chunk_size: Rows per write
+        model: Model whose categories and roles become columns (default: the current one)
+
+    Returns:
+        {'rows', 'part' (file name or None when nothing was new), 'format', 'columns'}
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    fmt = resolve_format(fmt)
+    writer_class = WRITERS[fmt]
+    columns = export_columns(model)
+
+    state = load_state(directory)
+    watermark = {} if full else state['files']
+    progress = {}
+
+    part = f"{PART_PREFIX}{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}{writer_class.extension}"
+    tmp_path = directory / (part + '.tmp')
+    writer = None
+    rows = 0
+    try:
+        submissions = new_submissions(watermark, progress, user_email)
+        while True:
+            chunk = [flatten_submission(submission) for submission in itertools.islice(submissions, chunk_size)]
+            if not chunk:
+                break
+            if writer is None:
+                writer = writer_class(tmp_path, columns)
+            writer.write(chunk)
+            rows += len(chunk)
+        if writer is not None:
+            writer.close()
+            writer = None
+            os.replace(tmp_path, directory / part)
+    finally:
+        if writer is not None:
+            writer.close()
+        tmp_path.unlink(missing_ok=True)
+
+    # The watermark moves only once the part is complete
+    state['files'] = {**state['files'], **progress}
+    if rows:
+        state['parts'].append({'file': part, 'rows': rows, 'format': fmt,
+                               'exported_at': datetime.now().isoformat(timespec='seconds')})
+    save_state(directory, state)
+    return {'rows': rows, 'part': part if rows else None, 'format': fmt, 'columns': len(columns)}
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m backend.export',
+                                     description='Export stored submissions as columnar files')
+    parser.add_argument('directory', help='Export directory (part files and the watermark)')
+    parser.add_argument('--format', default='auto', choices=('auto',) + FORMATS,
+                        help='auto = parquet when pyarrow is installed, otherwise csv.gz')
+    parser.add_argument('--full', action='store_true', help='Export everything, not only what is new')
+    parser.add_argument('--user', help='Only this user email')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    if args.format == 'parquet' and not PARQUET_AVAILABLE:
+        parser.error('Parquet export needs pyarrow (pip install pyarrow); use --format csv.gz')
+
+    # Model loading prints progress; keep it with the job's log
+    with contextlib.redirect_stdout(sys.stderr):
+        summary = run_export(args.directory, args.format, full=args.full, user_email=args.user,
+                             chunk_size=args.chunk_size)
+    if summary['part']:
+        print(f"✓ Exported {summary['rows']} submissions ({summary['columns']} columns) -> "
+              f"{Path(args.directory) / summary['part']}", file=sys.stderr)
+    else:
+        print("✓ No new submissions since the last export", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
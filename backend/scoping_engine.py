@@ -3,15 +3,19 @@ FCC Scoping Tool - Main Backend Engine
 Orchestrates the complete scoping and effort estimation workflow
 """
 
-import json
-from pathlib import Path
+from collections.abc import Mapping
 from datetime import datetime
 
 from backend.core.scope_processor import ScopeDefinitionProcessor
 from backend.core.effort_calculator import EffortCalculator
 from backend.core.fte_calculator import FTEEffortsCalculator
-from backend.core.sow_report_generator import SOWReportGenerator
+from backend.core.result_records import RoleFTE, to_plain
+from backend.core.scoping_model import ScopingModel, current_model
 from backend.config import OUTPUT_DIR
+from backend.storage.codec import EXTENSIONS, pack_record, storage_compression, write_json_file
+
+# SOWReportGenerator (python-docx/lxml) is imported in generate_report() so that
+# scoring-only processes never pay for the report dependencies.
 
 
 class ScopingEngine:
@@ -24,9 +28,15 @@ class ScopingEngine:
     5. Generate reports
     """
     
-    def __init__(self):
-        self.scope_processor = ScopeDefinitionProcessor()
-        self.fte_calculator = FTEEffortsCalculator()
+    def __init__(self, model: ScopingModel = None):
+        """
+        Args:
+            model: Scoping model snapshot (default: the current version, kept for
+                   every step of this engine even if a newer one is activated)
+        """
+        self.model = model or current_model()
+        self.scope_processor = ScopeDefinitionProcessor(self.model)
+        self.fte_calculator = FTEEffortsCalculator(self.model)
         self.scope_result = None
         self.effort_result = None
         self.fte_result = None
@@ -80,7 +90,7 @@ class ScopingEngine:
         print("STEP 2: CALCULATING EFFORT ESTIMATION")
         print("="*80)
         
-        calculator = EffortCalculator(self.scope_result)
+        calculator = EffortCalculator(self.scope_result, self.model)
         effort_estimation = calculator.calculate_effort()
         summary = calculator.generate_summary(effort_estimation)
         
@@ -121,11 +131,7 @@ class ScopingEngine:
         
         for role in selected_roles:
             hours = role_fte.get(role, 0)
-            fte_result[role] = {
-                'hours': hours,
-                'days': hours / 8,
-                'months': (hours / 8) / 30
-            }
+            fte_result[role] = RoleFTE(hours, hours / 8, (hours / 8) / 30)
             total_fte_hours += hours
         
         self.fte_result = {
@@ -142,26 +148,20 @@ class ScopingEngine:
         
         return self.fte_result
     
-    def generate_report(self, output_filename: str = None) -> dict:
+    def build_report(self) -> dict:
         """
-        Generate complete scoping report (JSON + Word document)
-        
-        Args:
-            output_filename: Optional custom filename
+        Assemble the JSON report from the computed results
         
         Returns:
-            Complete report data with file paths
+            Report dict (scope definition, effort estimation and FTE allocation if calculated),
+            plain dicts and lists only
         """
         if not self.scope_result or not self.effort_result:
             raise ValueError("Must process scope and calculate effort before generating report")
         
-        print("\n" + "="*80)
-        print("GENERATING REPORT")
-        print("="*80)
-        
-        # Generate JSON report
         report = {
             'generated_at': datetime.now().isoformat(),
+            'model_version': self.model.version,
             'scope_definition': {
                 'total_weightage': self.scope_result['total_weightage'],
                 'tier': self.scope_result['tier'],
@@ -169,17 +169,75 @@ class ScopingEngine:
                 'tier_range': self.scope_result['tier_range'],
                 'selected_roles': self.scope_result['selected_roles'],
                 'summary': self.scope_result['summary'],
-                'metrics': self.scope_result['metrics']
+                'metrics': to_plain(self.scope_result['metrics'])
             },
             'effort_estimation': {
                 'summary': self.effort_result['summary'],
-                'categories': self.effort_result['categories']
+                'categories': to_plain(self.effort_result['categories'])
             }
         }
         
         # Add FTE allocation if available
         if self.fte_result:
-            report['fte_allocation'] = self.fte_result
+            report['fte_allocation'] = to_plain(self.fte_result)
+        
+        return report
+    
+    def build_calculation_result(self) -> dict:
+        """
+        Assemble the result stored with a submission (the history/result API format)
+        
+        Returns:
+            Calculation result with effort categories as {category: hours}, plain dicts
+            and lists only
+        """
+        if not self.scope_result or not self.effort_result or not self.fte_result:
+            raise ValueError("Must process scope, calculate effort and FTE allocation first")
+        
+        # Transform effort categories to simple {category: hours} format for frontend
+        effort_categories_simple = {}
+        for category, data in self.effort_result['categories'].items():
+            if isinstance(data, Mapping) and 'final_estimate' in data:
+                effort_categories_simple[category] = data['final_estimate']
+            else:
+                effort_categories_simple[category] = 0
+        
+        return to_plain({
+            'scope_definition': self.scope_result,
+            'effort_estimation': {
+                'summary': self.effort_result.get('summary', {}),
+                'categories': effort_categories_simple  # Use simple format
+            },
+            'fte_allocation': self.fte_result,
+            'tier': self.scope_result.get('tier_name', 'N/A'),
+            'total_weightage': self.scope_result.get('total_weightage', 0),
+            'model_version': self.model.version,
+            'total_hours': self.fte_result.get('total_hours', 0),
+            'total_days': self.fte_result.get('total_days', 0),
+            'total_months': self.fte_result.get('total_months', 0),
+        })
+    
+    def generate_report(self, output_filename: str = None, report_service=None) -> dict:
+        """
+        Generate complete scoping report (JSON + Word document)
+        
+        Args:
+            output_filename: Optional custom filename
+            report_service: Optional ReportService - builds the Word document in a
+                            worker process instead of on the calling thread
+        
+        Returns:
+            Complete report data with file paths
+        """
+        if not self.scope_result or not self.effort_result:
+            raise ValueError("Must process scope and calculate effort before generating report")
+        
+        print("\n" + "="*80)
+        print("GENERATING REPORT")
+        print("="*80)
+        
+        # Generate JSON report
+        report = self.build_report()
         
         # Save JSON report
         OUTPUT_DIR.mkdir(exist_ok=True)
@@ -191,16 +249,12 @@ class ScopingEngine:
             # Remove extension if provided
             output_filename = output_filename.replace('.json', '').replace('.docx', '')
         
-        json_path = OUTPUT_DIR / f'{output_filename}.json'
-        
-        with open(json_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        # Compact and compressed like the stored results (read back with backend.storage.codec)
+        json_path = OUTPUT_DIR / f'{output_filename}.json{EXTENSIONS[storage_compression()]}'
+        write_json_file(json_path, pack_record(report))
         
         print(f"\n[OK] JSON Report saved to: {json_path}")
         
-        # Generate Word document report
-        sow_generator = SOWReportGenerator()
-        
         # Prepare FTE allocation for Word doc
         fte_for_word = {}
         if self.fte_result:
@@ -211,7 +265,8 @@ class ScopingEngine:
         # Don't add extra timestamp - output_filename already has one
         docx_filename = f'{output_filename.replace(".json", "")}.docx'
         
-        docx_path = sow_generator.generate_word_document(
+        # Generate Word document report
+        word_args = (
             self.scope_result,
             self.effort_result['categories'],
             self.effort_result['summary'],
@@ -219,6 +274,11 @@ class ScopingEngine:
             self.scope_inputs_dict,
             OUTPUT_DIR / docx_filename
         )
+        if report_service is not None:
+            docx_path = report_service.generate(*word_args)
+        else:
+            from backend.core.sow_report_generator import SOWReportGenerator
+            docx_path = SOWReportGenerator().generate_word_document(*word_args)
         
         print(f"[OK] Word Report saved to: {docx_path}")
         
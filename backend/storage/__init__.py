@@ -0,0 +1 @@
+# Stored Submissions
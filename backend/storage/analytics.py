@@ -0,0 +1,277 @@
+"""
+Cross-User Analytics Rollups
+
+Aggregates over every stored submission (tier distribution, hours per tier,
+role selection, in-scope features), kept up to date as submissions are saved
+instead of reading every user_*.json on request:
+
+    RESULTS_DIR/analytics.json
+
+holds running counts and sums. save_user_result adds each new submission to
+it and delete_user_results takes them out again; serving the dashboard numbers
+only derives averages and top-N lists from those totals, independent of the
+number of submissions.
+
+Several server processes share the file: each update re-reads it and writes
+it back while holding an exclusive lock on analytics.json.lock, so concurrent
+saves don't overwrite each other's totals. The rollup is built from the stored
+results when the file is missing (first use, or deleted) or was written by an
+older format. To rebuild it explicitly:
+
+    python -m backend.storage.analytics --rebuild
+"""
+
+import argparse
+import json
+import sys
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: updates are only serialized within the process
+    fcntl = None
+
+from backend.storage.codec import read_json_file, write_json_file
+
+# Bump when the rollup layout changes; older files are rebuilt
+ROLLUP_FORMAT = 1
+ANALYTICS_FILE_NAME = 'analytics.json'
+# Entries in the most-selected roles / most common features lists
+DEFAULT_TOP = 10
+
+
+def empty_rollup() -> Dict[str, Any]:
+    return {
+        'format': ROLLUP_FORMAT,
+        'updated_at': None,
+        'submissions': 0,
+        'users': {},           # email -> submissions
+        'tiers': {},           # tier name -> {'submissions', 'weightage', 'effort_hours', 'role_hours'}
+        'roles': {},           # role -> {'selected', 'hours'}
+        'features': {},        # metric -> submissions with it in scope
+        'model_versions': {},  # version -> submissions
+        'months': {},          # YYYY-MM -> submissions
+    }
+
+
+def _count(counts: Dict[str, int], key: str, sign: int):
+    counts[key] = counts.get(key, 0) + sign
+    if counts[key] <= 0:
+        del counts[key]
+
+
+def _apply(rollup: Dict[str, Any], submission: Dict[str, Any], sign: int):
+    result = submission.get('calculation_result') or {}
+    scope = result.get('scope_definition') or {}
+    effort_hours = (result.get('effort_estimation') or {}).get('summary', {}).get('total_time_hours') or 0
+
+    rollup['submissions'] += sign
+    _count(rollup['users'], submission.get('user_email') or 'unknown', sign)
+
+    tier_name = result.get('tier') or 'N/A'
+    tier = rollup['tiers'].setdefault(tier_name, {
+        'submissions': 0, 'weightage': 0, 'effort_hours': 0, 'role_hours': 0,
+    })
+    tier['submissions'] += sign
+    tier['weightage'] += sign * (result.get('total_weightage') or 0)
+    tier['effort_hours'] += sign * effort_hours
+    tier['role_hours'] += sign * (result.get('total_hours') or 0)
+    if tier['submissions'] <= 0:
+        del rollup['tiers'][tier_name]
+
+    by_role = (result.get('fte_allocation') or {}).get('by_role') or {}
+    for role in submission.get('selected_roles') or by_role:
+        totals = rollup['roles'].setdefault(role, {'selected': 0, 'hours': 0})
+        totals['selected'] += sign
+        totals['hours'] += sign * ((by_role.get(role) or {}).get('hours') or 0)
+        if totals['selected'] <= 0:
+            del rollup['roles'][role]
+
+    for metric in scope.get('metrics') or []:
+        if metric.get('in_scope') == 'YES':
+            _count(rollup['features'], metric['name'], sign)
+
+    _count(rollup['model_versions'], result.get('model_version') or 'unknown', sign)
+    _count(rollup['months'], (submission.get('submitted_at') or '')[:7] or 'unknown', sign)
+    rollup['updated_at'] = datetime.now().isoformat(timespec='seconds')
+
+
+def add_submission(rollup: Dict[str, Any], submission: Dict[str, Any]):
+    """Add one stored submission to the rollup totals (in place)"""
+    _apply(rollup, submission, 1)
+
+
+def remove_submission(rollup: Dict[str, Any], submission: Dict[str, Any]):
+    """Take a deleted submission out of the rollup totals (in place)"""
+    _apply(rollup, submission, -1)
+
+
+def build_rollup(submissions: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    rollup = empty_rollup()
+    for submission in submissions:
+        add_submission(rollup, submission)
+    rollup['updated_at'] = datetime.now().isoformat(timespec='seconds')
+    return rollup
+
+
+def _top(counts: Dict[str, int], top: int):
+    return [{'name': name, 'count': count}
+            for name, count in sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:top]]
+
+
+def analytics_view(rollup: Dict[str, Any], top: int = DEFAULT_TOP) -> Dict[str, Any]:
+    """Dashboard numbers from the rollup totals"""
+    total = rollup['submissions']
+    tiers = {
+        name: {
+            'submissions': data['submissions'],
+            'share': round(data['submissions'] / total, 4) if total else 0,
+            'avg_weightage': round(data['weightage'] / data['submissions'], 2),
+            'avg_effort_hours': round(data['effort_hours'] / data['submissions'], 2),
+            'avg_role_hours': round(data['role_hours'] / data['submissions'], 2),
+        }
+        for name, data in sorted(rollup['tiers'].items())
+    }
+    roles = sorted(rollup['roles'].items(), key=lambda item: (-item[1]['selected'], item[0]))[:top]
+
+    return {
+        'updated_at': rollup['updated_at'],
+        'submissions': total,
+        'users': len(rollup['users']),
+        'tier_distribution': tiers,
+        'top_roles': [
+            {'name': role, 'count': data['selected'],
+             'share': round(data['selected'] / total, 4) if total else 0,
+             'avg_hours': round(data['hours'] / data['selected'], 2)}
+            for role, data in roles
+        ],
+        'top_features': [dict(entry, share=round(entry['count'] / total, 4) if total else 0)
+                         for entry in _top(rollup['features'], top)],
+        'model_versions': dict(rollup['model_versions']),
+        'submissions_by_month': dict(sorted(rollup['months'].items())),
+    }
+
+
+class RollupStore:
+    """
+    The rollup file plus its in-memory copy
+
+    The copy is reloaded when the file changes on disk (another process saved)
+    and built from `source` (all stored submissions) when the file is missing
+    or in an older format.
+    """
+
+    def __init__(self, path: Path, source: Callable[[], Iterable[Dict[str, Any]]]):
+        self.path = Path(path)
+        self.source = source
+        self.lock_path = self.path.with_name(self.path.name + '.lock')
+        self._lock = threading.Lock()
+        self._rollup = None
+        self._stamp = None
+
+    @contextmanager
+    def _locked(self):
+        """Hold the thread lock plus an exclusive lock on the rollup across processes"""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _file_stamp(self):
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _write_locked(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Atomic, with a temp file per writer (several server processes share the file)
+        write_json_file(self.path, self._rollup)
+        self._stamp = self._file_stamp()
+
+    def _rebuild_locked(self):
+        print(f"Building analytics rollup from stored results -> {self.path}")
+        self._rollup = build_rollup(self.source())
+        self._write_locked()
+
+    def _load_locked(self, reread: bool = False) -> bool:
+        """
+        Bring the in-memory copy up to date; True if it was rebuilt from the stored results
+
+        `reread` skips the (mtime, size) check, which can miss a same-size write
+        within the file system's timestamp resolution; updates always re-read.
+        """
+        stamp = self._file_stamp()
+        if not reread and self._rollup is not None and stamp is not None and stamp == self._stamp:
+            return False
+        if stamp is not None:
+            try:
+                rollup = read_json_file(self.path)
+                if rollup.get('format') == ROLLUP_FORMAT:
+                    self._rollup, self._stamp = rollup, stamp
+                    return False
+            except Exception as e:
+                print(f"Unreadable analytics rollup {self.path}: {e}")
+        self._rebuild_locked()
+        return True
+
+    def record(self, submission: Dict[str, Any]):
+        """Add a submission that has just been saved"""
+        with self._locked():
+            # A rebuild reads the stored results, which already include it
+            if not self._load_locked(reread=True):
+                add_submission(self._rollup, submission)
+                self._write_locked()
+
+    def forget(self, submissions: Iterable[Dict[str, Any]]):
+        """Remove submissions that have just been deleted from the stored results"""
+        with self._locked():
+            # A rebuild reads the stored results, which no longer include them
+            if not self._load_locked(reread=True):
+                for submission in submissions:
+                    remove_submission(self._rollup, submission)
+                self._write_locked()
+
+    def view(self, top: int = DEFAULT_TOP) -> Dict[str, Any]:
+        # Locked too, as a missing or outdated file is rebuilt and written
+        with self._locked():
+            self._load_locked()
+            return analytics_view(self._rollup, top)
+
+    def rebuild(self) -> Dict[str, Any]:
+        with self._locked():
+            self._rebuild_locked()
+            return analytics_view(self._rollup)
+
+
+def main(argv: Optional[list] = None) -> int:
+    from backend.storage.results import get_analytics_store
+
+    parser = argparse.ArgumentParser(prog='python -m backend.storage.analytics',
+                                     description='Show or rebuild the cross-user analytics rollup')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild from every stored submission')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP)
+    args = parser.parse_args(argv)
+
+    store = get_analytics_store()
+    if args.rebuild:
+        store.rebuild()
+    json.dump(store.view(args.top), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
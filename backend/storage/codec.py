@@ -0,0 +1,256 @@
+"""
+Storage Codec
+
+How stored results and JSON reports are laid out on disk:
+
+- compact JSON (no indentation or spaces), encoded by backend.utils.json_serializer
+- framed with gzip (default) or zstd, per STORAGE_COMPRESSION; readers detect
+  the framing from the file's first bytes, so plain JSON files written before
+  (or with STORAGE_COMPRESSION=none) keep working
+- the metrics of a scope definition, which repeat the full formula text of
+  each metric for every submission, are stored as a reference to the model
+  version plus a compact row per metric (name, row, flags, in_scope, details,
+  weightage) and expanded again when read; rows carry their own template
+  columns, so a later change to METRICS_TEMPLATE can't misread them
+
+Packing is lossless: a record is only packed when its model version is stored
+in MODEL_DIR (the built-in version is written there on first use, so records
+still expand after the formula CSVs change) and expanding it gives back the
+original metrics.
+
+    python -m backend.storage.codec decode output/results/user_a_at_b_com.json
+    python -m backend.storage.codec migrate     # rewrite every results file in the current format
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from backend.config import STORAGE_COMPRESSION
+from backend.core.scoping_model import get_registry
+from backend.data.excel_templates import METRICS_TEMPLATE
+from backend.utils import json_serializer
+
+COMPRESSIONS = ('gzip', 'zstd', 'none')
+# File name suffix of each framing (for files read outside this codec, e.g. JSON reports)
+EXTENSIONS = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 10
+
+PACKED_METRICS_KEY = 'metrics_packed'
+PACK_FORMAT = 2
+# Columns of a packed metric row; format 1 stored only the last three and took
+# the rest from METRICS_TEMPLATE by position
+PACKED_COLUMNS = ('name', 'row', 'is_details_required', 'is_sub_question', 'in_scope', 'details', 'weightage')
+
+_formulas_by_version = {}
+_stored_versions = set()
+_formulas_lock = threading.Lock()
+
+
+def storage_compression() -> str:
+    """The configured framing ('zstd' falls back to 'gzip' without the zstandard package)"""
+    compression = STORAGE_COMPRESSION if STORAGE_COMPRESSION in COMPRESSIONS else 'gzip'
+    if compression == 'zstd' and not ZSTD_AVAILABLE:
+        return 'gzip'
+    return compression
+
+
+# ----------------------------------------------------------------------
+# Framing
+# ----------------------------------------------------------------------
+
+def dumps(data: Any, compression: str = None) -> bytes:
+    """Compact JSON, framed with `compression` (default: the configured one)"""
+    raw = json_serializer.dumps(data)
+    compression = compression or storage_compression()
+    if compression == 'gzip':
+        # mtime=0: identical data gives identical bytes
+        return gzip.compress(raw, compresslevel=GZIP_LEVEL, mtime=0)
+    if compression == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return raw
+
+
+def loads(raw: bytes) -> Any:
+    """Parse JSON written by dumps() with any framing (or plain JSON)"""
+    if raw[:2] == GZIP_MAGIC:
+        raw = gzip.decompress(raw)
+    elif raw[:4] == ZSTD_MAGIC:
+        if not ZSTD_AVAILABLE:
+            raise ValueError('zstd-compressed data needs the zstandard package (pip install zstandard)')
+        raw = zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return json_serializer.loads(raw)
+
+
+def read_json_file(path: Path) -> Any:
+    with open(path, 'rb') as f:
+        return loads(f.read())
+
+
+def write_json_file(path: Path, data: Any, compression: str = None):
+    """Write atomically (readers never see a partly written file; concurrent writers don't collide)"""
+    path = Path(path)
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(dumps(data, compression))
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+# ----------------------------------------------------------------------
+# Metrics packing
+# ----------------------------------------------------------------------
+
+def _model_formulas(version: str) -> Dict[str, str]:
+    """Formulas of a model version (versions are immutable, so cached for good)"""
+    with _formulas_lock:
+        if version not in _formulas_by_version:
+            _formulas_by_version[version] = dict(get_registry().load(version).formulas)
+        return _formulas_by_version[version]
+
+
+def _is_stored(version: str) -> bool:
+    """Whether a model version is stored in MODEL_DIR (storing the built-in version if it is that one)"""
+    with _formulas_lock:
+        if version in _stored_versions:
+            return True
+        try:
+            get_registry().ensure_stored(version)
+        except (KeyError, OSError) as e:
+            print(f"Model version {version} is not stored, keeping metrics unpacked: {e!r}")
+            return False
+        _stored_versions.add(version)
+        return True
+
+
+def _expand_metrics(packed: Dict[str, Any]) -> list:
+    formulas = _model_formulas(packed['model_version'])
+    if packed.get('format', 1) == 1:
+        if len(packed['values']) != len(METRICS_TEMPLATE):
+            raise ValueError('Packed metrics do not match the metrics template')
+        rows = [(template['name'], template['row'], template['is_details_required'], template['is_sub_question'],
+                 *values) for template, values in zip(METRICS_TEMPLATE, packed['values'])]
+    else:
+        rows = packed['values']
+    return [
+        {
+            'row': row,
+            'name': name,
+            'in_scope': in_scope,
+            'details': details,
+            'weightage': weightage,
+            'feature_clean': name,
+            'in_scope_flag': 1 if in_scope == 'YES' else 0,
+            'is_details_required': is_details_required,
+            'is_sub_question': is_sub_question,
+            'formula': formulas.get(name, ''),
+        }
+        for name, row, is_details_required, is_sub_question, in_scope, details, weightage in rows
+    ]
+
+
+def _replace_key(data: Dict[str, Any], old: str, new: str, value: Any) -> Dict[str, Any]:
+    """Copy of data with key `old` replaced by `new` at the same position"""
+    return {(new if key == old else key): (value if key == old else item) for key, item in data.items()}
+
+
+def _scope_holder(record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The dict holding scope_definition: the calculation result of a stored submission, or a report itself"""
+    holder = record.get('calculation_result') if isinstance(record.get('calculation_result'), dict) else record
+    return holder if isinstance(holder.get('scope_definition'), dict) else None
+
+
+def _with_scope(record: Dict[str, Any], holder: Dict[str, Any], scope: Dict[str, Any]) -> Dict[str, Any]:
+    holder = dict(holder, scope_definition=scope)
+    if holder is record or 'scope_definition' in record:
+        return holder
+    return dict(record, calculation_result=holder)
+
+
+def pack_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Storage form of a stored submission, recomputed result or JSON report
+
+    Returns a new dict (the input is not modified); records that can't be
+    packed losslessly are returned as they are.
+    """
+    holder = _scope_holder(record)
+    if holder is None:
+        return record
+    scope = holder['scope_definition']
+    metrics = scope.get('metrics')
+    version = holder.get('model_version') or scope.get('model_version')
+    if not metrics or not version or not _is_stored(version):
+        return record
+
+    try:
+        packed = {
+            'format': PACK_FORMAT,
+            'model_version': version,
+            'values': [[metric[column] for column in PACKED_COLUMNS] for metric in metrics],
+        }
+        if _expand_metrics(packed) != metrics:
+            return record
+    except Exception:
+        return record
+    return _with_scope(record, holder, _replace_key(scope, 'metrics', PACKED_METRICS_KEY, packed))
+
+
+def unpack_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """The original form of a record written by pack_record() (others are returned as they are)"""
+    holder = _scope_holder(record)
+    if holder is None or PACKED_METRICS_KEY not in holder['scope_definition']:
+        return record
+    scope = holder['scope_definition']
+    try:
+        metrics = _expand_metrics(scope[PACKED_METRICS_KEY])
+    except Exception as e:
+        print(f"Error expanding stored metrics of {record.get('submission_id', 'record')}: {e}")
+        return record
+    return _with_scope(record, holder, _replace_key(scope, PACKED_METRICS_KEY, 'metrics', metrics))
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m backend.storage.codec',
+                                     description='Inspect or migrate stored results')
+    commands = parser.add_subparsers(dest='command', required=True)
+    decode = commands.add_parser('decode', help='Print a stored file as plain, expanded JSON')
+    decode.add_argument('path')
+    commands.add_parser('migrate', help='Rewrite every results file in the current storage format')
+    args = parser.parse_args(argv)
+
+    if args.command == 'decode':
+        data = read_json_file(args.path)
+        data = [unpack_record(item) for item in data] if isinstance(data, list) else unpack_record(data)
+        json.dump(data, sys.stdout, indent=2)
+        print()
+        return 0
+
+    from backend.storage.results import RESULTS_DIR
+    before = after = 0
+    for path in sorted(RESULTS_DIR.glob('user_*.json')):
+        before += path.stat().st_size
+        write_json_file(path, [pack_record(unpack_record(item)) for item in read_json_file(path)])
+        after += path.stat().st_size
+    print(f"✓ Rewrote results files: {before:,} -> {after:,} bytes ({storage_compression()})", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,286 @@
+"""
+Stored Submission Results
+
+Each user's submissions live in RESULTS_DIR/user_<email>.json (a JSON list,
+appended to by the submit endpoint). Files are written through
+backend.storage.codec (compact, compressed JSON with the static model data of
+each submission replaced by its model version); the name keeps its .json
+suffix and reads detect the framing, so older plain JSON files stay readable.
+
+Results recomputed under another model version (backend.backfill) are kept
+alongside, never in place of, the original:
+
+    RESULTS_DIR/recomputed/<model_version>/user_<email>.ndjson
+
+one record per line, appended as the backfill runs. The live results files
+are never rewritten by a backfill, so it can run while users submit.
+
+Every save also updates the cross-user analytics rollup
+(backend.storage.analytics, RESULTS_DIR/analytics.json) and the submission
+search index (backend.storage.search_index, RESULTS_DIR/search_index.sqlite3).
+
+Lookups by submission ID go through an in-memory index of each parsed results
+file, reused until the file's mtime or size changes, so users with long
+histories don't pay for a full JSON parse on every request.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from backend.config import OUTPUT_DIR, RESULTS_CACHE_FILES
+from backend.storage.analytics import ANALYTICS_FILE_NAME, RollupStore
+from backend.storage.codec import pack_record, read_json_file, unpack_record, write_json_file
+from backend.storage.search_index import INDEX_FILE_NAME, SearchIndex
+from backend.utils import json_serializer
+
+RESULTS_DIR = OUTPUT_DIR / 'results'
+RECOMPUTED_DIR = RESULTS_DIR / 'recomputed'
+
+
+def safe_email(user_email: str) -> str:
+    """Email as used in file names and submission IDs"""
+    return user_email.replace('@', '_at_').replace('.', '_')
+
+
+def get_user_results_file(user_email):
+    """Get the path to user's results JSON file"""
+    return RESULTS_DIR / f'user_{safe_email(user_email)}.json'
+
+
+def _read_results_file(results_file: Path) -> List[Dict[str, Any]]:
+    """Results as stored (packed); [] if the file doesn't exist"""
+    if not results_file.exists():
+        return []
+    return read_json_file(results_file)
+
+
+def load_user_results(user_email):
+    """Load user's previous results from JSON file"""
+    try:
+        return [unpack_record(result) for result in _read_results_file(get_user_results_file(user_email))]
+    except Exception as e:
+        print(f"Error loading user results: {e}")
+        return []
+
+
+def save_user_result(user_email, result_data):
+    """Save a new result to user's JSON file"""
+    results_file = get_user_results_file(user_email)
+
+    try:
+        # Earlier results are kept as stored; only the new one is packed
+        results = _read_results_file(results_file)
+    except Exception as e:
+        print(f"Error loading user results: {e}")
+        results = []
+
+    # Add new result
+    results.append(pack_record(result_data))
+
+    # Save back to file
+    try:
+        write_json_file(results_file, results)
+    except Exception as e:
+        print(f"Error saving user result: {e}")
+        return False
+    
+    _update_derived('analytics rollup', lambda: get_analytics_store().record(result_data))
+    _update_derived('search index', lambda: get_search_index().add(result_data))
+    return True
+
+
+def _update_derived(name, update):
+    # The results file is the record; a failed rollup/index update must not fail the save
+    try:
+        update()
+    except Exception as e:
+        print(f"Error updating {name}: {e}")
+
+
+def delete_user_results(user_email: str) -> int:
+    """
+    Delete a user's results file (and its submissions from the analytics rollup
+    and the search index)
+    
+    Returns:
+        Number of submissions deleted
+    """
+    results_file = get_user_results_file(user_email)
+    if not results_file.exists():
+        return 0
+    results = load_user_results(user_email)
+    results_file.unlink(missing_ok=True)
+    _update_derived('analytics rollup', lambda: get_analytics_store().forget(results))
+    _update_derived('search index',
+                    lambda: get_search_index().remove(result.get('submission_id') for result in results))
+    return len(results)
+
+
+_analytics_stores = {}
+_derived_lock = threading.Lock()
+
+
+def get_analytics_store() -> RollupStore:
+    """The analytics rollup of RESULTS_DIR (one store per directory per process)"""
+    path = RESULTS_DIR / ANALYTICS_FILE_NAME
+    with _derived_lock:
+        if path not in _analytics_stores:
+            _analytics_stores[path] = RollupStore(
+                path, lambda: (submission for _, submission in iter_stored_submissions())
+            )
+        return _analytics_stores[path]
+
+
+_search_indexes = {}
+
+
+def get_search_index() -> SearchIndex:
+    """The submission search index of RESULTS_DIR (one per directory per process)"""
+    path = RESULTS_DIR / INDEX_FILE_NAME
+    with _derived_lock:
+        if path not in _search_indexes:
+            _search_indexes[path] = SearchIndex(
+                path, lambda: (submission for _, submission in iter_stored_submissions())
+            )
+        return _search_indexes[path]
+
+
+class SubmissionIndexCache:
+    """
+    Parsed results files by path (LRU), as {submission_id: submission}
+    
+    An entry is reused while the file's (mtime, size) is unchanged; results
+    files are rewritten whole on every save, so any save invalidates it.
+    Cached submissions are shared between callers and must not be modified.
+    """
+    
+    def __init__(self, max_files: int = RESULTS_CACHE_FILES):
+        self.max_files = max_files
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, path: Path) -> Dict[str, Dict[str, Any]]:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return {}
+        key = (stat.st_mtime_ns, stat.st_size)
+        
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == key:
+                self._entries.move_to_end(path)
+                return entry[1]
+        
+        try:
+            index = {result.get('submission_id'): unpack_record(result) for result in read_json_file(path)}
+        except Exception as e:
+            print(f"Error loading user results: {e}")
+            return {}
+        
+        with self._lock:
+            self._entries[path] = (key, index)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_files:
+                self._entries.popitem(last=False)
+        return index
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+_submission_index = SubmissionIndexCache()
+
+
+def find_user_submission(user_email: str, submission_id: str) -> Optional[Dict[str, Any]]:
+    """A stored submission by ID (None if not found); treat the result as read-only"""
+    return _submission_index.get(get_user_results_file(user_email)).get(submission_id)
+
+
+def iter_stored_submissions(user_email: str = None) -> Iterator[Tuple[Path, Dict[str, Any]]]:
+    """
+    Stream stored submissions one user file at a time
+
+    Args:
+        user_email: Only this user's submissions (default: everyone's)
+
+    Yields:
+        (results_file, submission)
+    """
+    if user_email:
+        result_files = [get_user_results_file(user_email)]
+    else:
+        result_files = sorted(RESULTS_DIR.glob('user_*.json'))
+
+    for results_file in result_files:
+        if not results_file.exists():
+            continue
+        try:
+            results = read_json_file(results_file)
+        except Exception as e:
+            print(f"Skipping unreadable results file {results_file}: {e}")
+            continue
+        for submission in results:
+            yield results_file, unpack_record(submission)
+
+
+# ----------------------------------------------------------------------
+# Recomputed results
+# ----------------------------------------------------------------------
+
+def get_recomputed_file(user_email: str, model_version: str) -> Path:
+    """Path of a user's recomputed results for one model version"""
+    return RECOMPUTED_DIR / model_version / f'user_{safe_email(user_email)}.ndjson'
+
+
+def append_recomputed(user_email: str, model_version: str, records: List[Dict[str, Any]]):
+    """Append recomputed result records for one user"""
+    path = get_recomputed_file(user_email, model_version)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as f:
+        # After an interrupted write, start on a fresh line (the partial one is skipped on read)
+        if f.tell() > 0:
+            f.seek(-1, 2)
+            if f.read(1) != b'\n':
+                f.write(b'\n')
+        f.write(b''.join(json_serializer.dumps(pack_record(record)) + b'\n' for record in records))
+
+
+def _read_recomputed_file(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json_serializer.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial line from an interrupted write
+            yield unpack_record(record)
+
+
+def iter_recomputed(model_version: str) -> Iterator[Dict[str, Any]]:
+    """Every recomputed record stored for a model version (later records win on repeats)"""
+    for path in sorted((RECOMPUTED_DIR / model_version).glob('user_*.ndjson')):
+        yield from _read_recomputed_file(path)
+
+
+def load_recomputed_versions(user_email: str, submission_id: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Recomputed results of one submission
+
+    Returns:
+        model_version -> recomputed record
+    """
+    versions = {}
+    if not RECOMPUTED_DIR.exists():
+        return versions
+    for version_dir in sorted(RECOMPUTED_DIR.iterdir()):
+        path = version_dir / f'user_{safe_email(user_email)}.ndjson'
+        if not path.exists():
+            continue
+        for record in _read_recomputed_file(path):
+            if record.get('submission_id') == submission_id:
+                versions[version_dir.name] = record
+    return versions
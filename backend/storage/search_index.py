@@ -0,0 +1,420 @@
+"""
+Submission Search Index
+
+An embedded SQLite database next to the results files,
+
+    RESULTS_DIR/search_index.sqlite3
+
+with one row per stored submission (client, project, tier, submission time,
+weightage, hours, in-scope features) and secondary indexes on the filter and
+sort columns. save_user_result adds each new submission and
+delete_user_results removes them, so queries across every user's history are
+answered from the indexes without reading any results file.
+
+In-scope features are kept as bit masks (bit i of the masks = metric i of
+METRICS_TEMPLATE), so "all of these features in scope" is an integer AND per
+row rather than a join.
+
+The index is built from the stored results when the database is missing, was
+created by an older schema or with a different metric list. To rebuild it explicitly:
+
+    python -m backend.storage.search_index --rebuild
+"""
+
+import argparse
+import json
+import math
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from backend.data.excel_templates import METRICS_TEMPLATE
+
+# Bump when the tables change; older databases are rebuilt
+SCHEMA_VERSION = 1
+INDEX_FILE_NAME = 'search_index.sqlite3'
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+# Rows per INSERT batch while building
+BUILD_BATCH_SIZE = 1000
+
+# Feature bit positions; 62 per mask column keeps masks positive 64-bit integers
+FEATURES = [metric['name'] for metric in METRICS_TEMPLATE]
+BITS_PER_MASK = 62
+MASK_COLUMNS = [f'scope_mask_{i}' for i in range(math.ceil(len(FEATURES) / BITS_PER_MASK))]
+FEATURE_BITS = {name: divmod(position, BITS_PER_MASK) for position, name in enumerate(FEATURES)}
+
+# Query sort keys -> columns
+SORT_COLUMNS = {
+    'submitted_at': 'submitted_ts',
+    'client_name': 'client_key',
+    'project_name': 'project_key',
+    'tier': 'tier',
+    'total_weightage': 'total_weightage',
+    'total_hours': 'total_hours',
+    'effort_hours': 'effort_hours',
+}
+
+_MASK_DEFINITIONS = ''.join(f',\n        {column} INTEGER NOT NULL DEFAULT 0' for column in MASK_COLUMNS)
+
+SCHEMA = [
+    f'''CREATE TABLE submissions (
+        submission_id TEXT PRIMARY KEY,
+        user_email TEXT,
+        user_name TEXT,
+        client_name TEXT,
+        client_key TEXT,
+        project_name TEXT,
+        project_key TEXT,
+        submitted_at TEXT,
+        submitted_ts TEXT,
+        status TEXT,
+        tier INTEGER,
+        tier_name TEXT,
+        total_weightage REAL,
+        effort_hours REAL,
+        total_hours REAL,
+        total_days REAL,
+        total_months REAL,
+        model_version TEXT{_MASK_DEFINITIONS}
+    )''',
+    'CREATE TABLE index_meta (key TEXT PRIMARY KEY, value TEXT)',
+    'CREATE INDEX idx_submissions_user ON submissions (user_email, submitted_ts)',
+    'CREATE INDEX idx_submissions_client ON submissions (client_key, submitted_ts)',
+    'CREATE INDEX idx_submissions_project ON submissions (project_key, submitted_ts)',
+    'CREATE INDEX idx_submissions_tier ON submissions (tier, submitted_ts)',
+    'CREATE INDEX idx_submissions_tier_hours ON submissions (tier, total_hours)',
+    'CREATE INDEX idx_submissions_submitted ON submissions (submitted_ts)',
+    'CREATE INDEX idx_submissions_hours ON submissions (total_hours)',
+    'CREATE INDEX idx_submissions_effort_hours ON submissions (effort_hours)',
+    'CREATE INDEX idx_submissions_weightage ON submissions (total_weightage)',
+]
+
+COLUMNS = ['submission_id', 'user_email', 'user_name', 'client_name', 'client_key', 'project_name',
+           'project_key', 'submitted_at', 'submitted_ts', 'status', 'tier', 'tier_name', 'total_weightage',
+           'effort_hours', 'total_hours', 'total_days', 'total_months', 'model_version'] + MASK_COLUMNS
+
+
+def search_key(value: Optional[str]) -> str:
+    """Case-insensitive form of a client/project name (as filtered on)"""
+    return (value or '').strip().lower()
+
+
+def timestamp_key(value) -> Optional[str]:
+    """Sortable form of a submitted_at value or datetime (None if unparseable)"""
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat(timespec='microseconds')
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    return parsed.replace(tzinfo=None).isoformat(timespec='microseconds')
+
+
+def index_row(submission: Dict[str, Any]) -> tuple:
+    """Column values (COLUMNS order) of a stored submission"""
+    result = submission.get('calculation_result') or {}
+    effort_summary = (result.get('effort_estimation') or {}).get('summary') or {}
+    return (
+        submission.get('submission_id'),
+        submission.get('user_email'),
+        submission.get('user_name'),
+        submission.get('client_name'),
+        search_key(submission.get('client_name')),
+        submission.get('project_name'),
+        search_key(submission.get('project_name')),
+        submission.get('submitted_at'),
+        timestamp_key(submission.get('submitted_at')),
+        submission.get('status', 'COMPLETED'),
+        (result.get('scope_definition') or {}).get('tier'),
+        result.get('tier'),
+        result.get('total_weightage'),
+        effort_summary.get('total_time_hours'),
+        result.get('total_hours'),
+        result.get('total_days'),
+        # History reports the effort estimate's duration as the submission's months
+        effort_summary.get('total_months'),
+        result.get('model_version'),
+        *feature_masks(
+            metric.get('name') for metric in (result.get('scope_definition') or {}).get('metrics') or []
+            if metric.get('in_scope') == 'YES'
+        ),
+    )
+
+
+def feature_masks(features: Iterable[str], strict: bool = False) -> List[int]:
+    """
+    Bit masks (MASK_COLUMNS order) of a set of features
+
+    Raises:
+        ValueError: strict and a feature is not a metric
+    """
+    masks = [0] * len(MASK_COLUMNS)
+    for feature in features:
+        if feature not in FEATURE_BITS:
+            if strict:
+                raise ValueError(f"Unknown feature '{feature}'")
+            continue
+        column, bit = FEATURE_BITS[feature]
+        masks[column] |= 1 << bit
+    return masks
+
+
+class SearchIndex:
+    """
+    SQLite index of stored submissions
+
+    Each call opens its own connection (safe across threads and processes);
+    WAL journaling lets queries run while a submission is being added.
+    """
+
+    def __init__(self, path: Path, source: Callable[[], Iterable[Dict[str, Any]]]):
+        """
+        Args:
+            path: Database file
+            source: All stored submissions (used to build a missing index)
+        """
+        self.path = Path(path)
+        self.source = source
+        self._lock = threading.Lock()
+        # Database file whose schema version has been checked
+        self._checked_inode = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        connection.execute('PRAGMA synchronous=NORMAL')
+        return connection
+
+    def _ensure(self) -> bool:
+        """Create/build the index if needed; True if it was just built from the stored results"""
+        try:
+            inode = self.path.stat().st_ino
+        except FileNotFoundError:
+            inode = None
+        if inode is not None and inode == self._checked_inode:
+            return False
+
+        with self._lock:
+            if inode is not None:
+                connection = self._connect()
+                try:
+                    version = connection.execute('PRAGMA user_version').fetchone()[0]
+                    features = connection.execute(
+                        "SELECT value FROM index_meta WHERE key = 'features'").fetchone() if version else None
+                finally:
+                    connection.close()
+                if version == SCHEMA_VERSION and features and json.loads(features[0]) == FEATURES:
+                    self._checked_inode = inode
+                    return False
+            self._build()
+            self._checked_inode = self.path.stat().st_ino
+            return True
+
+    def _build(self):
+        print(f"Building submission search index from stored results -> {self.path}")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        connection = self._connect()
+        # One explicit transaction (DDL included): queries see the old index until it commits
+        connection.isolation_level = None
+        try:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('BEGIN IMMEDIATE')
+            for (name,) in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall():
+                connection.execute(f'DROP TABLE IF EXISTS "{name}"')
+            for statement in SCHEMA:
+                connection.execute(statement)
+            batch = []
+            for submission in self.source():
+                batch.append(submission)
+                if len(batch) >= BUILD_BATCH_SIZE:
+                    self._insert(connection, batch)
+                    batch = []
+            self._insert(connection, batch)
+            connection.execute("INSERT INTO index_meta (key, value) VALUES ('features', ?)", (json.dumps(FEATURES),))
+            connection.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+            # Statistics for the query planner's choice between indexes
+            connection.execute('ANALYZE')
+            connection.execute('COMMIT')
+        except BaseException:
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+            raise
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _insert(connection: sqlite3.Connection, submissions: List[Dict[str, Any]]):
+        if not submissions:
+            return
+        connection.executemany(
+            f"INSERT OR REPLACE INTO submissions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            [index_row(submission) for submission in submissions]
+        )
+
+    def add(self, submission: Dict[str, Any]):
+        """Index a submission that has just been saved"""
+        # A build reads the stored results, which already include it
+        if self._ensure():
+            return
+        connection = self._connect()
+        try:
+            with connection:
+                self._insert(connection, [submission])
+        finally:
+            connection.close()
+
+    def remove(self, submission_ids: Iterable[str]):
+        """Drop submissions that have just been deleted from the stored results"""
+        if self._ensure():
+            return
+        ids = [(submission_id,) for submission_id in submission_ids]
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany('DELETE FROM submissions WHERE submission_id = ?', ids)
+        finally:
+            connection.close()
+
+    def rebuild(self) -> int:
+        """Rebuild from every stored submission; returns the number indexed"""
+        with self._lock:
+            self._build()
+        return self.count()
+
+    def count(self) -> int:
+        self._ensure()
+        connection = self._connect()
+        try:
+            return connection.execute('SELECT COUNT(*) FROM submissions').fetchone()[0]
+        finally:
+            connection.close()
+
+    def query(self, user_email: str = None, client_name: str = None, project_name: str = None,
+              tiers: List[int] = None, date_from: datetime = None, date_to: datetime = None,
+              min_hours: float = None, max_hours: float = None, features: List[str] = None,
+              sort: str = 'submitted_at', order: str = 'desc', page: int = 1,
+              page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+        """
+        Search stored submissions
+
+        Args:
+            user_email: Only this user's submissions
+            client_name: Case-insensitive prefix of the client name
+            project_name: Case-insensitive prefix of the project name
+            tiers: Tier numbers to include
+            date_from: Submitted at or after
+            date_to: Submitted at or before
+            min_hours: total_hours (role FTE hours) at least
+            max_hours: total_hours at most
+            features: Metric names that must all be in scope
+            sort: One of SORT_COLUMNS
+            order: 'asc' or 'desc'
+            page: 1-based page number
+            page_size: Rows per page (at most MAX_PAGE_SIZE)
+
+        Returns:
+            {'total', 'page', 'page_size', 'pages', 'submissions': [...]}
+
+        Raises:
+            ValueError: Unknown sort key/order/feature or invalid paging
+        """
+        if sort not in SORT_COLUMNS:
+            raise ValueError(f"Unsupported sort '{sort}'. Use one of: {', '.join(SORT_COLUMNS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        if page < 1 or not 1 <= page_size <= MAX_PAGE_SIZE:
+            raise ValueError(f'page must be at least 1 and page_size between 1 and {MAX_PAGE_SIZE}')
+
+        conditions, params = [], []
+        if user_email:
+            conditions.append('user_email = ?')
+            params.append(user_email)
+        for column, value in (('client_key', client_name), ('project_key', project_name)):
+            if value and search_key(value):
+                # Prefix as a range, so the index is used
+                conditions.append(f'{column} >= ? AND {column} < ?')
+                params += [search_key(value), search_key(value) + '\U0010ffff']
+        if tiers:
+            conditions.append(f"tier IN ({', '.join('?' * len(tiers))})")
+            params += list(tiers)
+        if date_from:
+            conditions.append('submitted_ts >= ?')
+            params.append(timestamp_key(date_from))
+        if date_to:
+            conditions.append('submitted_ts <= ?')
+            params.append(timestamp_key(date_to))
+        if min_hours is not None:
+            conditions.append('total_hours >= ?')
+            params.append(min_hours)
+        if max_hours is not None:
+            conditions.append('total_hours <= ?')
+            params.append(max_hours)
+        for column, mask in zip(MASK_COLUMNS, feature_masks(features or [], strict=True)):
+            if mask:
+                conditions.append(f'{column} & ? = ?')
+                params += [mask, mask]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        self._ensure()
+        connection = self._connect()
+        try:
+            total = connection.execute(f'SELECT COUNT(*) FROM submissions {where}', params).fetchone()[0]
+            rows = connection.execute(
+                f'SELECT * FROM submissions {where} '
+                f'ORDER BY {SORT_COLUMNS[sort]} {order.upper()}, submission_id {order.upper()} '
+                'LIMIT ? OFFSET ?',
+                params + [page_size, (page - 1) * page_size]
+            ).fetchall()
+        finally:
+            connection.close()
+
+        return {
+            'total': total,
+            'page': page,
+            'page_size': page_size,
+            'pages': (total + page_size - 1) // page_size,
+            'submissions': [
+                {
+                    'id': row['submission_id'],
+                    'user_email': row['user_email'],
+                    'user_name': row['user_name'],
+                    'client_name': row['client_name'],
+                    'project_name': row['project_name'],
+                    'submitted_at': row['submitted_at'],
+                    'status': row['status'],
+                    'tier': row['tier_name'],
+                    'tier_number': row['tier'],
+                    'total_weightage': row['total_weightage'],
+                    'effort_hours': row['effort_hours'],
+                    'total_hours': row['total_hours'],
+                    'total_days': row['total_days'],
+                    'total_months': row['total_months'],
+                    'model_version': row['model_version'],
+                }
+                for row in rows
+            ],
+        }
+
+
+def main(argv: Optional[list] = None) -> int:
+    from backend.storage.results import get_search_index
+
+    parser = argparse.ArgumentParser(prog='python -m backend.storage.search_index',
+                                     description='Show or rebuild the submission search index')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild from every stored submission')
+    args = parser.parse_args(argv)
+
+    index = get_search_index()
+    count = index.rebuild() if args.rebuild else index.count()
+    json.dump({'path': str(index.path), 'submissions': count}, sys.stdout)
+    print()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
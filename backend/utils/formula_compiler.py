@@ -0,0 +1,872 @@
+"""
+Formula Compiler
+Parses Excel-like weightage formulas once and evaluates them without eval()
+
+Pipeline:
+1. Parse the FeatureName[Column] formula text into an expression tree
+2. Fold constant sub-expressions
+3. Lower single-input range ladders - IF(AND(X[Details]>a, X[Details]<=b), v, IF(...)) and
+   IFS(X[Details]=1, v, X[Details]<=4, w, ...) - into sorted breakpoint/value tables
+   (StepLookup) evaluated with bisect, or np.searchsorted for batches
+
+Semantics match FormulaEvaluator exactly, including its Python-eval quirks:
+all function arguments are evaluated eagerly, any error anywhere makes the
+whole formula evaluate to 0, and a final "" result is 0.
+Formulas outside the supported grammar return None from compile_formula() and
+are left to FormulaEvaluator's interpreted path.
+
+Compiled formulas are shared process-wide and memoize their results in a
+bounded LRU keyed on the tuple of just the inputs they reference, so repeated
+input slices (NO everywhere, small details counts) are dictionary hits.
+"""
+
+import ast
+import logging
+import math
+import re
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.config import FORMULA_CACHE_SIZE, FORMULA_MEMO_SIZE
+
+# Same reference syntax FormulaEvaluator substitutes
+REFERENCE_PATTERN = re.compile(r'([A-Za-z][\w\s\-\.]*?)\[(InScope|Details)\]')
+
+TOKEN_PATTERN = re.compile(r'''
+    \s*(?:
+        (?P<ref>\x00(?P<ref_idx>\d+)\x00)
+      | (?P<number>(?:\d+\.\d*|\.\d+|\d+)(?:[eE][+-]?\d+)?)
+      | "(?P<string>[^"]*)"
+      | (?P<name>[A-Za-z_]\w*)
+      | (?P<op><=|>=|==|!=|<>|[=<>+\-*/(),])
+    )''', re.VERBOSE)
+
+logger = logging.getLogger(__name__)
+
+COMPARISON_OPS = {'=', '==', '!=', '<', '<=', '>', '>='}
+
+Ref = Tuple[str, str]  # (metric name, 'InScope' | 'Details')
+
+
+class FormulaCompileError(ValueError):
+    """Formula uses syntax the compiler does not support"""
+
+
+class FormulaValueError(ValueError):
+    """A referenced value cannot be used in a formula (mirrors eval() failing on it)"""
+
+
+class BatchUnsupported(Exception):
+    """Formula shape the vectorized batch path doesn't cover (evaluated row by row instead)"""
+
+
+# =============================================================================
+# Excel functions (identical behaviour to FormulaEvaluator's namespace)
+# =============================================================================
+
+def _excel_if(condition, true_val, false_val):
+    return true_val if condition else false_val
+
+
+def _excel_and(*args):
+    return all(args)
+
+
+def _excel_or(*args):
+    return any(args)
+
+
+def _excel_ifs(*args):
+    for i in range(0, len(args), 2):
+        if i + 1 < len(args):
+            if args[i]:
+                return args[i + 1]
+    return 0
+
+
+FUNCTIONS = {
+    'IF': _excel_if,
+    'AND': _excel_and,
+    'OR': _excel_or,
+    'SUM': sum,
+    'IFS': _excel_ifs,
+}
+
+COMPARE = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a < b,
+    '<=': lambda a, b: a <= b,
+    '>': lambda a, b: a > b,
+    '>=': lambda a, b: a >= b,
+}
+
+ARITHMETIC = {
+    '+': lambda a, b: a + b,
+    '-': lambda a, b: a - b,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b,
+}
+
+
+# =============================================================================
+# Expression tree
+# =============================================================================
+
+class Node(ABC):
+    __slots__ = ()
+
+    def children(self) -> tuple:
+        return ()
+
+    @abstractmethod
+    def evaluate(self, env: Dict[Ref, Any]) -> Any:
+        """Value of this expression for bound inputs"""
+
+
+class Const(Node):
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def evaluate(self, env):
+        return self.value
+
+
+class RefNode(Node):
+    __slots__ = ('ref',)
+
+    def __init__(self, ref: Ref):
+        self.ref = ref
+
+    def evaluate(self, env):
+        return env[self.ref]
+
+
+class Compare(Node):
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op, self.left, self.right = op, left, right
+
+    def children(self):
+        return (self.left, self.right)
+
+    def evaluate(self, env):
+        return COMPARE[self.op](self.left.evaluate(env), self.right.evaluate(env))
+
+
+class BinaryOp(Node):
+    __slots__ = ('op', 'left', 'right')
+
+    def __init__(self, op, left, right):
+        self.op, self.left, self.right = op, left, right
+
+    def children(self):
+        return (self.left, self.right)
+
+    def evaluate(self, env):
+        return ARITHMETIC[self.op](self.left.evaluate(env), self.right.evaluate(env))
+
+
+class Negate(Node):
+    __slots__ = ('operand', 'sign')
+
+    def __init__(self, sign, operand):
+        self.sign, self.operand = sign, operand
+
+    def children(self):
+        return (self.operand,)
+
+    def evaluate(self, env):
+        value = self.operand.evaluate(env)
+        return -value if self.sign == '-' else +value
+
+
+class Call(Node):
+    __slots__ = ('name', 'args')
+
+    def __init__(self, name, args):
+        self.name, self.args = name, tuple(args)
+
+    def children(self):
+        return self.args
+
+    def evaluate(self, env):
+        # Eager evaluation of every argument, exactly like a Python call
+        return FUNCTIONS[self.name](*[arg.evaluate(env) for arg in self.args])
+
+
+class _Raise:
+    """Table entry for a region where the original expression raises"""
+    __slots__ = ('error',)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+class StepLookup(Node):
+    """
+    Piecewise-constant function of one input, stored as sorted breakpoints
+
+    For breakpoints b[0] < ... < b[n-1]:
+        point_values[i]    = value at x == b[i]
+        interval_values[i] = value for b[i-1] < x < b[i]  (i = 0: x < b[0], i = n: x > b[n-1])
+    """
+    __slots__ = ('ref', 'breakpoints', 'point_values', 'interval_values')
+
+    def __init__(self, ref: Ref, breakpoints: List[float], point_values: list, interval_values: list):
+        self.ref = ref
+        self.breakpoints = breakpoints
+        self.point_values = point_values
+        self.interval_values = interval_values
+
+    def lookup(self, x):
+        i = bisect_left(self.breakpoints, x)
+        if i < len(self.breakpoints) and self.breakpoints[i] == x:
+            return self.point_values[i]
+        return self.interval_values[i]
+
+    def evaluate(self, env):
+        value = self.lookup(env[self.ref])
+        if isinstance(value, _Raise):
+            raise value.error
+        return value
+
+    def regions(self):
+        """Yield (low, high, includes_low, includes_high, value) for every region, in order"""
+        bps = self.breakpoints
+        for i, value in enumerate(self.interval_values):
+            low = bps[i - 1] if i > 0 else -math.inf
+            high = bps[i] if i < len(bps) else math.inf
+            yield low, high, False, False, value
+            if i < len(bps):
+                yield bps[i], bps[i], True, True, self.point_values[i]
+
+
+# =============================================================================
+# Parser
+# =============================================================================
+
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, value=None):
+        token = self.peek()
+        if token[0] is None or (kind and token[0] != kind) or (value and token[1] != value):
+            raise FormulaCompileError(f"Unexpected token {token[1]!r}, expected {value or kind}")
+        self.pos += 1
+        return token
+
+    def parse(self) -> Node:
+        node = self.comparison()
+        if self.pos != len(self.tokens):
+            raise FormulaCompileError(f"Unexpected trailing token {self.peek()[1]!r}")
+        return node
+
+    def comparison(self):
+        left = self.additive()
+        kind, value = self.peek()
+        if kind == 'op' and value in COMPARISON_OPS:
+            self.pos += 1
+            right = self.additive()
+            next_kind, next_value = self.peek()
+            if next_kind == 'op' and next_value in COMPARISON_OPS:
+                # Python would chain these; no formula needs it
+                raise FormulaCompileError("Chained comparisons are not supported")
+            return Compare('==' if value == '=' else value, left, right)
+        if kind == 'op' and value == '<>':
+            raise FormulaCompileError("'<>' is not supported by the interpreted evaluator either")
+        return left
+
+    def additive(self):
+        node = self.term()
+        while self.peek()[0] == 'op' and self.peek()[1] in ('+', '-'):
+            op = self.take()[1]
+            node = BinaryOp(op, node, self.term())
+        return node
+
+    def term(self):
+        node = self.unary()
+        while self.peek()[0] == 'op' and self.peek()[1] in ('*', '/'):
+            op = self.take()[1]
+            node = BinaryOp(op, node, self.unary())
+        return node
+
+    def unary(self):
+        if self.peek()[0] == 'op' and self.peek()[1] in ('+', '-'):
+            sign = self.take()[1]
+            return Negate(sign, self.unary())
+        return self.primary()
+
+    def primary(self):
+        kind, value = self.peek()
+        if kind == 'number':
+            self.pos += 1
+            return Const(value)
+        if kind == 'string':
+            self.pos += 1
+            return Const(value)
+        if kind == 'ref':
+            self.pos += 1
+            return RefNode(value)
+        if kind == 'name':
+            self.pos += 1
+            if value == 'TRUE':
+                return Const(True)
+            if value not in FUNCTIONS:
+                raise FormulaCompileError(f"Unknown name {value!r}")
+            self.take('op', '(')
+            args = []
+            if self.peek() != ('op', ')'):
+                args.append(self.comparison())
+                while self.peek() == ('op', ','):
+                    self.pos += 1
+                    args.append(self.comparison())
+            self.take('op', ')')
+            return Call(value, args)
+        if (kind, value) == ('op', '('):
+            self.pos += 1
+            node = self.comparison()
+            self.take('op', ')')
+            return node
+        raise FormulaCompileError(f"Unexpected token {value!r}")
+
+
+def _tokenize(formula: str) -> list:
+    refs = []
+
+    def stash(match):
+        refs.append((match.group(1).strip(), match.group(2)))
+        return f'\x00{len(refs) - 1}\x00'
+
+    text = REFERENCE_PATTERN.sub(stash, formula)
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        match = TOKEN_PATTERN.match(text, pos)
+        if not match or match.end() == pos:
+            raise FormulaCompileError(f"Cannot tokenize near {text[pos:pos + 20]!r}")
+        pos = match.end()
+        if match.group('ref') is not None:
+            tokens.append(('ref', refs[int(match.group('ref_idx'))]))
+        elif match.group('number') is not None:
+            literal = match.group('number')
+            number = float(literal) if any(c in literal for c in '.eE') else int(literal)
+            tokens.append(('number', number))
+        elif match.group('string') is not None:
+            tokens.append(('string', match.group('string')))
+        elif match.group('name') is not None:
+            tokens.append(('name', match.group('name')))
+        else:
+            tokens.append(('op', match.group('op')))
+    return tokens
+
+
+# =============================================================================
+# Optimization passes
+# =============================================================================
+
+def _rebuild(node: Node, children: list) -> Node:
+    if isinstance(node, (Compare, BinaryOp)):
+        return type(node)(node.op, children[0], children[1])
+    if isinstance(node, Negate):
+        return Negate(node.sign, children[0])
+    if isinstance(node, Call):
+        return Call(node.name, children)
+    return node
+
+
+def fold_constants(node: Node) -> Node:
+    """Evaluate sub-expressions whose inputs are all constants"""
+    children = [fold_constants(child) for child in node.children()]
+    node = _rebuild(node, children)
+
+    if children and all(isinstance(child, Const) for child in children):
+        try:
+            return Const(node.evaluate({}))
+        except Exception:
+            return node  # Keep it: the error must surface at evaluation time
+
+    # Details values are always numbers, so comparing them with a string constant is fixed
+    if isinstance(node, Compare) and node.op in ('==', '!=') and len(children) == 2:
+        for ref_side, const_side in ((children[0], children[1]), (children[1], children[0])):
+            if (isinstance(ref_side, RefNode) and ref_side.ref[1] == 'Details'
+                    and isinstance(const_side, Const) and isinstance(const_side.value, str)):
+                return Const(node.op == '!=')
+
+    return node
+
+
+def _collect_refs(node: Node, refs: set) -> set:
+    if isinstance(node, RefNode):
+        refs.add(node.ref)
+    elif isinstance(node, StepLookup):
+        refs.add(node.ref)
+    for child in node.children():
+        _collect_refs(child, refs)
+    return refs
+
+
+def _step_breakpoints(node: Node, ref: Ref, breakpoints: set) -> bool:
+    """
+    Collect comparison constants for ref; False if ref is used any other way
+    (then the subtree is not piecewise-constant in ref)
+    """
+    if isinstance(node, RefNode):
+        return False
+    if isinstance(node, Compare):
+        left, right = node.left, node.right
+        for ref_side, const_side in ((left, right), (right, left)):
+            if isinstance(ref_side, RefNode) and ref_side.ref == ref and isinstance(const_side, Const):
+                value = const_side.value
+                if isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value):
+                    breakpoints.add(value)
+                return True
+    return all(_step_breakpoints(child, ref, breakpoints) for child in node.children())
+
+
+def _tabulate(node: Node, ref: Ref, breakpoints: List[float]) -> StepLookup:
+    def value_at(x):
+        try:
+            return node.evaluate({ref: x})
+        except Exception as e:
+            return _Raise(e)
+
+    point_values = [value_at(b) for b in breakpoints]
+    interval_values = [value_at(breakpoints[0] - 1)]
+    for low, high in zip(breakpoints, breakpoints[1:]):
+        interval_values.append(value_at((low + high) / 2))
+    interval_values.append(value_at(breakpoints[-1] + 1))
+    return StepLookup(ref, breakpoints, point_values, interval_values)
+
+
+def _count_compares(node: Node) -> int:
+    return isinstance(node, Compare) + sum(_count_compares(child) for child in node.children())
+
+
+def lower_step_functions(node: Node) -> Node:
+    """Replace maximal single-Details-input range ladders with StepLookup tables"""
+    refs = _collect_refs(node, set())
+    if len(refs) == 1 and not isinstance(node, (RefNode, Const)):
+        ref = next(iter(refs))
+        breakpoints = set()
+        if ref[1] == 'Details' and _step_breakpoints(node, ref, breakpoints) and breakpoints \
+                and _count_compares(node) >= 2:
+            return _tabulate(node, ref, sorted(breakpoints))
+
+    return _rebuild(node, [lower_step_functions(child) for child in node.children()])
+
+
+# =============================================================================
+# Compiled formula
+# =============================================================================
+
+def _details_value(value):
+    """The number eval() would see after FormulaEvaluator substitutes str(value)"""
+    if value is None:
+        return 0
+    if isinstance(value, (int, float)):
+        if isinstance(value, float) and not math.isfinite(value):
+            raise FormulaValueError(f"Invalid details value {value!r}")
+        return value
+    if isinstance(value, str):
+        try:
+            parsed = ast.literal_eval(value.strip())
+        except (ValueError, SyntaxError):
+            raise FormulaValueError(f"Invalid details value {value!r}")
+        if isinstance(parsed, (int, float)):
+            return parsed
+    raise FormulaValueError(f"Invalid details value {value!r}")
+
+
+def bind_value(metric: Optional[dict], column: str):
+    """
+    Value a FeatureName[Column] reference takes for a metric (None = unknown metric)
+
+    metric is a dict or a result record (read by attribute, skipping its mapping interface)
+    """
+    if metric is None:
+        return 'NO' if column == 'InScope' else 0
+    is_dict = type(metric) is dict
+    if column == 'InScope':
+        value = str(metric.get('in_scope', 'NO') if is_dict else metric.in_scope)
+        if '"' in value or '\\' in value:
+            # Would break (or be unescaped in) the quoted literal eval() sees
+            raise FormulaValueError(f"Invalid in-scope value {value!r}")
+        return value
+    return _details_value(metric.get('details', 0) if is_dict else metric.details)
+
+
+def to_weightage(result) -> float:
+    """Final conversion FormulaEvaluator applies to an expression result"""
+    return float(result) if result != "" else 0
+
+
+class CompiledFormula:
+    """A parsed, optimized formula with a memo of results per referenced-input tuple"""
+
+    def __init__(self, text: str, root: Node, memo_size: int = FORMULA_MEMO_SIZE):
+        self.text = text
+        self.root = root
+        # Referenced inputs, in a stable order
+        self.refs: Tuple[Ref, ...] = tuple(sorted(_collect_refs(root, set())))
+        self.memo_size = memo_size
+        self.hits = 0
+        self.misses = 0
+        self._memo: "OrderedDict[tuple, float]" = OrderedDict()
+        self._memo_lock = threading.Lock()
+
+    def bind(self, metrics_lookup: Dict[str, dict]) -> Dict[Ref, Any]:
+        """Resolve every referenced input from a {metric name: metric dict} lookup"""
+        return {ref: bind_value(metrics_lookup.get(ref[0]), ref[1]) for ref in self.refs}
+
+    def evaluate_env(self, env: Dict[Ref, Any]) -> float:
+        """Evaluate against already-bound inputs; raises on error"""
+        return to_weightage(self.root.evaluate(env))
+
+    def evaluate(self, metrics_lookup: Dict[str, dict], strict: bool = False) -> float:
+        """
+        Evaluate against metric dicts (same contract as FormulaEvaluator.evaluate_interpreted)
+
+        Args:
+            metrics_lookup: Metric name -> metric dict
+            strict: Raise evaluation errors instead of returning 0
+
+        Returns:
+            Calculated numeric value (0 if evaluation fails)
+        """
+        try:
+            env = self.bind(metrics_lookup)
+        except FormulaValueError as e:
+            if strict:
+                raise
+            logger.debug("Error evaluating formula %.100s: %s", self.text, e)
+            return 0
+        if strict:
+            # Bypasses the memo, which holds failures as 0
+            return self.evaluate_env(env)
+        return self.evaluate_memo(env)
+
+    def evaluate_memo(self, env: Dict[Ref, Any]) -> float:
+        """Evaluate bound inputs through the memo (0 if evaluation fails)"""
+        key = tuple(env[ref] for ref in self.refs)
+
+        with self._memo_lock:
+            result = self._memo.get(key)
+            if result is not None:
+                self._memo.move_to_end(key)
+                self.hits += 1
+                return result
+            self.misses += 1
+
+        try:
+            result = self.evaluate_env(env)
+        except Exception as e:
+            logger.debug("Error evaluating formula %.100s: %s", self.text, e)
+            result = 0
+
+        if self.memo_size > 0:
+            with self._memo_lock:
+                self._memo[key] = result
+                self._memo.move_to_end(key)
+                while len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        return result
+
+    def clear_memo(self):
+        with self._memo_lock:
+            self._memo.clear()
+            self.hits = self.misses = 0
+
+    def step_lookups(self) -> List[StepLookup]:
+        """All breakpoint tables in this formula"""
+        found = []
+
+        def walk(node):
+            if isinstance(node, StepLookup):
+                found.append(node)
+            for child in node.children():
+                walk(child)
+
+        walk(self.root)
+        return found
+
+    def breakpoints(self, ref: Ref) -> Optional[List[float]]:
+        """
+        Values of a Details input at which this formula's result can change
+
+        Returns:
+            Sorted breakpoints (empty if ref isn't referenced), or None if the
+            formula uses the input outside comparisons (not piecewise-constant in it)
+        """
+        found = set()
+
+        def walk(node) -> bool:
+            if isinstance(node, StepLookup):
+                if node.ref == ref:
+                    found.update(node.breakpoints)
+                return True
+            if isinstance(node, RefNode):
+                return node.ref != ref
+            if isinstance(node, Compare):
+                for ref_side, const_side in ((node.left, node.right), (node.right, node.left)):
+                    if isinstance(ref_side, RefNode) and ref_side.ref == ref and isinstance(const_side, Const):
+                        value = const_side.value
+                        if isinstance(value, (int, float)) and not isinstance(value, bool) \
+                                and math.isfinite(value):
+                            found.add(value)
+                        return True
+            return all(walk(child) for child in node.children())
+
+        return sorted(found) if walk(self.root) else None
+
+    def evaluate_batch(self, columns: Dict[Ref, Any], size: int):
+        """
+        Evaluate for many scenarios at once
+
+        Args:
+            columns: (metric name, column) -> array of values (InScope strings, Details numbers);
+                     references without a column use the unknown-metric defaults
+            size: Number of scenarios
+
+        Returns:
+            numpy float array of weightages
+        """
+        import numpy as np
+
+        try:
+            return _BatchEvaluator(np, columns, size).run(self.root)
+        except BatchUnsupported:
+            # Shape the vectorized path doesn't cover: evaluate row by row
+            result = np.zeros(size)
+            for row in range(size):
+                env = {}
+                for ref in self.refs:
+                    if ref in columns:
+                        value = columns[ref][row]
+                        env[ref] = str(value) if ref[1] == 'InScope' else value
+                    else:
+                        env[ref] = bind_value(None, ref[1])
+                try:
+                    result[row] = self.evaluate_env(env)
+                except Exception:
+                    result[row] = 0
+            return result
+
+
+class _BatchEvaluator:
+    """
+    numpy evaluation with per-row error tracking
+
+    Numeric values are float arrays in which NaN stands for the "" string result;
+    any row that would raise in the scalar path is flagged in self.error and ends as 0.
+    """
+
+    def __init__(self, np, columns, size):
+        self.np = np
+        self.columns = columns
+        self.size = size
+        self.error = np.zeros(size, dtype=bool)
+
+    def run(self, root: Node):
+        np = self.np
+        value = self.eval(root)
+        if self._is_str(value):
+            raise BatchUnsupported
+        value = np.broadcast_to(np.asarray(value, dtype=float), (self.size,)).copy()
+        value[np.isnan(value) | self.error] = 0
+        return value
+
+    def _is_str(self, value):
+        return isinstance(value, str) or (hasattr(value, 'dtype') and value.dtype == object)
+
+    def _numeric(self, value):
+        """Numeric view of a value; "" -> NaN, other strings unsupported"""
+        if isinstance(value, str):
+            if value == "":
+                return float('nan')
+            raise BatchUnsupported
+        if hasattr(value, 'dtype'):
+            if value.dtype == object:
+                raise BatchUnsupported
+            return value.astype(float)
+        return float(value)
+
+    def _truthy(self, value):
+        np = self.np
+        if isinstance(value, str):
+            return value != ""
+        if hasattr(value, 'dtype'):
+            if value.dtype == bool:
+                return value
+            if value.dtype == object:
+                raise BatchUnsupported
+            return (value != 0) & ~np.isnan(value)
+        return bool(value)
+
+    def _flag(self, mask):
+        self.error = self.error | self.np.broadcast_to(mask, (self.size,))
+
+    def eval(self, node: Node):
+        np = self.np
+
+        if isinstance(node, Const):
+            return node.value
+
+        if isinstance(node, RefNode):
+            if node.ref not in self.columns:
+                return bind_value(None, node.ref[1])
+            column = self.columns[node.ref]
+            if node.ref[1] == 'InScope':
+                return np.asarray(column, dtype=object).astype(str).astype(object)
+            return np.asarray(column, dtype=float)
+
+        if isinstance(node, StepLookup):
+            x = np.asarray(self.columns.get(node.ref, 0), dtype=float)
+            bps = np.asarray(node.breakpoints, dtype=float)
+            idx = np.searchsorted(bps, x, side='left')
+            clipped = np.minimum(idx, len(bps) - 1)
+            on_point = (idx < len(bps)) & (bps[clipped] == x)
+
+            def table(values):
+                out = np.empty(len(values))
+                raises = np.zeros(len(values), dtype=bool)
+                for i, v in enumerate(values):
+                    if isinstance(v, _Raise):
+                        out[i], raises[i] = 0, True
+                    else:
+                        out[i] = self._numeric(v)
+                return out, raises
+
+            point_vals, point_raise = table(node.point_values)
+            interval_vals, interval_raise = table(node.interval_values)
+            self._flag(np.where(on_point, point_raise[clipped], interval_raise[idx]))
+            return np.where(on_point, point_vals[clipped], interval_vals[idx])
+
+        if isinstance(node, Compare):
+            left, right = self.eval(node.left), self.eval(node.right)
+            left_str, right_str = self._is_str(left), self._is_str(right)
+            if left_str and right_str:
+                return np.asarray(COMPARE[node.op](left, right), dtype=bool)
+            if left_str or right_str:
+                if node.op in ('==', '!='):
+                    return np.full(self.size, node.op == '!=')
+                self._flag(True)  # str vs number ordering raises TypeError
+                return np.zeros(self.size, dtype=bool)
+            left, right = self._numeric(left), self._numeric(right)
+            if node.op not in ('==', '!='):
+                self._flag(np.isnan(left) | np.isnan(right))
+            return np.asarray(COMPARE[node.op](left, right), dtype=bool)
+
+        if isinstance(node, BinaryOp):
+            left, right = self._numeric(self.eval(node.left)), self._numeric(self.eval(node.right))
+            self._flag(np.isnan(left) | np.isnan(right))
+            if node.op == '/':
+                zero = np.asarray(right) == 0
+                self._flag(zero)
+                right = np.where(zero, 1.0, right)
+            return ARITHMETIC[node.op](left, right)
+
+        if isinstance(node, Negate):
+            value = self._numeric(self.eval(node.operand))
+            self._flag(np.isnan(value))
+            return -value if node.sign == '-' else value
+
+        if isinstance(node, Call):
+            args = [self.eval(arg) for arg in node.args]
+            if node.name == 'IF':
+                if len(args) != 3:
+                    self._flag(True)
+                    return 0.0
+                condition = self._truthy(args[0])
+                return np.where(condition, self._numeric(args[1]), self._numeric(args[2]))
+            if node.name in ('AND', 'OR'):
+                combine = np.logical_and if node.name == 'AND' else np.logical_or
+                result = np.full(self.size, node.name == 'AND')
+                for arg in args:
+                    result = combine(result, self._truthy(arg))
+                return result
+            if node.name == 'IFS':
+                result = np.zeros(self.size)
+                assigned = np.zeros(self.size, dtype=bool)
+                for i in range(0, len(args) - 1, 2):
+                    take = self._truthy(args[i]) & ~assigned
+                    result = np.where(take, self._numeric(args[i + 1]), result)
+                    assigned = assigned | take
+                return result
+            raise BatchUnsupported
+
+        raise BatchUnsupported
+
+
+# Formula text -> CompiledFormula (None if unsupported), least recently used first.
+# Bounded: every published model version can add formulas (each with its own memo).
+_compiled: "OrderedDict[str, Optional[CompiledFormula]]" = OrderedDict()
+_compiled_lock = threading.Lock()
+
+
+def compile_formula(formula: str) -> Optional[CompiledFormula]:
+    """
+    Compile a formula (cached by text, shared by every evaluator in the process)
+
+    The cache keeps the FORMULA_CACHE_SIZE most recently used formulas.
+
+    Args:
+        formula: Formula string like "=IF(Account[InScope]="YES",2,0)"
+
+    Returns:
+        CompiledFormula, or None if the formula uses unsupported syntax
+    """
+    with _compiled_lock:
+        if formula in _compiled:
+            _compiled.move_to_end(formula)
+            return _compiled[formula]
+
+    text = formula[1:] if formula.startswith('=') else formula
+    try:
+        root = lower_step_functions(fold_constants(_Parser(_tokenize(text)).parse()))
+        compiled = CompiledFormula(text, root)
+    except FormulaCompileError:
+        compiled = None
+
+    with _compiled_lock:
+        compiled = _compiled.setdefault(formula, compiled)
+        _compiled.move_to_end(formula)
+        while len(_compiled) > FORMULA_CACHE_SIZE:
+            _compiled.popitem(last=False)
+        return compiled
+
+
+def formula_memo_stats() -> Dict[str, Any]:
+    """Hit/miss counters summed over all compiled formulas"""
+    with _compiled_lock:
+        formulas = [c for c in _compiled.values() if c is not None]
+    hits = sum(c.hits for c in formulas)
+    misses = sum(c.misses for c in formulas)
+    return {
+        'formulas': len(formulas),
+        'entries': sum(len(c._memo) for c in formulas),
+        'hits': hits,
+        'misses': misses,
+        'hit_rate': round(hits / (hits + misses), 4) if hits + misses else 0.0,
+    }
+
+
+def clear_formula_memos():
+    """Empty every formula memo and reset the counters"""
+    with _compiled_lock:
+        formulas = list(_compiled.values())
+    for compiled in formulas:
+        if compiled is not None:
+            compiled.clear_memo()
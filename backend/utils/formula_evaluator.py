@@ -6,6 +6,8 @@ Evaluates Excel-like formulas with FeatureName[Column] syntax
 import re
 from typing import Dict, Any, List
 
+from backend.utils.formula_compiler import compile_formula
+
 
 class FormulaEvaluator:
     """Evaluates Excel formulas with FeatureName[Column] syntax"""
@@ -32,6 +34,27 @@ class FormulaEvaluator:
         if not formula:
             return 0
         
+        # Compiled (parsed once, ladders lowered to lookup tables) when the syntax allows
+        compiled = compile_formula(formula)
+        if compiled is not None:
+            return compiled.evaluate(self.metrics_lookup)
+        
+        return self.evaluate_interpreted(formula)
+    
+    def evaluate_interpreted(self, formula: str, strict: bool = False) -> float:
+        """
+        Evaluate a formula by substituting values into the text and eval()-ing it
+        
+        Args:
+            formula: Formula string like "=IF(Account[InScope]="YES",2,0)"
+            strict: Raise evaluation errors instead of returning 0
+        
+        Returns:
+            Calculated numeric value
+        """
+        if not formula:
+            return 0
+        
         # Remove leading '='
         if formula.startswith('='):
             formula = formula[1:]
@@ -44,6 +67,8 @@ class FormulaEvaluator:
             result = self._safe_eval(formula_with_values)
             return float(result) if result != "" else 0
         except Exception as e:
+            if strict:
+                raise
             print(f"Error evaluating formula: {e}")
             print(f"  Original: {formula[:100]}")
             print(f"  Replaced: {formula_with_values[:100]}")
@@ -0,0 +1,129 @@
+"""
+JSON Serializer
+One encoder for API responses and stored files, using orjson when it is
+installed (several times faster on the large nested results) and the standard
+library otherwise
+
+JSON_BACKEND (config) selects it: 'auto', 'orjson' or 'stdlib'. Both backends
+encode engine result types directly - numpy arrays and scalars, dataclasses,
+result records and other mappings, dates, paths and sets - so results don't
+need converting to plain dicts and lists first. Output is compact UTF-8 bytes. One difference remains: orjson
+writes NaN/Infinity as null where the standard library writes the (non-JSON)
+literals NaN/Infinity. Values orjson can't encode (integers wider than 64 bits)
+fall back to the standard library.
+"""
+
+import dataclasses
+import json
+from collections.abc import Mapping
+from datetime import date, datetime
+from pathlib import PurePath
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+from backend.config import JSON_BACKEND
+
+BACKENDS = ('orjson', 'stdlib')
+
+
+def resolve_backend(name: str = None) -> str:
+    """
+    The backend to use for a JSON_BACKEND setting
+
+    Raises:
+        ValueError: Unknown backend, or 'orjson' without the orjson package
+    """
+    name = (name or JSON_BACKEND or 'auto').lower()
+    if name == 'auto':
+        return 'orjson' if ORJSON_AVAILABLE else 'stdlib'
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend '{name}'. Use one of: auto, {', '.join(BACKENDS)}")
+    if name == 'orjson' and not ORJSON_AVAILABLE:
+        raise ValueError("JSON backend 'orjson' needs the orjson package (pip install orjson)")
+    return name
+
+
+try:
+    BACKEND = resolve_backend()
+except ValueError as e:
+    print(f"Warning: {e}; using the default JSON backend")
+    BACKEND = resolve_backend('auto')
+
+
+def to_builtin(obj: Any) -> Any:
+    """JSON-compatible value of the non-JSON types engine results contain"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, PurePath):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Mapping):
+        # Result records and other non-dict mappings
+        return dict(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def dumps(obj: Any, sort_keys: bool = False, indent: bool = False,
+          default: Optional[Callable[[Any], Any]] = None, backend: str = None) -> bytes:
+    """
+    Encode to JSON
+
+    Args:
+        obj: Value to encode
+        sort_keys: Sort object keys
+        indent: Indent by two spaces (default: compact)
+        default: Encoder tried before to_builtin() for types the backend doesn't handle
+                 (raising TypeError passes the value on)
+        backend: 'orjson' or 'stdlib' (default: the configured one)
+
+    Returns:
+        UTF-8 encoded JSON
+    """
+    def encode_other(value):
+        if default is not None:
+            try:
+                return default(value)
+            except TypeError:
+                pass
+        return to_builtin(value)
+
+    if (backend or BACKEND) == 'orjson':
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        # orjson handles dataclasses and contiguous numpy arrays itself; the rest goes to encode_other
+        try:
+            return orjson.dumps(obj, default=encode_other, option=option)
+        except orjson.JSONEncodeError:
+            # Values orjson rejects without consulting default (integers wider than
+            # 64 bits) - the standard library encodes those
+            pass
+
+    if indent:
+        text = json.dumps(obj, indent=2, sort_keys=sort_keys, default=encode_other)
+    else:
+        text = json.dumps(obj, separators=(',', ':'), sort_keys=sort_keys, default=encode_other)
+    return text.encode('utf-8')
+
+
+def loads(data: Any, backend: str = None) -> Any:
+    """Decode JSON from bytes or str"""
+    if (backend or BACKEND) == 'orjson':
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,118 @@
+"""
+Workbook Snapshot
+Read-only, in-memory view of the Excel sheets used by the legacy text report
+
+Loads each needed sheet once (openpyxl read-only mode, cached values) into a
+sparse {(row, col): value} dict plus a metric-name -> row index for the
+Scope Definition sheet. Snapshots are cached per file and reloaded only when
+the file's modification time or size changes.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from backend.config import EXCEL_FILE, SHEET_SCOPE_DEFINITION, SHEET_DEFINITIONS
+
+# Metric names live in column B of the Scope Definition sheet, rows 6-99
+METRIC_NAME_COLUMN = 2
+METRIC_FIRST_ROW = 6
+METRIC_LAST_ROW = 99
+
+
+class WorkbookSnapshot:
+    """Immutable cell values for a set of sheets from one version of a workbook"""
+
+    def __init__(self, path: Path, sheet_names: Iterable[str]):
+        # openpyxl is only needed by the legacy report path
+        from openpyxl import load_workbook
+
+        self.path = Path(path)
+        stat = os.stat(self.path)
+        self.signature = (stat.st_mtime_ns, stat.st_size)
+        self.sheets: Dict[str, Dict[Tuple[int, int], Any]] = {}
+
+        wb = load_workbook(self.path, read_only=True, data_only=True)
+        try:
+            for sheet_name in sheet_names:
+                if sheet_name not in wb.sheetnames:
+                    continue
+                cells = {}
+                for row_idx, row in enumerate(wb[sheet_name].iter_rows(values_only=True), start=1):
+                    for col_idx, value in enumerate(row, start=1):
+                        if value is not None:
+                            cells[(row_idx, col_idx)] = value
+                self.sheets[sheet_name] = cells
+        finally:
+            wb.close()
+
+        self.metric_rows = self._index_metric_rows()
+
+    def _index_metric_rows(self) -> Dict[str, int]:
+        """Map stripped metric name -> first row it appears on (same order as a top-down scan)"""
+        index = {}
+        cells = self.sheets.get(SHEET_SCOPE_DEFINITION, {})
+        for row in range(METRIC_FIRST_ROW, METRIC_LAST_ROW + 1):
+            name = cells.get((row, METRIC_NAME_COLUMN))
+            if isinstance(name, str):
+                index.setdefault(name.strip(), row)
+        return index
+
+    def cell(self, sheet_name: str, row: int, col: int) -> Any:
+        """Value of a cell by row/column number (None if empty or sheet missing)"""
+        return self.sheets.get(sheet_name, {}).get((row, col))
+
+    def cell_ref(self, sheet_name: str, coordinate: str) -> Any:
+        """Value of a cell by A1 reference, e.g. 'E26'"""
+        from openpyxl.utils.cell import coordinate_to_tuple
+
+        row, col = coordinate_to_tuple(coordinate)
+        return self.cell(sheet_name, row, col)
+
+    def metric_row(self, metric_name: str) -> Optional[int]:
+        """Row of a metric in the Scope Definition sheet"""
+        return self.metric_rows.get(metric_name.strip())
+
+    def has_sheet(self, sheet_name: str) -> bool:
+        return sheet_name in self.sheets
+
+
+_snapshots: Dict[Tuple[str, Tuple[str, ...]], WorkbookSnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+DEFAULT_SHEETS = (SHEET_SCOPE_DEFINITION, SHEET_DEFINITIONS)
+
+
+def get_workbook_snapshot(path: Path = EXCEL_FILE, sheet_names: Iterable[str] = DEFAULT_SHEETS) -> WorkbookSnapshot:
+    """
+    Get the cached snapshot for a workbook, reloading it if the file changed
+
+    Args:
+        path: Excel file to read
+        sheet_names: Sheets to include in the snapshot
+
+    Returns:
+        WorkbookSnapshot (shared, treat as read-only)
+    """
+    path = Path(path)
+    key = (str(path.resolve()), tuple(sheet_names))
+    stat = os.stat(path)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    snapshot = _snapshots.get(key)
+    if snapshot is not None and snapshot.signature == signature:
+        return snapshot
+
+    with _snapshots_lock:
+        snapshot = _snapshots.get(key)
+        if snapshot is None or snapshot.signature != signature:
+            snapshot = WorkbookSnapshot(path, key[1])
+            _snapshots[key] = snapshot
+        return snapshot
+
+
+def clear_workbook_snapshots():
+    """Drop all cached snapshots"""
+    with _snapshots_lock:
+        _snapshots.clear()
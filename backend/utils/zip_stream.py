@@ -0,0 +1,99 @@
+"""
+Streaming ZIP Writer
+Builds a ZIP archive incrementally and yields it as byte chunks
+
+The archive is written to a non-seekable sink (zipfile then uses data
+descriptors), so only the current chunk and the central directory entries are
+ever held in memory - memory stays flat regardless of how many files go in.
+"""
+
+import io
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Tuple, Union
+
+CHUNK_SIZE = 64 * 1024
+
+# An entry source is a file path, raw bytes, an open binary file (read from its
+# current position and closed once written), or a callable producing any of these
+EntrySource = Union[str, Path, bytes, BinaryIO, Callable[[], Union[str, Path, bytes, BinaryIO]]]
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable buffer that hands its contents out in chunks"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return False
+
+    def seek(self, *args):
+        raise io.UnsupportedOperation('seek')
+
+    def tell(self):
+        raise io.UnsupportedOperation('tell')
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _open_source(source: EntrySource):
+    """Resolve an entry source to a readable binary stream"""
+    if callable(source):
+        source = source()
+    if isinstance(source, (bytes, bytearray)):
+        return io.BytesIO(source)
+    if hasattr(source, 'read'):
+        return source
+    return open(source, 'rb')
+
+
+def stream_zip(entries: Iterable[Tuple[str, EntrySource]],
+               compression: int = zipfile.ZIP_DEFLATED,
+               chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Stream a ZIP archive built from (archive_name, source) entries
+
+    Entries are consumed lazily, so sources can be generated on demand.
+
+    Args:
+        entries: Iterable of (name inside the archive, source)
+        compression: zipfile compression constant
+        chunk_size: Bytes read from each source at a time
+
+    Yields:
+        Consecutive chunks of the ZIP file
+    """
+    sink = _ChunkSink()
+
+    with zipfile.ZipFile(sink, mode='w', compression=compression) as archive:
+        for arcname, source in entries:
+            with _open_source(source) as src, archive.open(arcname, mode='w', force_zip64=True) as dest:
+                while True:
+                    block = src.read(chunk_size)
+                    if not block:
+                        break
+                    dest.write(block)
+                    data = sink.drain()
+                    if data:
+                        yield data
+
+            data = sink.drain()
+            if data:
+                yield data
+
+    # Central directory is written on close
+    data = sink.drain()
+    if data:
+        yield data
@@ -0,0 +1,7 @@
+"""
+Performance benchmarks for the scoping pipeline
+
+    python -m benchmarks                  # compare against benchmarks/baselines.json
+    python -m benchmarks --update         # record new baselines
+    python -m benchmarks.loadtest         # concurrent API load test
+"""
@@ -0,0 +1,88 @@
+"""
+Benchmark CLI
+
+Exits with status 1 when any benchmark regressed beyond the threshold.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from benchmarks.scenarios import SCENARIO_NAMES
+from benchmarks.suite import (
+    BASELINE_FILE, DEFAULT_REPEAT, DEFAULT_THRESHOLD, MIN_SAMPLE_SECONDS, STAGES,
+    compare, environment, load_baselines, run_suite, save_baselines
+)
+
+
+def _names(value, allowed):
+    names = [n.strip() for n in value.split(',') if n.strip()]
+    unknown = [n for n in names if n not in allowed]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown: {', '.join(unknown)} (choose from {', '.join(allowed)})")
+    return names
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Scoping pipeline benchmarks')
+    parser.add_argument('--stages', type=lambda v: _names(v, list(STAGES)),
+                        help=f"Comma-separated stages (default: all): {', '.join(STAGES)}")
+    parser.add_argument('--scenarios', type=lambda v: [n.strip() for n in v.split(',') if n.strip()],
+                        help=f"Comma-separated scenarios (default: all): {', '.join(SCENARIO_NAMES)}, "
+                             "generated_<i>")
+    parser.add_argument('--generated', type=int, default=0,
+                        help='Add this many synthetic scenarios (generated_0, generated_1, ...)')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for --generated')
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE, help='Baseline JSON file')
+    parser.add_argument('--update', action='store_true', help='Store the results as the new baselines')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='Allowed slowdown as a fraction of the baseline (default: %(default)s)')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--min-sample-seconds', type=float, default=MIN_SAMPLE_SECONDS)
+    parser.add_argument('--json', type=Path, help='Also write results and comparison to this file')
+    args = parser.parse_args(argv)
+
+    print('Running benchmarks (best per-call time)')
+    try:
+        results = run_suite(args.stages, args.scenarios, repeat=args.repeat,
+                            min_sample_seconds=args.min_sample_seconds,
+                            generated=args.generated, seed=args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.update:
+        save_baselines(results, args.baseline)
+        print(f'\n✓ Baselines written to {args.baseline}')
+        return 0
+
+    baselines = load_baselines(args.baseline)
+    if baselines is None:
+        print(f'\nNo baselines at {args.baseline}; run with --update to record them')
+        return 0
+
+    if baselines.get('environment') != environment():
+        print('\nWarning: baselines were recorded on a different environment; '
+              'timings may not be comparable')
+
+    rows = compare(results, baselines, args.threshold)
+    print(f"\n{'benchmark':<40} {'baseline ms':>12} {'current ms':>12} {'change':>8}  status")
+    for row in rows:
+        baseline = '-' if row['baseline_ms'] is None else f"{row['baseline_ms']:.3f}"
+        change = '-' if row['change'] is None else f"{row['change']:+.1%}"
+        print(f"{row['benchmark']:<40} {baseline:>12} {row['current_ms']:>12.3f} {change:>8}  {row['status']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'environment': environment(), 'results': results, 'comparison': rows}, f, indent=2)
+
+    regressed = [row['benchmark'] for row in rows if row['status'] == 'regressed']
+    if regressed:
+        print(f"\n✗ {len(regressed)} benchmark(s) regressed more than {args.threshold:.0%}: {', '.join(regressed)}")
+        return 1
+    print(f'\n✓ No regressions beyond {args.threshold:.0%}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,462 @@
+"""
+API Load Test
+
+Drives the scoping API with synthetic submissions (ScenarioGenerator) at a
+configurable concurrency and reports throughput, latency percentiles and error
+rates overall and per endpoint:
+
+    python -m benchmarks.loadtest --requests 500 --concurrency 8
+    python -m benchmarks.loadtest --mode subprocess --duration 60 --concurrency 16 --json load.json
+
+Modes:
+- inprocess: requests go through Flask test clients (one per thread) against
+  api_server.app in this process
+- subprocess: api_server.app is started in a child process (threaded dev
+  server on a free local port) and driven over HTTP
+
+Besides latency, the report checks what a single request can't show:
+- history growth: submit/history latency against the number of submissions
+  the user already has (a positive slope means per-request work grows with
+  history, e.g. rewriting the whole results file)
+- consistency: successful submits vs submissions stored in the history
+  (lost read-modify-write updates) and duplicate submission IDs
+
+Synthetic users are loadtest-<n>@example.invalid; their results and reports
+are removed afterwards unless --keep-output is given.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.config import BASE_DIR
+from backend.core.scenario_generator import ScenarioGenerator, submit_payload
+from benchmarks.suite import remove_user_outputs
+
+MODES = ('inprocess', 'subprocess')
+ENDPOINTS = ('submit', 'history', 'result', 'download')
+DEFAULT_MIX = {'submit': 4, 'history': 3, 'result': 2, 'download': 1}
+PERCENTILES = (50, 95, 99)
+
+SERVER_START_TIMEOUT = 60
+
+
+# ----------------------------------------------------------------------
+# Transports: request(method, path, payload) -> (status, body bytes)
+# ----------------------------------------------------------------------
+
+class InProcessTransport:
+    """Flask test client per thread against api_server.app"""
+
+    def __init__(self):
+        import api_server
+        self.app = api_server.app
+        self.local = threading.local()
+
+    def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, bytes]:
+        client = getattr(self.local, 'client', None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.open(path, method=method, json=payload)
+        return response.status_code, response.get_data()
+
+    def close(self):
+        import api_server
+        api_server.report_service.shutdown()
+
+
+class HTTPTransport:
+    """HTTP session per thread against a running server"""
+
+    def __init__(self, base_url: str):
+        import requests
+        self.requests = requests
+        self.base_url = base_url.rstrip('/')
+        self.local = threading.local()
+
+    def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, bytes]:
+        session = getattr(self.local, 'session', None)
+        if session is None:
+            session = self.local.session = self.requests.Session()
+        response = session.request(method, self.base_url + path, json=payload, timeout=300)
+        return response.status_code, response.content
+
+    def close(self):
+        pass
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@contextlib.contextmanager
+def server_subprocess(port: int = None):
+    """Run api_server.app (threaded) in a child process; yields its base URL"""
+    import requests
+
+    port = port or _free_port()
+    code = f"import api_server; api_server.app.run(host='127.0.0.1', port={port}, threaded=True)"
+    process = subprocess.Popen([sys.executable, '-c', code], cwd=str(BASE_DIR),
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f'http://127.0.0.1:{port}'
+    try:
+        deadline = time.monotonic() + SERVER_START_TIMEOUT
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f'API server exited with status {process.returncode}')
+            try:
+                if requests.get(base_url + '/health', timeout=1).ok:
+                    break
+            except requests.ConnectionError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f'API server did not start within {SERVER_START_TIMEOUT}s')
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+# ----------------------------------------------------------------------
+# Statistics
+# ----------------------------------------------------------------------
+
+def percentile(sorted_values: List[float], p: float) -> Optional[float]:
+    """Linear-interpolated percentile of pre-sorted values"""
+    if not sorted_values:
+        return None
+    position = (len(sorted_values) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def latency_summary(latencies_ms: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(latencies_ms)
+    summary = {f'p{p}': _round(percentile(values, p)) for p in PERCENTILES}
+    summary['mean'] = _round(sum(values) / len(values)) if values else None
+    summary['max'] = _round(values[-1]) if values else None
+    return summary
+
+
+def slope(points: List[Tuple[float, float]]) -> Optional[float]:
+    """Least-squares slope of y over x (None with fewer than two distinct x)"""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if var_x == 0:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def _round(value: Optional[float], digits: int = 3) -> Optional[float]:
+    return None if value is None else round(value, digits)
+
+
+# ----------------------------------------------------------------------
+# Load test
+# ----------------------------------------------------------------------
+
+class LoadTest:
+    """Weighted mix of API calls from concurrent synthetic users"""
+
+    def __init__(self, transport, users: int = 4, mix: Dict[str, float] = None, seed: int = 0,
+                 generator: ScenarioGenerator = None):
+        """
+        Args:
+            transport: InProcessTransport or HTTPTransport
+            users: Distinct synthetic users (history grows per user)
+            mix: Endpoint -> relative weight (default DEFAULT_MIX)
+            seed: Seed for scenarios and the request mix
+            generator: ScenarioGenerator for submissions (default: seeded with `seed`)
+        """
+        self.transport = transport
+        self.emails = [f'loadtest-{i}@example.invalid' for i in range(users)]
+        self.mix = {name: weight for name, weight in (mix or DEFAULT_MIX).items() if weight > 0}
+        self.seed = seed
+        self.generator = generator or ScenarioGenerator(seed=seed)
+
+        self.lock = threading.Lock()
+        self.records = []  # (endpoint, status, latency_ms, history_size)
+        self.submission_ids = []
+        self.history_size = Counter()  # email -> successful submits so far
+        self.scenario_counter = 0
+
+    def _next_scenario(self) -> int:
+        with self.lock:
+            self.scenario_counter += 1
+            return self.scenario_counter - 1
+
+    def _call(self, rng: random.Random) -> Tuple[str, int, float, int]:
+        endpoint = rng.choices(list(self.mix), weights=list(self.mix.values()))[0]
+        with self.lock:
+            known_ids = len(self.submission_ids)
+            submission_id = self.submission_ids[rng.randrange(known_ids)] if known_ids else None
+        if endpoint in ('result', 'download') and submission_id is None:
+            endpoint = 'submit'  # Nothing to fetch yet
+
+        email = rng.choice(self.emails)
+        if endpoint == 'submit':
+            method, path = 'POST', '/api/scoping/submit'
+            payload = submit_payload(self.generator.scenario(self._next_scenario()), user_email=email)
+        elif endpoint == 'history':
+            method, path, payload = 'GET', f'/api/scoping/history?email={email}', None
+        else:
+            method, path, payload = 'GET', f'/api/scoping/{endpoint}/{submission_id}', None
+        history = self.history_size[email]
+
+        started = time.perf_counter()
+        try:
+            status, body = self.transport.request(method, path, payload)
+        except Exception:
+            status, body = 0, b''
+        latency_ms = (time.perf_counter() - started) * 1000
+
+        if endpoint == 'submit' and status == 200:
+            new_id = json.loads(body).get('submission_id')
+            with self.lock:
+                self.submission_ids.append(new_id)
+                self.history_size[email] += 1
+        return endpoint, status, latency_ms, history
+
+    def run(self, requests: int = None, duration: float = None, concurrency: int = 4) -> Dict[str, Any]:
+        """
+        Run the load
+
+        Args:
+            requests: Total requests to send (if no duration)
+            duration: Seconds to keep sending requests
+            concurrency: Concurrent client threads
+
+        Returns:
+            Report (see report())
+        """
+        if requests is None and duration is None:
+            raise ValueError('Give a request count or a duration')
+
+        remaining = [requests]
+        deadline = None if duration is None else time.perf_counter() + duration
+
+        def take() -> bool:
+            if deadline is not None:
+                return time.perf_counter() < deadline
+            with self.lock:
+                if remaining[0] <= 0:
+                    return False
+                remaining[0] -= 1
+                return True
+
+        def worker(index: int):
+            rng = random.Random(f'{self.seed}:client:{index}')
+            records = []
+            while take():
+                records.append(self._call(rng))
+            with self.lock:
+                self.records.extend(records)
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        return self.report(elapsed, concurrency)
+
+    def _stored_submissions(self) -> Optional[int]:
+        stored = 0
+        for email in self.emails:
+            status, body = self.transport.request('GET', f'/api/scoping/history?email={email}')
+            if status != 200:
+                return None
+            stored += len(json.loads(body).get('submissions', []))
+        return stored
+
+    def report(self, elapsed: float, concurrency: int) -> Dict[str, Any]:
+        """
+        Summarize the recorded requests
+
+        Returns:
+            Overall throughput/latency/error rate, per-endpoint breakdown,
+            history growth slopes and consistency counts
+        """
+        def summarize(records):
+            errors = sum(1 for r in records if not 200 <= r[1] < 400)
+            return {
+                'requests': len(records),
+                'errors': errors,
+                'error_rate': _round(errors / len(records), 4) if records else 0.0,
+                'throughput_rps': _round(len(records) / elapsed, 2) if elapsed else None,
+                'latency_ms': latency_summary([r[2] for r in records]),
+                'status_codes': dict(Counter(str(r[1]) for r in records)),
+            }
+
+        by_endpoint = defaultdict(list)
+        for record in self.records:
+            by_endpoint[record[0]].append(record)
+
+        def growth(endpoint):
+            points = [(r[3], r[2]) for r in by_endpoint.get(endpoint, []) if r[1] == 200]
+            return _round(slope(points), 4)
+
+        successful_submits = sum(1 for r in by_endpoint.get('submit', []) if r[1] == 200)
+        stored = self._stored_submissions()
+        return {
+            'concurrency': concurrency,
+            'users': len(self.emails),
+            'elapsed_seconds': _round(elapsed),
+            **summarize(self.records),
+            'endpoints': {name: summarize(by_endpoint[name]) for name in ENDPOINTS if name in by_endpoint},
+            'history_growth': {
+                'max_history_size': max(self.history_size.values(), default=0),
+                'submit_ms_per_history_entry': growth('submit'),
+                'history_ms_per_history_entry': growth('history'),
+            },
+            'consistency': {
+                'successful_submits': successful_submits,
+                'stored_submissions': stored,
+                'lost_writes': None if stored is None else successful_submits - stored,
+                'duplicate_submission_ids': len(self.submission_ids) - len(set(self.submission_ids)),
+            },
+        }
+
+    def cleanup(self):
+        for email in self.emails:
+            remove_user_outputs(email)
+
+
+def print_report(report: Dict[str, Any], stream=sys.stdout):
+    def line(name, stats):
+        latency = stats['latency_ms']
+        fmt = lambda v: '-' if v is None else f'{v:.1f}'
+        print(f"{name:<10} {stats['requests']:>8} {stats['throughput_rps'] or 0:>9.1f} "
+              f"{stats['error_rate']:>7.1%} {fmt(latency['p50']):>9} {fmt(latency['p95']):>9} "
+              f"{fmt(latency['p99']):>9} {fmt(latency['max']):>9}", file=stream)
+
+    print(f"\n{report['requests']} requests in {report['elapsed_seconds']}s "
+          f"({report['concurrency']} concurrent clients, {report['users']} users)\n", file=stream)
+    print(f"{'endpoint':<10} {'requests':>8} {'req/s':>9} {'errors':>7} {'p50 ms':>9} "
+          f"{'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}", file=stream)
+    for name, stats in report['endpoints'].items():
+        line(name, stats)
+    line('total', report)
+
+    growth, consistency = report['history_growth'], report['consistency']
+    print(f"\nHistory growth (up to {growth['max_history_size']} submissions per user): "
+          f"submit {growth['submit_ms_per_history_entry']} ms/entry, "
+          f"history {growth['history_ms_per_history_entry']} ms/entry", file=stream)
+    print(f"Consistency: {consistency['successful_submits']} submitted, "
+          f"{consistency['stored_submissions']} stored, {consistency['lost_writes']} lost, "
+          f"{consistency['duplicate_submission_ids']} duplicate IDs", file=stream)
+
+
+def check_limits(report: Dict[str, Any], max_p95_ms: float = None, max_error_rate: float = None,
+                 max_history_slope_ms: float = None, strict: bool = False) -> List[str]:
+    """Limit violations (empty when the run is within all given limits)"""
+    failures = []
+    if max_p95_ms is not None:
+        for name, stats in report['endpoints'].items():
+            p95 = stats['latency_ms']['p95']
+            if p95 is not None and p95 > max_p95_ms:
+                failures.append(f'{name} p95 {p95:.1f} ms > {max_p95_ms} ms')
+    if max_error_rate is not None and report['error_rate'] > max_error_rate:
+        failures.append(f"error rate {report['error_rate']:.2%} > {max_error_rate:.2%}")
+    if max_history_slope_ms is not None:
+        for key, value in report['history_growth'].items():
+            if key.endswith('_per_history_entry') and value is not None and value > max_history_slope_ms:
+                failures.append(f'{key} {value} > {max_history_slope_ms}')
+    if strict:
+        consistency = report['consistency']
+        if consistency['lost_writes']:
+            failures.append(f"{consistency['lost_writes']} submissions missing from history")
+        if consistency['duplicate_submission_ids']:
+            failures.append(f"{consistency['duplicate_submission_ids']} duplicate submission IDs")
+    return failures
+
+
+def _parse_mix(value: str) -> Dict[str, float]:
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        if name.strip() not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def main(argv: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.loadtest', description='Scoping API load test')
+    parser.add_argument('--mode', choices=MODES, default='inprocess')
+    parser.add_argument('--port', type=int, help='Port for --mode subprocess (default: a free port)')
+    budget = parser.add_mutually_exclusive_group()
+    budget.add_argument('--requests', type=int, help='Total requests (default 200)')
+    budget.add_argument('--duration', type=float, help='Seconds to run')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--users', type=int, default=4)
+    parser.add_argument('--mix', type=_parse_mix, default=DEFAULT_MIX,
+                        help='Endpoint weights, e.g. submit=4,history=3,result=2,download=1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', type=Path, help='Write the report to this file')
+    parser.add_argument('--keep-output', action='store_true', help="Keep the synthetic users' results and reports")
+    parser.add_argument('--max-p95-ms', type=float, help='Fail when an endpoint p95 exceeds this')
+    parser.add_argument('--max-error-rate', type=float, help='Fail when the error rate exceeds this fraction')
+    parser.add_argument('--max-history-slope-ms', type=float,
+                        help='Fail when latency grows by more than this per stored submission')
+    parser.add_argument('--strict', action='store_true',
+                        help='Fail on lost history writes or duplicate submission IDs')
+    args = parser.parse_args(argv)
+    if args.concurrency < 1 or args.users < 1:
+        parser.error('--concurrency and --users must be at least 1')
+    requests = args.requests if args.requests is not None or args.duration is not None else 200
+
+    with contextlib.redirect_stdout(sys.stderr):
+        generator = ScenarioGenerator(seed=args.seed)
+
+    with contextlib.ExitStack() as stack:
+        if args.mode == 'subprocess':
+            transport = HTTPTransport(stack.enter_context(server_subprocess(args.port)))
+        else:
+            # The API logs every request; keep it out of the report
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, 'w'))))
+            transport = InProcessTransport()
+            stack.callback(transport.close)
+
+        load = LoadTest(transport, users=args.users, mix=args.mix, seed=args.seed, generator=generator)
+        if not args.keep_output:
+            stack.callback(load.cleanup)
+        report = load.run(requests=requests, duration=args.duration, concurrency=args.concurrency)
+    report['mode'] = args.mode
+
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    failures = check_limits(report, args.max_p95_ms, args.max_error_rate, args.max_history_slope_ms,
+                            args.strict)
+    if failures:
+        print('\n✗ ' + '\n✗ '.join(failures))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,97 @@
+"""
+Representative scenarios for the benchmark suite
+
+- minimal: a single dimension in scope, one role
+- typical: a mid-sized consolidation implementation (the debug_comparison.py scope)
+- all_yes: every metric in scope with small counts, every role
+- max_details: every metric in scope past the top of its weightage ladder (or at
+  MAX_UNLADDERED_DETAILS when its formula has no ladder), every role
+- generated_<i>: optional seeded synthetic scenarios (ScenarioGenerator)
+"""
+
+from typing import Any, Dict, List
+
+from backend.config import AVAILABLE_ROLES
+from backend.core.scope_processor import ScopeDefinitionProcessor
+from backend.core.scenario_generator import ScenarioGenerator, details_ceilings
+
+SCENARIO_NAMES = ('minimal', 'typical', 'all_yes', 'max_details')
+
+MAX_UNLADDERED_DETAILS = 1000
+
+# In-scope metrics of the typical scenario -> details; everything else is NO
+TYPICAL_IN_SCOPE = {
+    'Account': 2000, 'Account Alternate Hierarchies': 2, 'Rationalization of CoA': 0,
+    'Multi-Currency': 5, 'Reporting Currency': 2, 'Entity': 25, 'Entity Alternate Hierarchies': 2,
+    'Scenario': 2, 'Multi-GAAP': 0, 'Custom Dimensions': 2,
+    'Alternate Hierarchies in Custom Dimensions': 2, 'Additional Alias Tables': 1,
+    'Elimination': 0, 'Consolidation Journals': 0, 'Journal Templates': 1,
+    'Parent Currency Journals': 0, 'Cash Flow': 0, 'Approval Process': 0, 'Historic Overrides': 0,
+    'Audit': 0, 'Data Forms': 5, 'Business Rules': 3, 'Member Formula': 20, 'Ratios': 0,
+    'Secured Dimensions': 1, 'Number of Users': 20, 'Historical Data Validation': 2,
+    'Data Validation for Account Alt Hierarchies': 0, 'Data Validation for Entity Alt Hierarchies': 0,
+    'Historical Journal Conversion': 0, 'Direct Connect Integrations': 1, 'Custom Scripting': 2,
+    'Management Reports': 5, 'Consolidation Journal Reports': 1, 'Intercompany Reports': 1,
+    'Smart View Reports': 3, 'Automated Data loads': 0, 'Automated Consolidations': 0,
+    'Unit Testing': 0, 'UAT': 0, 'SIT': 0, 'Parallel Testing': 3, 'User Training': 0,
+    'Go Live': 0, 'Hypercare': 0, 'RTM': 0, 'Design Document': 0,
+    'System Configuration Document': 0, 'Admin Desktop Procedures': 0,
+    'End User Desktop Procedures': 0, 'Project Management': 0,
+}
+
+TYPICAL_ROLES = [
+    'PM USA', 'PM India', 'Architect USA', 'Delivery Lead India', 'Sr. Delivery Lead India',
+    'App Lead USA', 'App Lead India', 'App Developer India', 'Integration Lead USA',
+]
+
+
+def build_scenarios(generated: int = 0, seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """
+    Build the benchmark scenarios over the model's metric list
+
+    Args:
+        generated: Number of synthetic scenarios to add
+        seed: Seed for the synthetic scenarios
+
+    Returns:
+        name -> {'scope_inputs': [...], 'selected_roles': [...]} (ScopingEngine input format)
+    """
+    processor = ScopeDefinitionProcessor()
+    metric_names = [m['name'] for m in processor.metrics]
+    max_details = details_ceilings(processor.formulas)
+
+    def scope(details_for) -> List[Dict[str, Any]]:
+        inputs = []
+        for name in metric_names:
+            details = details_for(name)
+            inputs.append({'name': name, 'in_scope': 'NO' if details is None else 'YES',
+                           'details': details or 0})
+        return inputs
+
+    scenarios = {
+        'minimal': {
+            'scope_inputs': scope(lambda name: 100 if name == 'Account' else None),
+            'selected_roles': ['PM USA'],
+        },
+        'typical': {
+            'scope_inputs': scope(TYPICAL_IN_SCOPE.get),
+            'selected_roles': list(TYPICAL_ROLES),
+        },
+        'all_yes': {
+            'scope_inputs': scope(lambda name: 1),
+            'selected_roles': list(AVAILABLE_ROLES),
+        },
+        'max_details': {
+            'scope_inputs': scope(lambda name: max_details.get(name, MAX_UNLADDERED_DETAILS)),
+            'selected_roles': list(AVAILABLE_ROLES),
+        },
+    }
+
+    generator = ScenarioGenerator(seed=seed, formulas=processor.formulas) if generated else None
+    for i in range(generated):
+        scenario = generator.scenario(i)
+        scenarios[f'generated_{i}'] = {
+            'scope_inputs': scenario['scope_inputs'],
+            'selected_roles': scenario['selected_roles'],
+        }
+    return scenarios
@@ -0,0 +1,346 @@
+"""
+Benchmark Suite
+
+Times each pipeline stage against every benchmark scenario and compares the
+results with stored baselines.
+
+Each stage is a (setup, run) pair: setup(scenario, workdir) does the untimed
+preparation (e.g. computing the inputs of later stages) and returns a state,
+run(state) is the timed call. Timing follows timeit: the call count per sample
+is calibrated to take at least MIN_SAMPLE_SECONDS, and the best sample (the
+least disturbed by other load) is compared with the baseline.
+"""
+
+import contextlib
+import io
+import json
+import platform
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.config import OUTPUT_DIR
+from backend.core.scope_processor import ScopeDefinitionProcessor
+from backend.core.effort_calculator import EffortCalculator
+from backend.core.fte_calculator import FTEEffortsCalculator
+from backend.scoping_engine import ScopingEngine
+from backend.core.scenario_generator import submit_payload, to_scoping_data
+from backend.storage.codec import pack_record, write_json_file
+from backend.storage.results import delete_user_results
+from benchmarks.scenarios import build_scenarios
+
+BASELINE_FILE = Path(__file__).parent / 'baselines.json'
+
+# A stage regresses when its best time exceeds the baseline by this fraction...
+DEFAULT_THRESHOLD = 0.25
+# ...and by at least this much, so sub-microsecond jitter never fails a run
+MIN_REGRESSION_MS = 0.05
+
+MIN_SAMPLE_SECONDS = 0.2
+DEFAULT_REPEAT = 5
+
+BENCHMARK_EMAIL = 'benchmark@example.invalid'
+
+# Submissions in the /api/scoping/history payload of the history_json stages
+HISTORY_SIZE = 25
+
+
+def _engine(scenario) -> ScopingEngine:
+    engine = ScopingEngine()
+    engine.process_scope(scenario)
+    engine.calculate_effort()
+    engine.calculate_fte_allocation()
+    return engine
+
+
+# ----------------------------------------------------------------------
+# Stages: name -> (setup(scenario, workdir) -> state, run(state))
+# ----------------------------------------------------------------------
+
+def _setup_process(scenario, workdir):
+    return ScopeDefinitionProcessor(), scenario
+
+
+def _run_process(state):
+    processor, scenario = state
+    processor.process_user_input(scenario)
+
+
+def _setup_effort(scenario, workdir):
+    return ScopeDefinitionProcessor().process_user_input(scenario)
+
+
+def _run_effort(scope_result):
+    EffortCalculator(scope_result).calculate_effort()
+
+
+def _setup_fte(scenario, workdir):
+    scope_result = ScopeDefinitionProcessor().process_user_input(scenario)
+    categories = EffortCalculator(scope_result).calculate_effort()
+    return FTEEffortsCalculator(), categories, scope_result['selected_roles']
+
+
+def _run_fte(state):
+    calculator, categories, roles = state
+    calculator.calculate_role_fte_from_effort(categories, roles)
+
+
+def _setup_json_report(scenario, workdir):
+    return _engine(scenario), workdir / 'report.json'
+
+
+def _run_json_report(state):
+    engine, path = state
+    write_json_file(path, pack_record(engine.build_report()))
+
+
+def _setup_history_json(scenario, workdir):
+    import api_server
+    # As loaded from the results store (plain dicts and lists)
+    result = json.loads(json.dumps(_engine(scenario).build_calculation_result()))
+    submissions = [{
+        'id': f'benchmark_{i}', 'user_name': 'Benchmark', 'client_name': 'Benchmark',
+        'project_name': 'Benchmark', 'submitted_at': datetime(2026, 1, 1).isoformat(),
+        'status': 'COMPLETED', 'tier': result['tier'], 'total_weightage': result['total_weightage'],
+        'total_hours': result['total_hours'], 'total_days': result['total_days'],
+        'total_months': result['effort_estimation']['summary']['total_months'], 'comments': '',
+        'calculation_result': result,
+    } for i in range(HISTORY_SIZE)]
+    return api_server.app, {'success': True, 'submissions': submissions}
+
+
+def _run_history_json(state):
+    app, payload = state
+    app.json.response(payload)
+
+
+def _setup_history_json_stdlib(scenario, workdir):
+    from flask.json.provider import DefaultJSONProvider
+    app, payload = _setup_history_json(scenario, workdir)
+    return DefaultJSONProvider(app), payload
+
+
+def _run_history_json_stdlib(state):
+    provider, payload = state
+    provider.response(payload)
+
+
+def _setup_word(scenario, workdir):
+    from backend.core.sow_report_generator import SOWReportGenerator
+    engine = _engine(scenario)
+    fte_for_word = {role: engine.fte_result['by_role'][role]
+                    for role in engine.scope_result['selected_roles'] if role in engine.fte_result['by_role']}
+    args = (engine.scope_result, engine.effort_result['categories'], engine.effort_result['summary'],
+            fte_for_word, engine.scope_inputs_dict, workdir / 'report.docx')
+    return SOWReportGenerator(), args
+
+
+def _run_word(state):
+    generator, args = state
+    generator.generate_word_document(*args)
+
+
+def _setup_submit(scenario, workdir):
+    import api_server
+    payload = submit_payload(
+        dict(scenario, id='benchmark', scoping_data=to_scoping_data(scenario['scope_inputs'])),
+        user_email=BENCHMARK_EMAIL, client_name='Benchmark'
+    )
+    return api_server, api_server.app.test_client(), payload
+
+
+def _run_submit(state):
+    _, client, payload = state
+    response = client.post('/api/scoping/submit', json=payload)
+    if response.status_code != 200:
+        raise RuntimeError(f"Submit failed: {response.get_json().get('error')}")
+
+
+def _reset_submit(state):
+    # The user's results file grows with every submission; keep samples comparable
+    delete_user_results(BENCHMARK_EMAIL)
+
+
+def remove_user_outputs(email: str):
+    """Remove the reports and results file written by submissions from `email`"""
+    delete_user_results(email)
+    safe_email = email.replace('@', '_at_').replace('.', '_')
+    for directory in (OUTPUT_DIR, OUTPUT_DIR / 'results'):
+        for path in directory.glob(f'*{safe_email}*'):
+            path.unlink(missing_ok=True)
+
+
+# name -> (setup, run, reset before each sample or None)
+STAGES: Dict[str, Tuple[Callable, Callable, Optional[Callable]]] = {
+    'process_user_input': (_setup_process, _run_process, None),
+    'calculate_effort': (_setup_effort, _run_effort, None),
+    'calculate_role_fte': (_setup_fte, _run_fte, None),
+    'json_report': (_setup_json_report, _run_json_report, None),
+    # History response encoding: the app's JSON provider vs Flask's stdlib one
+    'history_json': (_setup_history_json, _run_history_json, None),
+    'history_json_stdlib': (_setup_history_json_stdlib, _run_history_json_stdlib, None),
+    'word_document': (_setup_word, _run_word, None),
+    'flask_submit': (_setup_submit, _run_submit, _reset_submit),
+}
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+
+def measure(run: Callable[[], Any], reset: Callable[[], Any] = None,
+            repeat: int = DEFAULT_REPEAT, min_sample_seconds: float = MIN_SAMPLE_SECONDS) -> Dict[str, Any]:
+    """
+    Time a call, timeit-style
+
+    Args:
+        run: Call to time
+        reset: Untimed call before each sample
+        repeat: Samples to take
+        min_sample_seconds: Calibrate calls per sample to take at least this long
+
+    Returns:
+        {'min_ms', 'median_ms', 'number', 'repeat'} (per-call milliseconds)
+    """
+    def sample(number):
+        if reset:
+            reset()
+        started = time.perf_counter()
+        for _ in range(number):
+            run()
+        return time.perf_counter() - started
+
+    run()  # Warm-up: imports, caches, worker pools
+    number = 1
+    while True:
+        elapsed = sample(number)
+        if elapsed >= min_sample_seconds:
+            break
+        number = max(number * 2, int(number * min_sample_seconds / max(elapsed, 1e-9)) + 1)
+
+    per_call = sorted(sample(number) / number * 1000 for _ in range(repeat))
+    return {
+        'min_ms': round(per_call[0], 4),
+        'median_ms': round(per_call[len(per_call) // 2], 4),
+        'number': number,
+        'repeat': repeat,
+    }
+
+
+def environment() -> Dict[str, str]:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+def run_suite(stages: List[str] = None, scenarios: List[str] = None, repeat: int = DEFAULT_REPEAT,
+              min_sample_seconds: float = MIN_SAMPLE_SECONDS, generated: int = 0,
+              seed: int = 0) -> Dict[str, Dict[str, Any]]:
+    """
+    Run the benchmarks
+
+    Args:
+        stages: Stage names (default: all)
+        scenarios: Scenario names (default: all)
+        repeat: Samples per benchmark
+        min_sample_seconds: Minimum duration of one sample
+        generated: Synthetic scenarios to add (generated_0 .. generated_<n-1>)
+        seed: Seed for the synthetic scenarios
+
+    Returns:
+        'stage/scenario' -> measure() result
+
+    Raises:
+        ValueError: Unknown scenario name
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        all_scenarios = build_scenarios(generated, seed)
+    unknown = [name for name in scenarios or [] if name not in all_scenarios]
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(unknown)}")
+    results = {}
+    workdir = Path(tempfile.mkdtemp(prefix='scoping-bench-'))
+
+    try:
+        for stage in stages or list(STAGES):
+            setup, run, reset = STAGES[stage]
+            for name in scenarios or list(all_scenarios):
+                # The pipeline prints progress; keep it out of the benchmark output
+                with contextlib.redirect_stdout(io.StringIO()):
+                    state = setup(all_scenarios[name], workdir)
+                    results[f'{stage}/{name}'] = measure(
+                        lambda: run(state), (lambda: reset(state)) if reset else None,
+                        repeat=repeat, min_sample_seconds=min_sample_seconds
+                    )
+                print(f"  {stage + '/' + name:<40} {results[f'{stage}/{name}']['min_ms']:>12.3f} ms")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+        if 'flask_submit' in (stages or STAGES):
+            remove_user_outputs(BENCHMARK_EMAIL)
+            import api_server
+            api_server.report_service.shutdown()
+
+    return results
+
+
+# ----------------------------------------------------------------------
+# Baselines
+# ----------------------------------------------------------------------
+
+def load_baselines(path: Path = BASELINE_FILE) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baselines(results: Dict[str, Dict[str, Any]], path: Path = BASELINE_FILE,
+                   merge: bool = True) -> Dict[str, Any]:
+    """Store results as the new baselines (merged into existing entries by default)"""
+    existing = load_baselines(path) if merge else None
+    baselines = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment(),
+        'results': {**((existing or {}).get('results') or {}), **results},
+    }
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write('\n')
+    return baselines
+
+
+def compare(results: Dict[str, Dict[str, Any]], baselines: Dict[str, Any],
+            threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Compare results with baselines
+
+    Returns:
+        One row per benchmark: {'benchmark', 'baseline_ms', 'current_ms', 'change', 'status'}
+        with status 'ok', 'regressed', 'improved' or 'new'
+    """
+    rows = []
+    for key, result in results.items():
+        baseline = (baselines.get('results') or {}).get(key)
+        current = result['min_ms']
+        if baseline is None:
+            rows.append({'benchmark': key, 'baseline_ms': None, 'current_ms': current,
+                         'change': None, 'status': 'new'})
+            continue
+
+        base = baseline['min_ms']
+        change = (current - base) / base if base else 0.0
+        if change > threshold and current - base > MIN_REGRESSION_MS:
+            status = 'regressed'
+        elif change < -threshold and base - current > MIN_REGRESSION_MS:
+            status = 'improved'
+        else:
+            status = 'ok'
+        rows.append({'benchmark': key, 'baseline_ms': base, 'current_ms': current,
+                     'change': round(change, 4), 'status': status})
+    return rows
@@ -0,0 +1,19 @@
+"""
+Shared test setup: model versions stored while packing records go to a
+temporary MODEL_DIR instead of output/models
+"""
+
+import pytest
+
+from backend.core import scoping_model
+from backend.core.scoping_model import ModelRegistry
+from backend.storage import codec
+
+
+@pytest.fixture(autouse=True)
+def model_dir(tmp_path, monkeypatch):
+    """A fresh MODEL_DIR under tmp_path, with the codec's per-version caches emptied"""
+    monkeypatch.setattr(scoping_model, '_registry', ModelRegistry(tmp_path / 'models', poll_seconds=0))
+    monkeypatch.setattr(codec, '_formulas_by_version', {})
+    monkeypatch.setattr(codec, '_stored_versions', set())
+    return tmp_path / 'models'
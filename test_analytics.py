@@ -0,0 +1,115 @@
+"""
+Analytics rollup: saving a submission updates the totals incrementally, and
+they equal a rebuild from the stored results
+"""
+
+import contextlib
+import io
+import json
+import multiprocessing
+
+from backend.scoping_engine import ScopingEngine
+from backend.storage import codec, results
+from backend.storage.analytics import RollupStore, analytics_view, build_rollup
+
+
+def _submission(i):
+    roles = ['PM USA', 'App Lead India'] if i % 2 else ['PM USA']
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': [
+            {'name': 'Account', 'in_scope': 'YES', 'details': 500 + 3000 * i},
+            {'name': 'Data Forms', 'in_scope': 'YES' if i % 3 else 'NO', 'details': 20},
+        ], 'selected_roles': roles})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return {
+        'submission_id': f'user{i % 2}_at_example_com_20260{i % 3 + 1}01_00000{i}',
+        'user_email': f'user{i % 2}@example.com',
+        'submitted_at': f'2026-0{i % 3 + 1}-01T00:00:00',
+        'selected_roles': roles,
+        'calculation_result': json.loads(json.dumps(engine.build_calculation_result())),
+    }
+
+
+def test_incremental_matches_rebuild(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    submissions = [_submission(i) for i in range(6)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        for submission in submissions:
+            assert results.save_user_result(submission['user_email'], submission)
+        incremental = results.get_analytics_store().view()
+        rebuilt = RollupStore(tmp_path / 'analytics.json', lambda: submissions).rebuild()
+
+    for view in (incremental, rebuilt):
+        view.pop('updated_at')
+    assert incremental == rebuilt
+    assert incremental['submissions'] == 6 and incremental['users'] == 2
+    assert sum(tier['submissions'] for tier in incremental['tier_distribution'].values()) == 6
+    assert incremental['top_roles'][0] == {
+        'name': 'PM USA', 'count': 6, 'share': 1.0,
+        'avg_hours': round(sum(s['calculation_result']['fte_allocation']['by_role']['PM USA']['hours']
+                               for s in submissions) / 6, 2)}
+    assert incremental['top_features'][:2] == [{'name': 'Account', 'count': 6, 'share': 1.0},
+                                               {'name': 'Data Forms', 'count': 4, 'share': round(4 / 6, 4)}]
+
+
+def test_missing_file_is_built_from_results_once(tmp_path):
+    submissions = [_submission(i) for i in range(3)]
+    store = RollupStore(tmp_path / 'analytics.json', lambda: submissions)
+    with contextlib.redirect_stdout(io.StringIO()):
+        # The submission being recorded is already in the stored results
+        store.record(submissions[-1])
+    assert store.view()['submissions'] == 3
+    assert analytics_view(build_rollup([]))['tier_distribution'] == {}
+
+    # Another process's update is picked up from the file
+    other = RollupStore(tmp_path / 'analytics.json', lambda: [])
+    other.record(_submission(3))
+    assert store.view()['submissions'] == 4
+
+
+def test_deleted_results_leave_the_rollup(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        kept = _submission(0)
+        results.save_user_result(kept['user_email'], kept)
+        before = results.get_analytics_store().view()
+        for i in (1, 3):
+            submission = _submission(i)
+            results.save_user_result(submission['user_email'], submission)
+        assert results.delete_user_results('user1@example.com') == 2
+
+    after = results.get_analytics_store().view()
+    before.pop('updated_at'), after.pop('updated_at')
+    assert after == before
+
+
+def _save_all(path, submissions, barrier):
+    store = RollupStore(path, lambda: [])
+    barrier.wait()
+    for _ in range(5):
+        for submission in submissions:
+            store.record(submission)
+
+
+def test_concurrent_writers_and_legacy_file(tmp_path):
+    path = tmp_path / 'analytics.json'
+    legacy = build_rollup([_submission(0)])
+    path.write_text(json.dumps(legacy))  # Plain JSON, as written before the storage codec
+    assert RollupStore(path, lambda: []).view()['submissions'] == 1
+
+    # Server processes saving at the same time; no update may be lost
+    submissions = [_submission(i) for i in range(1, 5)]
+    context = multiprocessing.get_context('spawn')
+    barrier = context.Barrier(4)
+    workers = [context.Process(target=_save_all, args=(path, submissions, barrier)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert [worker.exitcode for worker in workers] == [0] * 4
+
+    assert RollupStore(path, lambda: []).view()['submissions'] == 1 + 4 * 5 * len(submissions)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ['analytics.json', 'analytics.json.lock']
+    assert codec.read_json_file(path)['format'] == legacy['format']
@@ -0,0 +1,98 @@
+"""
+Backfill: stored submissions are recomputed under a new model version next to
+the originals, an interrupted run resumes, and the diff report shows the
+hour changes
+"""
+
+import contextlib
+import io
+import json
+
+import pytest
+
+from backend import backfill
+from backend.core.scenario_generator import to_scoping_data
+from backend.core.scoping_model import ScopingModel
+from backend.scoping_engine import ScopingEngine
+from backend.storage import results
+
+CATEGORY = 'Project Initiation and Planning'
+ROLES = ['PM USA', 'App Lead India']
+
+
+def _scope_inputs(i):
+    return [
+        {'name': 'Account', 'in_scope': 'YES', 'details': 500 + 400 * i},
+        {'name': 'Data Forms', 'in_scope': 'YES', 'details': 10 + 5 * i},
+        {'name': 'Business Rules', 'in_scope': 'NO', 'details': 0},
+    ]
+
+
+def _calculation_result(model, i):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine(model)
+        engine.process_scope({'scope_inputs': _scope_inputs(i), 'selected_roles': ROLES})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return json.loads(json.dumps(engine.build_calculation_result()))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path / 'results')
+    monkeypatch.setattr(results, 'RECOMPUTED_DIR', tmp_path / 'results' / 'recomputed')
+    monkeypatch.setattr(backfill, 'RECOMPUTED_DIR', tmp_path / 'results' / 'recomputed')
+    results.RESULTS_DIR.mkdir()
+
+    model = ScopingModel.default()
+    for i in range(5):
+        email = f'user{i % 2}@example.com'
+        results.save_user_result(email, {
+            'submission_id': f'{results.safe_email(email)}_20260101_00000{i}',
+            'user_email': email,
+            'client_name': f'Client {i}',
+            'project_name': 'Backfill',
+            'scoping_data': to_scoping_data(_scope_inputs(i)),
+            'selected_roles': ROLES,
+            'calculation_result': _calculation_result(model, i),
+        })
+    return model
+
+
+def _new_model(base, extra_hours):
+    template = {name: dict(data) for name, data in base.effort_template.items()}
+    template[CATEGORY]['total'] += extra_hours
+    return ScopingModel(base.formulas, template, base.tiers_data, base.roles, source='test')
+
+
+def test_recompute_keeps_originals_and_resumes(store):
+    new = _new_model(store, 40)
+    originals = {path.name: path.read_bytes() for path in results.RESULTS_DIR.glob('user_*.json')}
+
+    first = backfill.run_backfill(new, limit=2, chunk_size=1)
+    assert first['recomputed'] == 2
+    second = backfill.run_backfill(new, chunk_size=2)
+    assert (second['recomputed'], second['already_recomputed'], second['errors']) == (3, 2, 0)
+    assert backfill.run_backfill(store)['current'] == 5
+
+    assert {path.name: path.read_bytes() for path in results.RESULTS_DIR.glob('user_*.json')} == originals
+    records = {r['submission_id']: r for r in results.iter_recomputed(new.version)}
+    assert len(records) == 5
+
+    record = records['user1_at_example_com_20260101_000003']
+    assert record['calculation_result'] == dict(_calculation_result(new, 3),
+                                                model_version=new.version)
+    assert record['previous']['model_version'] == store.version
+    assert results.load_recomputed_versions('user1@example.com', record['submission_id']) == {
+        new.version: record}
+
+
+def test_diff_report(store, tmp_path):
+    new = _new_model(store, 40)
+    backfill.run_backfill(new)
+    summary = backfill.write_diff_report(new.version, tmp_path / 'report')
+
+    assert summary['submissions'] == 5 and summary['tier_changed'] == 0
+    assert summary['effort_hours_change'] == {'total': 200, 'mean': 40, 'min': 40, 'max': 40}
+    rows = (tmp_path / 'report' / backfill.DIFF_REPORT_FILE).read_text().splitlines()
+    assert rows[0].split(',') == backfill.DIFF_COLUMNS and len(rows) == 6
@@ -0,0 +1,59 @@
+"""
+Batch CLI: results come back in input order, match the full pipeline, and a
+resumed run produces the same file as an uninterrupted one
+"""
+
+import contextlib
+import io
+import json
+
+from backend.batch import ResultWriter, completed_records, main, read_scenarios, run_batch
+from backend.scoping_engine import ScopingEngine
+
+SCOPE_INPUTS = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+    {'name': 'Multi-Currency', 'in_scope': 'YES', 'details': 3},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 30},
+    {'name': 'Business Rules', 'in_scope': 'NO', 'details': 0},
+]
+
+
+def _scenarios(count):
+    for i in range(count):
+        inputs = [dict(item, details=item['details'] + i * 5) for item in SCOPE_INPUTS]
+        yield json.dumps({'id': f's{i}', 'selected_roles': ['PM USA'], 'scope_inputs': inputs}) + '\n'
+
+
+def test_results_in_order_and_match_engine():
+    lines = list(_scenarios(12)) + ['not json\n']
+    out = io.StringIO()
+    with contextlib.redirect_stderr(io.StringIO()):
+        summary = run_batch(read_scenarios(lines, 'ndjson'), ResultWriter(out, 'ndjson'), chunk_size=5)
+
+    records = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert summary['scenarios'] == 13 and summary['errors'] == 1
+    assert [r['id'] for r in records] == [f's{i}' for i in range(12)] + [13]
+
+    scenario = json.loads(lines[7])
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope(scenario)
+        engine.calculate_effort()
+    assert records[7]['total_weightage'] == engine.scope_result['total_weightage']
+    assert records[7]['total_hours'] == engine.effort_result['summary']['total_time_hours']
+
+
+def test_resume_after_partial_write(tmp_path):
+    source = tmp_path / 'in.ndjson'
+    source.write_text(''.join(_scenarios(9)))
+    full, partial = tmp_path / 'full.csv', tmp_path / 'partial.csv'
+
+    with contextlib.redirect_stderr(io.StringIO()):
+        assert main([str(source), str(full), '--workers', '1', '--chunk-size', '2']) == 0
+        # Interrupted mid-record: header + 4 rows + half a row
+        lines = full.read_text().splitlines(keepends=True)
+        partial.write_text(''.join(lines[:5]) + lines[5][:10])
+        assert completed_records(partial, 'csv') == 4
+        assert main([str(source), str(partial), '--workers', '1', '--resume']) == 0
+
+    assert partial.read_text() == full.read_text()
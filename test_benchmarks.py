@@ -0,0 +1,56 @@
+"""
+Benchmark suite plumbing: regression detection, timing and scenarios
+(actual timings are only checked by `python -m benchmarks`)
+"""
+
+import contextlib
+import io
+
+from backend.scoping_engine import ScopingEngine
+from benchmarks.scenarios import SCENARIO_NAMES, build_scenarios
+from benchmarks.suite import compare, measure
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baselines = {'results': {
+        'a/typical': {'min_ms': 10.0},
+        'b/typical': {'min_ms': 10.0},
+        'c/typical': {'min_ms': 10.0},
+        'd/typical': {'min_ms': 0.01},
+    }}
+    results = {
+        'a/typical': {'min_ms': 11.0},
+        'b/typical': {'min_ms': 13.0},
+        'c/typical': {'min_ms': 5.0},
+        'd/typical': {'min_ms': 0.02},  # +100% but below the absolute noise floor
+        'e/typical': {'min_ms': 1.0},
+    }
+    statuses = {row['benchmark']: row['status'] for row in compare(results, baselines, threshold=0.25)}
+    assert statuses == {'a/typical': 'ok', 'b/typical': 'regressed', 'c/typical': 'improved',
+                        'd/typical': 'ok', 'e/typical': 'new'}
+
+
+def test_measure_calibrates_and_resets():
+    calls = {'run': 0, 'reset': 0}
+
+    def run():
+        calls['run'] += 1
+
+    def reset():
+        calls['reset'] += 1
+
+    result = measure(run, reset, repeat=3, min_sample_seconds=0.001)
+    assert result['number'] >= 1 and result['repeat'] == 3
+    assert result['min_ms'] <= result['median_ms']
+    assert calls['reset'] >= 4  # Calibration sample(s) + 3 timed samples
+
+
+def test_scenarios_score():
+    with contextlib.redirect_stdout(io.StringIO()):
+        scenarios = build_scenarios()
+        tiers = {}
+        for name in SCENARIO_NAMES:
+            engine = ScopingEngine()
+            tiers[name] = engine.process_scope(scenarios[name])['tier']
+            engine.calculate_effort()
+    assert tiers['minimal'] <= tiers['typical'] <= tiers['max_details']
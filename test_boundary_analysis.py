@@ -0,0 +1,52 @@
+"""
+Breakpoint-driven tier/band search must find the same answers as a brute-force scan
+"""
+
+import contextlib
+import io
+
+from backend.core.boundary_analysis import BoundaryAnalyzer, TARGETS
+from backend.core.effort_calculator import get_adjustment_band
+from backend.core.scope_processor import determine_tier
+from backend.core.sensitivity import IncrementalScorer
+
+SCOPE_INPUTS = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+    {'name': 'Entity', 'in_scope': 'YES', 'details': 40},
+    {'name': 'Multi-Currency', 'in_scope': 'YES', 'details': 3},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 9},
+    {'name': 'Business Rules', 'in_scope': 'YES', 'details': 12},
+    {'name': 'Files Based Loads', 'in_scope': 'YES', 'details': 4},
+    {'name': 'Direct Connect Integrations', 'in_scope': 'YES', 'details': 2},
+    {'name': 'Consolidation Reports', 'in_scope': 'YES', 'details': 6},
+]
+
+
+def _brute_force(scorer, name, current, limit):
+    tier, band = scorer.tier, get_adjustment_band(scorer.total_weightage)
+    expected = dict.fromkeys(TARGETS)
+    for value in sorted((v for v in range(limit + 1) if v != current),
+                        key=lambda v: (abs(v - current), v < current)):
+        weightage = scorer.rescore_weightage(name, details=value)
+        new_tier, new_band = determine_tier(weightage), get_adjustment_band(weightage)
+        for key, crossed in (('next_tier', new_tier > tier), ('previous_tier', new_tier < tier),
+                             ('next_band', new_band > band), ('previous_band', new_band < band)):
+            if crossed and expected[key] is None:
+                expected[key] = value
+    return expected
+
+
+def test_matches_brute_force():
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = IncrementalScorer([dict(item) for item in SCOPE_INPUTS], ['PM USA'])
+        analyzer = BoundaryAnalyzer(scorer)
+        analysis = analyzer.analyze()
+
+        for result in analysis['metrics']:
+            breakpoints = analyzer.details_breakpoints(result['metric'])
+            assert breakpoints is not None
+            limit = int(max(breakpoints + [result['details']])) + 3
+            expected = _brute_force(scorer, result['metric'], result['details'], limit)
+            for key in TARGETS:
+                found = result[key]['details'] if result[key] else None
+                assert found == expected[key], (result['metric'], key)
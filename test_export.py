@@ -0,0 +1,88 @@
+"""
+Columnar export: one flat row per submission, and later runs only export what
+was stored since the watermark
+"""
+
+import contextlib
+import csv
+import gzip
+import io
+import json
+
+import pytest
+
+from backend import export
+from backend.scoping_engine import ScopingEngine
+from backend.storage import results
+
+
+def _submission(email, i):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': [
+            {'name': 'Account', 'in_scope': 'YES', 'details': 1000 + 500 * i},
+            {'name': 'Data Forms', 'in_scope': 'YES', 'details': 12},
+        ], 'selected_roles': ['PM USA']})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return {
+        'submission_id': f"{results.safe_email(email)}_20260101_00000{i}",
+        'user_email': email,
+        'selected_roles': ['PM USA'],
+        'calculation_result': json.loads(json.dumps(engine.build_calculation_result())),
+    }
+
+
+def _read_rows(directory, part):
+    with gzip.open(directory / part, 'rt', newline='') as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path / 'results')
+    results.RESULTS_DIR.mkdir()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(3):
+            results.save_user_result('a@example.com', _submission('a@example.com', i))
+    return tmp_path / 'export'
+
+
+def test_rows_and_watermark(store):
+    first = export.run_export(store, 'csv.gz', chunk_size=2)
+    rows = _read_rows(store, first['part'])
+    assert first['rows'] == 3 and len(rows[0]) == first['columns']
+
+    stored = results.load_user_results('a@example.com')[2]
+    result = stored['calculation_result']
+    assert rows[2]['submission_id'] == stored['submission_id']
+    assert float(rows[2]['details:Account']) == 2000 and rows[2]['in_scope:Account'] == '1'
+    assert rows[2]['in_scope:Business Rules'] == '0'
+    assert float(rows[2]['role_hours:PM USA']) == result['fte_allocation']['by_role']['PM USA']['hours']
+    assert rows[2]['role_hours:App Lead India'] == ''
+    for category, hours in result['effort_estimation']['categories'].items():
+        assert float(rows[2][f'category_hours:{category}']) == hours
+
+    assert export.run_export(store, 'csv.gz')['part'] is None
+    with contextlib.redirect_stdout(io.StringIO()):
+        results.save_user_result('b@example.com', _submission('b@example.com', 0))
+        results.save_user_result('a@example.com', _submission('a@example.com', 3))
+    second = export.run_export(store, 'csv.gz')
+    assert sorted(row['submission_id'] for row in _read_rows(store, second['part'])) == [
+        'a_at_example_com_20260101_000003', 'b_at_example_com_20260101_000000']
+
+    # A replaced results file is exported from the start
+    with contextlib.redirect_stdout(io.StringIO()):
+        results.delete_user_results('b@example.com')
+        results.save_user_result('b@example.com', _submission('b@example.com', 5))
+    assert export.run_export(store, 'csv.gz')['rows'] == 1
+    assert export.run_export(store, 'csv.gz', full=True)['rows'] == 5
+    assert [part['rows'] for part in export.load_state(store)['parts']] == [3, 2, 1, 5]
+
+
+def test_parquet(store):
+    pd = pytest.importorskip('pandas')
+    pytest.importorskip('pyarrow')
+    summary = export.run_export(store, 'parquet')
+    frame = pd.read_parquet(store / summary['part'])
+    assert len(frame) == 3 and frame['details:Account'].tolist() == [1000, 1500, 2000]
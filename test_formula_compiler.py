@@ -0,0 +1,137 @@
+"""
+Compiled formulas must score exactly like the interpreted FormulaEvaluator
+
+Runs every shipped weightage formula through both paths on random scenarios,
+including the awkward inputs (None, numeric strings, junk) the eval() path
+has to cope with, checks the numpy batch path against the scalar one, and
+checks the per-formula memo is keyed on referenced inputs only.
+"""
+
+import contextlib
+import io
+import random
+
+import numpy as np
+import pytest
+
+from backend.core.scope_processor import ScopeDefinitionProcessor
+from backend.utils import formula_compiler
+from backend.utils.formula_compiler import BatchUnsupported, Node, _BatchEvaluator, compile_formula, StepLookup
+from backend.utils.formula_evaluator import FormulaEvaluator
+
+EDGE_DETAILS = [None, 0, 1, 2, 2.5, 3, 100, 100.5, 101, '5', 'abc', '', -1, True]
+
+
+def _quiet(func, *args):
+    # Evaluation errors are printed, and some formulas error by design
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def _formulas():
+    return _quiet(ScopeDefinitionProcessor).formulas
+
+
+def _random_metrics(rng, names, edge_cases):
+    return [
+        {
+            'name': name,
+            'in_scope': rng.choice(['YES', 'NO', 'Yes', None]),
+            'details': rng.choice(EDGE_DETAILS) if edge_cases else rng.randint(0, 250),
+        }
+        for name in names
+    ]
+
+
+def test_ladders_are_lowered():
+    formulas = _formulas()
+    compiled = compile_formula(formulas['Multi-Currency'])
+    assert compiled is not None
+    assert compiled.step_lookups()
+    assert all(isinstance(table, StepLookup) for table in compiled.step_lookups())
+    # Constant formulas fold away entirely
+    assert compile_formula('=1').refs == ()
+
+
+def test_scalar_parity():
+    formulas = _formulas()
+    rng = random.Random(31)
+    for trial in range(150):
+        evaluator = FormulaEvaluator(_random_metrics(rng, formulas, edge_cases=trial % 3 == 0))
+        for name, formula in formulas.items():
+            compiled = _quiet(evaluator.evaluate, formula)
+            interpreted = _quiet(evaluator.evaluate_interpreted, formula)
+            assert compiled == interpreted, name
+
+
+def test_batch_parity():
+    formulas = _formulas()
+    rng = random.Random(131)
+    rows = [_random_metrics(rng, formulas, edge_cases=False) for _ in range(100)]
+    for row in rows[::2]:
+        for metric in row:
+            metric['details'] = rng.randint(0, 12)
+            metric['in_scope'] = rng.choice(['YES', 'NO'])
+
+    columns = {}
+    for i, name in enumerate(formulas):
+        columns[(name, 'InScope')] = np.array([str(row[i]['in_scope']) for row in rows], dtype=object)
+        columns[(name, 'Details')] = np.array([row[i]['details'] for row in rows], dtype=float)
+
+    for name, formula in formulas.items():
+        compiled = compile_formula(formula)
+        if compiled is None:
+            continue
+        batch = _quiet(compiled.evaluate_batch, columns, len(rows))
+        expected = [_quiet(FormulaEvaluator(row).evaluate_interpreted, formula) for row in rows]
+        assert np.allclose(batch, expected), name
+
+
+def test_unsupported_batch_shapes_fall_back_to_rows():
+    # A string-valued result has no numeric batch form
+    compiled = compile_formula('=IF(Probe[InScope]="YES",Probe[InScope],Probe[Details])')
+    columns = {('Probe', 'InScope'): np.array(['YES', 'NO'], dtype=object),
+               ('Probe', 'Details'): np.array([4.0, 6.0])}
+    with pytest.raises(BatchUnsupported):
+        _BatchEvaluator(np, columns, 2).run(compiled.root)
+    assert list(_quiet(compiled.evaluate_batch, columns, 2)) == [0, 6]
+
+    with pytest.raises(TypeError):
+        Node()
+
+
+def test_errors_are_quiet_unless_strict(capsys):
+    compiled = compile_formula('=10/Error Probe[Details]')
+    metrics = {'Error Probe': {'name': 'Error Probe', 'in_scope': 'YES', 'details': 0}}
+
+    assert compiled.evaluate(metrics) == 0
+    assert compiled.evaluate(metrics) == 0  # memoized failure
+    assert capsys.readouterr().out == ''
+    with pytest.raises(ZeroDivisionError):
+        compiled.evaluate(metrics, strict=True)
+
+
+def test_compiled_formula_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(formula_compiler, 'FORMULA_CACHE_SIZE', 2)
+    monkeypatch.setattr(formula_compiler, '_compiled', formula_compiler.OrderedDict())
+    first = compile_formula('=IF(Cache A[InScope]="YES",1,0)')
+    compile_formula('=IF(Cache B[InScope]="YES",2,0)')
+    assert compile_formula('=IF(Cache A[InScope]="YES",1,0)') is first  # now most recently used
+    compile_formula('=IF(Cache C[InScope]="YES",3,0)')
+
+    assert list(formula_compiler._compiled) == ['=IF(Cache A[InScope]="YES",1,0)',
+                                                '=IF(Cache C[InScope]="YES",3,0)']
+
+
+def test_memo_hits_on_repeated_input_slice():
+    compiled = compile_formula('=IF(Memo Probe[InScope]="YES",IF(Memo Probe[Details]>2,3,1),0)')
+    compiled.clear_memo()
+    metrics = {'Memo Probe': {'name': 'Memo Probe', 'in_scope': 'YES', 'details': 4},
+               'Unrelated': {'name': 'Unrelated', 'in_scope': 'NO', 'details': 0}}
+
+    assert compiled.evaluate(metrics) == 3
+    metrics['Unrelated']['details'] = 9  # Not referenced, so still the same key
+    assert compiled.evaluate(metrics) == 3
+    metrics['Memo Probe']['details'] = 1
+    assert compiled.evaluate(metrics) == 1
+    assert (compiled.hits, compiled.misses) == (1, 2)
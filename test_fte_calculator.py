@@ -0,0 +1,80 @@
+"""
+Dense allocation-matrix FTE must match the per-row SUMPRODUCT of App Tiers Definition
+"""
+
+import contextlib
+import io
+from collections.abc import Mapping
+
+import numpy as np
+import pytest
+
+from backend.core.fte_calculator import FTEEffortsCalculator
+from backend.core.scenario_generator import ScenarioGenerator
+from backend.core.scope_processor import ScopeDefinitionProcessor
+from backend.core.effort_calculator import EffortCalculator
+from backend.data.excel_templates import APP_TIERS_DATA, APP_TIERS_ROLES
+
+
+def _sumproduct(categories, role):
+    total = 0.0
+    for row in APP_TIERS_DATA:
+        entry = categories.get(row['category'], 0.0)
+        hours = entry.get('final_estimate', 0.0) if isinstance(entry, Mapping) else entry
+        total += hours * row['roles'].get(role, 0.0)
+    return total
+
+
+@pytest.fixture(scope='module')
+def calculator():
+    with contextlib.redirect_stdout(io.StringIO()):
+        return FTEEffortsCalculator()
+
+
+@pytest.fixture(scope='module')
+def effort_runs():
+    with contextlib.redirect_stdout(io.StringIO()):
+        processor = ScopeDefinitionProcessor()
+        generator = ScenarioGenerator(seed=3, formulas=processor.formulas)
+        return [EffortCalculator(processor.process_user_input(s)).calculate_effort()
+                for s in generator.generate(25)]
+
+
+def test_matrix_matches_sumproduct(calculator, effort_runs):
+    for categories in effort_runs:
+        result = calculator.calculate_role_fte_from_effort(categories)
+        assert list(result) == APP_TIERS_ROLES
+        for role, hours in result.items():
+            assert hours == pytest.approx(_sumproduct(categories, role), abs=1e-9)
+
+
+def test_batch_matches_single(calculator, effort_runs):
+    rows = []
+    for categories in effort_runs:
+        rows.append([categories.get(c, {}).get('final_estimate', 0.0) for c in calculator.categories])
+    batch = calculator.calculate_role_fte_batch(np.array(rows))
+    for categories, role_hours in zip(effort_runs, batch):
+        np.testing.assert_allclose(role_hours, calculator.calculate_all_roles_fte(categories))
+
+
+def test_selected_and_unknown_roles(calculator, effort_runs):
+    result = calculator.calculate_role_fte_from_effort(effort_runs[0], ['Architect USA', 'Nobody', 'PM USA'])
+    assert list(result) == ['Architect USA', 'PM USA']
+
+
+def test_simple_hours_format_and_summary(calculator, effort_runs):
+    simple = {c: v['final_estimate'] for c, v in effort_runs[0].items()}
+    summary = calculator.generate_fte_summary(simple, ['PM USA'])
+    hours = summary['role_fte_hours']['PM USA']
+    assert hours == pytest.approx(_sumproduct(simple, 'PM USA'))
+    assert summary['role_fte_summary'][0]['fte_months'] == pytest.approx(hours / 8 / 30)
+    assert summary['total_hours'] == pytest.approx(hours)
+
+
+def test_allocation_submatrix(calculator):
+    model = calculator.model
+    assert not model.allocation_matrix.flags.writeable
+    sub = model.allocation_submatrix(['Unknown', *model.categories[:2]], ['PM USA', 'Nobody'])
+    assert sub.shape == (3, 2)
+    assert not sub[0].any() and not sub[:, 1].any()
+
@@ -0,0 +1,50 @@
+"""
+Import-time budget for scoring-only processes
+
+`import backend.scoping_engine` must stay cheap: report dependencies
+(python-docx/lxml) and pandas may only load on first report generation.
+Each check runs in a fresh interpreter so earlier imports don't hide the cost.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+# Generous enough for slow CI machines; loading python-docx + pandas takes ~0.5s
+IMPORT_BUDGET_SECONDS = 0.25
+
+HEAVY_MODULES = ('docx', 'lxml', 'pandas', 'openpyxl')
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import backend.scoping_engine
+elapsed = time.perf_counter() - start
+heavy = sorted({{name.split('.')[0] for name in sys.modules}} & set({HEAVY_MODULES!r}))
+print(json.dumps({{'elapsed': elapsed, 'heavy': heavy}}))
+"""
+
+
+def _probe_import():
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE],
+        cwd=Path(__file__).parent,
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_scoping_engine_import_skips_report_dependencies():
+    result = _probe_import()
+    assert result['heavy'] == [], f"Heavy modules loaded at import: {result['heavy']}"
+
+
+def test_scoping_engine_import_within_budget():
+    # Best of three runs to keep filesystem cache noise out of the measurement
+    elapsed = min(_probe_import()['elapsed'] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET_SECONDS, (
+        f"import backend.scoping_engine took {elapsed:.3f}s (budget {IMPORT_BUDGET_SECONDS}s)"
+    )
@@ -0,0 +1,73 @@
+"""
+JSON serializer: both backends encode engine result types the same way, and
+API responses through the app's JSON provider match Flask's stdlib encoding
+"""
+
+import dataclasses
+import json
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+import api_server
+from backend.utils import json_serializer
+
+BACKENDS = ['stdlib'] + (['orjson'] if json_serializer.ORJSON_AVAILABLE else [])
+
+
+@dataclasses.dataclass
+class RoleHours:
+    role: str
+    hours: float
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_engine_types_encode_directly(backend):
+    value = {
+        'hours': np.array([1.5, 2.0]),
+        'tier': np.int64(3),
+        'weightage': np.float64(12.25),
+        'role': RoleHours('PM USA', 40.0),
+        'day': date(2026, 1, 2),
+        'path': Path('output') / 'report.docx',
+        2: 'non-string key',
+    }
+    encoded = json_serializer.dumps(value, backend=backend)
+    assert json.loads(encoded) == {
+        'hours': [1.5, 2.0], 'tier': 3, 'weightage': 12.25,
+        'role': {'role': 'PM USA', 'hours': 40.0}, 'day': '2026-01-02',
+        'path': str(Path('output') / 'report.docx'), '2': 'non-string key',
+    }
+    assert json_serializer.loads(encoded, backend=backend) == json.loads(encoded)
+
+    with pytest.raises(TypeError):
+        json_serializer.dumps({'x': object()}, backend=backend)
+
+
+@pytest.mark.parametrize('backend', BACKENDS)
+def test_integers_wider_than_64_bits(backend):
+    value = {'seed': 2 ** 127 + 1, 'tier': np.int64(3)}
+    encoded = json_serializer.dumps(value, backend=backend)
+    assert json.loads(encoded) == {'seed': 2 ** 127 + 1, 'tier': 3}
+
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        json_serializer.resolve_backend('yaml')
+
+
+def test_api_responses_match_flask_encoding():
+    payload = {'success': True, 'b': [1, 2.5, None], 'a': {'z': 'ü', 'y': date(2026, 1, 2)}}
+    with api_server.app.app_context():
+        fast = api_server.app.json.response(payload)
+        stdlib = DefaultJSONProvider(api_server.app).response(payload)
+    assert fast.mimetype == stdlib.mimetype == 'application/json'
+    assert json.loads(fast.get_data()) == json.loads(stdlib.get_data())
+    assert list(json.loads(fast.get_data())) == ['a', 'b', 'success']  # Flask sorts keys
+
+    client = api_server.app.test_client()
+    response = client.post('/api/scoping/submit', json={'scopingData': {}})
+    assert response.status_code == 400 and response.get_json()['error'] == 'User email is required'
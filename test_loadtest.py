@@ -0,0 +1,61 @@
+"""
+Load test harness: statistics, limit checks and a short in-process run
+"""
+
+import contextlib
+import io
+
+import api_server
+from backend import scoping_engine
+from backend.core.scenario_generator import ScenarioGenerator
+from backend.storage import results
+from benchmarks import suite
+from benchmarks.loadtest import InProcessTransport, LoadTest, check_limits, percentile, slope
+
+
+def test_statistics():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.5
+    assert percentile(values, 99) == 99.01
+    assert percentile([], 50) is None
+    assert slope([(0, 1.0), (1, 3.0), (2, 5.0)]) == 2.0
+    assert slope([(1, 1.0), (1, 2.0)]) is None
+
+
+def test_check_limits():
+    report = {
+        'error_rate': 0.02,
+        'endpoints': {'submit': {'latency_ms': {'p95': 900.0}}, 'history': {'latency_ms': {'p95': 20.0}}},
+        'history_growth': {'max_history_size': 50, 'submit_ms_per_history_entry': 3.5,
+                           'history_ms_per_history_entry': 0.1},
+        'consistency': {'lost_writes': 0, 'duplicate_submission_ids': 2},
+    }
+    assert check_limits(report) == []
+    failures = check_limits(report, max_p95_ms=500, max_error_rate=0.01, max_history_slope_ms=1, strict=True)
+    assert len(failures) == 4
+
+
+def test_inprocess_run(tmp_path, monkeypatch):
+    # Reports, results and the derived rollup/index go under tmp_path, not the checkout's output/
+    for module in (api_server, scoping_engine, suite):
+        monkeypatch.setattr(module, 'OUTPUT_DIR', tmp_path)
+    (tmp_path / 'results').mkdir()
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path / 'results')
+    monkeypatch.setattr(results, '_submission_index', results.SubmissionIndexCache())
+    monkeypatch.setattr(results, '_analytics_stores', {})
+    monkeypatch.setattr(results, '_search_indexes', {})
+    with contextlib.redirect_stdout(io.StringIO()):
+        load = LoadTest(InProcessTransport(), users=1, seed=3,
+                        mix={'submit': 1, 'history': 1, 'result': 1},
+                        generator=ScenarioGenerator(seed=3))
+        try:
+            report = load.run(requests=6, concurrency=2)
+        finally:
+            load.cleanup()
+
+    assert report['requests'] == 6
+    assert report['errors'] == 0
+    assert set(report['endpoints']) <= {'submit', 'history', 'result'}
+    assert report['consistency']['stored_submissions'] == report['consistency']['successful_submits'] >= 1
+    assert not list(tmp_path.glob('**/*loadtest-0_at_example_invalid*'))
+    assert (tmp_path / 'results' / 'analytics.json').exists()
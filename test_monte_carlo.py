@@ -0,0 +1,105 @@
+"""
+Vectorized Monte Carlo scoring must agree with the scalar pipeline and be
+reproducible for a seed regardless of how chunks are scheduled
+"""
+
+import contextlib
+import io
+import json
+
+import numpy as np
+
+from backend.core import monte_carlo
+from backend.core.monte_carlo import VectorizedScorer, run_simulation
+from backend.core.sensitivity import IncrementalScorer
+from backend.scoping_engine import ScopingEngine
+from backend.storage import results
+
+ROLES = ['PM USA', 'Architect USA']
+
+SCOPE_INPUTS = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+    {'name': 'Multi-Currency', 'in_scope': 'YES', 'details': 3},
+    {'name': 'Historical Data Validation', 'in_scope': 'YES', 'details': 2},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 9},
+    {'name': 'Files Based Loads', 'in_scope': 'YES', 'details': 4},
+]
+
+DISTRIBUTIONS = {
+    'Data Forms': {'type': 'range', 'min': 0, 'max': 40},
+    'Multi-Currency': {'type': 'triangular', 'min': 1, 'mode': 3, 'max': 12},
+    'Historical Data Validation': {'type': 'range', 'min': 0, 'max': 5},
+}
+
+
+def _quiet(func, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args, **kwargs)
+
+
+def test_vectorized_matches_pipeline():
+    scorer = _quiet(IncrementalScorer, [dict(item) for item in SCOPE_INPUTS], ROLES)
+    details = {
+        'Data Forms': np.array([0.0, 7.0, 25.0, 40.0]),
+        'Multi-Currency': np.array([1.0, 4.0, 9.0, 12.0]),
+        'Historical Data Validation': np.array([0.0, 1.0, 3.0, 5.0]),
+    }
+    result = _quiet(VectorizedScorer(scorer).score, details, 4)
+
+    for row in range(4):
+        inputs = [dict(item, details=float(details[item['name']][row])) if item['name'] in details
+                  else dict(item) for item in SCOPE_INPUTS]
+        engine = _quiet(ScopingEngine)
+        _quiet(engine.process_scope, {'scope_inputs': inputs, 'selected_roles': ROLES})
+        _quiet(engine.calculate_effort)
+        _quiet(engine.calculate_fte_allocation)
+
+        assert result['weightage'][row] == engine.scope_result['total_weightage']
+        assert result['tier'][row] == engine.scope_result['tier']
+        assert result['total_hours'][row] == engine.effort_result['summary']['total_time_hours']
+        for i, role in enumerate(ROLES):
+            assert abs(result['role_hours'][row, i] - engine.fte_result['by_role'][role]['hours']) < 1e-6
+
+
+def test_seeded_results_are_reproducible(monkeypatch):
+    serial = _quiet(run_simulation, SCOPE_INPUTS, ROLES, DISTRIBUTIONS, samples=25000, seed=11, max_workers=1)
+
+    monkeypatch.setattr(monte_carlo, 'PARALLEL_THRESHOLD', 1)
+    try:
+        pooled = _quiet(run_simulation, SCOPE_INPUTS, ROLES, DISTRIBUTIONS, samples=25000, seed=11, max_workers=2)
+    finally:
+        monte_carlo.shutdown_pool()
+
+    assert pooled == serial
+    assert abs(sum(t['probability'] for t in serial['tier_probabilities'].values()) - 1) < 1e-9
+    assert serial['total_hours']['p10'] <= serial['total_hours']['p50'] <= serial['total_hours']['p90']
+
+
+def test_simulate_without_seed(tmp_path, monkeypatch):
+    """The endpoint returns the seed it drew, exact as a JavaScript number, and it replays the run"""
+    import api_server
+
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    monkeypatch.setattr(results, '_submission_index', results.SubmissionIndexCache())
+    email = 'simulate@example.com'
+    submission_id = f'{results.safe_email(email)}_20260101_000000'
+    results.save_user_result(email, {
+        'submission_id': submission_id,
+        'user_email': email,
+        'selected_roles': ['PM USA'],
+        'scoping_data': {'dimensions-account': {'value': 'YES', 'count': 0}},
+    })
+
+    client = api_server.app.test_client()
+    url = f'/api/scoping/simulate/{submission_id}'
+    body = {'samples': 50, 'distributions': {'Data Forms': {'type': 'range', 'min': 1, 'max': 20}}}
+    response = _quiet(client.post, url, json=body)
+    assert response.status_code == 200, response.get_json()
+    simulation = response.get_json()['simulation']
+    assert simulation['samples'] == 50
+    assert isinstance(simulation['seed'], int) and 0 <= simulation['seed'] < 2 ** 53
+
+    # Send the seed back the way a browser would: parsed as a double
+    seed = json.loads(response.get_data(as_text=True), parse_int=float)['simulation']['seed']
+    replay = _quiet(client.post, url, data=json.dumps(dict(body, seed=seed)), content_type='application/json')
+    assert replay.get_json()['simulation'] == simulation
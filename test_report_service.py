@@ -0,0 +1,84 @@
+"""
+Report service: backpressure, timeout recycling and crash retries, on a
+one-worker pool with stub render functions in place of the SOW document
+"""
+
+import os
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from backend.core.report_service import ReportService, ReportServiceBusy, ReportServiceTimeout
+
+
+def _stub_render(payload, output_path):
+    """Sleeps, crashes (optionally only the first time) or returns payload['value']"""
+    time.sleep(payload.get('sleep', 0))
+    marker = payload.get('crash_once')
+    if payload.get('crash') or (marker and not os.path.exists(marker)):
+        if marker:
+            open(marker, 'w').close()
+        os._exit(1)
+    return payload.get('value')
+
+
+@pytest.fixture
+def service():
+    service = ReportService(max_workers=1, timeout=60, max_pending=3, render=_stub_render)
+    # Start the worker, so timings below don't include process startup
+    assert service.run({'value': 'warm'}) == 'warm'
+    yield service
+    service.shutdown(wait=False)
+
+
+def test_full_queue_is_rejected(service):
+    futures = [service.submit({'sleep': 1, 'value': 'a'})[1]] + \
+        [service.submit({'value': value})[1] for value in 'bc']
+    with pytest.raises(ReportServiceBusy):
+        service.submit({'value': 'd'})
+
+    assert [future.result() for future in futures] == ['a', 'b', 'c']
+    assert service.run({'value': 'e'}) == 'e'
+
+
+def test_timeout_recycles_pool_and_resubmits_other_reports(service, tmp_path):
+    outcomes = {}
+
+    def hung():
+        try:
+            service.run({'sleep': 30}, timeout=1)
+        except ReportServiceTimeout as e:
+            outcomes['hung'] = e
+
+    def queued(name):
+        # 'last' also crashes once after being re-submitted: the recycle must not use up its retry
+        marker = str(tmp_path / 'crashed') if name == 'last' else None
+        try:
+            outcomes[name] = service.run({'value': name, 'crash_once': marker})
+        except Exception as e:
+            outcomes[name] = e
+
+    threads = [threading.Thread(target=hung)]
+    threads[0].start()
+    time.sleep(0.2)  # The hung report is running; the next ones wait behind it
+    for name in ('next', 'last'):
+        threads.append(threading.Thread(target=queued, args=(name,)))
+        threads[-1].start()
+        time.sleep(0.1)
+    for thread in threads:
+        thread.join()
+
+    assert isinstance(outcomes['hung'], ReportServiceTimeout)
+    assert (outcomes['next'], outcomes['last']) == ('next', 'last')
+    assert service.restarts == 2
+
+
+def test_crashed_worker_is_retried_once(service, tmp_path):
+    assert service.run({'crash_once': str(tmp_path / 'crashed'), 'value': 'ok'}) == 'ok'
+    assert service.restarts == 1
+
+    with pytest.raises(BrokenProcessPool):
+        service.run({'crash': True})
+    assert service.restarts == 3
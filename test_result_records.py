@@ -0,0 +1,89 @@
+"""
+Result records read like the dicts they replace, and results leave the engine
+as plain dicts and lists
+"""
+
+import contextlib
+import io
+import json
+
+from backend.scoping_engine import ScopingEngine
+from backend.core.result_records import (
+    CategoryRecord, MetricRecord, Record, RoleFTE, RoleFTESummary, TaskRecord, to_plain
+)
+
+SCOPE_INPUTS = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+    {'name': 'Multi-Currency', 'in_scope': 'YES', 'details': 3},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 9},
+]
+
+
+def _contains_record(value):
+    if isinstance(value, Record):
+        return True
+    if isinstance(value, dict):
+        return any(_contains_record(item) for item in value.values())
+    if isinstance(value, list):
+        return any(_contains_record(item) for item in value)
+    return False
+
+
+def test_record_reads_like_dict():
+    metric = MetricRecord(7, 'Data Forms', True, False)
+    metric.in_scope, metric.details = 'YES', 9
+
+    assert not hasattr(metric, '__dict__')
+    assert metric['details'] == metric.get('details') == 9
+    assert metric.get('missing', 'x') == 'x' and 'missing' not in metric
+    assert dict(metric) == metric.to_dict() and metric == metric.to_dict()
+    assert list(metric.to_dict()) == list(MetricRecord.__slots__)
+
+    changed = metric.replace(details=4)
+    assert (changed.details, metric.details) == (4, 9)
+    assert changed.name == 'Data Forms' and type(changed) is MetricRecord
+
+    unscoped = MetricRecord.unscoped('Custom KPIs')
+    assert (unscoped.row, unscoped.in_scope, unscoped.details) == (None, 'NO', 0)
+
+
+def test_to_dict_covers_every_slot_in_order():
+    records = [
+        MetricRecord.unscoped('Custom KPIs'),
+        TaskRecord('Data Forms', 0, 'YES', 2, 16),
+        CategoryRecord(8, 24, 3.0),
+        RoleFTE(40, 5, 0.17),
+        RoleFTESummary('PM USA', 40, 5, 0.17),
+    ]
+    for record in records:
+        plain = record.to_dict()
+        assert list(plain) == list(record.__slots__), type(record).__name__
+        assert plain == {name: getattr(record, name) for name in record.__slots__}
+
+
+def test_to_plain_converts_nested_records():
+    category = CategoryRecord(8, 24, 3.0, [TaskRecord('Data Forms', 0, 'YES', 2, 16)])
+    plain = to_plain({'categories': {'Design': category}, 'rows': [category]})
+
+    assert not _contains_record(plain)
+    assert plain['categories']['Design']['tasks'][0] == {
+        'name': 'Data Forms', 'base_hours': 0, 'in_scope': 'YES', 'details': 2, 'final_estimate': 16}
+    assert plain['rows'][0] == plain['categories']['Design']
+
+
+def test_engine_results_are_plain():
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': SCOPE_INPUTS, 'selected_roles': ['PM USA']})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    assert isinstance(engine.scope_result['metrics'][0], MetricRecord)
+
+    for result in (engine.build_report(), engine.build_calculation_result()):
+        assert not _contains_record(result)
+        json.dumps(result)
+
+    report = engine.build_report()
+    forms = next(m for m in report['scope_definition']['metrics'] if m['name'] == 'Data Forms')
+    assert (forms['in_scope'], forms['details']) == ('YES', 9)
+    assert report['fte_allocation']['by_role']['PM USA']['hours'] > 0
@@ -0,0 +1,65 @@
+"""
+Synthetic scenarios are reproducible, respect sub-question dependencies and
+details requirements, and the frontend and backend shapes agree
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from backend.core.scenario_generator import ScenarioGenerator, parent_questions
+from backend.data.excel_templates import METRICS_TEMPLATE
+from backend.data.frontend_mapping import FRONTEND_TO_BACKEND_MAP
+
+
+def _generator(**kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ScenarioGenerator(**kwargs)
+
+
+def test_reproducible_per_index():
+    generator = _generator(seed=11)
+    batch = list(generator.generate(20))
+    assert batch == list(_generator(seed=11).generate(20))
+    assert generator.scenario(15) == batch[15]
+    assert batch != list(_generator(seed=12).generate(20))
+
+
+def test_dependencies_and_shapes():
+    parents = parent_questions()
+    details_required = {m['name']: m['is_details_required'] for m in METRICS_TEMPLATE}
+
+    for scenario in _generator(seed=3).generate(200):
+        in_scope = {item['name']: item['in_scope'] == 'YES' for item in scenario['scope_inputs']}
+        assert len(in_scope) == len(METRICS_TEMPLATE)
+        assert scenario['selected_roles']
+
+        for item in scenario['scope_inputs']:
+            parent = parents[item['name']]
+            if parent and in_scope[item['name']]:
+                assert in_scope[parent]
+            if not (in_scope[item['name']] and details_required[item['name']]):
+                assert item['details'] == 0
+
+        from_frontend = {
+            FRONTEND_TO_BACKEND_MAP[item_id]: (data['value'], data['count'])
+            for item_id, data in scenario['scoping_data'].items()
+        }
+        assert from_frontend == {i['name']: (i['in_scope'], i['details']) for i in scenario['scope_inputs']}
+
+
+def test_overrides():
+    generator = _generator(seed=1, roles=['PM USA'], metrics={
+        'data_forms': {'in_scope_probability': 1, 'type': 'range', 'min': 7, 'max': 9},
+        'Account': {'in_scope_probability': 0},
+    })
+    for scenario in generator.generate(30):
+        items = {i['name']: i for i in scenario['scope_inputs']}
+        assert items['Data Forms']['in_scope'] == 'YES' and 7 <= items['Data Forms']['details'] <= 9
+        assert items['Account']['in_scope'] == 'NO'
+        assert items['Account Alternate Hierarchies']['in_scope'] == 'NO'
+        assert scenario['selected_roles'] == ['PM USA']
+
+    with pytest.raises(ValueError):
+        _generator(metrics={'nope': {'in_scope_probability': 1}})
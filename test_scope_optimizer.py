@@ -0,0 +1,74 @@
+"""
+Branch-and-bound scope optimizer must find the true optimum (checked by brute force)
+and report totals that match a full pipeline run
+"""
+
+import contextlib
+import io
+from itertools import product
+
+from backend.core.scope_optimizer import ScopeOptimizer
+from backend.core.sensitivity import IncrementalScorer
+from backend.scoping_engine import ScopingEngine
+
+SCOPE_INPUTS = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+    {'name': 'Multi-Currency', 'in_scope': 'YES', 'details': 3},
+    {'name': 'Historical Data Validation', 'in_scope': 'YES', 'details': 2},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 30},
+    {'name': 'Business Rules', 'in_scope': 'YES', 'details': 20},
+    {'name': 'Files Based Loads', 'in_scope': 'YES', 'details': 6},
+    {'name': 'Direct Connect Integrations', 'in_scope': 'YES', 'details': 3},
+]
+
+PRIORITIES = {'Account': 5, 'Data Forms': 2, 'Business Rules': 3}
+
+
+def _score(scope_inputs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': scope_inputs, 'selected_roles': ['PM USA']})
+        engine.calculate_effort()
+    return (engine.scope_result['total_weightage'], engine.scope_result['tier'],
+            engine.effort_result['summary']['total_time_hours'])
+
+
+def _brute_force(max_hours, max_tier):
+    best = None
+    for keep in product((True, False), repeat=len(SCOPE_INPUTS)):
+        inputs = [dict(item) if k else dict(item, in_scope='NO', details=0) for item, k in zip(SCOPE_INPUTS, keep)]
+        _, tier, hours = _score(inputs)
+        if hours <= max_hours and tier <= max_tier:
+            value = sum(PRIORITIES.get(item['name'], 1) for item, k in zip(SCOPE_INPUTS, keep) if k)
+            best = value if best is None else max(best, value)
+    return best
+
+
+def test_optimum_matches_brute_force():
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = IncrementalScorer([dict(item) for item in SCOPE_INPUTS], ['PM USA'])
+    optimizer = ScopeOptimizer(scorer, priorities=PRIORITIES, allow_partial=False)
+
+    for max_hours, max_tier in ((1300, 5), (2000, 2), (10000, 1)):
+        result = optimizer.optimize(max_hours=max_hours, max_tier=max_tier)
+        expected = _brute_force(max_hours, max_tier)
+        assert result['optimal']
+        if expected is None:
+            assert not result['feasible']
+            continue
+
+        solution = result['solution']
+        assert solution['objective'] == expected
+        weightage, tier, hours = _score(solution['scope_inputs'])
+        assert (weightage, tier, hours) == (solution['total_weightage'], solution['tier'], solution['total_hours'])
+        assert hours <= max_hours and tier <= max_tier
+
+
+def test_locked_metrics_are_kept():
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = IncrementalScorer([dict(item) for item in SCOPE_INPUTS], ['PM USA'])
+    optimizer = ScopeOptimizer(scorer, locked=['Data Forms'])
+    result = optimizer.optimize(max_hours=1300)
+
+    statuses = {m['metric']: m['status'] for m in result['solution']['metrics']}
+    assert statuses['Data Forms'] == 'kept'
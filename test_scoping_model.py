@@ -0,0 +1,107 @@
+"""
+Versioned scoping model: publishing swaps the model for new work only, results
+record their version, invalid data is rejected and other processes pick up
+an activated version
+"""
+
+import contextlib
+import io
+import pickle
+import time
+
+import pytest
+
+from backend.core.scoping_model import ModelRegistry, ScopingModel
+from backend.scoping_engine import ScopingEngine
+
+SCENARIO = {
+    'scope_inputs': [
+        {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+        {'name': 'Data Forms', 'in_scope': 'YES', 'details': 12},
+    ],
+    'selected_roles': ['PM USA', 'App Lead India'],
+}
+
+CATEGORY = 'Project Initiation and Planning'
+
+
+def _score(model):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine(model)
+        engine.process_scope(SCENARIO)
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return engine
+
+
+def _edited_template(model, extra_hours):
+    template = {name: dict(data) for name, data in model.effort_template.items()}
+    template[CATEGORY]['total'] += extra_hours
+    return template
+
+
+@pytest.fixture
+def registry(tmp_path):
+    registry = ModelRegistry(tmp_path / 'models', poll_seconds=0)
+    with contextlib.redirect_stdout(io.StringIO()):
+        registry.current()
+    return registry
+
+
+def test_default_version_is_stable_and_picklable():
+    model = ScopingModel.default()
+    assert model.version == ScopingModel(**{part: getattr(model, part) for part in
+                                            ('formulas', 'effort_template', 'tiers_data', 'roles')}).version
+    copy = pickle.loads(pickle.dumps(model))
+    assert copy.version == model.version
+    assert (copy.allocation_matrix == model.allocation_matrix).all()
+
+
+def test_publish_affects_new_work_only(registry):
+    old = registry.current()
+    in_flight = _score(old)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        new = registry.publish({'effort_template': _edited_template(old, 40)}, source='test')
+    assert registry.current() is new and new.version != old.version
+
+    after = _score(registry.current())
+    # The engine created before the swap keeps scoring with its snapshot
+    in_flight.calculate_effort()
+    assert in_flight.build_report()['model_version'] == old.version
+    assert after.build_report()['model_version'] == new.version
+    assert (after.effort_result['summary']['total_time_hours']
+            == in_flight.effort_result['summary']['total_time_hours'] + 40)
+
+
+def test_invalid_data_is_rejected(registry):
+    old = registry.current()
+    with pytest.raises(ValueError, match='Account'):
+        registry.publish({'formulas': dict(old.formulas, Account='=IF(Account[InScope]="YES",2')})
+    with pytest.raises(ValueError, match='between 0 and 1'):
+        registry.publish({'tiers_data': [{'category': CATEGORY, 'roles': {'PM USA': 1.5}}]})
+    with pytest.raises(ValueError, match='Nothing to publish'):
+        registry.publish({'source': 'test'})
+    assert registry.current() is old
+
+
+def test_other_process_converges_and_rollback(registry, tmp_path):
+    other = ModelRegistry(registry.model_dir, poll_seconds=0.01)
+    with contextlib.redirect_stdout(io.StringIO()):
+        original = other.current()
+        published = registry.publish({'effort_template': _edited_template(original, 8)})
+
+        # Polling reloads in the background; until then the old snapshot is served
+        deadline = time.monotonic() + 5
+        while other.current().version != published.version and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert other.current().version == published.version
+
+        assert [v['version'] for v in registry.versions()] == [original.version, published.version]
+        registry.activate(original.version)
+        assert other.refresh().version == original.version
+
+    with pytest.raises(KeyError):
+        registry.activate('0' * 12)
+    with pytest.raises(KeyError):
+        registry.activate('../CURRENT')
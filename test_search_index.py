@@ -0,0 +1,97 @@
+"""
+Submission search index: kept in step with saves and deletes, and filters,
+sorting and paging agree with a scan of the stored results
+"""
+
+import contextlib
+import io
+from datetime import datetime
+
+import pytest
+
+from backend.storage import results
+from backend.storage.search_index import SearchIndex
+
+
+def _submission(i):
+    email = f'user{i % 3}@example.com'
+    return {
+        'submission_id': f'{results.safe_email(email)}_202601{i % 28 + 1:02d}_0000{i:02d}',
+        'user_email': email,
+        'client_name': ['Acme Corp', 'acme labs', 'Globex'][i % 3],
+        'project_name': f'Project {i % 4}',
+        'submitted_at': f'2026-01-{i % 28 + 1:02d}T10:00:{i:02d}',
+        'calculation_result': {
+            'tier': f'Tier {i % 4 + 1}',
+            'total_weightage': 10.0 * i,
+            'total_hours': 100.0 * i,
+            'scope_definition': {'tier': i % 4 + 1, 'metrics': [
+                {'name': 'Account', 'in_scope': 'YES'},
+                {'name': 'Data Forms', 'in_scope': 'YES' if i % 2 else 'NO'},
+                {'name': 'Business Rules', 'in_scope': 'YES' if i % 5 == 0 else 'NO'},
+            ]},
+            'effort_estimation': {'summary': {'total_time_hours': 50.0 * i, 'total_months': i / 10}},
+        },
+    }
+
+
+@pytest.fixture
+def index(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(40):
+            submission = _submission(i)
+            results.save_user_result(submission['user_email'], submission)
+    return results.get_search_index()
+
+
+def _ids(page):
+    return [row['id'] for row in page['submissions']]
+
+
+def test_filters_match_scan(index):
+    everything = [_submission(i) for i in range(40)]
+    page = index.query(client_name='ACME', tiers=[2, 3], min_hours=500, max_hours=3000,
+                       features=['Data Forms'], sort='total_hours', order='asc', page_size=100)
+    expected = [
+        s for s in everything
+        if s['client_name'].lower().startswith('acme')
+        and s['calculation_result']['scope_definition']['tier'] in (2, 3)
+        and 500 <= s['calculation_result']['total_hours'] <= 3000
+        and s['calculation_result']['scope_definition']['metrics'][1]['in_scope'] == 'YES'
+    ]
+    assert _ids(page) == [s['submission_id'] for s in expected] and page['total'] == len(expected)
+
+    both = index.query(features=['Data Forms', 'Business Rules'])
+    assert {row['id'] for row in both['submissions']} == {
+        s['submission_id'] for i, s in enumerate(everything) if i % 2 and i % 5 == 0}
+
+    window = index.query(date_from=datetime(2026, 1, 10), date_to=datetime(2026, 1, 12, 23, 59, 59))
+    assert sorted(_ids(window)) == sorted(
+        s['submission_id'] for s in everything if '2026-01-10' <= s['submitted_at'][:10] <= '2026-01-12')
+
+
+def test_paging_and_sync_with_deletes(index):
+    pages = [index.query(sort='submitted_at', order='desc', page=n, page_size=15) for n in (1, 2, 3)]
+    assert [page['pages'] for page in pages] == [3, 3, 3]
+    ordered = sum((_ids(page) for page in pages), [])
+    assert len(ordered) == len(set(ordered)) == 40
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        results.delete_user_results('user1@example.com')
+    assert index.query(user_email='user1@example.com')['total'] == 0
+    assert index.query()['total'] == 40 - len(range(1, 40, 3))
+
+    with pytest.raises(ValueError):
+        index.query(sort='comments')
+    with pytest.raises(ValueError, match='Unknown feature'):
+        index.query(features=['Not A Metric'])
+
+
+def test_missing_index_is_built(tmp_path):
+    submissions = [_submission(i) for i in range(5)]
+    index = SearchIndex(tmp_path / 'index.sqlite3', lambda: submissions)
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert index.query(project_name='project 1')['total'] == 1
+        index.add(dict(_submission(5), submission_id='extra'))
+    assert index.count() == 6
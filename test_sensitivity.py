@@ -0,0 +1,102 @@
+"""
+Incremental re-scoring must agree with a full ScopingEngine run
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from backend.scoping_engine import ScopingEngine
+from backend.core.sensitivity import IncrementalScorer, analyze_sensitivity
+
+ROLES = ['PM USA', 'Architect USA', 'App Lead India']
+
+SCOPE_INPUTS = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+    {'name': 'Entity', 'in_scope': 'YES', 'details': 40},
+    {'name': 'Multi-Currency', 'in_scope': 'YES', 'details': 3},
+    {'name': 'Entity Alternate Hierarchies', 'in_scope': 'NO', 'details': 2},
+    {'name': 'Historical Data Validation', 'in_scope': 'YES', 'details': 2},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 9},
+    {'name': 'Files Based Loads', 'in_scope': 'YES', 'details': 4},
+    {'name': 'Number of Users', 'in_scope': 'YES', 'details': 80},
+]
+
+CHANGES = [
+    ('Multi-Currency', None, 4),
+    ('Multi-Currency', 'NO', None),
+    ('Historical Data Validation', None, 3),
+    ('Entity Alternate Hierarchies', None, 5),
+    ('Data Forms', None, 8),
+    ('Custom Dimensions', 'YES', None),
+]
+
+
+def _full_run(scope_inputs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': scope_inputs, 'selected_roles': ROLES})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return engine
+
+
+def _apply(name, in_scope, details):
+    inputs = [dict(item) for item in SCOPE_INPUTS]
+    target = next((item for item in inputs if item['name'] == name), None)
+    if target is None:
+        target = {'name': name, 'in_scope': 'NO', 'details': 0}
+        inputs.append(target)
+    if in_scope is not None:
+        target['in_scope'] = in_scope
+    if details is not None:
+        target['details'] = details
+    return inputs
+
+
+def test_rescore_matches_full_pipeline():
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = IncrementalScorer([dict(item) for item in SCOPE_INPUTS], ROLES)
+
+    for name, in_scope, details in CHANGES:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = scorer.rescore(name, in_scope=in_scope, details=details)
+        engine = _full_run(_apply(name, in_scope, details))
+
+        assert result['total_weightage'] == engine.scope_result['total_weightage']
+        assert result['tier'] == engine.scope_result['tier']
+        assert result['total_hours'] == engine.effort_result['summary']['total_time_hours']
+        for role in ROLES:
+            expected = engine.fte_result['by_role'][role]['hours']
+            actual = scorer.role_hours[role] + result['role_hours_delta'].get(role, 0)
+            assert abs(actual - expected) < 1e-6
+
+
+def test_analysis_covers_every_metric():
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = IncrementalScorer([dict(item) for item in SCOPE_INPUTS], ROLES)
+        analysis = analyze_sensitivity(scorer, steps=2)
+
+    assert len(analysis['metrics']) == len(scorer.metric_order)
+    swings = [m['swing'] for m in analysis['metrics']]
+    assert swings == sorted(swings, reverse=True)
+    multi_currency = next(m for m in analysis['metrics'] if m['metric'] == 'Multi-Currency')
+    assert [c['step'] for c in multi_currency['changes']] == [-2, -1, 1, 2, None]
+
+
+@pytest.mark.parametrize('step_size', [float('nan'), float('inf'), 0, -1])
+def test_invalid_step_size_is_rejected(step_size):
+    with contextlib.redirect_stdout(io.StringIO()):
+        scorer = IncrementalScorer([dict(item) for item in SCOPE_INPUTS], ROLES)
+    with pytest.raises(ValueError):
+        analyze_sensitivity(scorer, step_size=step_size)
+
+
+@pytest.mark.parametrize('step', ['nan', 'inf', '-inf', '0', '-2', 'x'])
+def test_endpoint_rejects_invalid_step(step):
+    import api_server
+
+    response = api_server.app.test_client().get('/api/scoping/sensitivity/someone_at_example_com_20260101_000000',
+                                                query_string={'step': step})
+    assert response.status_code == 400
@@ -0,0 +1,94 @@
+"""
+SOW preview: HTML and Markdown renderings of a stored submission, with
+user-supplied text escaped in HTML
+"""
+
+import contextlib
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+import api_server
+from backend.core.sow_preview import SOWPreviewRenderer
+from backend.scoping_engine import ScopingEngine
+from backend.storage import results
+
+EMAIL = 'preview@example.com'
+ROLES = ['PM USA', 'App Lead India']
+CLIENT = 'Acme <script>alert(1)</script> & Sons'
+PROJECT = 'Close "Phase 2"'
+
+
+def _engine():
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': [
+            {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+            {'name': 'Data Forms', 'in_scope': 'YES', 'details': 12},
+        ], 'selected_roles': ROLES})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return engine
+
+
+def _render(fmt):
+    engine = _engine()
+    return SOWPreviewRenderer().render(
+        engine.scope_result, engine.effort_result['categories'], engine.effort_result['summary'],
+        engine.fte_result['by_role'], {}, fmt=fmt, generated_at=datetime(2026, 1, 5),
+        client_name=CLIENT, project_name=PROJECT
+    )
+
+
+def test_html_escapes_user_text():
+    html = _render('html')
+    assert html.startswith('<article class="sow-preview">') and html.rstrip().endswith('</article>')
+    assert '<script>' not in html
+    assert '<li>Client: Acme &lt;script&gt;alert(1)&lt;/script&gt; &amp; Sons</li>' in html
+    assert '<li>Project: Close &quot;Phase 2&quot;</li>' in html
+    assert 'Generated: 05-Jan-2026' in html
+    assert '<td>PM USA</td>' in html and '<h3>EFFORT BY CATEGORY</h3>' in html
+
+
+def test_markdown():
+    markdown = _render('markdown')
+    assert markdown.startswith('# STATEMENT OF WORK (SOW)\n')
+    assert f'- Client: {CLIENT}\n- Project: {PROJECT}\n' in markdown
+    assert '## 2. TIMINGS (EFFORT ESTIMATION)' in markdown
+    assert '| PM USA |' in markdown
+    assert '<li>' not in markdown
+
+
+def test_unsupported_format():
+    engine = _engine()
+    with pytest.raises(ValueError):
+        SOWPreviewRenderer().render(engine.scope_result, {}, {}, {}, {}, fmt='pdf')
+
+
+def test_preview_endpoint(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    monkeypatch.setattr(results, '_submission_index', results.SubmissionIndexCache())
+    submission_id = f'{results.safe_email(EMAIL)}_20260101_000000'
+    results.save_user_result(EMAIL, {
+        'submission_id': submission_id,
+        'user_email': EMAIL,
+        'client_name': CLIENT,
+        'project_name': PROJECT,
+        'selected_roles': ROLES,
+        'scoping_data': {},
+        'calculation_result': json.loads(json.dumps(_engine().build_calculation_result())),
+    })
+    client = api_server.app.test_client()
+    url = f'/api/scoping/preview/{submission_id}'
+
+    html = client.get(url).get_json()
+    assert html['format'] == 'html' and '&lt;script&gt;' in html['content']
+    assert '<script>' not in html['content']
+
+    markdown = client.get(url, query_string={'format': 'Markdown'}).get_json()
+    assert markdown['format'] == 'markdown' and markdown['content'].startswith('# STATEMENT OF WORK')
+
+    response = client.get(url, query_string={'format': 'pdf'})
+    assert response.status_code == 400 and "Unsupported format 'pdf'" in response.get_json()['error']
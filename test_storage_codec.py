@@ -0,0 +1,136 @@
+"""
+Storage codec: stored submissions and reports round-trip exactly, take a
+fraction of the space of pretty-printed JSON, and every read path (including
+the API) sees the same data as before
+"""
+
+import contextlib
+import io
+import json
+
+import api_server
+from backend.core import scoping_model
+from backend.core.scoping_model import ModelRegistry, ScopingModel
+from backend.scoping_engine import ScopingEngine
+from backend.storage import codec, results
+
+SCOPE_INPUTS = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 12},
+    {'name': 'Business Rules', 'in_scope': 'NO', 'details': 0},
+]
+ROLES = ['PM USA', 'App Lead India']
+EMAIL = 'codec@example.com'
+
+
+def _engine():
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': SCOPE_INPUTS, 'selected_roles': ROLES})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return engine
+
+
+def _submission(n=0):
+    return {
+        'submission_id': f'{results.safe_email(EMAIL)}_20260101_00000{n}',
+        'user_email': EMAIL,
+        'client_name': 'Codec',
+        'selected_roles': ROLES,
+        'calculation_result': json.loads(json.dumps(_engine().build_calculation_result())),
+    }
+
+
+def test_round_trip_is_exact():
+    submission = _submission()
+    packed = codec.pack_record(submission)
+    assert 'metrics' not in packed['calculation_result']['scope_definition']
+    assert codec.unpack_record(packed) == submission
+    assert json.dumps(codec.unpack_record(packed)) == json.dumps(submission)  # key order too
+
+    report = json.loads(json.dumps(_engine().build_report()))
+    packed = codec.pack_record(report)
+    assert codec.PACKED_METRICS_KEY in packed['scope_definition']
+    assert codec.loads(codec.dumps(packed)) == packed
+    assert codec.unpack_record(codec.loads(codec.dumps(packed))) == report
+
+
+def test_packed_records_expand_after_the_built_in_model_changes(model_dir, monkeypatch):
+    submission = _submission()
+    version = submission['calculation_result']['model_version']
+    packed = codec.pack_record(submission)
+    assert (model_dir / f'{version}.json').exists()
+
+    # Redeploy with edited formula CSVs: a new built-in model, caches gone
+    built_in = ScopingModel.default()
+    formulas = dict(built_in.formulas, Account='=1')
+    edited = ScopingModel(formulas, built_in.effort_template, built_in.tiers_data, built_in.roles)
+    monkeypatch.setattr(scoping_model, '_default_model', edited)
+    monkeypatch.setattr(scoping_model, '_registry', ModelRegistry(model_dir, poll_seconds=0))
+    monkeypatch.setattr(codec, '_formulas_by_version', {})
+    assert edited.version != version
+
+    assert codec.unpack_record(packed) == submission
+
+
+def test_packed_records_do_not_depend_on_the_metrics_template(monkeypatch):
+    submission = _submission()
+    packed = codec.pack_record(submission)
+    template = codec.METRICS_TEMPLATE
+
+    # A later template with metrics reordered and one removed
+    monkeypatch.setattr(codec, 'METRICS_TEMPLATE', template[:0:-1])
+    assert codec.unpack_record(packed) == submission
+
+    # Format 1 (values only) still expands against the template it was written with
+    monkeypatch.setattr(codec, 'METRICS_TEMPLATE', template + [{}])
+    original = packed['calculation_result']['scope_definition'][codec.PACKED_METRICS_KEY]
+    old = dict(original, format=1, values=[values[4:] for values in original['values']])
+    legacy = json.loads(json.dumps(packed))
+    legacy['calculation_result']['scope_definition'][codec.PACKED_METRICS_KEY] = old
+    with contextlib.redirect_stdout(io.StringIO()):
+        assert codec.unpack_record(legacy) is legacy  # Template length changed: left packed, not misread
+    monkeypatch.setattr(codec, 'METRICS_TEMPLATE', template)
+    assert codec.unpack_record(legacy) == submission
+
+
+def test_records_that_cannot_be_packed_losslessly_are_kept():
+    unknown = _submission()
+    unknown['calculation_result']['model_version'] = 'not-a-version'
+    assert codec.pack_record(unknown) is unknown
+
+    edited = _submission()
+    edited['calculation_result']['scope_definition']['metrics'][0]['formula'] = '=1'
+    assert codec.pack_record(edited) is edited
+
+    assert codec.pack_record({'submission_id': 'plain'}) == {'submission_id': 'plain'}
+
+
+def test_storage_is_an_order_of_magnitude_smaller(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    submission = _submission()
+    results.save_user_result(EMAIL, submission)
+
+    stored = results.get_user_results_file(EMAIL).stat().st_size
+    assert stored * 10 < len(json.dumps([submission], indent=2))
+    assert results.load_user_results(EMAIL) == [submission]
+
+
+def test_legacy_files_and_api_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    monkeypatch.setattr(results, '_submission_index', results.SubmissionIndexCache())
+    legacy, new = _submission(0), _submission(1)
+    # Written before the codec: pretty-printed, uncompressed
+    results.get_user_results_file(EMAIL).write_text(json.dumps([legacy], indent=2))
+    results.save_user_result(EMAIL, new)
+
+    assert results.load_user_results(EMAIL) == [legacy, new]
+    assert [submission for _, submission in results.iter_stored_submissions(EMAIL)] == [legacy, new]
+
+    client = api_server.app.test_client()
+    body = client.get(f"/api/scoping/result/{new['submission_id']}").get_json()
+    assert body['submission'] == new
+    history = client.get('/api/scoping/history', query_string={'email': EMAIL}).get_json()
+    assert [item['calculation_result'] for item in history['submissions']] == [
+        legacy['calculation_result'], new['calculation_result']]
@@ -0,0 +1,73 @@
+"""
+Submission comparison: deltas come from the stored results (they match what the
+engine computed for each side), and cached lookups see newly saved submissions
+"""
+
+import contextlib
+import io
+import json
+
+from backend.core.submission_compare import compare_submissions
+from backend.scoping_engine import ScopingEngine
+from backend.storage import results
+from backend.storage.results import SubmissionIndexCache
+
+ORIGINAL = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 12},
+    {'name': 'Business Rules', 'in_scope': 'NO', 'details': 0},
+]
+REVISED = [
+    {'name': 'Account', 'in_scope': 'YES', 'details': 6000},
+    {'name': 'Data Forms', 'in_scope': 'YES', 'details': 12},
+    {'name': 'Business Rules', 'in_scope': 'YES', 'details': 40},
+]
+
+
+def _submission(submission_id, scope_inputs, roles):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': scope_inputs, 'selected_roles': roles})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return engine, {
+        'submission_id': submission_id,
+        'calculation_result': json.loads(json.dumps(engine.build_calculation_result())),
+    }
+
+
+def test_compare_matches_engine():
+    engine_a, a = _submission('a', ORIGINAL, ['PM USA', 'App Lead India'])
+    engine_b, b = _submission('b', REVISED, ['PM USA', 'App Developer India'])
+    comparison = compare_submissions(a, b)
+
+    assert [change['name'] for change in comparison['inputs']][:1] == ['Account']
+    assert 'Business Rules' in [change['name'] for change in comparison['inputs']]
+    assert 'Data Forms' not in [change['name'] for change in comparison['inputs']]
+    assert comparison['same_model_version']
+    assert comparison['total_weightage']['delta'] == round(
+        engine_b.scope_result['total_weightage'] - engine_a.scope_result['total_weightage'], 6)
+    assert comparison['tier']['delta'] == engine_b.scope_result['tier'] - engine_a.scope_result['tier']
+
+    for category, values in comparison['categories'].items():
+        assert values['b'] == engine_b.effort_result['categories'][category]['final_estimate']
+    assert comparison['roles']['PM USA']['delta'] == round(
+        engine_b.fte_result['by_role']['PM USA']['hours'] - engine_a.fte_result['by_role']['PM USA']['hours'], 6)
+    assert comparison['summary']['roles_added'] == ['App Developer India']
+    assert comparison['summary']['roles_removed'] == ['App Lead India']
+
+    assert compare_submissions(a, a)['summary']['inputs_changed'] == 0
+
+
+def test_index_cache_sees_new_saves(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    cache = SubmissionIndexCache(max_files=1)
+    monkeypatch.setattr(results, '_submission_index', cache)
+
+    results.save_user_result('a@b.com', {'submission_id': 'first'})
+    assert results.find_user_submission('a@b.com', 'first') == {'submission_id': 'first'}
+    assert results.find_user_submission('a@b.com', 'second') is None
+
+    results.save_user_result('a@b.com', {'submission_id': 'second'})
+    assert results.find_user_submission('a@b.com', 'second') == {'submission_id': 'second'}
+    assert results.find_user_submission('other@b.com', 'first') is None
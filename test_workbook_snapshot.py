@@ -0,0 +1,67 @@
+"""
+Workbook snapshot: cell and metric-row lookups match the workbook, and the
+cached snapshot is reloaded when the file changes
+"""
+
+import os
+
+import pytest
+from openpyxl import Workbook
+
+from backend.config import SHEET_DEFINITIONS, SHEET_SCOPE_DEFINITION
+from backend.utils.workbook_snapshot import (
+    METRIC_FIRST_ROW, METRIC_NAME_COLUMN, clear_workbook_snapshots, get_workbook_snapshot
+)
+
+
+def _write_workbook(path, multi_currency_details):
+    wb = Workbook()
+    scope = wb.active
+    scope.title = SHEET_SCOPE_DEFINITION
+    scope.cell(row=2, column=METRIC_NAME_COLUMN, value='Not a metric row')
+    for offset, (name, details) in enumerate([(' Account ', 1500), ('Multi-Currency', multi_currency_details),
+                                              ('Account', 9)]):
+        row = METRIC_FIRST_ROW + offset
+        scope.cell(row=row, column=METRIC_NAME_COLUMN, value=name)
+        scope.cell(row=row, column=4, value=details)
+    wb.create_sheet(SHEET_DEFINITIONS)['E26'] = 'Tier 2 - Standard'
+    wb.create_sheet('Unused')['A1'] = 'ignored'
+    wb.save(path)
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    clear_workbook_snapshots()
+    yield
+    clear_workbook_snapshots()
+
+
+def test_lookups(tmp_path):
+    path = tmp_path / 'scoping.xlsx'
+    _write_workbook(path, 3)
+    snapshot = get_workbook_snapshot(path)
+
+    # Names are stripped; the first row wins; rows above the metric range are ignored
+    assert snapshot.metric_row('Account') == METRIC_FIRST_ROW
+    assert snapshot.metric_row(' Multi-Currency ') == METRIC_FIRST_ROW + 1
+    assert snapshot.metric_row('Not a metric row') is None
+    assert snapshot.cell(SHEET_SCOPE_DEFINITION, METRIC_FIRST_ROW + 1, 4) == 3
+    assert snapshot.cell(SHEET_SCOPE_DEFINITION, 1, 1) is None
+    assert snapshot.cell_ref(SHEET_DEFINITIONS, 'E26') == 'Tier 2 - Standard'
+    assert snapshot.has_sheet(SHEET_DEFINITIONS) and not snapshot.has_sheet('Unused')
+    assert snapshot.cell('Unused', 1, 1) is None
+
+
+def test_reloaded_when_file_changes(tmp_path):
+    path = tmp_path / 'scoping.xlsx'
+    _write_workbook(path, 3)
+    first = get_workbook_snapshot(path)
+    assert get_workbook_snapshot(path) is first
+
+    _write_workbook(path, 7)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, first.signature[0] + 10 ** 9))
+    reloaded = get_workbook_snapshot(path)
+    assert reloaded is not first
+    assert reloaded.cell(SHEET_SCOPE_DEFINITION, METRIC_FIRST_ROW + 1, 4) == 7
+    assert get_workbook_snapshot(path) is reloaded
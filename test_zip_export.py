@@ -0,0 +1,103 @@
+"""
+Bulk ZIP export: the streamed archive holds stored and regenerated Word
+reports plus a manifest, and stream_zip builds valid archives from any source
+"""
+
+import contextlib
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+
+import api_server
+from backend.core.report_service import ReportService
+from backend.scoping_engine import ScopingEngine
+from backend.storage import results
+from backend.utils.zip_stream import stream_zip
+
+EMAIL = 'export@example.com'
+ROLES = ['PM USA']
+
+
+def _submission(n, client_name):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine = ScopingEngine()
+        engine.process_scope({'scope_inputs': [
+            {'name': 'Account', 'in_scope': 'YES', 'details': 1500},
+            {'name': 'Data Forms', 'in_scope': 'YES', 'details': 12},
+        ], 'selected_roles': ROLES})
+        engine.calculate_effort()
+        engine.calculate_fte_allocation()
+    return {
+        'submission_id': f'{results.safe_email(EMAIL)}_20260101_00000{n}',
+        'user_email': EMAIL,
+        'client_name': client_name,
+        'project_name': 'Close',
+        'submitted_at': f'2026-01-0{n + 1}T10:00:00',
+        'selected_roles': ROLES,
+        'scoping_data': {'dimensions-account': {'value': 'YES', 'count': 0}},
+        'calculation_result': json.loads(json.dumps(engine.build_calculation_result())),
+    }
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setattr(results, 'RESULTS_DIR', tmp_path)
+    monkeypatch.setattr(results, '_submission_index', results.SubmissionIndexCache())
+    monkeypatch.setattr(api_server, 'OUTPUT_DIR', tmp_path)
+    service = ReportService(max_workers=1)
+    monkeypatch.setattr(api_server, 'report_service', service)
+    yield service
+    service.shutdown(wait=False)
+
+
+def test_export_streams_stored_and_regenerated_reports(service, tmp_path, monkeypatch):
+    monkeypatch.setattr(api_server, 'EXPORT_MANIFEST_SPOOL_BYTES', 1)  # Manifest rolls over to a temp file
+    stored_docx = tmp_path / 'stored.docx'
+    stored_docx.write_bytes(b'stored word report')
+    stored = dict(_submission(0, 'Acme Corp'), files={'word_report': str(stored_docx)})
+    regenerated = _submission(1, 'Globex/EU')
+    for submission in (stored, regenerated):
+        results.save_user_result(EMAIL, submission)
+
+    response = api_server.app.test_client().get('/api/scoping/export', query_string={'email': EMAIL})
+    assert response.status_code == 200 and response.mimetype == 'application/zip'
+
+    with zipfile.ZipFile(io.BytesIO(response.get_data())) as archive:
+        stored_name = f"Acme Corp/{stored['submission_id']}.docx"
+        regenerated_name = f"Globex_EU/{regenerated['submission_id']}.docx"
+        assert archive.namelist() == [stored_name, regenerated_name, 'export_manifest.csv']
+        assert archive.read(stored_name) == b'stored word report'
+        with zipfile.ZipFile(io.BytesIO(archive.read(regenerated_name))) as docx:
+            assert 'word/document.xml' in docx.namelist()
+        manifest = list(csv.DictReader(io.StringIO(archive.read('export_manifest.csv').decode('utf-8'))))
+
+    assert [(row['submission_id'], row['file'], row['source']) for row in manifest] == [
+        (stored['submission_id'], stored_name, 'stored'),
+        (regenerated['submission_id'], regenerated_name, 'regenerated'),
+    ]
+
+
+def test_export_rejects_bad_dates(service):
+    response = api_server.app.test_client().get('/api/scoping/export', query_string={'from': 'soon'})
+    assert response.status_code == 400
+
+
+def test_stream_zip_sources(tmp_path):
+    path = tmp_path / 'big.bin'
+    path.write_bytes(bytes(range(256)) * 1000)
+    opened = open(path, 'rb')
+    entries = [('bytes.txt', b'hello'), ('file.bin', path), ('lazy.txt', lambda: b'made on demand'),
+               ('opened.bin', opened)]
+
+    chunks = list(stream_zip(iter(entries), chunk_size=4096))
+    assert len(chunks) > 1
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+        assert archive.testzip() is None
+        assert archive.read('bytes.txt') == b'hello'
+        assert archive.read('file.bin') == path.read_bytes()
+        assert archive.read('lazy.txt') == b'made on demand'
+        assert archive.read('opened.bin') == path.read_bytes()
+    assert opened.closed